@@ -0,0 +1,194 @@
+# MuditaKurye entegrasyon dökümanlarını tek komutla üretir
+#
+# script.py ... script_4.py her biri bir Markdown dosyasını string olarak tutar.
+# Bu dosya hepsini paralel çalıştırır, içerikleri (ve ## bölümlerini) hash'ler
+# ve yalnızca içeriği değişen .md dosyalarını yeniden yazar. Değişmeyen
+# dosyaların mtime'ı korunur, böylece statik site cache'i boşuna bozulmaz.
+#
+# Kullanım:
+#   python build.py                # değişen dosyaları yaz
+#   python build.py --check        # yazmadan kontrol et (CI), değişiklik varsa exit 1
+#   python build.py --force        # elle düzenlenmiş dosyaların üzerine de yaz
+#   python build.py --out ./dist   # farklı bir dizine üret
+
+import argparse
+import hashlib
+import json
+import os
+import runpy
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_NAME = '.docs-build-cache.json'
+
+
+def current_umask():
+    # umask yalnızca değiştirilerek okunabilir; iş parçacıkları başlamadan bir kez okunur
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+UMASK = current_umask()
+
+# script -> (içerik değişkeni, çıktı dosyası)
+GENERATORS = (
+    ('script.py', 'readme_content', 'README.md'),
+    ('script_1.py', 'auth_content', 'AUTHENTICATION.md'),
+    ('script_2.py', 'order_content', 'ORDER-MANAGEMENT.md'),
+    ('script_3.py', 'webhook_content', 'WEBHOOK-INTEGRATION.md'),
+    ('script_4.py', 'testing_content', 'TESTING.md'),
+)
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    try:
+        with open(path, 'rb') as handle:
+            return sha256(handle.read())
+    except FileNotFoundError:
+        return None
+
+
+def section_hashes(content):
+    """``## `` başlıklarına göre bölüm hash'leri (kod blokları içi hariç)."""
+    sections = {}
+    current, lines, in_fence = '_intro', [], False
+
+    def flush():
+        key = current
+        index = 2
+        while key in sections:
+            key = f'{current} ({index})'
+            index += 1
+        sections[key] = sha256('\n'.join(lines).encode('utf-8'))
+
+    for line in content.split('\n'):
+        if line.startswith('```'):
+            in_fence = not in_fence
+        if not in_fence and line.startswith('## '):
+            flush()
+            current, lines = line[3:].strip(), []
+        lines.append(line)
+    flush()
+    return sections
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding='utf-8') as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    write_atomic(os.path.join(out_dir, MANIFEST_NAME),
+                 json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def write_atomic(path, data):
+    directory = os.path.dirname(path)
+    # mkstemp dosyayı 0600 açar; eski dosyanın (yoksa umask'ın) izinleri korunur
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def build_one(script, variable, output, out_dir, previous, force, check):
+    """Tek bir dökümanı üretir; sonuç ve yeni manifest kaydını döndürür."""
+    script_path = os.path.join(BASE_DIR, script)
+    output_path = os.path.join(out_dir, output)
+
+    with open(script_path, 'rb') as handle:
+        source_hash = sha256(handle.read())
+    disk_hash = file_hash(output_path)
+
+    # Kaynak ve çıktı son derlemeden beri değişmediyse script'i çalıştırmaya gerek yok
+    if previous and previous.get('source') == source_hash and previous.get('output') == disk_hash:
+        return output, 'cached', [], previous
+
+    content = runpy.run_path(script_path, run_name='docs_build')[variable]
+    data = content.encode('utf-8')
+    content_hash = sha256(data)
+    sections = section_hashes(content)
+    entry = {'source': source_hash, 'output': content_hash, 'sections': sections}
+
+    if disk_hash == content_hash:
+        return output, 'unchanged', [], entry
+
+    old_sections = (previous or {}).get('sections', {})
+    changed = sorted(name for name, digest in sections.items() if old_sections.get(name) != digest)
+    changed += sorted(f'-{name}' for name in old_sections if name not in sections)
+
+    # Dosya son derlemeden sonra elle düzenlenmişse üzerine yazma. Manifest commit'lenmez;
+    # kaydı olmayan (ör. yeni checkout'taki) dosya üretilen çıktıyla karşılaştırılır ve
+    # farklıysa güncel değil sayılır
+    edited_by_hand = disk_hash is not None and previous is not None and previous.get('output') != disk_hash
+    if edited_by_hand and not force:
+        return output, 'edited', changed, previous
+
+    if check:
+        return output, 'stale', changed, previous
+
+    write_atomic(output_path, data)
+    return output, 'written', changed, entry
+
+
+def build(out_dir, force=False, check=False, jobs=None):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+
+    with ThreadPoolExecutor(max_workers=jobs or len(GENERATORS)) as pool:
+        futures = [
+            pool.submit(build_one, script, variable, output, out_dir, manifest.get(output), force, check)
+            for script, variable, output in GENERATORS
+        ]
+        results = [future.result() for future in futures]
+
+    new_manifest = {output: entry for output, _status, _changed, entry in results if entry}
+    if not check and new_manifest != manifest:
+        save_manifest(out_dir, new_manifest)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='MuditaKurye dökümanlarını üret')
+    parser.add_argument('--out', default=BASE_DIR, help='Çıktı dizini')
+    parser.add_argument('--force', action='store_true', help='Elle düzenlenmiş dosyaların üzerine yaz')
+    parser.add_argument('--check', action='store_true', help='Yazmadan kontrol et')
+    parser.add_argument('--jobs', type=int, default=None, help='Paralel iş sayısı')
+    args = parser.parse_args(argv)
+
+    icons = {'cached': '⚡', 'unchanged': '✅', 'written': '📝', 'stale': '❌', 'edited': '⚠️'}
+    results = build(os.path.abspath(args.out), force=args.force, check=args.check, jobs=args.jobs)
+
+    for output, status, changed, _entry in results:
+        detail = f" ({', '.join(changed)})" if changed else ''
+        print(f'{icons[status]} {output}: {status}{detail}')
+
+    if any(status == 'edited' for _output, status, _changed, _entry in results):
+        print('\n⚠️ Elle düzenlenmiş dosyalar atlandı; script içeriğini güncelleyin veya --force kullanın.')
+    if args.check and any(status in ('stale', 'edited') for _output, status, _changed, _entry in results):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
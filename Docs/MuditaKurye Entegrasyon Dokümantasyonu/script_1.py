@@ -144,5 +144,6 @@ API Key'ler süresiz çalışır ancak güvenlik için periyodik yenileme öneri
 [Sipariş Yönetimi →](./ORDER-MANAGEMENT.md)
 """
 
-print("✅ AUTHENTICATION.md hazırlandı")
-print(f"Dosya boyutu: {len(auth_content)} karakter\n")
+if __name__ == "__main__":
+    print("✅ AUTHENTICATION.md hazırlandı")
+    print(f"Dosya boyutu: {len(auth_content)} karakter\n")
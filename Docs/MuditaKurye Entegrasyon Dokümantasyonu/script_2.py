@@ -256,5 +256,6 @@ const order2 = await createCourierOrder({
 [Webhook Entegrasyonu →](./WEBHOOK-INTEGRATION.md)
 """
 
-print("✅ ORDER-MANAGEMENT.md hazırlandı")
-print(f"Dosya boyutu: {len(order_content)} karakter\n")
+if __name__ == "__main__":
+    print("✅ ORDER-MANAGEMENT.md hazırlandı")
+    print(f"Dosya boyutu: {len(order_content)} karakter\n")
@@ -21,10 +21,16 @@ https://yourapi.com/webhook/muditakurye/cancel
 ## 🔐 Webhook Secret
 
 ```
-wh_0rC-rimL096iJALsxXui67-n0LrKWVNlpHknLHn12g4
+wh_YOUR_SECRET_KEY_FROM_MUDITA_PANEL
 ```
 
-Bu secret ile gelen isteklerin MuditaKurye'den geldiğini doğrulayabilirsiniz.
+⚠️ **Önemli:** Bu secret'ı MuditaKurye panelinden alacaksınız. Gelen isteklerin MuditaKurye'den geldiğini doğrulamak için kullanılır.
+
+**Güvenlik Notları:**
+- Secret'ı ASLA Git'e commit etmeyin
+- .env dosyasında saklayın
+- Production ve development için farklı secret'lar kullanın
+- Secret sızdıysa hemen rotate edin
 
 ## 📨 Webhook Payload Yapısı
 
@@ -59,9 +65,7 @@ Bu secret ile gelen isteklerin MuditaKurye'den geldiğini doğrulayabilirsiniz.
 }
 ```
 
-## 🔒 Signature Doğrulama
-
-### HMAC SHA-256 ile Güvenlik
+## 🔒 Signature Doğrulama (HMAC SHA-256)
 
 ```javascript
 import crypto from 'crypto';
@@ -83,8 +87,6 @@ export function verifyWebhookSignature(payload, signature, secret) {
 
 ## 💻 Express.js Webhook Sunucusu
 
-### Temel Yapı
-
 ```javascript
 // server.js
 import express from 'express';
@@ -105,12 +107,11 @@ function verifySignature(req, res, next) {
   const secret = process.env.MUDITAKURYE_WEBHOOK_SECRET;
   
   if (!secret) {
-    console.warn('⚠️ Webhook secret tanımlı değil, güvenlik kontrolü atlanıyor');
+    console.warn('⚠️ Webhook secret tanımlı değil');
     return next();
   }
   
   if (!signature) {
-    console.warn('⚠️ İstek signature içermiyor');
     return res.status(401).json({ error: 'Missing signature' });
   }
   
@@ -120,11 +121,9 @@ function verifySignature(req, res, next) {
   
   try {
     if (!crypto.timingSafeEqual(Buffer.from(signature), Buffer.from(expected))) {
-      console.error('❌ Signature doğrulaması başarısız');
       return res.status(401).json({ error: 'Invalid signature' });
     }
   } catch (error) {
-    console.error('❌ Signature doğrulama hatası:', error);
     return res.status(401).json({ error: 'Signature verification failed' });
   }
   
@@ -138,7 +137,6 @@ app.post('/webhook/muditakurye/status', verifySignature, async (req, res) => {
   console.log(`📬 [Webhook] ${event}`);
   console.log(`   Order ID: ${orderId}`);
   console.log(`   Status: ${previousStatus} → ${status}`);
-  console.log(`   Time: ${timestamp}`);
   
   // Hızlıca 200 dön (5 saniye içinde)
   res.status(200).json({ received: true });
@@ -147,26 +145,24 @@ app.post('/webhook/muditakurye/status', verifySignature, async (req, res) => {
   try {
     await processStatusUpdate(orderId, status, req.body);
   } catch (error) {
-    console.error('❌ Status update işleme hatası:', error);
-    // Hata loglama, alerting vs.
+    console.error('❌ Status update hatası:', error);
   }
 });
 
 // Cancel webhook endpoint
 app.post('/webhook/muditakurye/cancel', verifySignature, async (req, res) => {
-  const { event, orderId, reason, canceledBy, timestamp } = req.body;
+  const { event, orderId, reason, canceledBy } = req.body;
   
   console.log(`📬 [Webhook] ${event}`);
   console.log(`   Order ID: ${orderId}`);
   console.log(`   Reason: ${reason}`);
-  console.log(`   Canceled By: ${canceledBy}`);
   
   res.status(200).json({ received: true });
   
   try {
     await processCancelation(orderId, reason, req.body);
   } catch (error) {
-    console.error('❌ Cancel işleme hatası:', error);
+    console.error('❌ Cancel hatası:', error);
   }
 });
 
@@ -177,11 +173,11 @@ app.get('/webhook/muditakurye/health', (req, res) => {
 
 const PORT = process.env.PORT || 3000;
 app.listen(PORT, () => {
-  console.log(`🚀 Webhook sunucusu çalışıyor: http://localhost:${PORT}`);
+  console.log(`🚀 Webhook sunucusu: http://localhost:${PORT}`);
 });
 ```
 
-## 🎯 Next.js API Route (Alternatif)
+## 🎯 Next.js API Route
 
 ```javascript
 // pages/api/webhook/muditakurye/status.js
@@ -189,9 +185,7 @@ import crypto from 'crypto';
 import { buffer } from 'micro';
 
 export const config = {
-  api: {
-    bodyParser: false,
-  },
+  api: { bodyParser: false },
 };
 
 export default async function handler(req, res) {
@@ -199,7 +193,6 @@ export default async function handler(req, res) {
     return res.status(405).json({ error: 'Method not allowed' });
   }
 
-  // Raw body al
   const rawBody = await buffer(req);
   const signature = req.headers['x-muditakurye-signature'];
   const secret = process.env.MUDITAKURYE_WEBHOOK_SECRET;
@@ -214,55 +207,38 @@ export default async function handler(req, res) {
         return res.status(401).json({ error: 'Invalid signature' });
       }
     } catch {
-      return res.status(401).json({ error: 'Signature verification failed' });
+      return res.status(401).json({ error: 'Verification failed' });
     }
   }
 
-  // Payload parse et
   const payload = JSON.parse(rawBody.toString());
-  const { event, orderId, status } = payload;
-
-  console.log(`📬 Webhook: ${event} - Order: ${orderId} - Status: ${status}`);
+  console.log(`📬 Webhook: ${payload.event} - ${payload.orderId}`);
 
-  // Hızlıca yanıt dön
   res.status(200).json({ received: true });
-
-  // Asenkron işlemler (örn: DB update)
-  // processStatusUpdate(payload).catch(console.error);
 }
 ```
 
-## 📊 İş Mantığı Örnekleri
-
-### Durum Güncelleme İşleme
+## 📊 İş Mantığı
 
 ```javascript
 async function processStatusUpdate(orderId, status, webhookData) {
-  // Database güncelleme
+  // Database güncelle
   await db.orders.update(
     { id: orderId },
     { 
       courierStatus: status,
-      lastWebhookAt: new Date(),
-      webhookHistory: db.raw('array_append(webhook_history, ?)', [JSON.stringify(webhookData)])
+      lastWebhookAt: new Date()
     }
   );
   
-  // Müşteriye bildirim gönder
+  // Müşteriye bildirim
   if (status === 'ON_DELIVERY') {
-    await sendCustomerNotification(orderId, 'Siparişiniz yolda!');
+    await sendNotification(orderId, 'Siparişiniz yolda!');
   } else if (status === 'DELIVERED') {
-    await sendCustomerNotification(orderId, 'Siparişiniz teslim edildi.');
+    await sendNotification(orderId, 'Teslim edildi.');
   }
-  
-  // Admin panele bildirim
-  await notifyAdminPanel(orderId, status);
 }
-```
-
-### İptal İşleme
 
-```javascript
 async function processCancelation(orderId, reason, webhookData) {
   await db.orders.update(
     { id: orderId },
@@ -273,50 +249,24 @@ async function processCancelation(orderId, reason, webhookData) {
     }
   );
   
-  // Müşteriye bildirim
-  await sendCustomerNotification(orderId, `Siparişiniz iptal edildi. Sebep: ${reason}`);
-  
-  // Ödeme iadesi tetikle (gerekirse)
-  if (webhookData.paymentCaptured) {
-    await initiateRefund(orderId);
-  }
+  await sendNotification(orderId, `İptal: ${reason}`);
 }
 ```
 
-## 🔄 İdempotency ve Retry Yönetimi
-
-```javascript
-// Webhook idempotency için cache/DB kontrolü
-const processedWebhooks = new Set();
-
-app.post('/webhook/muditakurye/status', async (req, res) => {
-  const webhookId = `${req.body.orderId}-${req.body.status}-${req.body.timestamp}`;
-  
-  if (processedWebhooks.has(webhookId)) {
-    console.log('ℹ️ Webhook zaten işlendi, atlanıyor');
-    return res.status(200).json({ received: true, duplicate: true });
-  }
-  
-  processedWebhooks.add(webhookId);
-  
-  // İşleme devam et...
-  res.status(200).json({ received: true });
-});
-```
-
 ## ⚠️ En İyi Pratikler
 
-1. **Hızlı Yanıt**: Webhook'a 5 saniye içinde 200 dön
+1. **Hızlı Yanıt**: 5 saniye içinde 200 dön
 2. **Asenkron İşleme**: Ağır işleri queue'ya al
-3. **İdempotency**: Aynı webhook birden fazla gelebilir
+3. **İdempotency**: Aynı webhook tekrar gelebilir
 4. **Loglama**: Tüm webhook'ları kaydet
-5. **Hata Yönetimi**: İşlem hatası olsa bile 200 dön, MuditaKurye retry yapar
-6. **Güvenlik**: Signature doğrulamayı mutlaka yap
+5. **Signature Doğrulama**: Mutlaka yap
+6. **Hata Yönetimi**: İşlem hatası olsa da 200 dön
 
 ## 🔗 Sonraki Adım
 
 [Test ve Production →](./TESTING.md)
 """
 
-print("✅ WEBHOOK-INTEGRATION.md hazırlandı")
-print(f"Dosya boyutu: {len(webhook_content)} karakter\n")
+if __name__ == "__main__":
+    print("✅ WEBHOOK-INTEGRATION.md hazırlandı")
+    print(f"Dosya boyutu: {len(webhook_content)} karakter\n")
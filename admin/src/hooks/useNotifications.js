@@ -13,6 +13,8 @@ export function useNotifications() {
   const [showOrderModal, setShowOrderModal] = useState(false);
   const eventSourceRef = useRef(null);
   const audioRef = useRef(null);
+  // Id of the last event received, so a reconnect gets what it missed
+  const lastEventIdRef = useRef(null);
 
   /**
    * Play notification sound
@@ -97,7 +99,9 @@ export function useNotifications() {
 
       // Create new EventSource connection
       // EventSource doesn't support custom headers, so we pass token as query parameter
-      const url = `${backendUrl}/api/notifications/stream?token=${encodeURIComponent(token)}`;
+      const lastEventId = lastEventIdRef.current;
+      const url = `${backendUrl}/api/notifications/stream?token=${encodeURIComponent(token)}`
+        + (lastEventId ? `&lastEventId=${encodeURIComponent(lastEventId)}` : '');
       const eventSource = new EventSource(url, {
         withCredentials: true,
       });
@@ -108,6 +112,10 @@ export function useNotifications() {
       };
 
       eventSource.onmessage = (event) => {
+        if (event.lastEventId) {
+          lastEventIdRef.current = event.lastEventId;
+        }
+
         try {
           const data = JSON.parse(event.data);
 
@@ -128,12 +136,12 @@ export function useNotifications() {
         console.error('SSE connection error:', error);
         setConnected(false);
 
-        // Close and retry connection after 5 seconds
+        // Close and retry connection after 5-10 seconds (spread, so panels don't all reconnect at once)
         eventSource.close();
         setTimeout(() => {
           console.log('Retrying SSE connection...');
           connect();
-        }, 5000);
+        }, 5000 + Math.random() * 5000);
       };
 
       eventSourceRef.current = eventSource;
@@ -20,6 +20,8 @@ export function useRealtimeStats({
   const eventSourceRef = useRef(null)
   const reconnectTimeoutRef = useRef(null)
   const reconnectAttemptsRef = useRef(0)
+  // Id of the last event received, so a reconnect gets what it missed
+  const lastEventIdRef = useRef(null)
   const maxReconnectAttempts = 5
   const baseReconnectDelay = 2000 // 2 seconds
 
@@ -61,7 +63,9 @@ export function useRealtimeStats({
       // Note: EventSource doesn't support custom headers directly
       // We'll append token as query parameter instead
       const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:3000'
+      const lastEventId = lastEventIdRef.current
       const sseUrl = `${apiUrl}/api/notifications/stream?token=${token}`
+        + (lastEventId ? `&lastEventId=${encodeURIComponent(lastEventId)}` : '')
 
       const eventSource = new EventSource(sseUrl)
       eventSourceRef.current = eventSource
@@ -76,6 +80,10 @@ export function useRealtimeStats({
 
       // Message received
       eventSource.onmessage = (event) => {
+        if (event.lastEventId) {
+          lastEventIdRef.current = event.lastEventId
+        }
+
         try {
           const data = JSON.parse(event.data)
           setLastEvent(data)
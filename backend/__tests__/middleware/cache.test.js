@@ -21,5 +21,15 @@ describe('Cache Middleware', () => {
     const middleware = invalidateCache('products:*');
     expect(typeof middleware).toBe('function');
   });
+
+  it('should create cache middleware with tags', () => {
+    expect(typeof cache(300, ['products'])).toBe('function');
+    expect(typeof cache(300, (req, data) => [`product:${data.product._id}`])).toBe('function');
+  });
+
+  it('should create invalidate cache middleware with tags', () => {
+    const middleware = invalidateCache((req) => ['products', `product:${req.body.id}`]);
+    expect(typeof middleware).toBe('function');
+  });
 });
 
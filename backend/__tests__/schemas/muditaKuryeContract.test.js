@@ -0,0 +1,68 @@
+import {
+  validateMuditaKuryeWebhookPayload,
+  validateMuditaKuryeOrder,
+  MUDITAKURYE_STATUSES
+} from '../../schemas/generated/muditaKuryeContract.js';
+
+/**
+ * Generated MuditaKurye Contract Validator Tests
+ */
+describe('MuditaKurye Contract Validators', () => {
+  const statusChanged = {
+    event: 'order.status_changed',
+    orderId: 'order_123456',
+    muditaKuryeOrderId: '550e8400-e29b-41d4-a716-446655440000',
+    orderNumber: 'RST-20251112-0042',
+    status: 'PREPARED',
+    previousStatus: 'VALIDATED',
+    timestamp: '2025-11-12T17:45:00+03:00',
+    provider: 'THIRD_PARTY',
+    providerRestaurantId: 'rest_85b4ad47f35b45e893c9'
+  };
+
+  it('should expose the nine documented statuses', () => {
+    expect(MUDITAKURYE_STATUSES).toHaveLength(9);
+    expect(MUDITAKURYE_STATUSES).toContain('ON_DELIVERY');
+  });
+
+  it('should accept the documented status webhook', () => {
+    expect(validateMuditaKuryeWebhookPayload(statusChanged).valid).toBe(true);
+  });
+
+  it('should accept ISO date-times without an offset, as the Joi schema did', () => {
+    expect(validateMuditaKuryeWebhookPayload({ ...statusChanged, timestamp: '2025-11-12T17:45:00' }).valid).toBe(true);
+    expect(validateMuditaKuryeWebhookPayload({ ...statusChanged, timestamp: '12.11.2025 17:45' }).valid).toBe(false);
+  });
+
+  it('should accept any previousStatus string, as the Joi schema did', () => {
+    expect(validateMuditaKuryeWebhookPayload({ ...statusChanged, previousStatus: 'PICKED_UP' }).valid).toBe(true);
+    expect(validateMuditaKuryeWebhookPayload({ ...statusChanged, previousStatus: 3 }).valid).toBe(false);
+  });
+
+  it('should reject unknown statuses and missing timestamp', () => {
+    const { valid, errors } = validateMuditaKuryeWebhookPayload({ ...statusChanged, status: 'LOST', timestamp: undefined });
+    expect(valid).toBe(false);
+    expect(errors.map(error => error.field)).toEqual(['status', 'timestamp']);
+  });
+
+  it('should not mutate the payload', () => {
+    const payload = { ...statusChanged, extra: 'kept' };
+    validateMuditaKuryeWebhookPayload(payload);
+    expect(payload).toEqual({ ...statusChanged, extra: 'kept' });
+  });
+
+  it('should require documented order fields and validate items', () => {
+    const { valid, errors } = validateMuditaKuryeOrder({
+      orderId: 'order_1',
+      restaurantId: 'rest_1',
+      customerName: 'Ahmet',
+      items: [
+        { productCode: 'P1', productName: 'Tulumba', quantity: '2', unitPrice: '10.50', totalAmount: 21 },
+        { productCode: 'P2', productName: 'Baklava', quantity: 'iki', unitPrice: 10, totalAmount: 20 }
+      ]
+    });
+    expect(valid).toBe(false);
+    // Numeric strings pass, as Joi.number() converted them
+    expect(errors.map(error => error.field)).toEqual(['deliveryAddress', 'items.1.quantity']);
+  });
+});
@@ -0,0 +1,42 @@
+import { BranchSpatialIndex, pickNearestByCoordinates } from '../../services/BranchSpatialIndex.js';
+
+/**
+ * Branch Spatial Index Tests
+ */
+describe('BranchSpatialIndex', () => {
+  const branch = (code, latitude, longitude, assignedZones = []) => ({
+    code,
+    address: { coordinates: { latitude, longitude } },
+    assignedZones
+  });
+
+  const branches = [
+    branch('MENEMEN', 38.6069, 27.0699, ['zone_menemen']),
+    branch('BORNOVA', 38.4622, 27.2166),
+    branch('KARSIYAKA', 38.4552, 27.1098, ['zone_north']),
+    branch('BUCA', 38.3883, 27.1753),
+    branch('NO_PIN', null, null, ['zone_north'])
+  ];
+
+  it('should pick the same nearest branch as a linear haversine scan', () => {
+    const index = new BranchSpatialIndex(branches);
+
+    for (let lat = 38.3; lat <= 38.7; lat += 0.05) {
+      for (let lon = 26.9; lon <= 27.3; lon += 0.05) {
+        const address = { coordinates: { latitude: lat, longitude: lon } };
+        expect(index.findBest({ address }).code).toBe(pickNearestByCoordinates(branches, address).code);
+      }
+    }
+  });
+
+  it('should prefer branches serving the delivery zone and fall back to the first branch', () => {
+    const index = new BranchSpatialIndex(branches);
+    const nearBuca = { coordinates: { latitude: 38.39, longitude: 27.17 } };
+
+    expect(index.findBest({ delivery: { zoneId: 'zone_menemen' }, address: nearBuca }).code).toBe('MENEMEN');
+    expect(index.findBest({ delivery: { zoneId: 'zone_north' }, address: nearBuca }).code).toBe('KARSIYAKA');
+    expect(index.findBest({ delivery: { zoneId: 'zone_unknown' }, address: nearBuca }).code).toBe('BUCA');
+    expect(index.findBest({ address: { street: 'Kordon' } }).code).toBe('MENEMEN');
+    expect(new BranchSpatialIndex([]).findBest({ address: nearBuca })).toBeNull();
+  });
+});
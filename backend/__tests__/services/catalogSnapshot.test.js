@@ -0,0 +1,71 @@
+import { CatalogSnapshot } from '../../services/CatalogSnapshot.js';
+
+/**
+ * Catalog Snapshot Tests
+ * Documents are applied directly, as a sync would; no database is needed
+ */
+describe('CatalogSnapshot', () => {
+  const category = { _id: 'c1', name: 'Baklava', slug: 'baklava', active: true, updatedAt: 1000 };
+  const product = (id, fields) => ({
+    _id: id,
+    name: `Ürün ${id}`,
+    description: 'Uzun açıklama',
+    category: 'c1',
+    basePrice: 25000,
+    sizePrices: [{ size: 500, price: 40000 }],
+    sizes: [500],
+    labels: ['yeni'],
+    stock: 5,
+    active: true,
+    date: 1,
+    updatedAt: 1000,
+    ...fields
+  });
+
+  const createSnapshot = () => {
+    const snapshot = new CatalogSnapshot();
+    snapshot.applyCategories([category]);
+    snapshot.applyProducts([
+      product('p1', { date: 1 }),
+      product('p2', { date: 2, stock: 0, labels: ['yeni', 'çok satan'] }),
+      product('p3', { date: 3, active: false, basePrice: 100 })
+    ]);
+    return snapshot;
+  };
+
+  it('should list active products newest first with their category', () => {
+    const { products } = JSON.parse(createSnapshot().getList().body);
+
+    expect(products.map(p => p._id)).toEqual(['p2', 'p1']);
+    expect(products[0].category).toEqual({ _id: 'c1', name: 'Baklava', slug: 'baklava', active: true });
+    expect(products[0].description).toBe('Uzun açıklama');
+  });
+
+  it('should keep the ETag until the catalog changes', () => {
+    const snapshot = createSnapshot();
+    const before = snapshot.getList({ inStockOnly: true });
+
+    expect(snapshot.getList({ inStockOnly: true }).etag).toBe(before.etag);
+    snapshot.applyProducts([product('p2', { date: 2, stock: 3, updatedAt: 2000 })]);
+
+    const after = snapshot.getList({ inStockOnly: true });
+    expect(after.etag === before.etag).toBe(false);
+    expect(JSON.parse(after.body).products.map(p => p._id)).toEqual(['p2', 'p1']);
+  });
+
+  it('should leave out fields cards do not need', () => {
+    const [card] = JSON.parse(createSnapshot().getList({ view: 'card' }).body).products;
+
+    expect(card.description).toBe(undefined);
+    expect(card.name).toBe('Ürün p2');
+  });
+
+  it('should precompute price bounds and facets from active products', () => {
+    const snapshot = createSnapshot();
+
+    expect(snapshot.getPriceRange()).toEqual({ minPrice: 250, maxPrice: 400 });
+    expect(snapshot.getFacets().labels).toEqual([{ value: 'yeni', count: 2 }, { value: 'çok satan', count: 1 }]);
+    expect(snapshot.getFacets().categories).toEqual([{ _id: 'c1', name: 'Baklava', slug: 'baklava', count: 2 }]);
+    expect(snapshot.getFacets().inStock).toBe(1);
+  });
+});
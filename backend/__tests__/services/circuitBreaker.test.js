@@ -0,0 +1,87 @@
+import { CircuitBreaker } from '../../services/CircuitBreakerService.js';
+
+/**
+ * Circuit Breaker Tests
+ * Short windows and timeouts; Redis is not connected, so state stays local
+ */
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const createBreaker = (config) => new CircuitBreaker('test', {
+  minimumCalls: 4,
+  slowCallDurationMs: 20,
+  latencyThresholdMs: 1000,
+  timeout: 30,
+  windowSize: 1000,
+  ...config
+});
+
+describe('CircuitBreaker', () => {
+  it('should open on the slow-call rate even when every call succeeds', async () => {
+    const breaker = createBreaker();
+
+    for (let i = 0; i < 4; i++) {
+      await breaker.execute(async () => { await sleep(25); return { success: true }; });
+    }
+
+    expect(breaker.getState()).toBe('OPEN');
+    expect(breaker.getStatus().metrics.lastTripReason).toBe('slow_call_rate');
+
+    let rejected = null;
+    await breaker.execute(async () => ({ success: true })).catch(error => { rejected = error; });
+    expect(rejected.code).toBe('CIRCUIT_OPEN');
+  });
+
+  it('should open while calls hang, before any of them returns', async () => {
+    const breaker = createBreaker({ minimumSlowInFlight: 2 });
+    const hanging = [1, 2, 3].map(() => breaker.execute(async () => { await sleep(100); return { success: true }; }));
+
+    await sleep(30);
+    let rejected = null;
+    await breaker.execute(async () => ({ success: true })).catch(error => { rejected = error; });
+
+    expect(rejected.code).toBe('CIRCUIT_OPEN');
+    expect(breaker.getStatus().metrics.lastTripReason).toBe('slow_calls_in_flight');
+    await Promise.all(hanging);
+  });
+
+  it('should count retryable failed results but not client errors', async () => {
+    const breaker = createBreaker({ failureThreshold: 3, minimumCalls: 100 });
+    const badRequest = Object.assign(new Error('Bad request'), { statusCode: 400 });
+
+    for (let i = 0; i < 3; i++) {
+      await breaker.execute(async () => { throw badRequest; }).catch(() => {});
+    }
+    expect(breaker.getState()).toBe('CLOSED');
+
+    for (let i = 0; i < 3; i++) {
+      await breaker.execute(async () => ({ success: false, retryable: true, error: { message: 'HTTP 502' } }));
+    }
+    expect(breaker.getState()).toBe('OPEN');
+    expect(breaker.getStatus().metrics.lastTripReason).toBe('consecutive_failures');
+  });
+
+  it('should let a limited number of probes through when half-open', async () => {
+    const breaker = createBreaker({ failureThreshold: 1, halfOpenRequests: 2 });
+    await breaker.execute(async () => { throw new Error('down'); }).catch(() => {});
+    expect(breaker.getState()).toBe('OPEN');
+
+    await sleep(40);
+    const outcomes = await Promise.allSettled(
+      [1, 2, 3].map(() => breaker.execute(async () => { await sleep(5); return { success: true }; }))
+    );
+
+    expect(outcomes.map(outcome => outcome.status)).toEqual(['fulfilled', 'fulfilled', 'rejected']);
+    expect(breaker.getState()).toBe('CLOSED');
+  });
+
+  it('should stay open longer after a failed probe', async () => {
+    const breaker = createBreaker({ failureThreshold: 1 });
+    await breaker.execute(async () => { throw new Error('down'); }).catch(() => {});
+
+    await sleep(40);
+    await breaker.execute(async () => { throw new Error('still down'); }).catch(() => {});
+
+    expect(breaker.getState()).toBe('OPEN');
+    expect(breaker.getTimeUntilReset()).toBeGreaterThan(30);
+  });
+});
@@ -0,0 +1,77 @@
+import { CourierRouter } from '../../services/CourierRouter.js';
+
+/**
+ * Courier Router Tests
+ * Breaker state and submission queues are stubbed per instance; no provider calls are made
+ */
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const createRouter = (config) => {
+  const router = new CourierRouter({ minimumCalls: 4, sloLatencyMs: 100, windowMs: 10000, hedgeAfterMs: 0, ...config });
+  router.getBreakerState = () => 'CLOSED';
+  router.getLoad = () => ({ queued: 0, concurrency: 8 });
+  return router;
+};
+
+describe('CourierRouter', () => {
+  it('should route to the faster provider once both have enough calls', () => {
+    const router = createRouter();
+
+    for (let i = 0; i < 4; i++) {
+      router.record('slow', 400, { failed: false });
+      router.record('fast', 50, { failed: false });
+    }
+
+    expect(router.rank(['slow', 'fast']).map(health => health.platform)).toEqual(['fast', 'slow']);
+  });
+
+  it('should keep the given order while providers have too few calls to measure', () => {
+    const router = createRouter();
+    router.record('fast', 10, { failed: false });
+
+    expect(router.rank(['default', 'fast']).map(health => health.platform)).toEqual(['default', 'fast']);
+  });
+
+  it('should rank a provider with an open circuit last', () => {
+    const router = createRouter();
+    router.getBreakerState = (platform) => (platform === 'primary' ? 'OPEN' : 'CLOSED');
+
+    const [first, second] = router.rank(['primary', 'backup']);
+    expect(first.platform).toBe('backup');
+    expect(second.score).toBe(0);
+  });
+
+  it('should hedge a slow submission and cancel the losing duplicate', async () => {
+    const router = createRouter({ hedgeAfterMs: 20 });
+    const cancelled = [];
+
+    const result = await router.dispatch(
+      ['primary', 'backup'],
+      async (platform) => {
+        await sleep(platform === 'primary' ? 60 : 5);
+        return { success: true, externalOrderId: `${platform}-1` };
+      },
+      { orderId: 'order-1', cancel: async (platform, loser) => { cancelled.push(loser.externalOrderId); return { success: true }; } }
+    );
+
+    expect(result.platform).toBe('backup');
+    await sleep(60);
+    expect(cancelled).toEqual(['primary-1']);
+    expect(router.getSloReport().providers.primary.hedges.cancelled).toBe(1);
+    expect(router.getSloReport().providers.backup.hedges.won).toBe(1);
+  });
+
+  it('should burn the error budget with failed submissions', async () => {
+    const router = createRouter({ sloSuccessTarget: 0.9 });
+
+    for (let i = 0; i < 19; i++) {
+      await router.track('muditakurye', async () => ({ success: true }));
+    }
+    await router.track('muditakurye', async () => ({ success: false, retryable: true }));
+    await router.track('muditakurye', async () => ({ success: false, retryable: false }));
+
+    const { success } = router.getSloReport().providers.muditakurye;
+    expect(success.errorBudgetRemaining).toBeGreaterThan(0.52);
+    expect(success.errorBudgetRemaining).toBeLessThanOrEqual(0.53);
+  });
+});
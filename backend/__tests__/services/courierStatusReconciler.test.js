@@ -0,0 +1,126 @@
+import { CourierStatusReconciler } from '../../services/CourierStatusReconciler.js';
+import orderModel from '../../models/OrderModel.js';
+import eventEmitter from '../../utils/eventEmitter.js';
+
+/**
+ * Courier Status Reconciler Tests
+ * Database access is replaced by an in-memory order and a recorded list of writes
+ */
+class InMemoryReconciler extends CourierStatusReconciler {
+  constructor(config) {
+    super({ batchWindowMs: 5, bufferMs: 50, ...config });
+    this.writes = [];
+  }
+
+  async getState(platform, externalOrderId) {
+    const key = `${platform}:${externalOrderId}`;
+    if (!this.orders.has(key)) {
+      this.orders.set(key, {
+        key, orderId: externalOrderId, status: null, rank: -1,
+        pending: [], buffered: [], flushTimer: null, bufferTimer: null, flushing: null, attempts: 0
+      });
+    }
+    return this.orders.get(key);
+  }
+
+  async flush(state) {
+    const events = state.pending.splice(0).sort((a, b) => a.rank - b.rank);
+    if (events.length === 0) return;
+    this.writes.push(events.map(event => event.status));
+    events.forEach(event => event.settle({ success: true }));
+    state.rank = events[events.length - 1].rank;
+    state.status = events[events.length - 1].status;
+  }
+}
+
+const event = (status, previousStatus) => ({ status, previousStatus, timestamp: new Date().toISOString(), tulumbakStatus: status });
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+describe('CourierStatusReconciler', () => {
+  it('should discard stale and duplicate transitions', async () => {
+    const reconciler = new InMemoryReconciler();
+
+    expect((await reconciler.submit('muditakurye', 'o1', event('PREPARED', 'ACCEPTED'))).outcome).toBe('accepted');
+    await reconciler.drain();
+
+    expect((await reconciler.submit('muditakurye', 'o1', event('PREPARED', 'ACCEPTED'))).outcome).toBe('stale');
+    expect((await reconciler.submit('muditakurye', 'o1', event('ASSIGNED', 'ROUTED'))).outcome).toBe('stale');
+  });
+
+  it('should buffer a transition until its predecessor arrives and write both at once', async () => {
+    const reconciler = new InMemoryReconciler();
+    await reconciler.submit('muditakurye', 'o2', event('PREPARED', 'ACCEPTED'));
+    await reconciler.drain();
+
+    expect((await reconciler.submit('muditakurye', 'o2', event('DELIVERED', 'ON_DELIVERY'))).outcome).toBe('buffered');
+    expect((await reconciler.submit('muditakurye', 'o2', event('ON_DELIVERY', 'PREPARED'))).outcome).toBe('accepted');
+    await sleep(20);
+
+    expect(reconciler.writes).toEqual([['PREPARED'], ['ON_DELIVERY', 'DELIVERED']]);
+  });
+
+  it('should apply a buffered transition after the buffer timeout', async () => {
+    const reconciler = new InMemoryReconciler();
+    await reconciler.submit('muditakurye', 'o3', event('PREPARED', 'ACCEPTED'));
+    await reconciler.drain();
+
+    await reconciler.submit('muditakurye', 'o3', event('DELIVERED', 'ON_DELIVERY'));
+    await sleep(80);
+
+    expect(reconciler.writes).toEqual([['PREPARED'], ['DELIVERED']]);
+    expect(reconciler.getStats().gapsForced).toBe(1);
+  });
+
+  it('should never move past a terminal status', async () => {
+    const reconciler = new InMemoryReconciler();
+    await reconciler.submit('muditakurye', 'o4', event('ASSIGNED', 'ROUTED'));
+    await reconciler.submit('muditakurye', 'o4', event('CANCELED', 'ASSIGNED'));
+    await reconciler.drain();
+
+    expect((await reconciler.submit('muditakurye', 'o4', event('DELIVERED', 'ON_DELIVERY'))).outcome).toBe('stale');
+    expect(reconciler.writes).toEqual([['ASSIGNED', 'CANCELED']]);
+  });
+
+  it('should report events dropped after repeated write failures', async () => {
+    const reconciler = new InMemoryReconciler({ maxFlushAttempts: 1 });
+    // Real flush, failing database write
+    reconciler.flush = CourierStatusReconciler.prototype.flush;
+    const findOneAndUpdate = orderModel.findOneAndUpdate;
+    orderModel.findOneAndUpdate = () => ({ lean: () => Promise.reject(new Error('connection lost')) });
+
+    try {
+      const { outcome, written } = await reconciler.submit('muditakurye', 'o5', event('ASSIGNED', 'ROUTED'));
+      expect(outcome).toBe('accepted');
+      expect(await written).toEqual({ success: false, error: 'Courier status write failed: connection lost' });
+    } finally {
+      orderModel.findOneAndUpdate = findOneAndUpdate;
+    }
+  });
+
+  it('should announce courier-only status changes to the order branch', async () => {
+    const reconciler = new InMemoryReconciler();
+    reconciler.flush = CourierStatusReconciler.prototype.flush;
+    const findOneAndUpdate = orderModel.findOneAndUpdate;
+    const projections = [];
+    orderModel.findOneAndUpdate = (filter, update, options) => {
+      projections.push(options.projection);
+      return { lean: async () => ({ _id: 'o6', branchId: 'B1' }) };
+    };
+    const announced = [];
+    const listener = (orderData) => announced.push(orderData);
+    eventEmitter.on('order:statusChanged', listener);
+
+    try {
+      const { written } = await reconciler.submit('muditakurye', 'o6', event('ASSIGNED', 'ROUTED'));
+      expect(await written).toEqual({ success: true });
+      await reconciler.drain();
+
+      expect(projections).toEqual([{ branchId: 1 }]);
+      expect(announced.map(orderData => [orderData._id, orderData.courierStatus, orderData.branchId]))
+        .toEqual([['o6', 'ASSIGNED', 'B1']]);
+    } finally {
+      orderModel.findOneAndUpdate = findOneAndUpdate;
+      eventEmitter.off('order:statusChanged', listener);
+    }
+  });
+});
@@ -0,0 +1,47 @@
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { ColumnarFileWriter, readColumnarFile, stageDurations } from '../../services/LifecycleExportService.js';
+
+/**
+ * Lifecycle Export Tests
+ */
+describe('LifecycleExportService', () => {
+  it('should measure time per courier status from reordered and repeated events', () => {
+    const lifecycle = stageDurations([
+      { status: 'ON_DELIVERY', eventAt: 5000 },
+      { status: 'NEW', eventAt: 1000 },
+      { status: 'DELIVERED', eventAt: 9000 },
+      { status: 'ASSIGNED', eventAt: 2000 },
+      { status: 'ON_DELIVERY', eventAt: 7000 }
+    ]);
+
+    expect(lifecycle.events.map(event => event.status)).toEqual(['NEW', 'ASSIGNED', 'ON_DELIVERY', 'DELIVERED']);
+    expect(lifecycle.stages).toEqual({ NEW: 1000, ASSIGNED: 3000, ON_DELIVERY: 4000 });
+    expect(lifecycle.finalStatus).toBe('DELIVERED');
+    expect(lifecycle.durationMs).toBe(8000);
+  });
+
+  it('should write record batches column by column and read them back as rows', async () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'lifecycle-'));
+    const filePath = path.join(dir, 'events', 'date=2025-01-10', 'part-1.jsonl.gz');
+    const schema = [{ name: 'orderId', type: 'string' }, { name: 'durationMs', type: 'int64' }];
+
+    const writer = new ColumnarFileWriter(filePath, 'events', schema, 2);
+    for (const row of [{ orderId: 'a', durationMs: 10 }, { orderId: 'b' }, { orderId: 'c', durationMs: 30 }]) {
+      await writer.append(row);
+    }
+    await writer.close();
+
+    const rows = [];
+    for await (const row of readColumnarFile(filePath)) rows.push(row);
+
+    expect(rows).toEqual([
+      { orderId: 'a', durationMs: 10 },
+      { orderId: 'b', durationMs: null },
+      { orderId: 'c', durationMs: 30 }
+    ]);
+    expect(fs.existsSync(`${filePath}.tmp`)).toBe(false);
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+});
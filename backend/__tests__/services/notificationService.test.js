@@ -0,0 +1,99 @@
+import { NotificationService } from '../../services/NotificationService.js';
+
+/**
+ * Notification Service Tests
+ * In-process delivery (no Redis) to fake SSE responses
+ */
+describe('NotificationService', () => {
+  const createResponse = () => {
+    const response = {
+      frames: [],
+      blocked: false,
+      destroyed: false,
+      listeners: {},
+      writeHead() {},
+      write(frame) {
+        response.frames.push(frame);
+        return !response.blocked;
+      },
+      on(event, listener) { response.listeners[event] = listener; },
+      once(event, listener) { response.listeners[event] = listener; },
+      destroy() {
+        response.destroyed = true;
+        response.listeners.close?.();
+      },
+      end() {}
+    };
+    return response;
+  };
+
+  const events = (response) => response.frames
+    .filter(frame => frame.startsWith('id: '))
+    .map(frame => JSON.parse(frame.split('\ndata: ')[1]).type);
+
+  let service;
+  afterEach(() => service.stopKeepAlive());
+
+  it('should deliver order events to their branch and to every-branch panels only', async () => {
+    service = new NotificationService();
+    const all = createResponse();
+    const branchA = createResponse();
+    const branchB = createResponse();
+    service.addClient('a1', all);
+    service.addClient('a2', branchA, { branch: 'A' });
+    service.addClient('a3', branchB, { branch: 'B' });
+
+    await service.notifyNewOrder({ _id: 'o1', branchId: 'A', items: [] });
+    await service.broadcast({ type: 'TEST_NOTIFICATION' });
+
+    expect(events(all)).toEqual(['NEW_ORDER', 'TEST_NOTIFICATION']);
+    expect(events(branchA)).toEqual(['NEW_ORDER', 'TEST_NOTIFICATION']);
+    expect(events(branchB)).toEqual(['TEST_NOTIFICATION']);
+  });
+
+  it('should replay missed events after Last-Event-ID and ask for a resync once they are gone', async () => {
+    service = new NotificationService({ ringSize: 3 });
+    for (let i = 1; i <= 5; i++) {
+      await service.notifyOrderStatusChange({ _id: `o${i}`, status: 'Hazırlanıyor' });
+    }
+
+    const caughtUp = createResponse();
+    service.addClient('a1', caughtUp, { lastEventId: 'local-3' });
+    expect(caughtUp.frames.filter(frame => frame.startsWith('id: ')).map(frame => frame.split('\n')[0]))
+      .toEqual(['id: local-4', 'id: local-5']);
+
+    const tooOld = createResponse();
+    service.addClient('a1', tooOld, { lastEventId: 'local-1' });
+    expect(tooOld.frames.some(frame => frame.includes('"RESYNC"'))).toBe(true);
+    expect(service.getStats().resyncs).toBe(1);
+  });
+
+  it('should not drop Redis events whose id an in-process event had', async () => {
+    service = new NotificationService();
+    const panel = createResponse();
+    service.addClient('a1', panel);
+
+    await service.broadcast({ type: 'TEST_NOTIFICATION' });
+    expect(service.receive({ id: 1, channels: ['all'], data: { type: 'NEW_ORDER' } })).toBe(1);
+    expect(service.receive({ id: 1, channels: ['all'], data: { type: 'NEW_ORDER' } })).toBe(0);
+    expect(events(panel)).toEqual(['TEST_NOTIFICATION', 'NEW_ORDER']);
+  });
+
+  it('should buffer while a client is not draining and evict it when the buffer is full', async () => {
+    service = new NotificationService({ maxBufferedMessages: 2 });
+    const slow = createResponse();
+    service.addClient('a1', slow);
+    slow.blocked = true;
+
+    await service.broadcast({ type: 'TEST_NOTIFICATION' });
+    await service.broadcast({ type: 'TEST_NOTIFICATION' });
+    expect(service.clients.size).toBe(1);
+    expect(service.clients.values().next().value.pending.length).toBe(1);
+
+    await service.broadcast({ type: 'TEST_NOTIFICATION' });
+    await service.broadcast({ type: 'TEST_NOTIFICATION' });
+    expect(slow.destroyed).toBe(true);
+    expect(service.clients.size).toBe(0);
+    expect(service.getStats().evicted).toBe(1);
+  });
+});
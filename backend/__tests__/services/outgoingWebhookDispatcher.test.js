@@ -0,0 +1,83 @@
+import { OutgoingWebhookDispatcher } from '../../services/OutgoingWebhookDispatcher.js';
+
+/**
+ * Outgoing Webhook Dispatcher Tests
+ */
+describe('OutgoingWebhookDispatcher', () => {
+  const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+  // In-memory stand-in for the pending events collection
+  const createSource = (events) => ({
+    openDue: async function* () {
+      const now = Date.now();
+      for (const event of events.filter(e => e.status === 'pending' && e.nextRetryAt <= now)) {
+        yield event;
+      }
+    },
+    nextDueAt: async () => null
+  });
+
+  const pendingEvent = (id, subscriptionId) => ({
+    _id: id, subscriptionId, nextRetryAt: Date.now(), status: 'pending'
+  });
+
+  it('should not let a slow subscription hold up the others', async () => {
+    const events = [
+      ...Array.from({ length: 6 }, (_, i) => pendingEvent(`slow_${i}`, 'slow')),
+      ...Array.from({ length: 6 }, (_, i) => pendingEvent(`fast_${i}`, 'fast'))
+    ];
+    const delivered = [];
+
+    const dispatcher = new OutgoingWebhookDispatcher({
+      source: createSource(events),
+      concurrency: 2,
+      deliver: async (eventId) => {
+        const event = events.find(e => e._id === eventId);
+        event.status = 'sending';
+        await sleep(event.subscriptionId === 'slow' ? 200 : 5);
+        event.status = 'delivered';
+        delivered.push(eventId);
+        return event;
+      }
+    });
+    dispatcher.start();
+
+    await sleep(100);
+    const stats = dispatcher.getStats();
+
+    expect(delivered.filter(id => id.startsWith('fast')).length).toBe(6);
+    expect(delivered.filter(id => id.startsWith('slow')).length).toBe(0);
+    expect(stats.subscriptions.slow.active).toBe(2);
+    expect(stats.subscriptions.fast.delivered).toBe(6);
+    dispatcher.stop();
+  });
+
+  it('should pick up events as soon as they are due', async () => {
+    const events = [];
+    const delivered = [];
+
+    const dispatcher = new OutgoingWebhookDispatcher({
+      source: createSource(events),
+      maxIdleMs: 60000,
+      deliver: async (eventId) => {
+        const event = events.find(e => e._id === eventId);
+        event.status = 'delivered';
+        delivered.push(eventId);
+        return event;
+      }
+    });
+    dispatcher.start();
+    await sleep(10);
+
+    const event = { ...pendingEvent('later', 'sub'), nextRetryAt: Date.now() + 30 };
+    events.push(event);
+    dispatcher.notify(event.nextRetryAt);
+
+    await sleep(10);
+    expect(delivered).toEqual([]);
+
+    await sleep(60);
+    expect(delivered).toEqual(['later']);
+    dispatcher.stop();
+  });
+});
@@ -0,0 +1,69 @@
+import { CatalogSnapshot } from '../../services/CatalogSnapshot.js';
+import { ProductSearchIndex, normalize, editDistance } from '../../services/ProductSearchIndex.js';
+
+/**
+ * Product Search Index Tests
+ * The index follows a CatalogSnapshot that documents are applied to directly; no database is needed
+ */
+describe('ProductSearchIndex', () => {
+  const product = (id, fields) => ({
+    _id: id,
+    name: `Ürün ${id}`,
+    description: '',
+    category: 'c1',
+    stock: 5,
+    active: true,
+    date: 1,
+    updatedAt: 1000,
+    ...fields
+  });
+
+  const createIndex = () => {
+    const snapshot = new CatalogSnapshot();
+    const index = new ProductSearchIndex();
+    index.attach(snapshot);
+
+    snapshot.applyCategories([{ _id: 'c1', name: 'Şerbetli Tatlılar', updatedAt: 1000 }]);
+    snapshot.applyProducts([
+      product('p1', { name: 'Fıstıklı Baklava', sku: 'BAK-500-001', date: 1 }),
+      product('p2', { name: 'Cevizli Baklava', sku: 'BAK-500-002', date: 2 }),
+      product('p3', { name: 'Tulumba Tatlısı', description: 'Fıstıklı servis edilir', date: 3 }),
+      product('p4', { name: 'Fıstıklı Şöbiyet', active: false })
+    ]);
+    return { snapshot, index };
+  };
+
+  const ids = ({ results }) => results.map(result => result.product._id);
+
+  it('should fold Turkish letters the same way for queries and products', () => {
+    expect(normalize('FISTIKLI İÇLİ Şöbiyet')).toBe('fistikli icli sobiyet');
+
+    const { index } = createIndex();
+    expect(ids(index.search('fistikli'))).toEqual(['p1', 'p3']);
+    // Name prefix first, then the category prefix (newest first)
+    expect(ids(index.search('TATLI'))).toEqual(['p3', 'p2', 'p1']);
+  });
+
+  it('should match prefixes, SKUs, categories and typos', () => {
+    const { index } = createIndex();
+
+    expect(ids(index.search('bakl cev'))).toEqual(['p2']);
+    expect(ids(index.search('bak-500-001'))).toEqual(['p1']);
+    expect(index.search('serbetli').total).toBe(3);
+    expect(editDistance('baklvaa', 'baklava', 2)).toBe(1);
+    expect(ids(index.search('baklvaa cevizli'))).toEqual(['p2']);
+  });
+
+  it('should follow product and category changes', () => {
+    const { snapshot, index } = createIndex();
+
+    snapshot.applyProducts([product('p3', { name: 'Kadayıf', date: 3, updatedAt: 2000 })]);
+    snapshot.applyCategories([{ _id: 'c1', name: 'Sütlü Tatlılar', updatedAt: 2000 }]);
+    snapshot.removeProducts(['p2']);
+
+    expect(index.search('tulumba').total).toBe(0);
+    expect(ids(index.search('kadayif'))).toEqual(['p3']);
+    expect(index.search('serbetli').total).toBe(0);
+    expect(ids(index.search('sutlu'))).toEqual(['p3', 'p1']);
+  });
+});
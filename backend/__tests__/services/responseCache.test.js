@@ -0,0 +1,51 @@
+import { ResponseCache } from '../../services/ResponseCache.js';
+
+/**
+ * Response Cache Tests
+ * Redis is not connected in tests, so only the in-process tier is exercised
+ */
+describe('ResponseCache', () => {
+  const request = (query) => ({ baseUrl: '/api/product', path: '/list', originalUrl: '/api/product/list', query });
+
+  it('should build the same key for reordered query parameters', () => {
+    const cache = new ResponseCache();
+
+    const a = cache.buildKey(request({ inStockOnly: 'true', category: 'baklava' }));
+    const b = cache.buildKey(request({ category: 'baklava', inStockOnly: 'true', noCache: 'false' }));
+
+    expect(a).toBe(b);
+    expect(a).toBe('response:/api/product/list?category=baklava&inStockOnly=true');
+  });
+
+  it('should let only one request recompute a key and hand the result to the others', async () => {
+    const cache = new ResponseCache();
+    const key = 'response:/api/product/list';
+
+    expect(cache.begin(key)).toBe(true);
+    expect(cache.begin(key)).toBe(false);
+
+    const waiting = cache.wait(key);
+    await cache.store(key, { success: true, products: [] }, 300, ['products']);
+
+    expect(await waiting).toEqual({ success: true, products: [] });
+    expect((await cache.lookup(key)).tier).toBe('local');
+    expect(cache.getStats().coalesced).toBe(1);
+  });
+
+  it('should drop local entries by tag and not store loads that raced an invalidation', async () => {
+    const cache = new ResponseCache();
+
+    await cache.store('response:/a', { success: true }, 300, ['product:1']);
+    await cache.store('response:/b', { success: true }, 300, ['product:2']);
+    cache.invalidateLocal(['product:1']);
+
+    expect(await cache.lookup('response:/a')).toBeNull();
+    expect((await cache.lookup('response:/b')).fresh).toBe(true);
+
+    cache.begin('response:/c');
+    cache.invalidateLocal(['product:3']);
+    await cache.store('response:/c', { success: true }, 300, ['product:3']);
+
+    expect(await cache.lookup('response:/c')).toBeNull();
+  });
+});
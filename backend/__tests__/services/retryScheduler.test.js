@@ -0,0 +1,88 @@
+import { RetryScheduler, RetryHeap } from '../../services/RetryScheduler.js';
+
+/**
+ * Retry Scheduler Tests
+ */
+describe('RetryScheduler', () => {
+  const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+  const createSource = () => {
+    const heap = new RetryHeap();
+    return {
+      heap,
+      takeDue: async (now, limit) => {
+        const due = [];
+        while (due.length < limit && heap.size > 0 && heap.peek().retryAt <= now) {
+          due.push(heap.pop());
+        }
+        return due;
+      },
+      nextDueAt: async () => heap.peek()?.retryAt ?? null
+    };
+  };
+
+  it('should pop heap entries in retryAt order', () => {
+    const heap = new RetryHeap();
+    [50, 10, 40, 20, 30].forEach(retryAt => heap.push({ retryId: `r${retryAt}`, retryAt }));
+
+    const order = [];
+    while (heap.size > 0) order.push(heap.pop().retryAt);
+
+    expect(order).toEqual([10, 20, 30, 40, 50]);
+  });
+
+  it('should wake when the next retry is due instead of polling', async () => {
+    const source = createSource();
+    const executed = [];
+    const scheduler = new RetryScheduler({
+      source,
+      execute: async (retryId) => { executed.push(retryId); },
+      maxIdleMs: 60000
+    });
+    scheduler.start();
+
+    const retryAt = Date.now() + 30;
+    source.heap.push({ retryId: 'r1', retryAt });
+    scheduler.notify(retryAt);
+
+    await sleep(10);
+    expect(executed).toEqual([]);
+
+    await sleep(60);
+    expect(executed).toEqual(['r1']);
+    expect(scheduler.getStats().wakeups).toBeLessThanOrEqual(2);
+    scheduler.stop();
+  });
+
+  it('should drain a burst with bounded concurrency', async () => {
+    const source = createSource();
+    let running = 0;
+    let maxRunning = 0;
+    let executed = 0;
+
+    const scheduler = new RetryScheduler({
+      source,
+      concurrency: 3,
+      execute: async () => {
+        running++;
+        maxRunning = Math.max(maxRunning, running);
+        await sleep(5);
+        running--;
+        executed++;
+      }
+    });
+
+    const now = Date.now();
+    for (let i = 0; i < 20; i++) {
+      source.heap.push({ retryId: `r${i}`, retryAt: now });
+    }
+    scheduler.start();
+
+    await sleep(100);
+    await scheduler.idle();
+
+    expect(executed).toBe(20);
+    expect(maxRunning).toBe(3);
+    scheduler.stop();
+  });
+});
@@ -0,0 +1,57 @@
+import { rollupIncrements, rangeSegments, startOfDay, nextDay } from '../../services/SalesRollupService.js';
+
+/**
+ * Sales Rollup Tests
+ * Only the bucket arithmetic is exercised, no database is needed
+ */
+describe('SalesRollupService', () => {
+  const placedAt = new Date(2025, 2, 14, 10, 25).getTime();
+  const order = {
+    date: placedAt,
+    amount: 450,
+    paymentMethod: 'KAPIDA',
+    status: 'Siparişiniz Alındı',
+    items: [
+      { id: 'p1', name: 'Fıstıklı Baklava', price: 200, quantity: 2 },
+      { id: 'p2', name: 'Tulumba', price: 50, quantity: 1 }
+    ]
+  };
+
+  it('should add an order to hour and day buckets of every dimension', () => {
+    const increments = rollupIncrements(order, 1);
+    const dayTotal = increments.get(`total||day|${startOfDay(placedAt)}`);
+    const hourProduct = increments.get(`product|p1|hour|${new Date(2025, 2, 14, 10).getTime()}`);
+
+    expect(increments.size).toBe(8);
+    expect(dayTotal.inc).toEqual({ orders: 1, revenue: 450, quantity: 3, 'statuses.Siparişiniz Alındı': 1 });
+    expect(hourProduct.name).toBe('Fıstıklı Baklava');
+    expect(hourProduct.inc.revenue).toBe(400);
+    expect(increments.has(`paymentMethod|KAPIDA|day|${startOfDay(placedAt)}`)).toBe(true);
+  });
+
+  it('should only move status counters when an order is cancelled', () => {
+    const increments = rollupIncrements(order, -1);
+    rollupIncrements({ ...order, status: 'İptal Edildi' }, 1, increments);
+
+    expect(increments.get(`total||day|${startOfDay(placedAt)}`).inc).toEqual({
+      'statuses.Siparişiniz Alındı': -1,
+      'statuses.İptal Edildi': 1,
+      cancelledOrders: 1,
+      cancelledRevenue: 450
+    });
+  });
+
+  it('should read whole days from day buckets and the edges from hour buckets', () => {
+    const day = startOfDay(placedAt);
+    const from = new Date(2025, 2, 12, 18, 30).getTime();
+
+    expect(rangeSegments(day, nextDay(day) - 1)).toEqual([
+      { granularity: 'day', bucket: { $gte: day, $lt: nextDay(day) } }
+    ]);
+    expect(rangeSegments(from, placedAt)).toEqual([
+      { granularity: 'day', bucket: { $gte: new Date(2025, 2, 13).getTime(), $lt: day } },
+      { granularity: 'hour', bucket: { $gte: new Date(2025, 2, 12, 18).getTime(), $lt: new Date(2025, 2, 13).getTime() } },
+      { granularity: 'hour', bucket: { $gte: day, $lt: placedAt + 1 } }
+    ]);
+  });
+});
@@ -0,0 +1,46 @@
+import { normalizeItems, reserveOperations, restoreOperations } from '../../services/StockReservationService.js';
+
+/**
+ * Stock Reservation Tests
+ * Only cart normalization and the bulk write operations are exercised, no database is needed
+ */
+describe('StockReservationService', () => {
+  const baklava = '64b7f0c2a1b2c3d4e5f60001';
+  const tulumba = '64b7f0c2a1b2c3d4e5f60002';
+
+  it('should merge cart lines of the same product into one update', () => {
+    const items = normalizeItems([
+      { id: baklava, size: '500', quantity: 2 },
+      { _id: baklava, size: '1000', quantity: 1 },
+      { id: tulumba, quantity: 0 }
+    ]);
+
+    expect(items).toEqual([{ productId: baklava, quantity: 3 }]);
+  });
+
+  it('should reject carts it cannot reserve', () => {
+    const codeOf = (items) => {
+      try {
+        normalizeItems(items);
+        return null;
+      } catch (error) {
+        return error.code;
+      }
+    };
+
+    expect(codeOf([])).toBe('EMPTY_CART');
+    expect(codeOf([{ quantity: 1 }])).toBe('MISSING_PRODUCT_ID');
+    expect(codeOf([{ id: 'not-an-id', quantity: 1 }])).toBe('PRODUCT_NOT_FOUND');
+    expect(codeOf([{ id: baklava, quantity: -1 }])).toBe('INVALID_QUANTITY');
+  });
+
+  it('should only take stock that is there and only give back what it took', () => {
+    const [reserve] = reserveOperations('r1', [{ productId: baklava, quantity: 3 }]);
+    const [restore] = restoreOperations('r1', [{ productId: baklava, quantity: 3 }]);
+
+    expect(reserve.updateOne.filter).toEqual({ _id: baklava, stock: { $gte: 3 }, stockHolds: { $ne: 'r1' } });
+    expect(reserve.updateOne.update).toEqual({ $inc: { stock: -3 }, $push: { stockHolds: 'r1' } });
+    expect(restore.updateOne.filter).toEqual({ _id: baklava, stockHolds: 'r1' });
+    expect(restore.updateOne.update).toEqual({ $inc: { stock: 3 }, $pull: { stockHolds: 'r1' } });
+  });
+});
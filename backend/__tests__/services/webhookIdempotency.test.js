@@ -0,0 +1,45 @@
+import { WebhookIdempotencyService } from '../../services/WebhookIdempotencyService.js';
+
+/**
+ * Webhook Idempotency Service Tests
+ */
+describe('WebhookIdempotencyService', () => {
+  it('should build the same compact key for a retried delivery', () => {
+    const store = new WebhookIdempotencyService();
+    const payload = { orderId: 'order_1', status: 'DELIVERED', timestamp: '2025-11-12T17:45:00+03:00' };
+
+    const key = store.buildKey('muditakurye', { payload });
+    expect(key).toHaveLength(22);
+    expect(store.buildKey('MuditaKurye', { payload: { ...payload } })).toBe(key);
+    expect(store.buildKey('muditakurye', { payload: { ...payload, status: 'CANCELED' } })).not.toBe(key);
+  });
+
+  it('should prefer the sender webhook id and skip payloads without identity', () => {
+    const store = new WebhookIdempotencyService();
+
+    expect(store.buildKey('courier', { webhookId: 'wh_1', payload: {} }))
+      .toBe(store.buildKey('courier', { webhookId: 'wh_1', payload: { orderId: 'other' } }));
+    expect(store.buildKey('courier', { payload: { orderId: 'order_1' } })).toBeNull();
+  });
+
+  it('should bound the local map and report evictions', () => {
+    const store = new WebhookIdempotencyService({ maxLocalEntries: 3 });
+    ['a', 'b', 'c', 'd', 'e'].forEach(key => store.remember(key));
+
+    const stats = store.getStats();
+    expect(stats.local.entries).toBe(3);
+    expect(stats.capacityEvictions).toBe(2);
+    expect(store.local.has('a')).toBe(false);
+    expect(store.local.has('e')).toBe(true);
+  });
+
+  it('should sweep expired entries', () => {
+    const store = new WebhookIdempotencyService({ ttlMs: 1 });
+    store.remember('a');
+    store.local.set('a', Date.now() - 1);
+
+    store.sweep();
+    expect(store.local.size).toBe(0);
+    expect(store.getStats().expiredEvictions).toBe(1);
+  });
+});
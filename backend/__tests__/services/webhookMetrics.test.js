@@ -0,0 +1,48 @@
+import { WebhookMetricsService } from '../../services/WebhookMetricsService.js';
+import { Histogram } from '../../utils/histogram.js';
+
+/**
+ * Webhook Metrics Tests
+ */
+describe('Histogram', () => {
+  it('should count observations into fixed buckets and estimate percentiles', () => {
+    const histogram = new Histogram([10, 100, 1000]);
+    for (let i = 0; i < 90; i++) histogram.observe(5);
+    for (let i = 0; i < 10; i++) histogram.observe(500);
+
+    const stats = histogram.toJSON();
+    expect(stats.count).toBe(100);
+    expect(stats.buckets).toEqual({ 10: 90, 100: 0, 1000: 10, '+Inf': 0 });
+    expect(stats.p50).toBeLessThanOrEqual(10);
+    expect(stats.p99).toBeGreaterThan(100);
+    expect(stats.max).toBe(500);
+  });
+});
+
+describe('WebhookMetricsService', () => {
+  it('should add up repeated stages of a trace', async () => {
+    const metrics = new WebhookMetricsService();
+    const trace = metrics.startTrace({ traceId: 't1' });
+
+    metrics.record(trace, 'dbWrite', 3);
+    await metrics.time(trace, 'dbWrite', async () => 'saved');
+
+    expect(trace.stages.dbWrite).toBeGreaterThan(2.9);
+    expect(metrics.getStats().stages.dbWrite.count).toBe(2);
+  });
+
+  it('should charge an ack over budget to its slowest stage', () => {
+    const metrics = new WebhookMetricsService({ ackBudgetMs: 50 });
+    const trace = metrics.startTrace({ startedAt: performance.now() - 80 });
+    metrics.record(trace, 'parse', 1);
+    metrics.record(trace, 'dbRead', 70);
+    metrics.record(trace, 'dedup', 4);
+
+    metrics.recordAck(trace, 200);
+
+    const stats = metrics.getStats();
+    expect(stats.overBudget).toBe(1);
+    expect(stats.overBudgetStages).toEqual({ dbRead: 1 });
+    expect(metrics.toPrometheus().includes('webhook_ack_over_budget_total{stage="dbRead"} 1')).toBe(true);
+  });
+});
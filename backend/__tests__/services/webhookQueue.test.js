@@ -0,0 +1,123 @@
+import { WebhookQueueService } from '../../services/WebhookQueueService.js';
+import webhookLogModel from '../../models/WebhookLogModel.js';
+
+/**
+ * Webhook Queue Service Tests
+ */
+describe('WebhookQueueService', () => {
+  const job = (orderId, seq) => ({ webhookId: `wh_${orderId}_${seq}`, payload: { orderId, seq } });
+  const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+  it('should process events of one order sequentially and in order', async () => {
+    const queue = new WebhookQueueService({ enabled: true, concurrency: 4 });
+    const seen = [];
+    let running = 0;
+    let maxRunning = 0;
+
+    queue.setProcessor(async ({ payload }) => {
+      running++;
+      maxRunning = Math.max(maxRunning, running);
+      await sleep(5);
+      seen.push(payload.seq);
+      running--;
+      return { success: true };
+    });
+
+    [1, 2, 3, 4].forEach(seq => queue.enqueue(job('order_1', seq)));
+    await queue.drain();
+
+    expect(seen).toEqual([1, 2, 3, 4]);
+    expect(maxRunning).toBe(1);
+    expect(queue.getStats().processed).toBe(4);
+  });
+
+  it('should run different orders concurrently up to the pool size', async () => {
+    const queue = new WebhookQueueService({ enabled: true, concurrency: 2 });
+    let running = 0;
+    let maxRunning = 0;
+
+    queue.setProcessor(async () => {
+      running++;
+      maxRunning = Math.max(maxRunning, running);
+      await sleep(5);
+      running--;
+      return { success: true };
+    });
+
+    ['a', 'b', 'c', 'd'].forEach(orderId => queue.enqueue(job(orderId, 1)));
+    await queue.drain();
+
+    expect(maxRunning).toBe(2);
+  });
+
+  it('should reject jobs when the queue is full', () => {
+    const queue = new WebhookQueueService({ enabled: true, concurrency: 1, maxDepth: 2 });
+    queue.setProcessor(() => new Promise(() => {}));
+
+    expect(queue.enqueue(job('a', 1))).toBe(true); // Picked up by the worker
+    expect(queue.enqueue(job('a', 2))).toBe(true);
+    expect(queue.enqueue(job('a', 3))).toBe(true);
+    expect(queue.enqueue(job('a', 4))).toBe(false);
+    expect(queue.getStats()).toMatchObject({ depth: 2, inFlight: 1, rejected: 1 });
+  });
+
+  it('should re-queue stale pending webhooks on every sweep, but only once each', async () => {
+    const queue = new WebhookQueueService({ enabled: true, concurrency: 1 });
+    const processed = [];
+    queue.setProcessor(async ({ webhookId }) => {
+      await sleep(20);
+      processed.push(webhookId);
+      return { success: true };
+    });
+
+    const { find, updateOne } = webhookLogModel;
+    const logs = [{ _id: 'log_1', webhookId: 'wh_1', payload: { orderId: 'a' }, retryCount: 0 }];
+    webhookLogModel.find = () => ({ sort: () => ({ limit: () => ({ lean: async () => logs }) }) });
+    webhookLogModel.updateOne = async () => ({ modifiedCount: 1 });
+
+    try {
+      await queue.recover();
+      await queue.recover(); // Still in flight here: not queued again
+      await queue.drain();
+    } finally {
+      webhookLogModel.find = find;
+      webhookLogModel.updateOne = updateOne;
+    }
+
+    expect(processed).toEqual(['wh_1']);
+    expect(queue.getStats().recovered).toBe(1);
+  });
+
+  it('should only recover unleased logs and renew the leases of its own jobs', async () => {
+    const queue = new WebhookQueueService({ enabled: true, concurrency: 1, leaseMs: 60000 });
+    queue.setProcessor(() => new Promise(() => {}));
+
+    const { find, updateOne, updateMany } = webhookLogModel;
+    const calls = [];
+    webhookLogModel.find = (filter) => {
+      calls.push(['find', filter]);
+      return { sort: () => ({ limit: () => ({ lean: async () => [] }) }) };
+    };
+    webhookLogModel.updateMany = async (filter, update) => {
+      calls.push(['updateMany', filter, update]);
+      return { modifiedCount: 2 };
+    };
+
+    try {
+      queue.enqueue({ ...job('a', 1), webhookLogId: 'log_1' });
+      queue.enqueue({ ...job('a', 2), webhookLogId: 'log_2' });
+      await queue.recover();
+      await queue.renewLeases();
+    } finally {
+      webhookLogModel.find = find;
+      webhookLogModel.updateOne = updateOne;
+      webhookLogModel.updateMany = updateMany;
+    }
+
+    const [[, findFilter], [, renewFilter, renewUpdate]] = calls;
+    expect(findFilter.status).toBe('pending');
+    expect(findFilter.$or[0].leaseUntil.$lt).toBeGreaterThan(Date.now() - 1000);
+    expect(renewFilter).toEqual({ _id: { $in: ['log_1', 'log_2'] }, status: 'pending', processingBy: queue.instanceId });
+    expect(renewUpdate.$set.leaseUntil).toBeGreaterThan(Date.now() + 50000);
+  });
+});
@@ -0,0 +1,42 @@
+/**
+ * Email Shell Tests
+ * Slot tokens, shell compilation and filling (emails/utils/renderShell.js)
+ */
+
+import { slotToken, Slot, money, compileShell, fillShell } from '../../emails/utils/renderShell.js';
+
+describe('Email shells', () => {
+  it('formats money slots as their token and keeps variant comparisons working', () => {
+    const total = new Slot('total');
+
+    expect(money(total)).toBe(slotToken('total'));
+    expect(money(12.5)).toBe('12.50');
+    expect(total > 0).toBe(true);
+  });
+
+  it('fills slots with escaped values and raw html', () => {
+    const shell = compileShell(
+      `<p>Merhaba ${slotToken('customerName')},</p><div>${slotToken('items')}</div><b>₺${slotToken('total')}</b>`
+    );
+
+    expect(shell.slots).toEqual(['customerName', 'items', 'total']);
+    expect(shell.parts).toHaveLength(4);
+
+    const html = fillShell(
+      shell,
+      { customerName: 'Ayşe <b>& "Ali"</b>', total: '120.00' },
+      { items: '<table><tr><td>Baklava</td></tr></table>' }
+    );
+
+    expect(html).toBe(
+      '<p>Merhaba Ayşe &lt;b&gt;&amp; &quot;Ali&quot;&lt;/b&gt;,</p>' +
+      '<div><table><tr><td>Baklava</td></tr></table></div><b>₺120.00</b>'
+    );
+  });
+
+  it('renders missing values as empty text', () => {
+    const shell = compileShell(`<span>${slotToken('deliveryDate')}</span>`);
+
+    expect(fillShell(shell, {})).toBe('<span></span>');
+  });
+});
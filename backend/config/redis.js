@@ -9,6 +9,11 @@ import logger from '../utils/logger.js';
 let redisClient = null;
 let isConnected = false;
 
+// Tag sets: cache:tag:<tag> -> keys of cached entries carrying that tag
+const TAG_PREFIX = 'cache:tag:';
+// Keys per SCAN page / UNLINK call, small enough to never block Redis noticeably
+const SCAN_BATCH = 500;
+
 /**
  * Initialize Redis connection
  */
@@ -110,8 +115,77 @@ export const deleteFromCache = async (key) => {
   }
 };
 
+/**
+ * Set value in cache and register it under tags for invalidateTags()
+ */
+export const setInCacheWithTags = async (key, value, expirySeconds = 3600, tags = []) => {
+  if (!redisClient || !isConnected) {
+    return false;
+  }
+
+  try {
+    const multi = redisClient.multi().setEx(key, expirySeconds, JSON.stringify(value));
+    for (const tag of tags) {
+      // The set lives as long as its newest member
+      multi.sAdd(`${TAG_PREFIX}${tag}`, key).expire(`${TAG_PREFIX}${tag}`, expirySeconds);
+    }
+    await multi.exec();
+    return true;
+  } catch (error) {
+    logger.error('Redis tagged set error', { key, tags, error: error.message });
+    return false;
+  }
+};
+
+/**
+ * Delete every cached entry registered under any of the tags
+ * Only the tagged keys are touched; the keyspace is never scanned
+ */
+export const invalidateTags = async (tags = []) => {
+  if (!redisClient || !isConnected || tags.length === 0) {
+    return 0;
+  }
+
+  try {
+    let deletedCount = 0;
+
+    for (const tag of tags) {
+      const tagKey = `${TAG_PREFIX}${tag}`;
+      const keys = await redisClient.sMembers(tagKey);
+
+      for (let i = 0; i < keys.length; i += SCAN_BATCH) {
+        deletedCount += await redisClient.unlink(keys.slice(i, i + SCAN_BATCH));
+      }
+      await redisClient.unlink(tagKey);
+    }
+
+    return deletedCount;
+  } catch (error) {
+    logger.error('Redis invalidate tags error', { tags, error: error.message });
+    return 0;
+  }
+};
+
+/**
+ * Iterate keys matching a pattern with SCAN, in batches of up to SCAN_BATCH
+ */
+async function* scanKeys(pattern) {
+  let batch = [];
+  for await (const key of redisClient.scanIterator({ MATCH: pattern, COUNT: SCAN_BATCH })) {
+    batch.push(key);
+    if (batch.length >= SCAN_BATCH) {
+      yield batch;
+      batch = [];
+    }
+  }
+  if (batch.length > 0) {
+    yield batch;
+  }
+}
+
 /**
  * Delete multiple keys by pattern
+ * Uses SCAN + UNLINK in batches instead of KEYS, so Redis keeps serving other clients
  */
 export const deletePattern = async (pattern) => {
   if (!redisClient || !isConnected) {
@@ -119,9 +193,8 @@ export const deletePattern = async (pattern) => {
   }
 
   try {
-    const keys = await redisClient.keys(pattern);
-    if (keys.length > 0) {
-      await redisClient.del(keys);
+    for await (const keys of scanKeys(pattern)) {
+      await redisClient.unlink(keys);
     }
     return true;
   } catch (error) {
@@ -220,7 +293,11 @@ export const getKeys = async (pattern = '*', limit = 100) => {
   }
 
   try {
-    const keys = await redisClient.keys(pattern);
+    const keys = [];
+    for await (const batch of scanKeys(pattern)) {
+      keys.push(...batch);
+      if (keys.length >= limit) break;
+    }
     return keys.slice(0, limit);
   } catch (error) {
     logger.error('Redis get keys error', { pattern, error: error.message });
@@ -263,15 +340,16 @@ export const clearCacheByNamespace = async (namespace) => {
 
   try {
     const pattern = `${namespace}:*`;
-    const keys = await redisClient.keys(pattern);
+    let deletedCount = 0;
 
-    if (keys.length > 0) {
-      await redisClient.del(keys);
-      logger.info(`Cleared ${keys.length} keys from namespace: ${namespace}`);
-      return { success: true, deletedCount: keys.length };
+    for await (const keys of scanKeys(pattern)) {
+      deletedCount += await redisClient.unlink(keys);
     }
 
-    return { success: true, deletedCount: 0 };
+    if (deletedCount > 0) {
+      logger.info(`Cleared ${deletedCount} keys from namespace: ${namespace}`);
+    }
+    return { success: true, deletedCount };
   } catch (error) {
     logger.error('Redis clear namespace error', { namespace, error: error.message });
     return { success: false, message: error.message };
@@ -1,4 +1,5 @@
 import branchModel from '../models/BranchModel.js';
+import { invalidateBranchIndex } from '../services/AssignmentService.js';
 import logger from '../utils/logger.js';
 
 /**
@@ -66,6 +67,7 @@ const createBranch = async (req, res) => {
         });
 
         await newBranch.save();
+        invalidateBranchIndex();
 
         res.json({ 
             success: true, 
@@ -146,6 +148,8 @@ const updateBranch = async (req, res) => {
             return res.json({ success: false, message: 'Branch not found' });
         }
 
+        invalidateBranchIndex();
+
         res.json({ 
             success: true, 
             message: 'Branch updated successfully',
@@ -170,6 +174,8 @@ const deleteBranch = async (req, res) => {
             return res.json({ success: false, message: 'Branch not found' });
         }
 
+        invalidateBranchIndex();
+
         res.json({ 
             success: true, 
             message: 'Branch deleted successfully' 
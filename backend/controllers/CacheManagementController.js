@@ -8,6 +8,7 @@ import {
     deleteFromCache,
     isRedisAvailable
 } from '../config/redis.js';
+import ResponseCache from '../services/ResponseCache.js';
 import logger from '../utils/logger.js';
 
 /**
@@ -185,6 +186,7 @@ export const clearAllCache = async (req, res) => {
         }
 
         const result = await clearCache();
+        ResponseCache.clearLocal();
 
         if (!result) {
             return res.status(500).json({
@@ -231,6 +233,7 @@ export const clearNamespaceCache = async (req, res) => {
 
         const { namespace } = req.params;
         const result = await clearCacheByNamespace(namespace);
+        ResponseCache.clearLocal();
 
         if (!result.success) {
             return res.status(500).json({
@@ -342,6 +345,32 @@ export const getCacheStatistics = async (req, res) => {
     }
 };
 
+/**
+ * Get response cache statistics (hit ratios per tier)
+ * GET /api/admin/cache/response-stats
+ */
+export const getResponseCacheStatistics = async (req, res) => {
+    try {
+        res.json({
+            success: true,
+            data: {
+                ...ResponseCache.getStats(),
+                redisAvailable: isRedisAvailable()
+            }
+        });
+
+    } catch (error) {
+        logger.error('Get response cache stats error', {
+            error: error.message
+        });
+
+        res.status(500).json({
+            success: false,
+            error: error.message
+        });
+    }
+};
+
 export default {
     getCacheOverview,
     getCacheKeys,
@@ -349,5 +378,6 @@ export default {
     clearAllCache,
     clearNamespaceCache,
     deleteKey,
-    getCacheStatistics
+    getCacheStatistics,
+    getResponseCacheStatistics
 };
@@ -1,4 +1,5 @@
 import orderModel from "../models/OrderModel.js";
+import SalesRollupService from "../services/SalesRollupService.js";
 import logger from "../utils/logger.js";
 
 // Generate unique tracking ID
@@ -120,6 +121,7 @@ const updateCourierStatus = async (req, res) => {
         }
 
         // Update courier status
+        const previousStatus = order.status;
         order.courierStatus = status;
         
         // Update main status based on courier status
@@ -140,6 +142,7 @@ const updateCourierStatus = async (req, res) => {
         await addStatusHistory(order._id, status, location, note, 'courier');
 
         await order.save();
+        await SalesRollupService.recordStatusChange(order, previousStatus, order.status);
 
         res.json({ success: true });
     } catch (error) {
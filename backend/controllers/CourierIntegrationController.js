@@ -1,11 +1,14 @@
 import CourierIntegrationConfigModel from '../models/CourierIntegrationConfigModel.js';
 import CourierIntegrationService from '../services/CourierIntegrationService.js';
 import CircuitBreakerService from '../services/CircuitBreakerService.js';
+import WebhookMetricsService from '../services/WebhookMetricsService.js';
+import CourierRouter from '../services/CourierRouter.js';
 import RetryService from '../services/RetryService.js';
 import MuditaKuryeService from '../services/MuditaKuryeService.js';
 import WebhookEventModel from '../models/WebhookEventModel.js';
 import DeadLetterQueueModel from '../models/DeadLetterQueueModel.js';
 import orderModel from '../models/OrderModel.js';
+import { getCourierPollStats } from '../jobs/pollCourierStatus.js';
 import logger from '../utils/logger.js';
 
 /**
@@ -323,7 +326,7 @@ export const getStatistics = async (req, res) => {
 
         res.json({
             success: true,
-            statistics: stats
+            statistics: { ...stats, statusPolling: getCourierPollStats() }
         });
     } catch (error) {
         logger.error('Failed to get integration statistics', {
@@ -337,6 +340,60 @@ export const getStatistics = async (req, res) => {
     }
 };
 
+/**
+ * Get webhook ingestion stage timings
+ * GET /api/courier-integration/webhook-metrics[?format=prometheus]
+ */
+export const getWebhookMetrics = async (req, res) => {
+    try {
+        if (req.query.format === 'prometheus') {
+            res.type('text/plain; version=0.0.4');
+            return res.send(WebhookMetricsService.toPrometheus());
+        }
+
+        res.json({
+            success: true,
+            webhookMetrics: WebhookMetricsService.getStats()
+        });
+    } catch (error) {
+        logger.error('Failed to get webhook metrics', {
+            error: error.message,
+            stack: error.stack
+        });
+        res.status(500).json({
+            success: false,
+            message: 'Failed to get webhook metrics'
+        });
+    }
+};
+
+/**
+ * Get per-provider courier SLOs (success, latency, error budgets, routing health, hedges)
+ * GET /api/courier-integration/slo[?format=prometheus]
+ */
+export const getCourierSlo = async (req, res) => {
+    try {
+        if (req.query.format === 'prometheus') {
+            res.type('text/plain; version=0.0.4');
+            return res.send(CourierRouter.toPrometheus());
+        }
+
+        res.json({
+            success: true,
+            slo: CourierRouter.getSloReport()
+        });
+    } catch (error) {
+        logger.error('Failed to get courier SLOs', {
+            error: error.message,
+            stack: error.stack
+        });
+        res.status(500).json({
+            success: false,
+            message: 'Failed to get courier SLOs'
+        });
+    }
+};
+
 /**
  * Get circuit breaker status
  * GET /api/courier-integration/circuit-breakers
@@ -449,6 +506,57 @@ export const submitOrder = async (req, res) => {
     }
 };
 
+/**
+ * Submit several orders to courier
+ * POST /api/courier-integration/submit-orders
+ */
+export const submitOrders = async (req, res) => {
+    try {
+        const { orderIds, platform } = req.body;
+
+        if (!Array.isArray(orderIds) || orderIds.length === 0) {
+            return res.status(400).json({
+                success: false,
+                message: 'orderIds must be a non-empty array'
+            });
+        }
+
+        if (orderIds.length > 200) {
+            return res.status(400).json({
+                success: false,
+                message: 'At most 200 orders can be submitted at once'
+            });
+        }
+
+        await CourierIntegrationService.initialize();
+        const results = await CourierIntegrationService.submitOrders(orderIds, platform);
+        const submitted = results.filter(result => result.success).length;
+
+        logger.info('Orders submitted to courier in bulk', {
+            platform,
+            requested: orderIds.length,
+            submitted
+        });
+
+        res.json({
+            success: submitted === orderIds.length,
+            message: `${submitted}/${orderIds.length} orders submitted`,
+            results
+        });
+    } catch (error) {
+        logger.error('Failed to submit orders to courier', {
+            platform: req.body.platform,
+            error: error.message,
+            stack: error.stack
+        });
+        res.status(500).json({
+            success: false,
+            message: 'Failed to submit orders',
+            error: error.message
+        });
+    }
+};
+
 /**
  * Cancel order with courier
  * POST /api/courier-integration/cancel-order
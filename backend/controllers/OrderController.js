@@ -2,10 +2,11 @@ import orderModel from "../models/OrderModel.js";
 import userModel from "../models/UserModel.js";
 import deliveryZoneModel from "../models/DeliveryZoneModel.js";
 import branchModel from "../models/BranchModel.js";
-import { reduceStock, checkLowStockAlert } from "../middleware/StockCheck.js";
+import { commitStockReservation, checkLowStockAlert } from "../middleware/StockCheck.js";
 import AssignmentService, { assignBranch, suggestBranch } from "../services/AssignmentService.js";
 import settingsModel from "../models/SettingsModel.js";
 import CourierIntegrationService from "../services/CourierIntegrationService.js";
+import SalesRollupService from "../services/SalesRollupService.js";
 import eventEmitter from "../utils/eventEmitter.js";
 import logger from "../utils/logger.js";
 
@@ -175,11 +176,11 @@ const placeOrder = async (req, res) => {
         }
         
         const newOrder = new orderModel(orderData);
-        
-        // Reduce stock for all items
-        await reduceStock(items);
-        
         await newOrder.save();
+
+        // Keep the stock reserved by checkStockAvailability for this order
+        await commitStockReservation(req, newOrder._id);
+        await SalesRollupService.recordOrder(newOrder);
         await userModel.findByIdAndUpdate(userId, {cartData: {}});
         
         // Check for low stock alerts
@@ -279,6 +280,7 @@ const updateStatus = async (req, res) => {
         await addStatusHistory(orderId, status, order.address?.address || '', `Durum güncellendi: ${status}`, 'admin');
         
         await orderModel.findByIdAndUpdate(orderId, {status});
+        await SalesRollupService.recordStatusChange(order, order.status, status);
         
         // Get user data
         const user = await userModel.findById(order.userId);
@@ -524,11 +526,13 @@ const prepareOrder = async (req, res) => {
             return res.json({ success: false, message: `Cannot prepare order with status: ${order.status}` });
         }
         
+        const previousStatus = order.status;
         order.status = 'Hazırlanıyor';
         order.preparationStartedAt = order.preparationStartedAt || Date.now();
         
         await addStatusHistory(orderId, 'Hazırlanıyor', '', 'Sipariş hazırlanmaya başlandı', 'admin');
         await order.save();
+        await SalesRollupService.recordStatusChange(order, previousStatus, order.status);
         
         res.json({ success: true, message: 'Order marked as preparing', order });
     } catch (error) {
@@ -625,6 +629,7 @@ const sendToCourier = async (req, res) => {
         }
 
         await order.save();
+        await SalesRollupService.recordStatusChange(order, 'Hazırlanıyor', order.status);
 
         // Emit courier assigned event for real-time notification
         try {
@@ -696,6 +701,7 @@ const deleteOrder = async (req, res) => {
 
         // Delete the order
         await orderModel.findByIdAndDelete(orderId);
+        await SalesRollupService.removeOrder(order);
 
         logger.info('Order deleted successfully', { orderId, orderNumber: order._id });
 
@@ -263,6 +263,7 @@ export const getWebhookStats = async (req, res) => {
                     successRate: parseFloat(successRate),
                     avgDuration: stats.find(s => s._id === 'delivered')?.avgDuration || 0
                 },
+                dispatcher: OutgoingWebhookService.getDispatcherStats(),
                 recentFailures: recentFailures.map(f => ({
                     id: f._id,
                     eventType: f.eventType,
@@ -3,6 +3,7 @@ import {render} from "ejs";
 import orderModel from "../models/OrderModel.js";
 import {response} from "express";
 import userModel from "../models/UserModel.js";
+import StockReservationService from "../services/StockReservationService.js";
 import logger from "../utils/logger.js";
 
 // PayTR Token isteği
@@ -41,7 +42,20 @@ export const updatePayTrOrderItemsAndAddress = async (req, res) => {
             });
         }
 
-        // 2. Siparişi güncelle
+        // 2. Ödeme beklenirken stoğu ayır (yeni sepet önceki ayırmanın yerine geçer)
+        if (lastOrder.paymentMethod === 'PayTR' && !lastOrder.payment && lastOrder.orderId) {
+            const reservationId = `paytr:${lastOrder.orderId}`;
+            await StockReservationService.release(reservationId);
+            const reservation = await StockReservationService.reserve(reservationId, items);
+            if (!reservation.success) {
+                return res.status(409).json({
+                    success: false,
+                    message: reservation.message
+                });
+            }
+        }
+
+        // 3. Siparişi güncelle
         const updatedOrder = await orderModel.findByIdAndUpdate(
             lastOrder._id, // Bulunan siparişin ID'si
             {
@@ -68,6 +82,20 @@ export const updatePayTrOrderItemsAndAddress = async (req, res) => {
     }
 };
 
+// Ödenen siparişin stoğunu kesinleştir; ayırma süresi dolduysa stoğu yeniden almayı dene
+const commitPaidReservation = async (reservationId, order) => {
+    const committed = await StockReservationService.commit(reservationId, { orderId: order?._id });
+    if (committed.success || !order) return;
+
+    const reserved = await StockReservationService.reserve(reservationId, order.items);
+    if (reserved.success) {
+        await StockReservationService.commit(reservationId, { orderId: order._id });
+        logger.warn("PayTR payment arrived after its stock reservation ended, stock taken again", { reservationId, orderId: order._id });
+    } else {
+        logger.error("Paid PayTR order has no stock, needs manual handling", { reservationId, orderId: order._id, reason: reserved.message });
+    }
+};
+
 // PayTR Callback kontrolü
 export const handlePaytrCallback = async (req, res) => {
     try {
@@ -75,16 +103,19 @@ export const handlePaytrCallback = async (req, res) => {
         // Callback hash doğrulaması
         validatePaytrCallback(callbackData);
         // Callback'in başarılı olduğu durum
+        const reservationId = `paytr:${callbackData.merchant_oid}`;
         if (callbackData.status === 'success') {
             const orderIds = callbackData.merchant_oid;
             const order = await orderModel.findOneAndUpdate({orderId: orderIds}, { payment: true });
+            await commitPaidReservation(reservationId, order);
             const user = await userModel.findById(order.userId);
             user.cartData = {};
             await user.save();
             // Ödeme başarılıysa işlem yapılabilir (örneğin, sipariş onaylama vb.
             res.send('OK');
         } else {
-            // Ödeme başarısızsa yapılacak işlemler
+            // Ödeme başarısızsa ayrılan stok geri bırakılır
+            await StockReservationService.release(reservationId);
             res.send('FAILED');
         }
     } catch (error) {
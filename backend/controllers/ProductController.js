@@ -1,5 +1,8 @@
 import productModel from "../models/ProductModel.js";
 import Media from "../models/MediaModel.js";
+import categoryModel from "../models/CategoryModel.js";
+import CatalogSnapshot, { buildFacets, priceBounds } from "../services/CatalogSnapshot.js";
+import ProductSearchIndex from "../services/ProductSearchIndex.js";
 import logger from "../utils/logger.js";
 
 // Helper function to parse JSON string or return array
@@ -256,7 +259,19 @@ const addProduct = async (req, res) => {
 // List product
 const listProducts = async (req, res) => {
     try {
-        const { inStockOnly = false, includeDeleted = false } = req.query;
+        const { inStockOnly = false, includeDeleted = false, view } = req.query;
+
+        // Served from the in-memory catalog; the ETag lets unchanged lists answer 304
+        if (CatalogSnapshot.ready) {
+            const list = CatalogSnapshot.getList({
+                includeDeleted: includeDeleted === 'true',
+                inStockOnly: inStockOnly === 'true',
+                view: view === 'card' ? 'card' : 'full'
+            });
+            res.set('ETag', list.etag);
+            res.set('Cache-Control', 'no-cache');
+            return res.type('json').send(list.body);
+        }
 
         let query = {};
 
@@ -473,7 +488,11 @@ const quickUpdateProduct = async (req, res) => {
 // Get price range for filter slider
 const getPriceRange = async (req, res) => {
     try {
-        const products = await productModel.find({ active: true });
+        if (CatalogSnapshot.ready) {
+            return res.json({ success: true, ...CatalogSnapshot.getPriceRange() });
+        }
+
+        const products = await productModel.find({ active: true }).select('basePrice sizePrices').lean();
 
         if (products.length === 0) {
             return res.json({ success: true, minPrice: 0, maxPrice: 10000 });
@@ -498,6 +517,65 @@ const getPriceRange = async (req, res) => {
     }
 };
 
+// Filter facets (categories, labels, sizes, ...) with product counts and the price range
+const getFacets = async (req, res) => {
+    try {
+        if (CatalogSnapshot.ready) {
+            return res.json({ success: true, facets: CatalogSnapshot.getFacets(), ...CatalogSnapshot.getPriceRange() });
+        }
+
+        const [products, categories] = await Promise.all([
+            productModel.find({ active: { $ne: false } }).select('-description').lean(),
+            categoryModel.find({}).select('name slug').lean()
+        ]);
+        const categoriesById = new Map(categories.map(category => [String(category._id), category]));
+        res.json({ success: true, facets: buildFacets(products, categoriesById), ...priceBounds(products) });
+    } catch (error) {
+        logger.error('Error getting product facets', { error: error.message, stack: error.stack });
+        res.status(500).json({ success: false, message: error.message });
+    }
+};
+
+// Product search (name, SKU, category, keywords, description)
+const searchProducts = async (req, res) => {
+    try {
+        const query = String(req.query.q || '').trim().slice(0, 100);
+        const limit = Math.min(Math.max(parseInt(req.query.limit) || 20, 1), 50);
+        const offset = Math.max(parseInt(req.query.offset) || 0, 0);
+        const start = process.hrtime.bigint();
+
+        if (!query) {
+            return res.json({ success: true, query, total: 0, products: [], tookMs: 0 });
+        }
+
+        if (CatalogSnapshot.ready) {
+            const { total, results } = ProductSearchIndex.search(query, { limit, offset });
+            return res.json({
+                success: true,
+                query,
+                total,
+                products: results.map(({ product }) => CatalogSnapshot.present(product, 'card')),
+                tookMs: Number(process.hrtime.bigint() - start) / 1e6
+            });
+        }
+
+        // Until the catalog is loaded: plain substring match, newest first
+        const pattern = new RegExp(query.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'), 'i');
+        const filter = {
+            active: { $ne: false },
+            $or: [{ name: pattern }, { sku: pattern }, { keywords: pattern }, { description: pattern }]
+        };
+        const [total, products] = await Promise.all([
+            productModel.countDocuments(filter),
+            productModel.find(filter).populate('category', 'name slug active').sort({ date: -1 }).skip(offset).limit(limit).lean()
+        ]);
+        res.json({ success: true, query, total, products, tookMs: Number(process.hrtime.bigint() - start) / 1e6 });
+    } catch (error) {
+        logger.error('Error searching products', { error: error.message, stack: error.stack, query: req.query.q });
+        res.status(500).json({ success: false, message: error.message });
+    }
+};
+
 export {
     listProducts,
     addProduct,
@@ -510,5 +588,7 @@ export {
     quickUpdateProduct,
     getProductBySKU,
     getProductByBarcode,
-    getPriceRange
+    getPriceRange,
+    getFacets,
+    searchProducts
 };
@@ -1,6 +1,8 @@
+import mongoose from "mongoose";
 import orderModel from "../models/OrderModel.js";
 import productModel from "../models/ProductModel.js";
 import userModel from "../models/UserModel.js";
+import SalesRollupService from "../services/SalesRollupService.js";
 import logger from "../utils/logger.js";
 
 /**
@@ -17,19 +19,20 @@ const dailySales = async (req, res) => {
     const endOfDay = new Date(targetDate);
     endOfDay.setHours(23, 59, 59, 999);
     
-    const orders = await orderModel.find({
-      date: { $gte: startOfDay.getTime(), $lte: endOfDay.getTime() }
-    });
+    // Read the day's rollups instead of loading every order of the day
+    const [summary, paymentMethods] = await Promise.all([
+      SalesRollupService.getSummary(startOfDay.getTime(), endOfDay.getTime()),
+      SalesRollupService.getTotals('paymentMethod', startOfDay.getTime(), endOfDay.getTime())
+    ]);
     
-    const totalRevenue = orders.reduce((sum, order) => sum + order.amount, 0);
-    const totalOrders = orders.length;
+    const totalRevenue = summary.revenue;
+    const totalOrders = summary.orders;
     const averageOrderValue = totalOrders > 0 ? totalRevenue / totalOrders : 0;
     
     // Calculate by payment method
     const paymentMethodStats = {};
-    orders.forEach(order => {
-      const method = order.paymentMethod || 'UNKNOWN';
-      paymentMethodStats[method] = (paymentMethodStats[method] || 0) + 1;
+    paymentMethods.forEach(row => {
+      paymentMethodStats[row.key] = row.orders;
     });
     
     res.json({
@@ -40,7 +43,9 @@ const dailySales = async (req, res) => {
         totalOrders,
         averageOrderValue,
         paymentMethodStats,
-        ordersCount: orders.length
+        cancelledOrders: summary.cancelledOrders,
+        cancelledRevenue: summary.cancelledRevenue,
+        ordersCount: totalOrders
       }
     });
   } catch (error) {
@@ -58,20 +63,27 @@ const weeklySales = async (req, res) => {
     const weekAgo = new Date(today);
     weekAgo.setDate(today.getDate() - 7);
     
-    const orders = await orderModel.find({
-      date: { $gte: weekAgo.getTime(), $lte: today.getTime() }
-    });
+    // Hourly buckets, so the breakdown keeps using UTC dates and the week starts at the hour
+    const hours = await SalesRollupService.getBuckets(
+      'total',
+      'hour',
+      Math.floor(weekAgo.getTime() / 3600000) * 3600000,
+      today.getTime() + 1
+    );
     
-    const totalRevenue = orders.reduce((sum, order) => sum + order.amount, 0);
+    let totalRevenue = 0;
+    let totalOrders = 0;
     const dailyBreakdown = {};
     
-    orders.forEach(order => {
-      const orderDate = new Date(order.date).toISOString().split('T')[0];
+    hours.forEach(bucket => {
+      const orderDate = new Date(bucket.bucket).toISOString().split('T')[0];
       if (!dailyBreakdown[orderDate]) {
         dailyBreakdown[orderDate] = { revenue: 0, orders: 0 };
       }
-      dailyBreakdown[orderDate].revenue += order.amount;
-      dailyBreakdown[orderDate].orders += 1;
+      dailyBreakdown[orderDate].revenue += bucket.revenue;
+      dailyBreakdown[orderDate].orders += bucket.orders;
+      totalRevenue += bucket.revenue;
+      totalOrders += bucket.orders;
     });
     
     res.json({
@@ -79,7 +91,7 @@ const weeklySales = async (req, res) => {
       report: {
         period: 'week',
         totalRevenue,
-        totalOrders: orders.length,
+        totalOrders,
         dailyBreakdown
       }
     });
@@ -98,19 +110,17 @@ const monthlySales = async (req, res) => {
     const monthAgo = new Date(today);
     monthAgo.setMonth(today.getMonth() - 1);
     
-    const orders = await orderModel.find({
-      date: { $gte: monthAgo.getTime(), $lte: today.getTime() }
-    });
-    
-    const totalRevenue = orders.reduce((sum, order) => sum + order.amount, 0);
+    const summary = await SalesRollupService.getSummary(monthAgo.getTime(), today.getTime());
     
     res.json({
       success: true,
       report: {
         period: 'month',
-        totalRevenue,
-        totalOrders: orders.length,
-        averageOrderValue: orders.length > 0 ? totalRevenue / orders.length : 0
+        totalRevenue: summary.revenue,
+        totalOrders: summary.orders,
+        averageOrderValue: summary.orders > 0 ? summary.revenue / summary.orders : 0,
+        cancelledOrders: summary.cancelledOrders,
+        cancelledRevenue: summary.cancelledRevenue
       }
     });
   } catch (error) {
@@ -126,51 +136,30 @@ const productAnalytics = async (req, res) => {
   try {
     const { dateFrom, dateTo } = req.query;
     
-    const query = {};
-    if (dateFrom || dateTo) {
-      query.date = {};
-      if (dateFrom) query.date.$gte = new Date(dateFrom).getTime();
-      if (dateTo) query.date.$lte = new Date(dateTo).getTime();
-    }
-    
-    const orders = await orderModel.find(query);
+    const from = dateFrom ? new Date(dateFrom).getTime() : 0;
+    const to = dateTo ? new Date(dateTo).getTime() : Date.now();
     
-    // Calculate product sales
-    const productSales = {};
-    orders.forEach(order => {
-      order.items.forEach(item => {
-        const productId = item.id || item.productId;
-        if (!productSales[productId]) {
-          productSales[productId] = {
-            name: item.name,
-            totalSold: 0,
-            revenue: 0,
-            orders: 0
-          };
-        }
-        productSales[productId].totalSold += item.quantity || 1;
-        productSales[productId].revenue += (item.price || 0) * (item.quantity || 1);
-        productSales[productId].orders += 1;
-      });
-    });
+    // Per-product rollups, already sorted by revenue
+    const productSales = await SalesRollupService.getTotals('product', from, to);
     
-    // Get product details
-    const productDetails = await productModel.find({});
+    // Get details of the sold products only
+    const productIds = productSales.map(row => row.key).filter(id => mongoose.isValidObjectId(id));
+    const productDetails = await productModel.find({ _id: { $in: productIds } });
     const productMap = {};
     productDetails.forEach(product => {
       productMap[product._id.toString()] = product;
     });
     
     // Add product details to sales data
-    const enrichedSales = Object.entries(productSales).map(([productId, sales]) => ({
-      productId,
-      ...sales,
-      product: productMap[productId] || null
+    const enrichedSales = productSales.map(row => ({
+      productId: row.key,
+      name: row.name,
+      totalSold: row.quantity,
+      revenue: row.revenue,
+      orders: row.orders,
+      product: productMap[row.key] || null
     }));
     
-    // Sort by revenue
-    enrichedSales.sort((a, b) => b.revenue - a.revenue);
-    
     res.json({
       success: true,
       analytics: {
@@ -297,20 +286,14 @@ const dashboardStats = async (req, res) => {
     const lastMonth = new Date(today.getFullYear(), today.getMonth() - 1, 1);
     
     // This month stats
-    const thisMonthOrders = await orderModel.find({
-      date: { $gte: thisMonth.getTime() }
-    });
-    
-    const thisMonthRevenue = thisMonthOrders.reduce((sum, order) => sum + order.amount, 0);
-    const thisMonthOrderCount = thisMonthOrders.length;
+    const thisMonthStats = await SalesRollupService.getSummary(thisMonth.getTime(), today.getTime());
+    const thisMonthRevenue = thisMonthStats.revenue;
+    const thisMonthOrderCount = thisMonthStats.orders;
     
     // Last month stats
-    const lastMonthOrders = await orderModel.find({
-      date: { $gte: lastMonth.getTime(), $lt: thisMonth.getTime() }
-    });
-    
-    const lastMonthRevenue = lastMonthOrders.reduce((sum, order) => sum + order.amount, 0);
-    const lastMonthOrderCount = lastMonthOrders.length;
+    const lastMonthStats = await SalesRollupService.getSummary(lastMonth.getTime(), thisMonth.getTime() - 1);
+    const lastMonthRevenue = lastMonthStats.revenue;
+    const lastMonthOrderCount = lastMonthStats.orders;
     
     // Calculate growth
     const revenueGrowth = lastMonthRevenue > 0 
@@ -318,11 +301,13 @@ const dashboardStats = async (req, res) => {
       : '0';
     
     // Pending orders
-    const pendingOrders = await orderModel.find({ status: { $ne: 'Teslim Edildi' } });
+    const pendingOrders = await orderModel.countDocuments({ status: { $ne: 'Teslim Edildi' } });
     
     // Low stock products
-    const products = await productModel.find({});
-    const lowStockProducts = products.filter(p => (p.stock || 0) <= 10);
+    const lowStockProducts = await productModel.countDocuments({
+      $or: [{ stock: { $lte: 10 } }, { stock: { $exists: false } }, { stock: null }]
+    });
+    const totalProducts = await productModel.countDocuments({});
     
     res.json({
       success: true,
@@ -341,9 +326,9 @@ const dashboardStats = async (req, res) => {
             ? ((thisMonthOrderCount - lastMonthOrderCount) / lastMonthOrderCount * 100).toFixed(2) + '%'
             : '0%'
         },
-        pendingOrders: pendingOrders.length,
-        lowStockProducts: lowStockProducts.length,
-        totalProducts: products.length,
+        pendingOrders,
+        lowStockProducts,
+        totalProducts,
         totalUsers: await userModel.countDocuments({})
       }
     });
@@ -3,6 +3,9 @@ import webhookConfigModel from '../models/WebhookConfigModel.js';
 import webhookLogModel from '../models/WebhookLogModel.js';
 import orderModel from '../models/OrderModel.js';
 import CourierIntegrationService from '../services/CourierIntegrationService.js';
+import WebhookIdempotencyService, { CLAIM_NEW, CLAIM_DUPLICATE } from '../services/WebhookIdempotencyService.js';
+import WebhookQueueService from '../services/WebhookQueueService.js';
+import WebhookMetricsService from '../services/WebhookMetricsService.js';
 import WebhookSecurity from '../utils/webhookSecurity.js';
 import logger from '../utils/logger.js';
 
@@ -13,12 +16,19 @@ import logger from '../utils/logger.js';
 export const receiveWebhook = async (req, res) => {
     const startTime = Date.now();
     let webhookLog = null;
+    let idempotencyKey = null;
+
+    // Stage timings from the moment the body was read (see express.json verify in server.js)
+    const trace = WebhookMetricsService.startTrace({ startedAt: req.bodyReceivedAt });
+    res.set('X-Trace-Id', trace.traceId);
+    res.once('finish', () => WebhookMetricsService.recordAck(trace, res.statusCode));
 
     try {
         // Extract headers (support both generic and MuditaKurye-specific headers)
         const signature = req.headers['x-webhook-signature'] || req.headers['x-muditakurye-signature'];
         let platform = req.headers['x-webhook-platform'] || req.headers['x-mudita-platform'];
-        const webhookId = req.headers['x-webhook-id'] || req.headers['x-mudita-webhook-id'] || crypto.randomBytes(16).toString('hex');
+        const senderWebhookId = req.headers['x-webhook-id'] || req.headers['x-mudita-webhook-id'];
+        const webhookId = senderWebhookId || crypto.randomBytes(16).toString('hex');
         const timestamp = req.headers['x-webhook-timestamp'] || req.headers['x-mudita-timestamp'];
 
         // Auto-detect MuditaKurye platform from URL path
@@ -72,24 +82,13 @@ export const receiveWebhook = async (req, res) => {
                 payload.orderId = payload.muditaOrderId;
             }
         }
-
-        // Check for duplicate webhook (idempotency)
-        const existingLog = await webhookLogModel.findOne({ webhookId, platform });
-        if (existingLog && existingLog.status === 'success') {
-            logger.info('Duplicate webhook detected', { webhookId, platform });
-            return res.status(409).json({
-                success: false,
-                error: 'Duplicate webhook',
-                code: 'DUPLICATE_WEBHOOK',
-                webhookId
-            });
-        }
+        WebhookMetricsService.record(trace, 'parse', performance.now() - trace.startedAt);
 
         // Get webhook config
-        const config = await webhookConfigModel.findOne({ 
+        const config = await WebhookMetricsService.time(trace, 'dbRead', () => webhookConfigModel.findOne({ 
             platform: platform.toLowerCase(),
             enabled: true 
-        });
+        }));
 
         if (!config) {
             return res.status(404).json({
@@ -101,6 +100,7 @@ export const receiveWebhook = async (req, res) => {
         }
 
         // Decrypt secret key
+        const verifyStartedAt = performance.now();
         let secretKey;
         try {
             secretKey = config.getDecryptedSecretKey();
@@ -121,14 +121,17 @@ export const receiveWebhook = async (req, res) => {
             secretKey,
             {
                 maxAgeMs: 5 * 60 * 1000, // 5 minutes
-                clockSkewMs: 30000 // 30 seconds
+                clockSkewMs: 30000, // 30 seconds
+                rawBody: req.rawBody // Verify the bytes as received
             }
         );
+        WebhookMetricsService.record(trace, 'verify', performance.now() - verifyStartedAt);
 
         if (!verification.valid) {
             // Log failed webhook
             webhookLog = new webhookLogModel({
                 webhookId,
+                traceId: trace.traceId,
                 platform: platform.toLowerCase(),
                 event: payload.event,
                 orderId: payload.orderId,
@@ -141,7 +144,7 @@ export const receiveWebhook = async (req, res) => {
                 errorCode: verification.code,
                 createdAt: Date.now()
             });
-            await webhookLog.save();
+            await WebhookMetricsService.time(trace, 'dbWrite', () => webhookLog.save());
 
             const statusCode = verification.code === 'INVALID_SIGNATURE' ? 401 : 400;
             return res.status(statusCode).json({
@@ -152,60 +155,94 @@ export const receiveWebhook = async (req, res) => {
             });
         }
 
-        // Create webhook log
+        // Check for duplicate webhook (idempotency)
+        // Keyed by the sender's webhook id, or by order/status/event time when none is sent
+        idempotencyKey = WebhookIdempotencyService.buildKey(platform, { webhookId: senderWebhookId, payload });
+        const claim = await WebhookMetricsService.time(trace, 'dedup', () =>
+            WebhookIdempotencyService.claim(idempotencyKey, platform.toLowerCase())
+        );
+        if (claim !== CLAIM_NEW) {
+            idempotencyKey = null; // Owned by the first delivery
+            logger.info('Duplicate webhook detected', { webhookId, traceId: trace.traceId, platform, claim });
+            return res.status(409).json({
+                success: false,
+                error: claim === CLAIM_DUPLICATE ? 'Duplicate webhook' : 'Webhook is already being processed',
+                code: claim === CLAIM_DUPLICATE ? 'DUPLICATE_WEBHOOK' : 'WEBHOOK_IN_PROGRESS',
+                webhookId
+            });
+        }
+
+        // Create webhook log (also the durable record of a queued webhook)
         webhookLog = new webhookLogModel({
             webhookId,
+            traceId: trace.traceId,
             platform: platform.toLowerCase(),
             event: payload.event,
             orderId: payload.orderId,
             courierTrackingId: payload.courierTrackingId,
             payload,
             signature,
+            idempotencyKey,
             status: 'pending',
+            // Leased to this instance's queue, so other instances' sweeps leave it alone
+            ...WebhookQueueService.lease(),
             createdAt: Date.now()
         });
-        await webhookLog.save();
+        await WebhookMetricsService.time(trace, 'dbWrite', () => webhookLog.save());
 
-        // Process webhook based on platform and event type
-        let processingResult;
-
-        if (platform === 'muditakurye') {
-            // Use CourierIntegrationService for MuditaKurye webhooks
-            processingResult = await CourierIntegrationService.processWebhook(
-                platform,
-                payload,
-                req.headers
-            );
-        } else {
-            // Use legacy processing for other platforms
-            processingResult = await processWebhookEvent(payload, config);
-        }
-
-        const processingTime = Date.now() - startTime;
+        const job = {
+            webhookLogId: webhookLog._id,
+            webhookId,
+            traceId: trace.traceId,
+            platform: platform.toLowerCase(),
+            payload,
+            idempotencyKey,
+            receivedAt: startTime
+        };
 
-        // Update webhook log
-        webhookLog.status = processingResult.success ? 'success' : 'failed';
-        webhookLog.statusCode = processingResult.statusCode || 200;
-        webhookLog.response = processingResult.response;
-        webhookLog.error = processingResult.error;
-        webhookLog.errorCode = processingResult.errorCode;
-        webhookLog.processingTime = processingTime;
-        webhookLog.processedAt = Date.now();
-        await webhookLog.save();
+        // Ack first: status updates and notifications run on the queue workers
+        if (WebhookQueueService.isEnabled()) {
+            if (!WebhookQueueService.enqueue(job)) {
+                await WebhookIdempotencyService.release(idempotencyKey);
+                idempotencyKey = null;
+
+                webhookLog.status = 'failed';
+                webhookLog.statusCode = 503;
+                webhookLog.error = 'Webhook queue is full';
+                webhookLog.errorCode = 'QUEUE_FULL';
+                webhookLog.processedAt = Date.now();
+                await webhookLog.save();
+
+                logger.warn('Webhook queue full, asking sender to retry', { webhookId, traceId: trace.traceId, platform });
+                res.set('Retry-After', '30');
+                return res.status(503).json({
+                    success: false,
+                    error: 'Webhook queue is full',
+                    code: 'QUEUE_FULL',
+                    webhookId
+                });
+            }
 
-        if (processingResult.success) {
-            logger.info('Webhook processed successfully', {
+            return res.status(200).json({
+                success: true,
+                message: 'Webhook accepted',
                 webhookId,
-                platform,
-                event: payload.event,
-                orderId: payload.orderId,
-                processingTime
+                traceId: trace.traceId,
+                queued: true,
+                receivedAt: startTime
             });
+        }
+
+        // Queue disabled: process inline (the job owns the idempotency key from here)
+        idempotencyKey = null;
+        const processingResult = await processWebhookJob(job);
 
+        if (processingResult.success) {
             return res.status(200).json({
                 success: true,
                 message: 'Webhook processed successfully',
                 webhookId,
+                traceId: trace.traceId,
                 processedAt: Date.now()
             });
         } else {
@@ -223,10 +260,16 @@ export const receiveWebhook = async (req, res) => {
         logger.error('Webhook processing error', {
             error: error.message,
             stack: error.stack,
+            traceId: trace.traceId,
             webhookId: req.headers['x-webhook-id'],
             platform: req.headers['x-webhook-platform']
         });
 
+        // Let the provider's retry be processed
+        if (idempotencyKey) {
+            await WebhookIdempotencyService.release(idempotencyKey);
+        }
+
         // Update webhook log if exists
         if (webhookLog) {
             webhookLog.status = 'failed';
@@ -247,10 +290,95 @@ export const receiveWebhook = async (req, res) => {
     }
 };
 
+/**
+ * Process an accepted webhook and record the outcome in its webhook log
+ * Runs on the WebhookQueueService workers, or inline when the queue is disabled
+ */
+const processWebhookJob = async (job) => {
+    const trace = WebhookMetricsService.startTrace({ traceId: job.traceId });
+    if (job.queuedAt) {
+        WebhookMetricsService.record(trace, 'queueWait', Date.now() - job.queuedAt);
+    }
+    let processingResult;
+
+    // A queued job whose lease ran out may have been re-queued and processed elsewhere
+    if (job.queuedAt && job.webhookLogId && !(await WebhookQueueService.holdLease(job.webhookLogId))) {
+        logger.info('Webhook already processed or taken over by another instance, skipping', {
+            webhookId: job.webhookId,
+            traceId: trace.traceId,
+            platform: job.platform
+        });
+        return { success: true, skipped: true };
+    }
+
+    try {
+        if (job.platform === 'muditakurye') {
+            // Signature was verified on receipt; apply the event through CourierIntegrationService
+            processingResult = await CourierIntegrationService.handleWebhookEvent(job.platform, job.payload, { traceId: trace.traceId });
+        } else {
+            // Use legacy processing for other platforms
+            processingResult = await processWebhookEvent(job.payload);
+        }
+    } catch (error) {
+        processingResult = {
+            success: false,
+            statusCode: 500,
+            error: error.message,
+            errorCode: 'PROCESSING_ERROR'
+        };
+    }
+
+    if (processingResult.success) {
+        await WebhookIdempotencyService.complete(job.idempotencyKey);
+    } else {
+        // Let the provider's retry be processed
+        await WebhookIdempotencyService.release(job.idempotencyKey);
+    }
+
+    const processingTime = Date.now() - job.receivedAt;
+
+    await WebhookMetricsService.time(trace, 'dbWrite', () => webhookLogModel.updateOne({ _id: job.webhookLogId }, {
+        $set: {
+            status: processingResult.success ? 'success' : 'failed',
+            statusCode: processingResult.statusCode || (processingResult.success ? 200 : 500),
+            response: processingResult.response,
+            error: processingResult.error,
+            errorCode: processingResult.errorCode,
+            processingTime,
+            processedAt: Date.now()
+        }
+    }));
+    WebhookMetricsService.record(trace, 'process', performance.now() - trace.startedAt);
+
+    if (processingResult.success) {
+        logger.info('Webhook processed successfully', {
+            webhookId: job.webhookId,
+            traceId: trace.traceId,
+            platform: job.platform,
+            event: job.payload.event,
+            orderId: job.payload.orderId,
+            processingTime
+        });
+    } else {
+        logger.warn('Webhook processing failed', {
+            webhookId: job.webhookId,
+            traceId: trace.traceId,
+            platform: job.platform,
+            event: job.payload.event,
+            error: processingResult.error,
+            processingTime
+        });
+    }
+
+    return processingResult;
+};
+
+WebhookQueueService.setProcessor(processWebhookJob);
+
 /**
  * Process webhook event based on event type
  */
-const processWebhookEvent = async (payload, config) => {
+const processWebhookEvent = async (payload) => {
     try {
         const { event, orderId, status, location, estimatedDelivery, actualDelivery, note, metadata } = payload;
 
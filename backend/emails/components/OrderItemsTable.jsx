@@ -1,9 +1,43 @@
 import React from 'react';
 import { Section, Row, Column, Text } from '@react-email/components';
+import { money } from '../utils/renderShell.js';
+
+/**
+ * Order Item Card
+ * One product line; lineTotal defaults to price x quantity
+ */
+export const OrderItemCard = ({ item }) => {
+  const price = item.price || 0;
+  const quantity = item.quantity || 1;
+
+  return (
+    <Section style={itemCardStyle}>
+      <Row>
+        {/* Product Info */}
+        <Column style={{ width: '60%' }}>
+          <Text style={productNameStyle}>{item.name || 'Ürün'}</Text>
+          {item.size && (
+            <Text style={productSizeStyle}>Gramaj: {item.size}g</Text>
+          )}
+          <Text style={quantityStyle}>Adet: {quantity}</Text>
+        </Column>
+
+        {/* Pricing */}
+        <Column style={{ width: '40%', textAlign: 'right' }}>
+          <Text style={unitPriceStyle}>₺{money(price)}</Text>
+          <Text style={totalPriceStyle}>
+            ₺{money(item.lineTotal ?? price * quantity)}
+          </Text>
+        </Column>
+      </Row>
+    </Section>
+  );
+};
 
 /**
  * Order Items Component - Modern Card Layout
  * Clean, modern card design for displaying order items
+ * items can also be a slot token, filled with rendered cards (see EmailRenderer shells)
  */
 export const OrderItemsTable = ({ items = [], brandColor = '#d4af37' }) => {
   return (
@@ -12,28 +46,9 @@ export const OrderItemsTable = ({ items = [], brandColor = '#d4af37' }) => {
       <Text style={sectionTitleStyle}>Sipariş Ürünleri</Text>
 
       {/* Items as Cards */}
-      {items.map((item, index) => (
-        <Section key={index} style={itemCardStyle}>
-          <Row>
-            {/* Product Info */}
-            <Column style={{ width: '60%' }}>
-              <Text style={productNameStyle}>{item.name || 'Ürün'}</Text>
-              {item.size && (
-                <Text style={productSizeStyle}>Gramaj: {item.size}g</Text>
-              )}
-              <Text style={quantityStyle}>Adet: {item.quantity || 1}</Text>
-            </Column>
-
-            {/* Pricing */}
-            <Column style={{ width: '40%', textAlign: 'right' }}>
-              <Text style={unitPriceStyle}>₺{(item.price || 0).toFixed(2)}</Text>
-              <Text style={totalPriceStyle}>
-                ₺{((item.price || 0) * (item.quantity || 1)).toFixed(2)}
-              </Text>
-            </Column>
-          </Row>
-        </Section>
-      ))}
+      {typeof items === 'string'
+        ? items
+        : items.map((item, index) => <OrderItemCard key={index} item={item} />)}
     </Section>
   );
 };
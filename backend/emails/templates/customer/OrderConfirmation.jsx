@@ -1,8 +1,9 @@
 import React from 'react';
 import { Text, Section, Row, Column } from '@react-email/components';
 import { EmailLayout } from '../../components/EmailLayout.jsx';
-import { OrderItemsTable } from '../../components/OrderItemsTable.jsx';
+import { OrderItemsTable, OrderItemCard } from '../../components/OrderItemsTable.jsx';
 import { Button } from '../../components/Button.jsx';
+import { Slot, slotToken, money } from '../../utils/renderShell.js';
 
 /**
  * Order Confirmation Email Template
@@ -89,7 +90,7 @@ export const OrderConfirmation = ({
             <Text style={summaryLabelStyle}>Ara Toplam:</Text>
           </Column>
           <Column style={{ width: '30%', textAlign: 'right' }}>
-            <Text style={summaryValueStyle}>₺{subtotal.toFixed(2)}</Text>
+            <Text style={summaryValueStyle}>₺{money(subtotal)}</Text>
           </Column>
         </Row>
 
@@ -98,7 +99,7 @@ export const OrderConfirmation = ({
             <Text style={summaryLabelStyle}>Kargo:</Text>
           </Column>
           <Column style={{ width: '30%', textAlign: 'right' }}>
-            <Text style={summaryValueStyle}>₺{shipping.toFixed(2)}</Text>
+            <Text style={summaryValueStyle}>₺{money(shipping)}</Text>
           </Column>
         </Row>
 
@@ -108,7 +109,7 @@ export const OrderConfirmation = ({
               <Text style={summaryLabelStyle}>İndirim:</Text>
             </Column>
             <Column style={{ width: '30%', textAlign: 'right' }}>
-              <Text style={{...summaryValueStyle, color: '#22c55e'}}>-₺{discount.toFixed(2)}</Text>
+              <Text style={{...summaryValueStyle, color: '#22c55e'}}>-₺{money(discount)}</Text>
             </Column>
           </Row>
         )}
@@ -118,7 +119,7 @@ export const OrderConfirmation = ({
             <Text style={totalLabelStyle}>Toplam:</Text>
           </Column>
           <Column style={{ width: '30%', textAlign: 'right' }}>
-            <Text style={totalValueStyle}>₺{total.toFixed(2)}</Text>
+            <Text style={totalValueStyle}>₺{money(total)}</Text>
           </Column>
         </Row>
       </Section>
@@ -152,6 +153,60 @@ export const OrderConfirmation = ({
   );
 };
 
+/**
+ * Shell spec (see EmailRenderer): markup variants, slot props and the values that fill them
+ * Variants: d = delivery date shown, x = discount row shown; items: s = size shown
+ */
+export const orderConfirmationShell = {
+  variant: (data) => `${data.deliveryDate ? 'd' : ''}${data.discount > 0 ? 'x' : ''}`,
+  props: (variant) => ({
+    customerName: slotToken('customerName'),
+    orderId: slotToken('orderId'),
+    orderDate: slotToken('orderDate'),
+    items: slotToken('items'),
+    subtotal: new Slot('subtotal'),
+    shipping: new Slot('shipping'),
+    discount: variant.includes('x') ? new Slot('discount') : 0,
+    total: new Slot('total'),
+    shippingAddress: slotToken('shippingAddress'),
+    deliveryDate: variant.includes('d') ? slotToken('deliveryDate') : undefined,
+    paymentMethod: slotToken('paymentMethod'),
+  }),
+  values: (data) => ({
+    customerName: data.customerName || 'Müşteri',
+    orderId: data.orderId,
+    orderDate: data.orderDate || new Date().toLocaleDateString('tr-TR'),
+    subtotal: money(data.subtotal || 0),
+    shipping: money(data.shipping || 0),
+    discount: money(data.discount || 0),
+    total: money(data.total || 0),
+    shippingAddress: data.shippingAddress || '',
+    deliveryDate: data.deliveryDate,
+    paymentMethod: data.paymentMethod || 'Kredi Kartı',
+  }),
+  items: {
+    component: OrderItemCard,
+    list: (data) => data.items || [],
+    variant: (item) => (item.size ? 's' : ''),
+    props: (variant) => ({
+      item: {
+        name: slotToken('name'),
+        size: variant === 's' ? slotToken('size') : undefined,
+        quantity: slotToken('quantity'),
+        price: new Slot('price'),
+        lineTotal: new Slot('lineTotal'),
+      },
+    }),
+    values: (item) => ({
+      name: item.name || 'Ürün',
+      size: item.size,
+      quantity: item.quantity || 1,
+      price: money(item.price || 0),
+      lineTotal: money(item.lineTotal ?? (item.price || 0) * (item.quantity || 1)),
+    }),
+  },
+};
+
 // Inline styles
 const titleStyle = {
   fontSize: '28px',
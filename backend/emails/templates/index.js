@@ -0,0 +1,16 @@
+import { OrderConfirmation, orderConfirmationShell } from './customer/OrderConfirmation.jsx';
+
+/**
+ * Email template registry
+ * component: React Email template; shell: pre-rendered shell spec (optional, see EmailRenderer)
+ */
+export const templates = {
+  orderConfirmation: { component: OrderConfirmation, shell: orderConfirmationShell },
+  // Future templates will be added here
+  // orderStatusUpdate: { component: OrderStatusUpdate },
+  // courierAssignment: { component: CourierAssignment },
+  // orderDelivered: { component: OrderDelivered },
+  // orderCancelled: { component: OrderCancelled },
+};
+
+export default templates;
@@ -0,0 +1,32 @@
+import { templates } from '../templates/index.js';
+import { renderEmailToHTML } from './renderEmail.js';
+
+/**
+ * Render jobs, run by the render workers (or inline when the pool is off)
+ * Jobs are plain data so they can be posted to a worker:
+ * - { kind: 'full', templateType, props }: the whole email
+ * - { kind: 'shell', templateType, variant, design }: email with slot tokens for per-order values
+ * - { kind: 'item', templateType, variant }: one repeated item (e.g. an order line) with slot tokens
+ */
+export async function renderJob({ kind, templateType, variant = '', design = {}, props = {} }) {
+  const template = templates[templateType];
+  if (!template) {
+    throw new Error(`Template '${templateType}' not found`);
+  }
+
+  switch (kind) {
+    case 'shell':
+      return renderEmailToHTML(template.component, { ...template.shell.props(variant), ...design });
+
+    case 'item': {
+      const html = await renderEmailToHTML(template.shell.items.component, template.shell.items.props(variant));
+      // A fragment goes inside the email, without the document type
+      return html.replace(/^\s*<!DOCTYPE[^>]*>/i, '');
+    }
+
+    default:
+      return renderEmailToHTML(template.component, props);
+  }
+}
+
+export default renderJob;
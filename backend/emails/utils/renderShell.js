@@ -0,0 +1,69 @@
+/**
+ * Pre-rendered email shells
+ * A template is rendered once per design version (and markup variant) with slot tokens in
+ * place of per-order values; each email then only escapes its values into the slots.
+ *
+ * Slot values given to templates:
+ * - text (customerName, orderId, ...): the token string itself
+ * - money: a Slot, formatted by money() to its token; compares as 1, so `discount > 0` still
+ *   picks the variant's branch
+ */
+
+const TOKEN_PATTERN = /__slot_([A-Za-z0-9]+)__/;
+
+export const slotToken = (name) => `__slot_${name}__`;
+
+export class Slot {
+  constructor(name) {
+    this.name = name;
+  }
+
+  toString() {
+    return slotToken(this.name);
+  }
+
+  valueOf() {
+    return 1;
+  }
+}
+
+/**
+ * Price text for templates: numbers with two decimals, slots as their token
+ */
+export const money = (value) => (typeof value === 'number' ? value.toFixed(2) : String(value));
+
+const ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;' };
+
+/**
+ * Same escaping React applies to text and attribute values
+ */
+export const escapeHtml = (value) => String(value ?? '').replace(/[&<>"']/g, char => ESCAPES[char]);
+
+/**
+ * Split rendered HTML into static parts and slot names
+ * @returns {{ parts: string[], slots: string[] }} parts.length === slots.length + 1
+ */
+export const compileShell = (html) => {
+  const pieces = html.split(new RegExp(TOKEN_PATTERN.source, 'g'));
+  return {
+    parts: pieces.filter((_, index) => index % 2 === 0),
+    slots: pieces.filter((_, index) => index % 2 === 1)
+  };
+};
+
+/**
+ * Fill a compiled shell
+ * @param {object} shell - From compileShell
+ * @param {object} values - Slot name -> value (escaped)
+ * @param {object} html - Slot name -> HTML inserted as is (e.g. rendered item cards)
+ */
+export const fillShell = (shell, values, html = {}) => {
+  let output = shell.parts[0];
+  for (let i = 0; i < shell.slots.length; i++) {
+    const name = shell.slots[i];
+    output += (name in html ? html[name] : escapeHtml(values[name])) + shell.parts[i + 1];
+  }
+  return output;
+};
+
+export default { slotToken, Slot, money, escapeHtml, compileShell, fillShell };
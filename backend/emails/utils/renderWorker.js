@@ -0,0 +1,17 @@
+import { parentPort } from 'worker_threads';
+import { performance } from 'perf_hooks';
+import { renderJob } from './renderJob.js';
+
+/**
+ * Email render worker (see EmailRenderPool)
+ * Receives { id, job } and answers { id, html, renderMs } or { id, error }
+ */
+parentPort.on('message', async ({ id, job }) => {
+  const startedAt = performance.now();
+  try {
+    const html = await renderJob(job);
+    parentPort.postMessage({ id, html, renderMs: performance.now() - startedAt });
+  } catch (error) {
+    parentPort.postMessage({ id, error: error.message });
+  }
+});
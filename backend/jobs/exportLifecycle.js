@@ -0,0 +1,35 @@
+import cron from 'node-cron';
+import LifecycleExporter from '../services/LifecycleExportService.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Lifecycle Export Job - incremental columnar export of order/courier lifecycle data
+ * Runs daily at 2:00 AM (Istanbul timezone), outside business hours
+ *
+ * Appends the orders settled since the last run (high-water mark in LIFECYCLE_EXPORT_DIR)
+ * to date-partitioned files for offline courier performance analysis.
+ * Scheduled only when LIFECYCLE_EXPORT_DIR is set; also runnable by hand:
+ *   node scripts/exportLifecycle.js [outputDir]
+ */
+
+const exportLifecycle = async () => {
+    try {
+        await LifecycleExporter.run();
+    } catch (error) {
+        // Already logged by the exporter; the next run resumes from the high-water mark
+        logger.warn('Lifecycle export job run failed', { error: error.message });
+    }
+};
+
+/**
+ * Schedule export job
+ * '0 2 * * *' = Every day at 2:00 AM
+ */
+const lifecycleExportJob = cron.schedule('0 2 * * *', exportLifecycle, {
+    scheduled: false,
+    timezone: "Europe/Istanbul"
+});
+
+// Export for manual execution and testing
+export { exportLifecycle, lifecycleExportJob };
+export default lifecycleExportJob;
@@ -0,0 +1,209 @@
+import cron from 'node-cron';
+import orderModel from '../models/OrderModel.js';
+import CourierIntegrationService from '../services/CourierIntegrationService.js';
+import RateLimiterService from '../services/RateLimiter.js';
+import { nextPollAt } from '../services/CourierStatusReconciler.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Courier Status Polling Job - fallback for lost or late courier webhooks
+ * Runs every minute (Istanbul timezone)
+ *
+ * Orders sent to a courier carry courierIntegration.nextPollAt, set per stage by
+ * CourierStatusReconciler (e.g. 3 minutes after NEW, 30 minutes after ON_DELIVERY) and
+ * cleared once the order is delivered or canceled. Each run:
+ *   - loads the due orders with one indexed, projected query (oldest first, capped per run)
+ *   - fetches their status from the courier API with bounded concurrency behind an
+ *     outbound token bucket, pausing when the provider answers 429
+ *   - hands changed statuses to the reconciler, which batches and orders the writes
+ *   - re-schedules unchanged orders with exponential backoff in a single bulkWrite
+ */
+
+const config = {
+    maxOrdersPerRun: parseInt(process.env.COURIER_POLL_MAX_PER_RUN) || 2000,
+    concurrency: parseInt(process.env.COURIER_POLL_CONCURRENCY) || 8,
+    ratePerSecond: parseInt(process.env.COURIER_POLL_RATE_PER_SECOND) || 10
+};
+
+const limiter = RateLimiterService.createOutboundLimiter(config.ratePerSecond, config.ratePerSecond);
+
+const stats = {
+    runs: 0,
+    skippedRuns: 0,
+    polled: 0,
+    changed: 0,
+    unchanged: 0,
+    errors: 0,
+    rateLimited: 0,
+    lastRunAt: null,
+    lastRunMs: 0,
+    lastDue: 0
+};
+
+let running = false;
+
+/**
+ * Poll one provider's due orders; returns bulkWrite operations for orders to re-schedule
+ */
+const pollPlatform = async (platform, orders) => {
+    const service = CourierIntegrationService.getService(platform);
+    const reschedule = [];
+    let next = 0;
+    let stopped = false;
+
+    const pollOrder = async (order) => {
+        const integration = order.courierIntegration;
+        const misses = (integration.pollMisses || 0) + 1;
+
+        await limiter.acquire();
+        if (stopped) return;
+
+        const result = await service.getOrderStatus(integration.externalOrderId);
+        stats.polled++;
+
+        if (!result.success) {
+            stats.errors++;
+            if (result.error?.category === 'rate_limit') {
+                // Leave the remaining orders due for the next run
+                stats.rateLimited++;
+                stopped = true;
+                limiter.pause((result.error.retryAfter || 60) * 1000);
+            }
+            reschedule.push({ order, misses });
+            return;
+        }
+
+        const status = result.order?.status;
+        if (status && status !== integration.lastStatus) {
+            const reconciled = await CourierIntegrationService.updateOrderStatus(
+                platform,
+                integration.externalOrderId,
+                status,
+                { note: `Durum sorgulama ile güncellendi: ${status}` },
+                { timestamp: result.order.updatedAt }
+            );
+
+            // Accepted statuses re-arm nextPollAt when the reconciler writes them
+            if (reconciled.success && reconciled.outcome !== 'stale') {
+                stats.changed++;
+                return;
+            }
+        }
+
+        stats.unchanged++;
+        reschedule.push({ order, misses });
+    };
+
+    const worker = async () => {
+        while (!stopped && next < orders.length) {
+            const order = orders[next++];
+            try {
+                await pollOrder(order);
+            } catch (error) {
+                stats.errors++;
+                reschedule.push({ order, misses: (order.courierIntegration.pollMisses || 0) + 1 });
+                logger.error('Courier status poll failed', {
+                    orderId: order._id,
+                    platform,
+                    error: error.message
+                });
+            }
+        }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(config.concurrency, orders.length) }, worker));
+
+    const now = Date.now();
+    return reschedule.map(({ order, misses }) => ({
+        updateOne: {
+            // Skip orders whose status moved on (e.g. a webhook arrived) while we were polling
+            filter: { _id: order._id, 'courierIntegration.nextPollAt': order.courierIntegration.nextPollAt },
+            update: {
+                $set: {
+                    'courierIntegration.nextPollAt': nextPollAt(order.courierIntegration.lastStatus || 'NEW', now, misses),
+                    'courierIntegration.pollMisses': misses,
+                    'courierIntegration.lastSyncAt': now
+                }
+            }
+        }
+    }));
+};
+
+const pollCourierStatus = async () => {
+    if (running) {
+        // The previous run is still working through a large backlog
+        stats.skippedRuns++;
+        return;
+    }
+    running = true;
+    const startedAt = Date.now();
+
+    try {
+        await CourierIntegrationService.initialize();
+
+        const due = await orderModel.find({
+            'courierIntegration.nextPollAt': { $lte: startedAt },
+            'courierIntegration.syncStatus': 'synced'
+        })
+            .select('_id courierIntegration.platform courierIntegration.externalOrderId courierIntegration.lastStatus courierIntegration.nextPollAt courierIntegration.pollMisses')
+            .sort({ 'courierIntegration.nextPollAt': 1 })
+            .limit(config.maxOrdersPerRun)
+            .lean();
+
+        stats.lastDue = due.length;
+        if (due.length === 0) return;
+
+        const byPlatform = new Map();
+        for (const order of due) {
+            const platform = order.courierIntegration.platform;
+            if (!platform || !order.courierIntegration.externalOrderId) continue;
+            if (!byPlatform.has(platform)) byPlatform.set(platform, []);
+            byPlatform.get(platform).push(order);
+        }
+
+        const operations = [];
+        for (const [platform, orders] of byPlatform.entries()) {
+            operations.push(...await pollPlatform(platform, orders));
+        }
+
+        if (operations.length > 0) {
+            await orderModel.bulkWrite(operations, { ordered: false });
+        }
+
+        logger.info('Courier status poll completed', {
+            due: due.length,
+            rescheduled: operations.length,
+            durationMs: Date.now() - startedAt
+        });
+    } catch (error) {
+        logger.error('Courier status poll job failed', {
+            error: error.message,
+            stack: error.stack
+        });
+    } finally {
+        running = false;
+        stats.runs++;
+        stats.lastRunAt = startedAt;
+        stats.lastRunMs = Date.now() - startedAt;
+    }
+};
+
+const getCourierPollStats = () => ({
+    ...config,
+    running,
+    ...stats,
+    limiter: limiter.getStats()
+});
+
+/**
+ * Schedule polling job
+ * '* * * * *' = Every minute
+ */
+const courierStatusPollJob = cron.schedule('* * * * *', pollCourierStatus, {
+    scheduled: false,
+    timezone: "Europe/Istanbul"
+});
+
+// Export for manual execution and testing
+export { pollCourierStatus, getCourierPollStats, courierStatusPollJob };
+export default courierStatusPollJob;
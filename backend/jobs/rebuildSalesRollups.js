@@ -0,0 +1,72 @@
+import cron from 'node-cron';
+import orderModel from '../models/OrderModel.js';
+import SalesRollupService from '../services/SalesRollupService.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Sales Rollup Job - backfill and nightly reconcile of the report rollups
+ * Runs daily at 3:30 AM (Istanbul timezone)
+ *
+ * Orders keep the rollups current as they are placed and change status; this job:
+ *   - builds them from the whole order history until a backfill has completed (retried on
+ *     every start after a failed or interrupted one)
+ *   - rebuilds the last SALES_ROLLUP_RECONCILE_DAYS days every night, so increments lost to
+ *     a failed write or to status changes made outside the application heal within a day
+ *
+ * A full rebuild can also be run manually: node scripts/backfillSalesRollups.js [fromDate]
+ */
+
+const RECONCILE_DAYS = parseInt(process.env.SALES_ROLLUP_RECONCILE_DAYS) || 2;
+
+let running = false;
+
+const rebuildSalesRollups = async ({ from, to = Date.now() } = {}) => {
+    if (running) {
+        logger.warn('Sales rollup rebuild already running, skipping');
+        return null;
+    }
+    running = true;
+
+    try {
+        const rangeFrom = from ?? to - RECONCILE_DAYS * 24 * 60 * 60 * 1000;
+        return await SalesRollupService.rebuild({ from: rangeFrom, to });
+    } catch (error) {
+        logger.error('Sales rollup rebuild failed', {
+            error: error.message,
+            stack: error.stack
+        });
+        return null;
+    } finally {
+        running = false;
+    }
+};
+
+/**
+ * Build the rollups from the order history unless a backfill has completed
+ */
+const ensureSalesRollups = async () => {
+    if (await SalesRollupService.isBackfilled()) return null;
+
+    const firstOrder = await orderModel.findOne({}).select('date').sort({ date: 1 }).lean();
+    if (!firstOrder) return null;
+
+    logger.info('Sales rollups not backfilled yet, rebuilding from order history', { from: firstOrder.date });
+    const result = await rebuildSalesRollups({ from: firstOrder.date });
+    if (result) {
+        await SalesRollupService.markBackfilled(result);
+    }
+    return result;
+};
+
+/**
+ * Schedule reconcile job
+ * '30 3 * * *' = Every day at 3:30 AM
+ */
+const salesRollupJob = cron.schedule('30 3 * * *', () => rebuildSalesRollups(), {
+    scheduled: false,
+    timezone: "Europe/Istanbul"
+});
+
+// Export for manual execution and testing
+export { rebuildSalesRollups, ensureSalesRollups, salesRollupJob };
+export default salesRollupJob;
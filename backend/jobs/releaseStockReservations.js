@@ -0,0 +1,44 @@
+import cron from 'node-cron';
+import StockReservationService from '../services/StockReservationService.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Stock Reservation Expiry Job - gives back stock held for abandoned checkouts and payments
+ * Runs every minute (Istanbul timezone)
+ *
+ * Checkouts release their reservation when the request ends; PayTR payments hold theirs
+ * until the callback arrives. Reservations still held past their expiry (the payment was
+ * abandoned, or the process stopped mid-checkout) are released here.
+ */
+
+let running = false;
+
+const releaseStockReservations = async () => {
+    // A slow run must not overlap the next one
+    if (running) return;
+    running = true;
+
+    try {
+        await StockReservationService.releaseExpired();
+    } catch (error) {
+        logger.error('Stock reservation expiry job failed', {
+            error: error.message,
+            stack: error.stack
+        });
+    } finally {
+        running = false;
+    }
+};
+
+/**
+ * Schedule expiry job
+ * '* * * * *' = Every minute
+ */
+const stockReservationJob = cron.schedule('* * * * *', releaseStockReservations, {
+    scheduled: false,
+    timezone: "Europe/Istanbul"
+});
+
+// Export for manual execution and testing
+export { releaseStockReservations, stockReservationJob };
+export default stockReservationJob;
@@ -1,33 +1,31 @@
+import crypto from "crypto";
 import productModel from "../models/ProductModel.js";
 import settingsModel from "../models/SettingsModel.js";
+import StockReservationService from "../services/StockReservationService.js";
 import logger from "../utils/logger.js";
 
 /**
- * Check cart items stock availability before placing order
+ * Reserve cart items' stock before placing order
+ * Stock is checked and taken in one conditional bulk write (StockReservationService);
+ * the handler keeps it with commitStockReservation, otherwise it goes back when the response ends
  */
 export const checkStockAvailability = async (req, res, next) => {
     try {
-        const { items } = req.body;
-        if (!Array.isArray(items) || items.length === 0) {
-            return res.json({ success: false, message: 'Sepet boş veya geçersiz' });
+        const reservationId = `checkout:${crypto.randomUUID()}`;
+        const result = await StockReservationService.reserve(reservationId, req.body.items);
+        if (!result.success) {
+            return res.json({ success: false, message: result.message });
         }
 
-        for (const item of items) {
-            // Hem item.id hem de item._id'yi kontrol et (frontend farklı formatlar gönderebilir)
-            const productId = item.id || item._id;
-            if (!productId) {
-                return res.json({ success: false, message: 'Ürün ID\'si bulunamadı' });
-            }
-            
-            const product = await productModel.findById(productId);
-            if (!product) {
-                return res.json({ success: false, message: 'Ürün bulunamadı' });
-            }
-            const requested = Number(item.quantity || 0);
-            if (Number(product.stock || 0) < requested) {
-                return res.json({ success: false, message: `${product.name} için stok yetersiz` });
-            }
-        }
+        const reservation = { reservationId, committed: false };
+        req.stockReservation = reservation;
+
+        res.once('close', () => {
+            if (reservation.committed) return;
+            StockReservationService.release(reservationId).catch(error => {
+                logger.error('Error releasing stock reservation', { error: error.message, reservationId });
+            });
+        });
 
         next();
     } catch (error) {
@@ -37,20 +35,20 @@ export const checkStockAvailability = async (req, res, next) => {
 };
 
 /**
- * Reduce stock quantities for ordered items
+ * Keep the stock reserved by checkStockAvailability for a placed order
  */
-export const reduceStock = async (items) => {
-    if (!Array.isArray(items)) return;
-    for (const item of items) {
-        const requested = Number(item.quantity || 0);
-        // Hem item.id hem de item._id'yi kontrol et
-        const productId = item.id || item._id;
-        if (!productId || !requested) continue;
-        await productModel.findByIdAndUpdate(
-            productId,
-            { $inc: { stock: -requested } },
-            { new: true }
-        );
+export const commitStockReservation = async (req, orderId) => {
+    const reservation = req.stockReservation;
+    if (!reservation || reservation.committed) return;
+
+    reservation.committed = true;
+    const result = await StockReservationService.commit(reservation.reservationId, { orderId });
+    if (!result.success) {
+        logger.error('Stock reservation could not be committed', {
+            reservationId: reservation.reservationId,
+            orderId,
+            status: result.status
+        });
     }
 };
 
@@ -84,5 +82,5 @@ export const checkLowStockAlert = async (productId) => {
     }
 };
 
-export default { checkStockAvailability, reduceStock, checkLowStockAlert };
+export default { checkStockAvailability, commitStockReservation, checkLowStockAlert };
 
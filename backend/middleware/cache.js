@@ -1,10 +1,22 @@
-import { getFromCache, setInCache } from '../config/redis.js';
+import ResponseCache from '../services/ResponseCache.js';
+
+/**
+ * Resolve a tag list given as an array or as a function of the request (and response data)
+ */
+const resolveTags = (tags, ...args) => {
+  const resolved = typeof tags === 'function' ? tags(...args) : tags;
+  return (resolved || []).filter(Boolean).map(String);
+};
 
 /**
  * Cache Middleware
  * Automatically caches GET requests for specified duration
+ * Served from the two-tier ResponseCache (in-process LRU, then Redis). Only one request per
+ * key recomputes an expired entry; concurrent ones get the stale copy or wait for it.
+ * @param {number} durationSeconds - TTL of the cached response
+ * @param {string[]|Function} tags - Invalidation tags, e.g. ['products'] or (req, data) => [`product:${data.product._id}`]
  */
-export const cache = (durationSeconds = 3600) => {
+export const cache = (durationSeconds = 3600, tags = []) => {
   return async (req, res, next) => {
     // Only cache GET requests
     if (req.method !== 'GET') {
@@ -16,33 +28,56 @@ export const cache = (durationSeconds = 3600) => {
       return next();
     }
 
-    const cacheKey = `${req.originalUrl}:${JSON.stringify(req.query)}`;
+    const cacheKey = ResponseCache.buildKey(req);
 
     try {
       // Try to get from cache
-      const cachedData = await getFromCache(cacheKey);
+      const cached = await ResponseCache.lookup(cacheKey);
 
-      if (cachedData) {
+      if (cached?.fresh) {
         // Add cache header
         res.set('X-Cache', 'HIT');
-        return res.json(cachedData);
+        res.set('X-Cache-Tier', cached.tier);
+        return res.json(cached.data);
+      }
+
+      if (!ResponseCache.begin(cacheKey)) {
+        // Another request is already recomputing this key
+        if (cached) {
+          ResponseCache.recordStaleServed();
+          res.set('X-Cache', 'STALE');
+          return res.json(cached.data);
+        }
+
+        const data = await ResponseCache.wait(cacheKey);
+        if (data) {
+          res.set('X-Cache', 'COALESCED');
+          return res.json(data);
+        }
+        return next();
       }
 
       // Cache miss - override res.json to capture response
       const originalJson = res.json.bind(res);
       res.json = function(data) {
         // Only cache successful responses
-        if (data.success && durationSeconds > 0) {
-          setInCache(cacheKey, data, durationSeconds);
+        if (data?.success && durationSeconds > 0) {
+          ResponseCache.store(cacheKey, data, durationSeconds, resolveTags(tags, req, data));
+        } else {
+          ResponseCache.abandon(cacheKey);
         }
-        
+
         // Add cache header
         res.set('X-Cache', 'MISS');
         return originalJson(data);
       };
 
+      // Release waiting requests if the handler fails without a JSON response
+      res.on('close', () => ResponseCache.abandon(cacheKey));
+
       next();
     } catch (error) {
+      ResponseCache.abandon(cacheKey);
       next();
     }
   };
@@ -51,8 +86,10 @@ export const cache = (durationSeconds = 3600) => {
 /**
  * Cache invalidation middleware
  * Clears related cache when data is updated
+ * @param {string[]|Function|string} target - Tags to invalidate (array or (req) => tags);
+ *   a string is treated as a legacy key pattern and deleted with SCAN
  */
-export const invalidateCache = (pattern) => {
+export const invalidateCache = (target) => {
   return async (req, res, next) => {
     // Store original end function
     const originalEnd = res.end.bind(res);
@@ -60,8 +97,15 @@ export const invalidateCache = (pattern) => {
     res.end = function(chunk, encoding) {
       // Only invalidate on successful response
       if (res.statusCode === 200 || res.statusCode === 201) {
-        import('../config/redis.js').then(({ deletePattern }) => {
-          deletePattern(pattern);
+        import('../config/redis.js').then(({ deletePattern, invalidateTags }) => {
+          if (typeof target === 'string') {
+            ResponseCache.clearLocal();
+            deletePattern(target);
+          } else {
+            const invalidated = resolveTags(target, req);
+            ResponseCache.invalidateLocal(invalidated);
+            invalidateTags(invalidated);
+          }
         });
       }
       return originalEnd(chunk, encoding);
@@ -43,6 +43,11 @@ const branchSchema = new mongoose.Schema({
         },
         timezone: { type: String, default: 'Europe/Istanbul' }
     },
+    // GeoJSON copy of address.coordinates for $near queries, kept in sync by the hooks below
+    location: {
+        type: { type: String, enum: ['Point'] },
+        coordinates: { type: [Number], default: undefined } // [longitude, latitude]
+    },
     assignedZones: [{
         type: String // Delivery zone IDs that this branch serves
     }],
@@ -73,10 +78,33 @@ const branchSchema = new mongoose.Schema({
 branchSchema.index({ status: 1 });
 branchSchema.index({ 'address.city': 1, 'address.district': 1 });
 branchSchema.index({ assignedZones: 1 });
+branchSchema.index({ location: '2dsphere' });
+
+const toLocation = (coordinates) => (
+    typeof coordinates?.latitude === 'number' && typeof coordinates?.longitude === 'number'
+        ? { type: 'Point', coordinates: [coordinates.longitude, coordinates.latitude] }
+        : undefined
+);
 
 // Update updatedAt before saving
 branchSchema.pre('save', function(next) {
     this.updatedAt = Date.now();
+    this.location = toLocation(this.address?.coordinates);
+    next();
+});
+
+// Keep location in sync when the address is replaced through findByIdAndUpdate
+branchSchema.pre('findOneAndUpdate', function(next) {
+    const update = this.getUpdate() || {};
+    const address = update.address ?? update.$set?.address;
+    if (address !== undefined) {
+        const location = toLocation(address?.coordinates);
+        if (location) {
+            this.set('location', location);
+        } else {
+            update.$unset = { ...update.$unset, location: '' };
+        }
+    }
     next();
 });
 
@@ -1,4 +1,5 @@
 import mongoose from "mongoose";
+import eventEmitter from "../utils/eventEmitter.js";
 
 const categorySchema = new mongoose.Schema({
     name: {
@@ -110,6 +111,11 @@ categorySchema.methods.updateProductCount = async function() {
     return count;
 };
 
+// Keep the in-memory catalog (CatalogSnapshot) current after writes made by this process
+categorySchema.post(['save', 'insertMany', 'updateOne', 'updateMany', 'findOneAndUpdate', 'deleteOne', 'deleteMany', 'findOneAndDelete', 'bulkWrite'], function() {
+    eventEmitter.emit('catalog:changed');
+});
+
 const categoryModel = mongoose.models.category || mongoose.model("category", categorySchema);
 
 export default categoryModel;
@@ -88,7 +88,13 @@ const courierIntegrationConfigSchema = new mongoose.Schema({
         halfOpenRequests: {
             type: Number,
             default: 1
-        }
+        },
+        // Sliding-window tripping; unset fields fall back to the CIRCUIT_BREAKER_* env defaults
+        failureRateThreshold: Number, // 0..1
+        slowCallDurationMs: Number,
+        slowCallRateThreshold: Number, // 0..1
+        latencyThresholdMs: Number, // p95
+        minimumCalls: Number
     },
     statusMapping: {
         type: Map,
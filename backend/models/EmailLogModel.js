@@ -32,6 +32,11 @@ const emailLogSchema = new mongoose.Schema(
     templateId: { type: mongoose.Schema.Types.ObjectId, ref: 'EmailTemplate' },
     templateName: { type: String },
 
+    // Rendering (React Email templates, see EmailRenderer)
+    renderMs: { type: Number },
+    renderMode: { type: String, enum: ['shell', 'full'] },
+    designVersion: { type: String },
+
     // Status
     status: {
       type: String,
@@ -49,6 +54,7 @@ const emailLogSchema = new mongoose.Schema(
     // Related Data
     orderId: { type: mongoose.Schema.Types.ObjectId, ref: 'Order' },
     userId: { type: mongoose.Schema.Types.ObjectId, ref: 'User' },
+    traceId: { type: String, index: true }, // Webhook trace that triggered the email
 
     // Tracking
     opens: { type: Number, default: 0 },
@@ -65,6 +71,7 @@ const emailLogSchema = new mongoose.Schema(
 emailLogSchema.index({ createdAt: -1 });
 emailLogSchema.index({ trigger: 1, status: 1 });
 emailLogSchema.index({ to: 1, createdAt: -1 });
+emailLogSchema.index({ templateName: 1, createdAt: -1 });
 
 const EmailLog = mongoose.model('EmailLog', emailLogSchema);
 
@@ -1,4 +1,5 @@
 import mongoose from 'mongoose';
+import eventEmitter from '../utils/eventEmitter.js';
 
 const emailSettingsSchema = new mongoose.Schema(
   {
@@ -65,6 +66,11 @@ const emailSettingsSchema = new mongoose.Schema(
 // Ensure only one settings document exists (singleton pattern)
 emailSettingsSchema.index({ _id: 1 }, { unique: true });
 
+// Let EmailRenderer drop its cached design settings (and shells) after writes made by this process
+emailSettingsSchema.post(['save', 'updateOne', 'updateMany', 'findOneAndUpdate', 'findOneAndReplace', 'replaceOne'], function() {
+  eventEmitter.emit('emailSettings:changed');
+});
+
 const EmailSettings = mongoose.model('EmailSettings', emailSettingsSchema);
 
 export default EmailSettings;
@@ -63,6 +63,22 @@ const orderSchema = new mongoose.Schema({
         lastSyncAt: {
             type: Number // Last status sync time
         },
+        lastStatus: {
+            type: String // Last applied courier status (e.g. ON_DELIVERY)
+        },
+        statusRank: {
+            type: Number // Lifecycle position of lastStatus, see CourierStatusReconciler
+        },
+        lastStatusAt: {
+            type: Number // Courier event time of lastStatus
+        },
+        nextPollAt: {
+            type: Number // When the status polling fallback checks this order next (unset once terminal)
+        },
+        pollMisses: {
+            type: Number, // Consecutive polls without a status change
+            default: 0
+        },
         syncStatus: {
             type: String,
             enum: ['pending', 'synced', 'failed'],
@@ -101,6 +117,7 @@ orderSchema.index({ branchCode: 1 });
 orderSchema.index({ 'courierIntegration.platform': 1 });
 // externalOrderId already has index: true in schema definition
 orderSchema.index({ 'courierIntegration.syncStatus': 1 });
+orderSchema.index({ 'courierIntegration.nextPollAt': 1 }, { sparse: true });
 
 const orderModel = mongoose.models.order || mongoose.model("order", orderSchema);
 
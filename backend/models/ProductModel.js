@@ -1,4 +1,5 @@
 import mongoose from "mongoose";
+import eventEmitter from "../utils/eventEmitter.js";
 
 // Keyword array limit validator
 const arrayLimit = (val) => val.length <= 10;
@@ -25,6 +26,8 @@ const productSchema = new mongoose.Schema({
     date: {type: Number, required: true},
     sizePrices: [{ size: Number, price: Number }], // Gramaja özel fiyat
     stock: {type: Number, default: 0},
+    // Open stock reservations holding part of this stock (see StockReservationService)
+    stockHolds: {type: [String], default: undefined, select: false},
     allergens: {type: String}, // Alerjen bilgileri
     ingredients: {type: String}, // Malzemeler
     shelfLife: {type: String}, // Raf ömrü/tazeleme bilgisi
@@ -198,6 +201,11 @@ productSchema.pre('save', async function(next) {
     next();
 });
 
+// Keep the in-memory catalog (CatalogSnapshot) current after writes made by this process
+productSchema.post(['save', 'insertMany', 'updateOne', 'updateMany', 'findOneAndUpdate', 'deleteOne', 'deleteMany', 'findOneAndDelete', 'bulkWrite'], function() {
+    eventEmitter.emit('catalog:changed');
+});
+
 const productModel = mongoose.models.product || mongoose.model("product", productSchema);
 
 export default productModel;
@@ -0,0 +1,59 @@
+import mongoose from 'mongoose';
+
+/**
+ * SalesRollup Model
+ * Pre-aggregated sales per time bucket, maintained by SalesRollupService as orders are
+ * placed, change status or are deleted, and rebuilt from orders by the rollup job.
+ *
+ * One document per (dimension, key, granularity, bucket):
+ *   - dimension 'total' (key ''), 'paymentMethod' (key = method) or 'product' (key = product id)
+ *   - granularity 'hour' or 'day'; bucket is the start of the hour / local day in ms
+ *   - dimension 'meta' (key 'backfill') records a completed backfill; it holds no sales
+ * Counters cover orders by the day they were placed, like the reports always did.
+ */
+
+const salesRollupSchema = new mongoose.Schema({
+    dimension: {
+        type: String,
+        enum: ['total', 'paymentMethod', 'product', 'meta'],
+        required: true
+    },
+    key: {
+        type: String,
+        default: ''
+    },
+    granularity: {
+        type: String,
+        enum: ['hour', 'day'],
+        required: true
+    },
+    bucket: {
+        type: Number,
+        required: true
+    },
+    name: {
+        type: String
+    },
+    orders: { type: Number, default: 0 },
+    revenue: { type: Number, default: 0 },
+    quantity: { type: Number, default: 0 },
+    cancelledOrders: { type: Number, default: 0 },
+    cancelledRevenue: { type: Number, default: 0 },
+    // Current status of the orders placed in this bucket: status -> count
+    statuses: {
+        type: Map,
+        of: Number,
+        default: {}
+    },
+    updatedAt: {
+        type: Number
+    }
+}, {
+    versionKey: false
+});
+
+salesRollupSchema.index({ dimension: 1, granularity: 1, bucket: 1, key: 1 }, { unique: true });
+
+const salesRollupModel = mongoose.models.sales_rollup || mongoose.model('sales_rollup', salesRollupSchema);
+
+export default salesRollupModel;
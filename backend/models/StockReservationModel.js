@@ -0,0 +1,48 @@
+import mongoose from 'mongoose';
+
+/**
+ * StockReservation Model
+ * Ledger of stock held for checkouts and pending PayTR payments (see StockReservationService).
+ * Finished reservations are removed by the TTL index a week after finishedAt, which is set
+ * when they are committed, released, expired or rejected; held ones have no finishedAt and stay.
+ */
+
+const stockReservationSchema = new mongoose.Schema({
+    // Business key, e.g. checkout:<uuid> or paytr:<merchant_oid>
+    reservationId: {
+        type: String,
+        required: true,
+        index: true
+    },
+    items: [{
+        _id: false,
+        productId: { type: mongoose.Schema.Types.ObjectId, ref: 'product', required: true },
+        quantity: { type: Number, required: true }
+    }],
+    status: {
+        type: String,
+        enum: ['held', 'committed', 'released', 'expired', 'rejected'],
+        default: 'held'
+    },
+    orderId: {
+        type: String
+    },
+    expiresAt: {
+        type: Date,
+        required: true
+    },
+    finishedAt: {
+        type: Date
+    }
+}, {
+    timestamps: true,
+    versionKey: false
+});
+
+stockReservationSchema.index({ status: 1, expiresAt: 1 });
+// TTL only applies to documents that have the date field, i.e. finished reservations
+stockReservationSchema.index({ finishedAt: 1 }, { expireAfterSeconds: 7 * 24 * 60 * 60 });
+
+const stockReservationModel = mongoose.models.stock_reservation || mongoose.model('stock_reservation', stockReservationSchema);
+
+export default stockReservationModel;
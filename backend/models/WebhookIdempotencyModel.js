@@ -0,0 +1,35 @@
+import mongoose from 'mongoose';
+
+/**
+ * WebhookIdempotency Model
+ * Shared dedup keys for incoming webhooks when Redis is unavailable.
+ * Keys are SHA-256 digests; MongoDB removes them through the TTL index on expiresAt.
+ */
+
+const webhookIdempotencySchema = new mongoose.Schema({
+    key: {
+        type: String,
+        required: true,
+        unique: true
+    },
+    state: {
+        type: String,
+        enum: ['processing', 'done'],
+        default: 'processing'
+    },
+    platform: {
+        type: String
+    },
+    expiresAt: {
+        type: Date,
+        required: true
+    }
+}, {
+    versionKey: false
+});
+
+webhookIdempotencySchema.index({ expiresAt: 1 }, { expireAfterSeconds: 0 });
+
+const webhookIdempotencyModel = mongoose.models.webhook_idempotency || mongoose.model('webhook_idempotency', webhookIdempotencySchema);
+
+export default webhookIdempotencyModel;
@@ -11,6 +11,11 @@ const webhookLogSchema = new mongoose.Schema({
         required: true,
         index: true
     },
+    // Joins the log lines of one delivery (receipt, processing, notification, email)
+    traceId: {
+        type: String,
+        index: true
+    },
     platform: {
         type: String,
         required: true,
@@ -36,6 +41,9 @@ const webhookLogSchema = new mongoose.Schema({
     signature: {
         type: String
     },
+    idempotencyKey: {
+        type: String
+    },
     status: {
         type: String,
         enum: ['success', 'failed', 'pending'],
@@ -58,6 +66,13 @@ const webhookLogSchema = new mongoose.Schema({
         type: Number,
         default: 0
     },
+    // Instance whose webhook queue holds a pending log, and until when (see WebhookQueueService)
+    processingBy: {
+        type: String
+    },
+    leaseUntil: {
+        type: Number
+    },
     processingTime: {
         type: Number // milliseconds
     },
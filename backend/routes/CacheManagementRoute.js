@@ -6,7 +6,8 @@ import {
     clearAllCache,
     clearNamespaceCache,
     deleteKey,
-    getCacheStatistics
+    getCacheStatistics,
+    getResponseCacheStatistics
 } from '../controllers/CacheManagementController.js';
 import adminAuth from '../middleware/AdminAuth.js';
 
@@ -49,6 +50,23 @@ router.get('/', getCacheOverview);
  */
 router.get('/stats', getCacheStatistics);
 
+/**
+ * GET /api/admin/cache/response-stats
+ * Get response cache hit ratios per tier (in-process LRU and Redis)
+ *
+ * Available without Redis; the local tier keeps working on its own.
+ *
+ * Response:
+ * {
+ *   success: true,
+ *   data: {
+ *     requests: 1200, localHits: 900, redisHits: 200, staleServed: 12, coalesced: 30,
+ *     hitRatio: { local: 0.75, redis: 0.67, overall: 0.92 }
+ *   }
+ * }
+ */
+router.get('/response-stats', getResponseCacheStatistics);
+
 /**
  * GET /api/admin/cache/keys
  * Get all cache keys with optional pattern filtering
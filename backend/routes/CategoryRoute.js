@@ -14,6 +14,9 @@ import { cache, invalidateCache } from "../middleware/cache.js";
 
 const categoryRouter = express.Router();
 
+// Category writes also drop product responses that embed the category
+const categoryWriteTags = (req) => ['categories', req.body?.id && `category:${req.body.id}`];
+
 /**
  * @swagger
  * /api/category/list:
@@ -46,7 +49,7 @@ const categoryRouter = express.Router();
  *                 categories:
  *                   type: array
  */
-categoryRouter.get('/list', adminAuth, cache(300), listCategories);
+categoryRouter.get('/list', adminAuth, cache(300, ['categories']), listCategories);
 
 /**
  * @swagger
@@ -58,7 +61,7 @@ categoryRouter.get('/list', adminAuth, cache(300), listCategories);
  *       200:
  *         description: List of active categories
  */
-categoryRouter.get('/active', cache(300), listActiveCategories);
+categoryRouter.get('/active', cache(300, ['categories']), listActiveCategories);
 
 /**
  * @swagger
@@ -112,7 +115,7 @@ categoryRouter.post('/single', adminAuth, singleCategory);
  *       200:
  *         description: Category added successfully
  */
-categoryRouter.post('/add', adminAuth, invalidateCache('categories:*'), addCategory);
+categoryRouter.post('/add', adminAuth, invalidateCache(['categories']), addCategory);
 
 /**
  * @swagger
@@ -145,7 +148,7 @@ categoryRouter.post('/add', adminAuth, invalidateCache('categories:*'), addCateg
  *       200:
  *         description: Category updated successfully
  */
-categoryRouter.post('/update', adminAuth, invalidateCache('categories:*'), updateCategory);
+categoryRouter.post('/update', adminAuth, invalidateCache(categoryWriteTags), updateCategory);
 
 /**
  * @swagger
@@ -168,7 +171,7 @@ categoryRouter.post('/update', adminAuth, invalidateCache('categories:*'), updat
  *       200:
  *         description: Category removed successfully
  */
-categoryRouter.post('/remove', adminAuth, invalidateCache('categories:*'), removeCategory);
+categoryRouter.post('/remove', adminAuth, invalidateCache(categoryWriteTags), removeCategory);
 
 /**
  * @swagger
@@ -191,7 +194,7 @@ categoryRouter.post('/remove', adminAuth, invalidateCache('categories:*'), remov
  *       200:
  *         description: Category status toggled successfully
  */
-categoryRouter.post('/toggle-active', adminAuth, invalidateCache('categories:*'), toggleActive);
+categoryRouter.post('/toggle-active', adminAuth, invalidateCache(categoryWriteTags), toggleActive);
 
 /**
  * @swagger
@@ -221,6 +224,6 @@ categoryRouter.post('/toggle-active', adminAuth, invalidateCache('categories:*')
  *       200:
  *         description: Categories reordered successfully
  */
-categoryRouter.post('/reorder', adminAuth, invalidateCache('categories:*'), reorderCategories);
+categoryRouter.post('/reorder', adminAuth, invalidateCache(categoryWriteTags), reorderCategories);
 
 export default categoryRouter;
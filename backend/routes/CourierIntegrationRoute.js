@@ -6,9 +6,12 @@ import {
     updateConfiguration,
     testConnection,
     getStatistics,
+    getWebhookMetrics,
+    getCourierSlo,
     getCircuitBreakerStatus,
     resetCircuitBreaker,
     submitOrder,
+    submitOrders,
     cancelOrder,
     getOrderTracking,
     getDashboard,
@@ -49,11 +52,14 @@ router.post('/test-webhook/:platform', adminAuth, testIncomingWebhook);
 
 // Statistics and monitoring
 router.get('/stats', adminAuth, getStatistics);
+router.get('/webhook-metrics', adminAuth, getWebhookMetrics);
+router.get('/slo', adminAuth, getCourierSlo);
 router.get('/circuit-breakers', adminAuth, getCircuitBreakerStatus);
 router.post('/circuit-breakers/:platform/reset', adminAuth, resetCircuitBreaker);
 
 // Order operations
 router.post('/submit-order', adminAuth, submitOrder);
+router.post('/submit-orders', adminAuth, submitOrders);
 router.post('/cancel-order', adminAuth, cancelOrder);
 router.get('/tracking/:orderId', adminAuth, getOrderTracking);
 
@@ -1,25 +1,37 @@
 import express from 'express';
+import mongoose from 'mongoose';
 import authMiddleware from '../middleware/Auth.js';
 import notificationService from '../services/NotificationService.js';
 import printService from '../services/PrintService.js';
 import orderModel from '../models/OrderModel.js';
+import adminModel from '../models/AdminModel.js';
 import logger from '../utils/logger.js';
 
 const notificationRouter = express.Router();
 
 /**
  * SSE Endpoint - Connect to notification stream
- * GET /api/notifications/stream
+ * GET /api/notifications/stream?branch=<branchId>&lastEventId=<id>
  */
-notificationRouter.get('/stream', authMiddleware, (req, res) => {
+notificationRouter.get('/stream', authMiddleware, async (req, res) => {
   try {
     // authMiddleware sets req.body.userId
     const adminId = req.body.userId;
 
-    logger.info('Admin connecting to notification stream', { adminId });
+    // Role channel from the admin record; ?branch= narrows order events to one branch
+    const admin = mongoose.isValidObjectId(adminId)
+      ? await adminModel.findById(adminId).select('role').lean()
+      : null;
+    const branch = typeof req.query.branch === 'string' && req.query.branch.trim()
+      ? req.query.branch.trim().slice(0, 64)
+      : null;
+    // Sent by EventSource on its own reconnects; ?lastEventId= for clients that reconnect themselves
+    const lastEventId = req.get('Last-Event-ID') || req.query.lastEventId || null;
+
+    logger.info('Admin connecting to notification stream', { adminId, branch, lastEventId });
 
     // Add client to notification service
-    notificationService.addClient(adminId, res);
+    notificationService.addClient(adminId, res, { role: admin?.role || 'admin', branch, lastEventId });
 
     // Connection will be kept alive by NotificationService
     // Client disconnect will be handled automatically
@@ -62,7 +74,7 @@ notificationRouter.get('/stats', authMiddleware, (req, res) => {
  * Test notification - Send test notification to all connected admins
  * POST /api/notifications/test
  */
-notificationRouter.post('/test', authMiddleware, (req, res) => {
+notificationRouter.post('/test', authMiddleware, async (req, res) => {
   try {
     const testNotification = {
       type: 'TEST_NOTIFICATION',
@@ -72,7 +84,7 @@ notificationRouter.post('/test', authMiddleware, (req, res) => {
       timestamp: Date.now()
     };
 
-    const result = notificationService.broadcast(testNotification);
+    const result = await notificationService.broadcast(testNotification);
 
     logger.info('Test notification sent', result);
 
@@ -36,9 +36,9 @@ orderRouter.post("/delete", adminAuth, deleteOrder);
 orderRouter.get("/:id/branch-suggestion", adminAuth, getBranchSuggestion);
 
 // payment features with stock check and rate limiting
-orderRouter.post("/place", authUser, checkStockAvailability, RateLimiterService.createOrderLimiter(), placeOrder);
-orderRouter.post("/stripe", authUser, checkStockAvailability, RateLimiterService.createOrderLimiter(), placeOrderStripe);
-orderRouter.post("/razorpay", authUser, checkStockAvailability, RateLimiterService.createOrderLimiter(), placeOrderRazorpay);
+orderRouter.post("/place", authUser, RateLimiterService.createOrderLimiter(), checkStockAvailability, placeOrder);
+orderRouter.post("/stripe", authUser, RateLimiterService.createOrderLimiter(), checkStockAvailability, placeOrderStripe);
+orderRouter.post("/razorpay", authUser, RateLimiterService.createOrderLimiter(), checkStockAvailability, placeOrderRazorpay);
 
 // user feature
 orderRouter.post("/userorders", authUser, userOrders);
@@ -11,7 +11,9 @@ import {
     quickUpdateProduct,
     getProductBySKU,
     getProductByBarcode,
-    getPriceRange
+    getPriceRange,
+    getFacets,
+    searchProducts
 } from '../controllers/ProductController.js';
 import adminAuth from "../middleware/AdminAuth.js";
 import uploadImagesWithMulter from "../config/uploadImagesWithMulter.js";
@@ -20,6 +22,14 @@ import { cache, invalidateCache } from "../middleware/cache.js";
 
 const productRouter = express.Router();
 
+// Cache tags: lists carry 'products' (and 'categories', since categories are populated),
+// single-product responses carry product:<id> and the category:<id> they embed
+const productReadTags = (req, data) => [
+    data.product?._id && `product:${data.product._id}`,
+    data.product?.category?._id && `category:${data.product.category._id}`
+];
+const productWriteTags = (req) => ['products', req.body?.id && `product:${req.body.id}`];
+
 /**
  * @swagger
  * /api/product/list:
@@ -59,17 +69,17 @@ const imageUploadMiddleware = uploadImagesWithMulter.fields([
 ]);
 
 // Admin routes with rate limiting and cache invalidation
-productRouter.post('/add', adminAuth, RateLimiterService.createUploadLimiter(), imageUploadMiddleware, invalidateCache('products:*'), addProduct);
-productRouter.post('/update', adminAuth, RateLimiterService.createUploadLimiter(), imageUploadMiddleware, invalidateCache('products:*'), updateProduct);
-productRouter.post('/remove', adminAuth, invalidateCache('products:*'), removeProduct);
+productRouter.post('/add', adminAuth, RateLimiterService.createUploadLimiter(), imageUploadMiddleware, invalidateCache(['products']), addProduct);
+productRouter.post('/update', adminAuth, RateLimiterService.createUploadLimiter(), imageUploadMiddleware, invalidateCache(productWriteTags), updateProduct);
+productRouter.post('/remove', adminAuth, invalidateCache(productWriteTags), removeProduct);
 
 // Soft delete and restore routes
-productRouter.post('/soft-delete', adminAuth, invalidateCache('products:*'), softDeleteProduct);
-productRouter.post('/restore', adminAuth, invalidateCache('products:*'), restoreProduct);
-productRouter.post('/permanent-delete', adminAuth, invalidateCache('products:*'), permanentDeleteProduct);
+productRouter.post('/soft-delete', adminAuth, invalidateCache(productWriteTags), softDeleteProduct);
+productRouter.post('/restore', adminAuth, invalidateCache(productWriteTags), restoreProduct);
+productRouter.post('/permanent-delete', adminAuth, invalidateCache(productWriteTags), permanentDeleteProduct);
 
 // Quick update route for inline editing
-productRouter.post('/quick-update', adminAuth, invalidateCache('products:*'), quickUpdateProduct);
+productRouter.post('/quick-update', adminAuth, invalidateCache(productWriteTags), quickUpdateProduct);
 
 /**
  * @swagger
@@ -87,7 +97,8 @@ productRouter.post('/quick-update', adminAuth, invalidateCache('products:*'), qu
  *       200:
  *         description: List of products
  */
-productRouter.get('/list', cache(300), listProducts);
+// Served from CatalogSnapshot (kept current on writes, ETag/304), so not response-cached
+productRouter.get('/list', listProducts);
 
 /**
  * @swagger
@@ -108,7 +119,7 @@ productRouter.get('/list', cache(300), listProducts);
  *       200:
  *         description: Product details
  */
-productRouter.post('/single', cache(300), singleProduct);
+productRouter.post('/single', cache(300, productReadTags), singleProduct);
 
 /**
  * @swagger
@@ -127,7 +138,7 @@ productRouter.post('/single', cache(300), singleProduct);
  *       200:
  *         description: Product details
  */
-productRouter.get('/sku/:sku', cache(300), getProductBySKU);
+productRouter.get('/sku/:sku', cache(300, productReadTags), getProductBySKU);
 
 /**
  * @swagger
@@ -146,7 +157,7 @@ productRouter.get('/sku/:sku', cache(300), getProductBySKU);
  *       200:
  *         description: Product details
  */
-productRouter.get('/barcode/:barcode', cache(300), getProductByBarcode);
+productRouter.get('/barcode/:barcode', cache(300, productReadTags), getProductByBarcode);
 
 /**
  * @swagger
@@ -169,6 +180,49 @@ productRouter.get('/barcode/:barcode', cache(300), getProductByBarcode);
  *                 maxPrice:
  *                   type: number
  */
-productRouter.get('/price-range', cache(300), getPriceRange);
+productRouter.get('/price-range', getPriceRange);
+
+/**
+ * @swagger
+ * /api/product/facets:
+ *   get:
+ *     summary: Get filter facets with product counts and the price range
+ *     tags: [Products]
+ *     responses:
+ *       200:
+ *         description: Facets (categories, labels, sizes, personCounts, freshType, packaging) and price range
+ */
+productRouter.get('/facets', getFacets);
+
+/**
+ * @swagger
+ * /api/product/search:
+ *   get:
+ *     summary: Search products by name, SKU, category, keywords and description
+ *     description: Turkish-insensitive (ş/s, ı/i, ...), prefix and typo tolerant, ranked by relevance
+ *     tags: [Products]
+ *     parameters:
+ *       - in: query
+ *         name: q
+ *         required: true
+ *         schema:
+ *           type: string
+ *         description: Search text (e.g., "fistikli baklava")
+ *       - in: query
+ *         name: limit
+ *         schema:
+ *           type: integer
+ *           default: 20
+ *           maximum: 50
+ *       - in: query
+ *         name: offset
+ *         schema:
+ *           type: integer
+ *           default: 0
+ *     responses:
+ *       200:
+ *         description: Matching products (card fields), total matches and search time
+ */
+productRouter.get('/search', searchProducts);
 
 export default productRouter;
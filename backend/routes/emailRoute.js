@@ -3,6 +3,7 @@ import EmailSettings from '../models/EmailSettingsModel.js';
 import EmailLog from '../models/EmailLogModel.js';
 import EmailTemplate from '../models/EmailTemplateModel.js';
 import emailService from '../services/EmailService.js';
+import EmailRenderer from '../services/EmailRenderer.js';
 import logger from '../utils/logger.js';
 
 const emailRouter = express.Router();
@@ -440,4 +441,44 @@ emailRouter.get('/logs/stats/overview', async (req, res) => {
   }
 });
 
+// Get render time statistics per template (from email logs, plus this process's live histograms)
+emailRouter.get('/logs/stats/render', async (req, res) => {
+  try {
+    const { startDate, endDate } = req.query;
+    const match = { renderMs: { $exists: true } };
+
+    if (startDate || endDate) {
+      match.createdAt = {};
+      if (startDate) match.createdAt.$gte = new Date(startDate);
+      if (endDate) match.createdAt.$lte = new Date(endDate);
+    }
+
+    const byTemplate = await EmailLog.aggregate([
+      { $match: match },
+      {
+        $group: {
+          _id: '$templateName',
+          count: { $sum: 1 },
+          avgRenderMs: { $avg: '$renderMs' },
+          maxRenderMs: { $max: '$renderMs' },
+          shellRenders: { $sum: { $cond: [{ $eq: ['$renderMode', 'shell'] }, 1, 0] } },
+          designVersions: { $addToSet: '$designVersion' },
+        },
+      },
+      { $sort: { count: -1 } },
+    ]);
+
+    res.json({
+      success: true,
+      stats: {
+        byTemplate,
+        live: EmailRenderer.getStats(),
+      },
+    });
+  } catch (error) {
+    logger.error('Error fetching render stats', { error: error.message });
+    res.status(500).json({ success: false, message: error.message });
+  }
+});
+
 export default emailRouter;
@@ -0,0 +1,340 @@
+// AUTO-GENERATED by tools/muditakurye/schema_compiler.py - DO NOT EDIT.
+// Source: Docs/MuditaKurye Entegrasyon Dokümantasyonu (script.py, script_2.py, script_3.py)
+// Regenerate: python -m tools.muditakurye.schema_compiler
+
+/**
+ * Precompiled MuditaKurye contract validators
+ * Straight-line checks derived from the documented JSON examples; no schema
+ * interpretation happens per request. Payloads are never mutated, so HMAC
+ * signatures computed over the original body stay valid.
+ */
+
+export const MUDITAKURYE_STATUSES = Object.freeze(["NEW", "VALIDATED", "ROUTED", "ASSIGNED", "ACCEPTED", "PREPARED", "ON_DELIVERY", "DELIVERED", "CANCELED"]);
+
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$/i;
+// ISO 8601 as Joi isoDate() accepts it: time, seconds and offset are optional
+const DATE_TIME_PATTERN = /^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}(:?\d{2})?)?)?$/;
+const NUMERIC_PATTERN = /^\s*[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?\s*$/i;
+const VALID = Object.freeze({ valid: true, errors: Object.freeze([]) });
+
+// Numbers, or numeric strings as Joi.number() converts them
+const isNumeric = (value) => (typeof value === 'number' ? Number.isFinite(value) : typeof value === 'string' && NUMERIC_PATTERN.test(value));
+
+const MUDITA_KURYE_WEBHOOK_PAYLOAD_EVENT_VALUES = new Set(["order.status_changed", "order.canceled", "order.delivered", "order.assigned"]);
+const MUDITA_KURYE_WEBHOOK_PAYLOAD_STATUS_VALUES = new Set(["NEW", "VALIDATED", "ROUTED", "ASSIGNED", "ACCEPTED", "PREPARED", "ON_DELIVERY", "DELIVERED", "CANCELED", "FAILED"]);
+const MUDITA_KURYE_WEBHOOK_PAYLOAD_PROVIDER_VALUES = new Set(["THIRD_PARTY", "DIRECT"]);
+const MUDITA_KURYE_WEBHOOK_PAYLOAD_CANCELED_BY_VALUES = new Set(["RESTAURANT", "CUSTOMER", "COURIER", "SYSTEM"]);
+
+function checkMuditaKuryeOrderItemsItem(item, path, errors) {
+    if (item === null || typeof item !== 'object' || Array.isArray(item)) {
+        errors.push({ field: path.slice(0, -1), message: 'must be an object', type: 'object.base' });
+        return;
+    }
+    let value;
+    value = item["productCode"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: path + "productCode", message: "\"productCode\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: path + "productCode", message: "\"productCode\" must be a string", type: 'string.base' });
+        }
+    }
+    value = item["productName"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: path + "productName", message: "\"productName\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: path + "productName", message: "\"productName\" must be a string", type: 'string.base' });
+        }
+    }
+    value = item["quantity"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: path + "quantity", message: "\"quantity\" is required", type: 'any.required' });
+    } else {
+        if (!isNumeric(value)) {
+            errors.push({ field: path + "quantity", message: "\"quantity\" must be a number", type: 'number.base' });
+        }
+    }
+    value = item["unitPrice"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: path + "unitPrice", message: "\"unitPrice\" is required", type: 'any.required' });
+    } else {
+        if (!isNumeric(value)) {
+            errors.push({ field: path + "unitPrice", message: "\"unitPrice\" must be a number", type: 'number.base' });
+        }
+    }
+    value = item["totalAmount"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: path + "totalAmount", message: "\"totalAmount\" is required", type: 'any.required' });
+    } else {
+        if (!isNumeric(value)) {
+            errors.push({ field: path + "totalAmount", message: "\"totalAmount\" must be a number", type: 'number.base' });
+        }
+    }
+    value = item["productNote"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: path + "productNote", message: "\"productNote\" must be a string", type: 'string.base' });
+        }
+    }
+}
+
+/**
+ * Validate a MuditaKuryeOrder payload (generated from the integration docs).
+ * Required: orderId, restaurantId, customerName, deliveryAddress
+ * Optional: customerPhone, customerEmail, deliveryLatitude, deliveryLongitude, scheduledDeliveryTime, paymentMethod, paymentCaptured, subtotal, deliveryFee, serviceFee, discount, taxAmount, total, currency, notes, items
+ *
+ * @param {Object} payload - Parsed JSON body
+ * @returns {{ valid: boolean, errors: Array<{field: string, message: string, type: string}> }}
+ */
+export function validateMuditaKuryeOrder(payload) {
+    if (payload === null || typeof payload !== 'object' || Array.isArray(payload)) {
+        return { valid: false, errors: [{ field: '', message: 'Payload must be an object', type: 'object.base' }] };
+    }
+    const errors = [];
+    let value;
+    value = payload["orderId"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: "orderId", message: "\"orderId\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: "orderId", message: "\"orderId\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["restaurantId"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: "restaurantId", message: "\"restaurantId\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: "restaurantId", message: "\"restaurantId\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["customerName"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: "customerName", message: "\"customerName\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: "customerName", message: "\"customerName\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["customerPhone"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "customerPhone", message: "\"customerPhone\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["customerEmail"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "customerEmail", message: "\"customerEmail\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["deliveryAddress"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: "deliveryAddress", message: "\"deliveryAddress\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: "deliveryAddress", message: "\"deliveryAddress\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["deliveryLatitude"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "deliveryLatitude", message: "\"deliveryLatitude\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["deliveryLongitude"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "deliveryLongitude", message: "\"deliveryLongitude\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["scheduledDeliveryTime"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "scheduledDeliveryTime", message: "\"scheduledDeliveryTime\" must be a string", type: 'string.base' });
+        } else if (!DATE_TIME_PATTERN.test(value) || Number.isNaN(Date.parse(value))) {
+            errors.push({ field: "scheduledDeliveryTime", message: "\"scheduledDeliveryTime\" must be in ISO 8601 date format", type: 'date.format' });
+        }
+    }
+    value = payload["paymentMethod"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "paymentMethod", message: "\"paymentMethod\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["paymentCaptured"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'boolean') {
+            errors.push({ field: "paymentCaptured", message: "\"paymentCaptured\" must be a boolean", type: 'boolean.base' });
+        }
+    }
+    value = payload["subtotal"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "subtotal", message: "\"subtotal\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["deliveryFee"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "deliveryFee", message: "\"deliveryFee\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["serviceFee"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "serviceFee", message: "\"serviceFee\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["discount"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "discount", message: "\"discount\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["taxAmount"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "taxAmount", message: "\"taxAmount\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["total"];
+    if (value !== undefined && value !== null) {
+        if (!isNumeric(value)) {
+            errors.push({ field: "total", message: "\"total\" must be a number", type: 'number.base' });
+        }
+    }
+    value = payload["currency"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "currency", message: "\"currency\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["notes"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "notes", message: "\"notes\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["items"];
+    if (value !== undefined && value !== null) {
+        if (!Array.isArray(value)) {
+            errors.push({ field: "items", message: "\"items\" must be an array", type: 'array.base' });
+        } else {
+            for (let i = 0; i < value.length; i++) {
+                checkMuditaKuryeOrderItemsItem(value[i], "items" + '.' + i + '.', errors);
+            }
+        }
+    }
+    return errors.length === 0 ? VALID : { valid: false, errors };
+}
+
+/**
+ * Validate a MuditaKuryeWebhookPayload payload (generated from the integration docs).
+ * Required: status, timestamp
+ * Optional: event, orderId, muditaKuryeOrderId, orderNumber, previousStatus, provider, providerRestaurantId, reason, canceledBy, metadata
+ *
+ * @param {Object} payload - Parsed JSON body
+ * @returns {{ valid: boolean, errors: Array<{field: string, message: string, type: string}> }}
+ */
+export function validateMuditaKuryeWebhookPayload(payload) {
+    if (payload === null || typeof payload !== 'object' || Array.isArray(payload)) {
+        return { valid: false, errors: [{ field: '', message: 'Payload must be an object', type: 'object.base' }] };
+    }
+    const errors = [];
+    let value;
+    value = payload["event"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "event", message: "\"event\" must be a string", type: 'string.base' });
+        } else if (!MUDITA_KURYE_WEBHOOK_PAYLOAD_EVENT_VALUES.has(value)) {
+            errors.push({ field: "event", message: "\"event\" must be one of " + "order.status_changed, order.canceled, order.delivered, order.assigned", type: 'any.only' });
+        }
+    }
+    value = payload["orderId"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "orderId", message: "\"orderId\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["muditaKuryeOrderId"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "muditaKuryeOrderId", message: "\"muditaKuryeOrderId\" must be a string", type: 'string.base' });
+        } else if (!UUID_PATTERN.test(value)) {
+            errors.push({ field: "muditaKuryeOrderId", message: "\"muditaKuryeOrderId\" must be a valid GUID", type: 'string.guid' });
+        }
+    }
+    value = payload["orderNumber"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "orderNumber", message: "\"orderNumber\" must be a string", type: 'string.base' });
+        } else if (value.length > 100) {
+            errors.push({ field: "orderNumber", message: "\"orderNumber\" length must be less than or equal to 100 characters long", type: 'string.max' });
+        }
+    }
+    value = payload["status"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: "status", message: "\"status\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: "status", message: "\"status\" must be a string", type: 'string.base' });
+        } else if (!MUDITA_KURYE_WEBHOOK_PAYLOAD_STATUS_VALUES.has(value)) {
+            errors.push({ field: "status", message: "\"status\" must be one of " + "NEW, VALIDATED, ROUTED, ASSIGNED, ACCEPTED, PREPARED, ON_DELIVERY, DELIVERED, CANCELED, FAILED", type: 'any.only' });
+        }
+    }
+    value = payload["previousStatus"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "previousStatus", message: "\"previousStatus\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["timestamp"];
+    if (value === undefined || value === null || value === '') {
+        errors.push({ field: "timestamp", message: "\"timestamp\" is required", type: 'any.required' });
+    } else {
+        if (typeof value !== 'string') {
+            errors.push({ field: "timestamp", message: "\"timestamp\" must be a string", type: 'string.base' });
+        } else if (!DATE_TIME_PATTERN.test(value) || Number.isNaN(Date.parse(value))) {
+            errors.push({ field: "timestamp", message: "\"timestamp\" must be in ISO 8601 date format", type: 'date.format' });
+        }
+    }
+    value = payload["provider"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "provider", message: "\"provider\" must be a string", type: 'string.base' });
+        } else if (!MUDITA_KURYE_WEBHOOK_PAYLOAD_PROVIDER_VALUES.has(value)) {
+            errors.push({ field: "provider", message: "\"provider\" must be one of " + "THIRD_PARTY, DIRECT", type: 'any.only' });
+        }
+    }
+    value = payload["providerRestaurantId"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "providerRestaurantId", message: "\"providerRestaurantId\" must be a string", type: 'string.base' });
+        }
+    }
+    value = payload["reason"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "reason", message: "\"reason\" must be a string", type: 'string.base' });
+        } else if (value.length > 500) {
+            errors.push({ field: "reason", message: "\"reason\" length must be less than or equal to 500 characters long", type: 'string.max' });
+        }
+    }
+    value = payload["canceledBy"];
+    if (value !== undefined && value !== null) {
+        if (typeof value !== 'string') {
+            errors.push({ field: "canceledBy", message: "\"canceledBy\" must be a string", type: 'string.base' });
+        } else if (!MUDITA_KURYE_WEBHOOK_PAYLOAD_CANCELED_BY_VALUES.has(value)) {
+            errors.push({ field: "canceledBy", message: "\"canceledBy\" must be one of " + "RESTAURANT, CUSTOMER, COURIER, SYSTEM", type: 'any.only' });
+        }
+    }
+    value = payload["metadata"];
+    if (value !== undefined && value !== null) {
+        if (value === null || typeof value !== 'object' || Array.isArray(value)) {
+            errors.push({ field: "metadata", message: "\"metadata\" must be an object", type: 'object.base' });
+        }
+    }
+    return errors.length === 0 ? VALID : { valid: false, errors };
+}
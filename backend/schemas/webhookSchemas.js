@@ -1,4 +1,5 @@
 import Joi from 'joi';
+import { validateMuditaKuryeWebhookPayload } from './generated/muditaKuryeContract.js';
 
 /**
  * Webhook Validation Schemas
@@ -94,6 +95,8 @@ export const genericWebhookPayloadSchema = Joi.object({
 
 /**
  * MuditaKurye specific webhook payload schema
+ * Kept for reference/admin tooling; the request path uses the generated
+ * validator in ./generated/muditaKuryeContract.js (see validateMuditaKuryeWebhook)
  */
 export const muditaKuryeWebhookSchema = Joi.object({
     // Event (may not be present in MuditaKurye format)
@@ -270,8 +273,24 @@ export const validateWebhookPayload = createValidationMiddleware(genericWebhookP
 
 /**
  * Validate MuditaKurye webhook
+ * Uses the precompiled contract validator generated from the MuditaKurye docs
+ * (tools/muditakurye/schema_compiler.py). The body is not stripped or converted,
+ * so signatures computed over the original payload stay valid.
  */
-export const validateMuditaKuryeWebhook = createValidationMiddleware(muditaKuryeWebhookSchema, 'body');
+export const validateMuditaKuryeWebhook = (req, res, next) => {
+    const { valid, errors } = validateMuditaKuryeWebhookPayload(req.body);
+
+    if (!valid) {
+        return res.status(400).json({
+            success: false,
+            error: 'Validation failed',
+            code: 'VALIDATION_ERROR',
+            details: errors
+        });
+    }
+
+    next();
+};
 
 /**
  * Validate webhook config
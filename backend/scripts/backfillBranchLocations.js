@@ -0,0 +1,35 @@
+import "dotenv/config";
+import connectDB from "../config/mongodb.js";
+import branchModel from "../models/BranchModel.js";
+
+// Fill the GeoJSON location used by BRANCH_ASSIGNMENT_STRATEGY=near from address.coordinates
+const backfillBranchLocations = async () => {
+    try {
+        await connectDB();
+        await branchModel.syncIndexes();
+
+        const branches = await branchModel.find({}).select('address.coordinates location').lean();
+        const operations = branches.map(branch => {
+            const { latitude, longitude } = branch.address?.coordinates || {};
+            const located = typeof latitude === 'number' && typeof longitude === 'number';
+            return {
+                updateOne: {
+                    filter: { _id: branch._id },
+                    update: located
+                        ? { $set: { location: { type: 'Point', coordinates: [longitude, latitude] } } }
+                        : { $unset: { location: '' } }
+                }
+            };
+        });
+
+        const result = operations.length > 0 ? await branchModel.bulkWrite(operations) : { modifiedCount: 0 };
+        const located = operations.filter(operation => operation.updateOne.update.$set).length;
+        console.log(`Checked ${branches.length} branches, ${located} with coordinates, updated ${result.modifiedCount}.`);
+        process.exit(0);
+    } catch (error) {
+        console.error("Failed to backfill branch locations:", error);
+        process.exit(1);
+    }
+};
+
+backfillBranchLocations();
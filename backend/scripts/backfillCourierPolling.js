@@ -0,0 +1,63 @@
+import "dotenv/config";
+import connectDB from "../config/mongodb.js";
+import orderModel from "../models/OrderModel.js";
+import { nextPollAt, POLL_POLICY } from "../services/CourierStatusReconciler.js";
+
+// Arms the courier status polling fallback for in-flight orders that were synced without
+// courierIntegration.nextPollAt (before polling existed, or submitted through a retry)
+const BATCH_SIZE = 500;
+
+const backfillCourierPolling = async () => {
+    try {
+        await connectDB();
+
+        const cursor = orderModel.find({
+            'courierIntegration.syncStatus': 'synced',
+            'courierIntegration.externalOrderId': { $exists: true, $ne: null },
+            'courierIntegration.nextPollAt': { $exists: false },
+            $or: [
+                { 'courierIntegration.lastStatus': { $in: Object.keys(POLL_POLICY) } },
+                { 'courierIntegration.lastStatus': { $exists: false } },
+                { 'courierIntegration.lastStatus': null }
+            ]
+        })
+            .select('_id courierIntegration.lastStatus')
+            .lean()
+            .cursor();
+
+        const now = Date.now();
+        let operations = [];
+        let armed = 0;
+
+        for await (const order of cursor) {
+            operations.push({
+                updateOne: {
+                    filter: { _id: order._id, 'courierIntegration.nextPollAt': { $exists: false } },
+                    update: {
+                        $set: {
+                            // Due within the stage's stuck window from now
+                            'courierIntegration.nextPollAt': nextPollAt(order.courierIntegration?.lastStatus || 'NEW', now),
+                            'courierIntegration.pollMisses': 0
+                        }
+                    }
+                }
+            });
+
+            if (operations.length >= BATCH_SIZE) {
+                armed += (await orderModel.bulkWrite(operations, { ordered: false })).modifiedCount;
+                operations = [];
+            }
+        }
+        if (operations.length > 0) {
+            armed += (await orderModel.bulkWrite(operations, { ordered: false })).modifiedCount;
+        }
+
+        console.log(`Armed courier status polling for ${armed} orders.`);
+        process.exit(0);
+    } catch (error) {
+        console.error("Failed to backfill courier polling:", error);
+        process.exit(1);
+    }
+};
+
+backfillCourierPolling();
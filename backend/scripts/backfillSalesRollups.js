@@ -0,0 +1,33 @@
+import "dotenv/config";
+import connectDB from "../config/mongodb.js";
+import orderModel from "../models/OrderModel.js";
+import SalesRollupService from "../services/SalesRollupService.js";
+
+// Optional start date (YYYY-MM-DD); defaults to the first order
+const FROM = process.argv[2] ? new Date(process.argv[2]).getTime() : null;
+
+const backfillSalesRollups = async () => {
+    try {
+        await connectDB();
+
+        const firstOrder = FROM === null
+            ? await orderModel.findOne({}).select('date').sort({ date: 1 }).lean()
+            : { date: FROM };
+        if (!firstOrder) {
+            console.log("No orders found, nothing to backfill.");
+            process.exit(0);
+        }
+
+        const result = await SalesRollupService.rebuild({ from: firstOrder.date });
+        if (FROM === null) {
+            await SalesRollupService.markBackfilled(result);
+        }
+        console.log(`Rebuilt ${result.buckets} rollup buckets from ${result.orders} orders in ${result.durationMs}ms.`);
+        process.exit(0);
+    } catch (error) {
+        console.error("Failed to backfill sales rollups:", error);
+        process.exit(1);
+    }
+};
+
+backfillSalesRollups();
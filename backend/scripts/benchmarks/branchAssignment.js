@@ -0,0 +1,93 @@
+import { BranchSpatialIndex, pickNearestByCoordinates } from '../../services/BranchSpatialIndex.js';
+
+/**
+ * Branch Assignment Benchmark
+ * Assigns simulated orders around İzmir to branches with:
+ *   - linear:  previous findBestBranch logic (zone filter + haversine over every branch),
+ *              without the branchModel.find() it also ran per order
+ *   - index:   BranchSpatialIndex.findBest (zone map + k-d tree)
+ * Both must pick the same branch for every order.
+ *
+ * Usage: node scripts/benchmarks/branchAssignment.js [orders] [zones]
+ */
+
+const ORDERS = parseInt(process.argv[2]) || 10000;
+const ZONES = parseInt(process.argv[3]) || 40;
+const BRANCH_COUNTS = [10, 100, 1000, 10000];
+
+// Deterministic pseudo-random numbers so runs are comparable
+let seed = 42;
+const random = () => {
+    seed = (seed * 1103515245 + 12345) % 2147483648;
+    return seed / 2147483648;
+};
+
+const randomPoint = () => ({
+    latitude: 38.2 + random() * 0.6,
+    longitude: 26.7 + random() * 0.7
+});
+
+const createBranches = (count) => Array.from({ length: count }, (_, i) => ({
+    _id: `branch_${i}`,
+    code: `BR_${i}`,
+    // A few branches have no coordinates, like branches created without a map pin
+    address: { coordinates: i % 25 === 24 ? { latitude: null, longitude: null } : randomPoint() },
+    assignedZones: random() < 0.5 ? [`zone_${Math.floor(random() * ZONES)}`] : []
+}));
+
+const createOrders = () => Array.from({ length: ORDERS }, () => ({
+    delivery: random() < 0.3 ? { zoneId: `zone_${Math.floor(random() * ZONES * 1.5)}` } : {},
+    address: { coordinates: randomPoint() }
+}));
+
+// Previous AssignmentService.findBestBranch, minus the database query
+const linearFindBest = (branches, { delivery, address }) => {
+    if (!branches.length) return null;
+    if (delivery?.zoneId) {
+        const zoneBranches = branches.filter(b => Array.isArray(b.assignedZones) && b.assignedZones.includes(delivery.zoneId));
+        if (zoneBranches.length === 1) return zoneBranches[0];
+        if (zoneBranches.length > 1) {
+            return pickNearestByCoordinates(zoneBranches, address) || zoneBranches[0];
+        }
+    }
+    return pickNearestByCoordinates(branches, address) || branches[0];
+};
+
+const time = (fn) => {
+    const startedAt = process.hrtime.bigint();
+    const result = fn();
+    return { result, ms: Number(process.hrtime.bigint() - startedAt) / 1e6 };
+};
+
+console.log('='.repeat(72));
+console.log(`🗺️  Branch assignment benchmark: ${ORDERS} orders, ${ZONES} zones`);
+console.log('='.repeat(72));
+console.log(`${'branches'.padEnd(10)}${'build ms'.padStart(10)}${'linear ms'.padStart(12)}${'index ms'.padStart(12)}${'µs/order'.padStart(11)}${'visited'.padStart(9)}${'speedup'.padStart(9)}`);
+
+const orders = createOrders();
+let mismatches = 0;
+
+for (const count of BRANCH_COUNTS) {
+    const branches = createBranches(count);
+
+    const linear = time(() => orders.map(order => linearFindBest(branches, order)));
+    const build = time(() => new BranchSpatialIndex(branches));
+    const index = build.result;
+    const indexed = time(() => orders.map(order => index.findBest(order)));
+
+    indexed.result.forEach((branch, i) => {
+        if (branch !== linear.result[i]) mismatches++;
+    });
+
+    const visited = orders.reduce((sum, order) => sum + (index.nearest(order.address.coordinates)?.visited || 0), 0) / orders.length;
+
+    console.log(
+        `${String(count).padEnd(10)}${build.ms.toFixed(1).padStart(10)}${linear.ms.toFixed(1).padStart(12)}` +
+        `${indexed.ms.toFixed(1).padStart(12)}${(indexed.ms * 1000 / ORDERS).toFixed(2).padStart(11)}` +
+        `${visited.toFixed(1).padStart(9)}${(linear.ms / indexed.ms).toFixed(1).padStart(8)}x`
+    );
+}
+
+console.log(mismatches === 0
+    ? '\n✅ Index and linear scan assigned every order to the same branch'
+    : `\n❌ ${mismatches} orders assigned to a different branch`);
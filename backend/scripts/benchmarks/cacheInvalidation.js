@@ -0,0 +1,111 @@
+import redis from 'redis';
+import { connectRedis, deletePattern, invalidateTags, setInCacheWithTags, getRedisClient } from '../../config/redis.js';
+
+/**
+ * Cache Invalidation Benchmark
+ * Fills Redis with cached responses and measures how other clients' latency suffers while a
+ * product's cache entries are invalidated:
+ *   - keys:    KEYS pattern + DEL (previous deletePattern)
+ *   - scan:    SCAN + UNLINK in batches (current deletePattern, legacy patterns)
+ *   - tags:    tag set members + UNLINK (invalidateTags)
+ *
+ * A separate connection sends PING every millisecond during each invalidation; its latency is
+ * what every other request served by Redis experiences at that moment.
+ *
+ * Requires a disposable Redis (the database is flushed):
+ *   REDIS_URL=redis://localhost:6379 node scripts/benchmarks/cacheInvalidation.js [keys] [products]
+ */
+
+const KEYS = parseInt(process.argv[2]) || 100000;
+const PRODUCTS = parseInt(process.argv[3]) || 1000;
+const REDIS_URL = process.env.REDIS_URL || 'redis://localhost:6379';
+
+const percentile = (sorted, pct) => sorted.length > 0
+    ? sorted[Math.min(sorted.length - 1, Math.floor(pct / 100 * sorted.length))]
+    : 0;
+
+// Cached responses: one product detail per key, spread over PRODUCTS products
+const seed = async (client) => {
+    await client.flushDb();
+    const batchSize = 1000;
+
+    for (let i = 0; i < KEYS; i += batchSize) {
+        const writes = [];
+        for (let j = i; j < Math.min(i + batchSize, KEYS); j++) {
+            const productId = j % PRODUCTS;
+            writes.push(setInCacheWithTags(
+                `products:/api/product/sku/SKU-${j}:{}`,
+                { success: true, product: { _id: productId, name: `Baklava ${j}` } },
+                3600,
+                [`product:${productId}`]
+            ));
+        }
+        await Promise.all(writes);
+    }
+};
+
+const measure = async (name, probe, invalidate) => {
+    const samples = [];
+    let probing = true;
+
+    const probeLoop = (async () => {
+        while (probing) {
+            const startedAt = process.hrtime.bigint();
+            await probe.ping();
+            samples.push(Number(process.hrtime.bigint() - startedAt) / 1e6);
+            await new Promise(resolve => setTimeout(resolve, 1));
+        }
+    })();
+
+    const startedAt = Date.now();
+    await invalidate();
+    const duration = Date.now() - startedAt;
+
+    probing = false;
+    await probeLoop;
+    samples.sort((a, b) => a - b);
+
+    console.log(
+        `${name.padEnd(8)}${String(duration).padStart(12)}` +
+        `${percentile(samples, 50).toFixed(2).padStart(10)}${percentile(samples, 99).toFixed(2).padStart(10)}` +
+        `${(samples[samples.length - 1] || 0).toFixed(2).padStart(10)}${String(samples.length).padStart(9)}`
+    );
+};
+
+const main = async () => {
+    process.env.REDIS_URL = REDIS_URL;
+    await connectRedis();
+    const client = getRedisClient();
+    if (!client) {
+        console.error('Redis is not available, set REDIS_URL');
+        process.exit(1);
+    }
+
+    const probe = redis.createClient({ url: REDIS_URL });
+    await probe.connect();
+
+    console.log('='.repeat(59));
+    console.log(`🧹 Cache invalidation benchmark: ${KEYS} keys, ${PRODUCTS} products → ${REDIS_URL}`);
+    console.log('='.repeat(59));
+    console.log('Invalidating one product; PING latency of another client (ms)');
+    console.log(`${'mode'.padEnd(8)}${'duration ms'.padStart(12)}${'p50'.padStart(10)}${'p99'.padStart(10)}${'max'.padStart(10)}${'pings'.padStart(9)}`);
+
+    const scenarios = [
+        ['keys', async () => {
+            const keys = await client.keys('products:*SKU-1[0-9]:*');
+            if (keys.length > 0) await client.del(keys);
+        }],
+        ['scan', () => deletePattern('products:*SKU-1[0-9]:*')],
+        ['tags', () => invalidateTags(['product:7'])]
+    ];
+
+    for (const [name, invalidate] of scenarios) {
+        await seed(client);
+        await measure(name, probe, invalidate);
+    }
+
+    await probe.quit();
+    await client.quit();
+};
+
+main();
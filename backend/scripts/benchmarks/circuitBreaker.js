@@ -0,0 +1,165 @@
+import { CircuitBreaker } from '../../services/CircuitBreakerService.js';
+import { CourierSubmissionPipeline } from '../../services/CourierSubmissionPipeline.js';
+import logger from '../../utils/logger.js';
+
+/**
+ * Circuit Breaker Benchmark
+ * Drives order submissions at a steady rate through CourierSubmissionPipeline and a circuit
+ * breaker, as CourierIntegrationService does, while the fake MuditaKurye API cycles through
+ * fault modes (healthy → slow → errors → outage → recovered), and compares:
+ *   - counted:  trips on consecutive failures only (previous behaviour, no slow-call tracking)
+ *   - adaptive: sliding-window failure rate, slow-call rate, latency percentile, hanging calls
+ * For each phase: calls sent to the provider, calls rejected by the open circuit, provider
+ * failures, p95 time an order waited for its outcome (submission slots held by a slow provider
+ * make everyone queue) and the state transitions.
+ *
+ * Start the fake server first (from the repository root):
+ *   python -m tools.muditakurye.fake_server --status-webhook ""
+ *
+ * Usage: node scripts/benchmarks/circuitBreaker.js [phaseSeconds] [ratePerSecond] [concurrency]
+ */
+
+const PHASE_SECONDS = parseInt(process.argv[2]) || 20;
+const RATE = parseInt(process.argv[3]) || 20;
+const CONCURRENCY = parseInt(process.argv[4]) || 8;
+const BASE_URL = process.env.MUDITAKURYE_BASE_URL || 'http://127.0.0.1:4010';
+const API_KEY = process.env.MUDITA_API_KEY || 'yk_24c584705e97492483bcb4264338aa14';
+
+const HEALTHY_LATENCY = { dist: 'lognormal', medianMs: 80, sigma: 0.5, capMs: 2000 };
+const PHASES = [
+    { name: 'healthy', order: { latency: HEALTHY_LATENCY, errorRate: 0 } },
+    { name: 'slow', order: { latency: { dist: 'lognormal', medianMs: 4000, sigma: 0.3, capMs: 15000 }, errorRate: 0 } },
+    { name: 'errors', order: { latency: HEALTHY_LATENCY, errorRate: 0.6, errorStatus: 502 } },
+    { name: 'outage', order: { latency: { dist: 'fixed', ms: 50 }, errorRate: 1, errorStatus: 503 } },
+    { name: 'recovered', order: { latency: HEALTHY_LATENCY, errorRate: 0 } }
+];
+
+// Open times scaled down so every phase sees the circuit probe and recover
+const BREAKERS = {
+    counted: {
+        failureThreshold: 5,
+        minimumCalls: Number.POSITIVE_INFINITY,
+        slowCallDurationMs: Number.POSITIVE_INFINITY,
+        timeout: 3000,
+        maxTimeout: 12000
+    },
+    adaptive: { timeout: 3000, maxTimeout: 12000 }
+};
+
+const setFaults = async (faults) => {
+    const response = await fetch(`${BASE_URL}/__fake/faults`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ order: { burst: null, rateLimit: null, ...faults } })
+    });
+    if (!response.ok) throw new Error(`Fake server refused faults: HTTP ${response.status}`);
+};
+
+// Same result shape as MuditaKuryeService.createOrder: API errors are returned, not thrown
+const submitOrder = async (orderId) => {
+    const response = await fetch(`${BASE_URL}/webhook/third-party/order`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'X-API-Key': API_KEY, 'X-Idempotency-Key': orderId },
+        body: JSON.stringify({
+            orderId,
+            restaurantId: 'rest_benchmark',
+            customerName: 'Benchmark Müşteri',
+            deliveryAddress: 'Kadıköy, İstanbul'
+        }),
+        signal: AbortSignal.timeout(30000)
+    });
+    await response.arrayBuffer();
+
+    if (response.ok) return { success: true };
+    return {
+        success: false,
+        retryable: response.status >= 500 || response.status === 429,
+        error: { message: `HTTP ${response.status}`, statusCode: response.status }
+    };
+};
+
+const percentile = (sorted, pct) => sorted.length > 0
+    ? sorted[Math.min(sorted.length - 1, Math.floor(pct / 100 * sorted.length))]
+    : 0;
+
+const runScenario = async (name, config) => {
+    const breaker = new CircuitBreaker(`bench-${name}`, config);
+    const pipeline = new CourierSubmissionPipeline({ concurrency: CONCURRENCY, maxQueue: PHASES.length * PHASE_SECONDS * RATE });
+    const runId = `${name}-${Date.now()}`;
+    const inFlight = [];
+    const phaseStats = [];
+    let sequence = 0;
+
+    console.log(`\n⚡ ${name}`);
+
+    for (const phase of PHASES) {
+        await setFaults(phase.order);
+
+        const stats = { name: phase.name, sent: 0, rejected: 0, failed: 0, waits: [], transitions: [] };
+        phaseStats.push(stats);
+        const start = Date.now();
+        let lastState = breaker.getState();
+
+        const sampler = setInterval(() => {
+            if (breaker.getState() !== lastState) {
+                lastState = breaker.getState();
+                const reason = lastState === 'OPEN' ? ` (${breaker.metrics.lastTripReason})` : '';
+                stats.transitions.push(`${((Date.now() - start) / 1000).toFixed(1)}s ${lastState}${reason}`);
+            }
+        }, 50);
+
+        for (let i = 0; i < PHASE_SECONDS * RATE; i++) {
+            // Open loop: orders arrive at RATE per second whether or not earlier ones finished
+            const wait = start + (i * 1000) / RATE - Date.now();
+            if (wait > 0) await new Promise(resolve => setTimeout(resolve, wait));
+
+            const orderId = `bench-${runId}-${sequence++}`;
+            const arrivedAt = Date.now();
+            inFlight.push(
+                pipeline.run('muditakurye', () => breaker.execute(() => {
+                    stats.sent++;
+                    return submitOrder(orderId);
+                }))
+                    .then(result => { if (!result.success) stats.failed++; })
+                    .catch(error => { if (error.code === 'CIRCUIT_OPEN') stats.rejected++; else stats.failed++; })
+                    .finally(() => stats.waits.push(Date.now() - arrivedAt))
+            );
+        }
+
+        clearInterval(sampler);
+    }
+
+    await Promise.all(inFlight);
+
+    console.log(`${'phase'.padEnd(11)}${'sent'.padStart(7)}${'rejected'.padStart(10)}${'failed'.padStart(8)}${'p95 wait ms'.padStart(13)}  transitions`);
+    for (const stats of phaseStats) {
+        stats.waits.sort((a, b) => a - b);
+        console.log(
+            `${stats.name.padEnd(11)}${String(stats.sent).padStart(7)}${String(stats.rejected).padStart(10)}` +
+            `${String(stats.failed).padStart(8)}${String(percentile(stats.waits, 95)).padStart(13)}` +
+            `  ${stats.transitions.join(' → ') || '-'}`
+        );
+    }
+
+    const { metrics } = breaker.getStatus();
+    console.log(`total: ${metrics.totalRequests} requests, ${metrics.rejected} rejected, ${metrics.slowCalls} slow calls, final state ${breaker.getState()}`);
+};
+
+const main = async () => {
+    logger.silent = true;
+
+    console.log('='.repeat(72));
+    console.log(`🔌 Circuit breaker benchmark: ${PHASE_SECONDS}s per phase @ ${RATE}/s, ${CONCURRENCY} slots → ${BASE_URL}`);
+    console.log('='.repeat(72));
+
+    for (const [name, config] of Object.entries(BREAKERS)) {
+        await runScenario(name, config);
+    }
+
+    await setFaults({ latency: HEALTHY_LATENCY, errorRate: 0 });
+};
+
+main().catch(error => {
+    console.error('Benchmark failed:', error.message);
+    process.exit(1);
+});
@@ -0,0 +1,101 @@
+import axios from 'axios';
+import http from 'http';
+import { CourierSubmissionPipeline } from '../../services/CourierSubmissionPipeline.js';
+
+/**
+ * Courier Order Submission Benchmark
+ * Replays a lunch-peak burst of order submissions against the fake MuditaKurye API and compares:
+ *   - fresh:  one connection per request, no concurrency cap (previous behaviour)
+ *   - pooled: keep-alive agent + CourierSubmissionPipeline (per-provider concurrency cap)
+ *
+ * Start the fake server first (from the repository root):
+ *   python -m tools.muditakurye.fake_server --status-webhook "" --faults tools/muditakurye/faults.example.json
+ *
+ * Usage: node scripts/benchmarks/courierSubmit.js [orders] [ratePerSecond] [concurrency]
+ */
+
+const ORDERS = parseInt(process.argv[2]) || 2000;
+const RATE = parseInt(process.argv[3]) || 100;
+const CONCURRENCY = parseInt(process.argv[4]) || 8;
+const BASE_URL = process.env.MUDITAKURYE_BASE_URL || 'http://127.0.0.1:4010';
+const API_KEY = process.env.MUDITA_API_KEY || 'yk_24c584705e97492483bcb4264338aa14';
+
+const buildOrder = (runId, index) => ({
+    orderId: `bench-${runId}-${index}`,
+    restaurantId: 'rest_benchmark',
+    customerName: 'Benchmark Müşteri',
+    customerPhone: '+905551112233',
+    deliveryAddress: 'Kadıköy, İstanbul',
+    paymentMethod: 'CASH',
+    paymentCaptured: false,
+    subtotal: 250,
+    deliveryFee: 20,
+    total: 270,
+    currency: 'TRY',
+    items: [{ productCode: 'BAKLAVA-1', productName: 'Fıstıklı Baklava', quantity: 1, unitPrice: 250, totalAmount: 250 }]
+});
+
+const percentile = (sorted, pct) => sorted.length > 0
+    ? sorted[Math.min(sorted.length - 1, Math.floor(pct / 100 * sorted.length))]
+    : 0;
+
+const runScenario = async (name, client, submit) => {
+    const runId = `${name}-${Date.now()}`;
+    const latencies = [];
+    let errors = 0;
+
+    const start = Date.now();
+    const inFlight = [];
+
+    for (let i = 0; i < ORDERS; i++) {
+        // Open loop: orders arrive at RATE per second whether or not earlier ones finished
+        const due = start + (i * 1000) / RATE;
+        const wait = due - Date.now();
+        if (wait > 0) await new Promise(resolve => setTimeout(resolve, wait));
+
+        const order = buildOrder(runId, i);
+        inFlight.push(
+            submit(() => client.post('/webhook/third-party/order', order, {
+                headers: { 'X-API-Key': API_KEY, 'X-Idempotency-Key': order.orderId }
+            }))
+                .then(() => latencies.push(Math.round(Date.now() - due)))
+                .catch(() => { errors++; })
+        );
+    }
+
+    await Promise.all(inFlight);
+    const elapsed = (Date.now() - start) / 1000;
+    latencies.sort((a, b) => a - b);
+
+    console.log(
+        `${name.padEnd(10)}${(latencies.length / elapsed).toFixed(1).padStart(12)}` +
+        `${String(percentile(latencies, 50)).padStart(9)}${String(percentile(latencies, 95)).padStart(9)}` +
+        `${String(percentile(latencies, 99)).padStart(9)}${String(latencies[latencies.length - 1] || 0).padStart(9)}` +
+        `${String(errors).padStart(8)}`
+    );
+};
+
+const main = async () => {
+    console.log('='.repeat(64));
+    console.log(`🚚 Courier submission benchmark: ${ORDERS} orders @ ${RATE}/s → ${BASE_URL}`);
+    console.log('='.repeat(64));
+    console.log(`${'mode'.padEnd(10)}${'orders/s'.padStart(12)}${'p50 ms'.padStart(9)}${'p95 ms'.padStart(9)}${'p99 ms'.padStart(9)}${'max ms'.padStart(9)}${'errors'.padStart(8)}`);
+
+    const fresh = axios.create({
+        baseURL: BASE_URL,
+        timeout: 30000,
+        httpAgent: new http.Agent({ keepAlive: false })
+    });
+    await runScenario('fresh', fresh, (request) => request());
+
+    const pooledAgent = new http.Agent({ keepAlive: true, maxSockets: CONCURRENCY, maxFreeSockets: 4 });
+    const pooled = axios.create({ baseURL: BASE_URL, timeout: 30000, httpAgent: pooledAgent });
+    const pipeline = new CourierSubmissionPipeline({ concurrency: CONCURRENCY, maxQueue: ORDERS });
+    await runScenario('pooled', pooled, (request) => pipeline.run('muditakurye', request));
+    pooledAgent.destroy();
+
+    console.log('\n📊 Pipeline stats');
+    console.log(JSON.stringify(pipeline.getStats('muditakurye'), null, 2));
+};
+
+main();
@@ -0,0 +1,130 @@
+import { ProductSearchIndex, normalize } from '../../services/ProductSearchIndex.js';
+
+/**
+ * Product Search Benchmark
+ * Builds a synthetic catalog of Turkish product names and runs a query mix (whole words,
+ * search-as-you-type prefixes, typos, multi-word) against:
+ *   - scan:  substring match over every product's pre-normalized text (what a regex
+ *            search does, minus the database)
+ *   - index: ProductSearchIndex.search (inverted index, ranked)
+ * Reports index build time, then p50 / p99 / max per query.
+ *
+ * Usage: node scripts/benchmarks/productSearch.js [products] [queries]
+ */
+
+const PRODUCTS = parseInt(process.argv[2]) || 5000;
+const QUERIES = parseInt(process.argv[3]) || 5000;
+
+// Deterministic pseudo-random numbers so runs are comparable
+let seed = 42;
+const random = () => {
+    seed = (seed * 1103515245 + 12345) % 2147483648;
+    return seed / 2147483648;
+};
+const pickOne = (values) => values[Math.floor(random() * values.length)];
+
+const KINDS = ['Baklava', 'Şöbiyet', 'Tulumba', 'Kadayıf', 'Künefe', 'Sarığı Burma', 'Dürüm', 'Lokum', 'Revani', 'Güllaç'];
+const FILLINGS = ['Fıstıklı', 'Cevizli', 'Kaymaklı', 'Çikolatalı', 'Sade', 'Fındıklı', 'Bademli', 'Hindistan Cevizli'];
+const SIZES = ['250 gr', '500 gr', '1 kg', '2 kg', 'Aile Boyu', 'Mini'];
+const CATEGORIES = ['Şerbetli Tatlılar', 'Sütlü Tatlılar', 'Kuru Tatlılar', 'Özel Kutular', 'Lokumlar'];
+const WORDS = ['günlük', 'taze', 'üretim', 'tereyağı', 'ile', 'hazırlanır', 'ince', 'yufka', 'şerbeti', 'hafif', 'bayram', 'hediye'];
+
+const createCatalog = () => {
+    const categories = new Map(CATEGORIES.map((name, i) => [`c${i}`, { _id: `c${i}`, name }]));
+    const products = new Map();
+    for (let i = 0; i < PRODUCTS; i++) {
+        const product = {
+            _id: `p${i}`,
+            name: `${pickOne(FILLINGS)} ${pickOne(KINDS)} ${pickOne(SIZES)}`,
+            sku: `TUL-${String(i).padStart(5, '0')}`,
+            category: `c${Math.floor(random() * CATEGORIES.length)}`,
+            keywords: [pickOne(WORDS), pickOne(WORDS)],
+            description: Array.from({ length: 20 }, () => pickOne(WORDS)).join(' '),
+            stock: Math.floor(random() * 20),
+            bestseller: random() < 0.1,
+            date: i
+        };
+        products.set(product._id, product);
+    }
+    return { products, categories };
+};
+
+const createQueries = () => Array.from({ length: QUERIES }, () => {
+    const kind = pickOne(KINDS);
+    const filling = pickOne(FILLINGS);
+    switch (Math.floor(random() * 5)) {
+        case 0: return kind;
+        case 1: return kind.slice(0, 2 + Math.floor(random() * 3)).toLowerCase();
+        case 2: return `${filling} ${kind}`;
+        case 3: return `${filling.slice(0, 3)} ${kind.slice(0, 4)}`;
+        default: {
+            // One swapped letter pair, the most common typo
+            const word = normalize(kind).split(' ')[0];
+            const at = 1 + Math.floor(random() * (word.length - 2));
+            return word.slice(0, at) + word[at + 1] + word[at] + word.slice(at + 2);
+        }
+    }
+});
+
+const createScan = (catalog) => {
+    const texts = Array.from(catalog.products.values(), product => [product, normalize(
+        `${product.name} ${product.sku} ${catalog.categories.get(product.category).name} ${product.keywords.join(' ')} ${product.description}`
+    )]);
+
+    return (query) => {
+        const tokens = normalize(query).split(/[^a-z0-9]+/).filter(Boolean);
+        const matches = [];
+        for (const [product, text] of texts) {
+            if (tokens.every(token => text.includes(token))) matches.push(product);
+        }
+        return matches.slice(0, 20);
+    };
+};
+
+const measure = (name, queries, search) => {
+    const timings = [];
+    let hits = 0;
+    for (const query of queries) {
+        const start = process.hrtime.bigint();
+        const results = search(query);
+        timings.push(Number(process.hrtime.bigint() - start) / 1e6);
+        if (results.length > 0) hits++;
+    }
+    timings.sort((a, b) => a - b);
+    const at = (q) => timings[Math.min(timings.length - 1, Math.floor(timings.length * q))].toFixed(3);
+
+    console.log(
+        `${name.padEnd(10)}${at(0.5).padStart(12)}${at(0.99).padStart(12)}` +
+        `${timings[timings.length - 1].toFixed(3).padStart(12)}${`${hits}/${queries.length}`.padStart(14)}`
+    );
+};
+
+const main = () => {
+    const catalog = createCatalog();
+    const queries = createQueries();
+
+    const index = new ProductSearchIndex();
+    const buildStart = process.hrtime.bigint();
+    index.attach({
+        ...catalog,
+        subscribe: listener => listener({ type: 'reset' })
+    });
+    const buildMs = Number(process.hrtime.bigint() - buildStart) / 1e6;
+    const stats = index.getStats();
+
+    console.log('='.repeat(72));
+    console.log(`🔎 Product search: ${PRODUCTS} products, ${QUERIES} queries`);
+    console.log(`   index built in ${buildMs.toFixed(1)} ms (${stats.terms} terms)`);
+    console.log('='.repeat(72));
+    console.log(`${'search'.padEnd(10)}${'p50 ms'.padStart(12)}${'p99 ms'.padStart(12)}${'max ms'.padStart(12)}${'with hits'.padStart(14)}`);
+
+    const scan = createScan(catalog);
+
+    // Warm up both paths before measuring
+    queries.slice(0, 200).forEach(query => { scan(query); index.search(query); });
+
+    measure('scan', queries, scan);
+    measure('index', queries, query => index.search(query).results);
+};
+
+main();
@@ -0,0 +1,166 @@
+import axios from 'axios';
+import http from 'http';
+import { RetryScheduler, RetryHeap } from '../../services/RetryScheduler.js';
+
+/**
+ * Retry Recovery Benchmark
+ * Simulates a MuditaKurye outage with a local stand-in API and measures how long the retry
+ * queue takes to drain once the API is back:
+ *   - interval:  previous behaviour, poll every 5s and start up to 10 due retries
+ *   - scheduler: RetryScheduler, wakes at the next retryAt and keeps `concurrency` in flight
+ *
+ * Every order fails once when the outage starts, then retries with the same exponential
+ * backoff as RetryService.calculateBackoff until the stand-in answers 200.
+ *
+ * Usage: node scripts/benchmarks/retryRecovery.js [orders] [outageSeconds] [concurrency]
+ */
+
+const ORDERS = parseInt(process.argv[2]) || 500;
+const OUTAGE_MS = (parseInt(process.argv[3]) || 10) * 1000;
+const CONCURRENCY = parseInt(process.argv[4]) || 10;
+const BASE_DELAY = 500;
+const MAX_DELAY = 30000;
+const SERVICE_TIME_MS = 20;
+
+const backoff = (retryCount) => {
+    const delay = Math.min(Math.pow(2, retryCount) * BASE_DELAY, MAX_DELAY);
+    return Math.floor(delay + delay * 0.1 * Math.random());
+};
+
+const percentile = (sorted, pct) => sorted.length > 0
+    ? sorted[Math.min(sorted.length - 1, Math.floor(pct / 100 * sorted.length))]
+    : 0;
+
+// Stand-in courier API: 503 until the outage ends, then a fixed service time
+const startStandIn = () => new Promise(resolve => {
+    const state = { outageEndsAt: 0, requests: 0 };
+    const server = http.createServer((req, res) => {
+        state.requests++;
+        req.resume();
+        req.on('end', () => {
+            if (Date.now() < state.outageEndsAt) {
+                res.writeHead(503, { 'Content-Type': 'application/json' });
+                res.end('{"error":"unavailable"}');
+                return;
+            }
+            setTimeout(() => {
+                res.writeHead(201, { 'Content-Type': 'application/json' });
+                res.end('{"success":true}');
+            }, SERVICE_TIME_MS);
+        });
+    });
+    server.listen(0, '127.0.0.1', () => resolve({ server, state, port: server.address().port }));
+});
+
+// In-memory retry queue shared by both strategies
+const createQueue = () => {
+    const entries = new Map();
+    const heap = new RetryHeap();
+    return {
+        entries,
+        schedule(retryId, retryCount) {
+            const retryAt = Date.now() + backoff(retryCount);
+            entries.set(retryId, { retryId, retryCount, retryAt });
+            heap.push({ retryId, retryAt });
+            return retryAt;
+        },
+        takeDue(now, limit) {
+            const due = [];
+            while (due.length < limit && heap.size > 0 && heap.peek().retryAt <= now) {
+                due.push(heap.pop());
+            }
+            return due;
+        },
+        nextDueAt() {
+            return heap.peek()?.retryAt ?? null;
+        }
+    };
+};
+
+const runScenario = async (name, standIn, client, createRunner) => {
+    const queue = createQueue();
+    const recoveredAt = [];
+    let attempts = 0;
+    let onDone;
+    const done = new Promise(resolve => { onDone = resolve; });
+
+    const startedAt = Date.now();
+    standIn.state.outageEndsAt = startedAt + OUTAGE_MS;
+
+    const runner = createRunner(queue, async (retryId) => {
+        const entry = queue.entries.get(retryId);
+        attempts++;
+        try {
+            await client.post('/webhook/third-party/order', { orderId: retryId });
+            queue.entries.delete(retryId);
+            recoveredAt.push(Date.now());
+            if (recoveredAt.length === ORDERS) onDone();
+        } catch (error) {
+            const retryAt = queue.schedule(retryId, entry.retryCount + 1);
+            runner.notify(retryAt);
+        }
+    });
+
+    // All orders fail on their first submission when the outage starts
+    for (let i = 0; i < ORDERS; i++) {
+        runner.notify(queue.schedule(`${name}-${i}`, 0));
+    }
+    runner.start();
+
+    await done;
+    runner.stop();
+
+    const outageEnd = standIn.state.outageEndsAt;
+    const afterOutage = recoveredAt.map(at => at - outageEnd).sort((a, b) => a - b);
+
+    console.log(
+        `${name.padEnd(11)}${String(attempts).padStart(10)}` +
+        `${String(percentile(afterOutage, 50)).padStart(10)}${String(percentile(afterOutage, 95)).padStart(10)}` +
+        `${String(afterOutage[afterOutage.length - 1]).padStart(11)}${((Date.now() - startedAt) / 1000).toFixed(1).padStart(9)}`
+    );
+};
+
+// Previous RetryService loop: every 5s, fire up to 10 due retries
+const intervalRunner = (queue, execute) => {
+    let timer = null;
+    return {
+        notify() {},
+        start() {
+            timer = setInterval(() => {
+                queue.takeDue(Date.now(), 10).forEach(({ retryId }) => execute(retryId));
+            }, 5000);
+        },
+        stop() {
+            clearInterval(timer);
+        }
+    };
+};
+
+const schedulerRunner = (queue, execute) => new RetryScheduler({
+    source: {
+        takeDue: async (now, limit) => queue.takeDue(now, limit),
+        nextDueAt: async () => queue.nextDueAt()
+    },
+    execute,
+    concurrency: CONCURRENCY
+});
+
+const main = async () => {
+    const standIn = await startStandIn();
+    const agent = new http.Agent({ keepAlive: true, maxSockets: CONCURRENCY });
+    const client = axios.create({ baseURL: `http://127.0.0.1:${standIn.port}`, timeout: 10000, httpAgent: agent });
+
+    console.log('='.repeat(61));
+    console.log(`🔁 Retry recovery benchmark: ${ORDERS} orders, ${OUTAGE_MS / 1000}s outage, concurrency ${CONCURRENCY}`);
+    console.log('='.repeat(61));
+    console.log('Recovery times are measured from the end of the outage (ms)');
+    console.log(`${'mode'.padEnd(11)}${'attempts'.padStart(10)}${'p50'.padStart(10)}${'p95'.padStart(10)}${'all done'.padStart(11)}${'total s'.padStart(9)}`);
+
+    await runScenario('interval', standIn, client, intervalRunner);
+    await runScenario('scheduler', standIn, client, schedulerRunner);
+
+    agent.destroy();
+    standIn.server.close();
+};
+
+main();
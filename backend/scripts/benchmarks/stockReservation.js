@@ -0,0 +1,119 @@
+import mongoose from 'mongoose';
+import productModel from '../../models/ProductModel.js';
+import stockReservationModel from '../../models/StockReservationModel.js';
+import StockReservationService from '../../services/StockReservationService.js';
+import logger from '../../utils/logger.js';
+
+/**
+ * Stock Reservation Benchmark
+ * Flash sale: BUYERS checkouts race for a product with STOCK items left (each cart also holds a
+ * couple of products with plenty of stock), at most CONCURRENCY at a time, and compares:
+ *   - check-then-decrement: findById per item, then findByIdAndUpdate per item (previous
+ *                           checkStockAvailability + reduceStock)
+ *   - reservation:          StockReservationService.reserve + commit (conditional bulk write)
+ * Reports checkouts per second, database round trips per checkout, items sold against the
+ * stock there was, and the flash product's final stock (negative = oversold).
+ *
+ * Requires a disposable MongoDB (the products and stock_reservations collections are dropped):
+ *   MONGODB_URI=mongodb://localhost:27017/tulumbak_benchmark node scripts/benchmarks/stockReservation.js [buyers] [stock] [concurrency]
+ */
+
+const BUYERS = parseInt(process.argv[2]) || 2000;
+const STOCK = parseInt(process.argv[3]) || 100;
+const CONCURRENCY = parseInt(process.argv[4]) || 64;
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://127.0.0.1:27017/tulumbak_benchmark';
+
+const FLASH_ID = new mongoose.Types.ObjectId();
+const OTHER_IDS = [new mongoose.Types.ObjectId(), new mongoose.Types.ObjectId()];
+
+let roundTrips = 0;
+
+const seed = async () => {
+    await productModel.collection.deleteMany({});
+    await stockReservationModel.collection.deleteMany({});
+    // Raw inserts: only the fields stock handling reads
+    await productModel.collection.insertMany([
+        { _id: FLASH_ID, name: 'Flaş İndirim Baklava', stock: STOCK },
+        ...OTHER_IDS.map((_id, index) => ({ _id, name: `Tulumba ${index + 1}`, stock: BUYERS * 10 }))
+    ]);
+};
+
+const cartFor = (index) => [
+    { id: FLASH_ID.toString(), quantity: 1 + (index % 2) },
+    ...OTHER_IDS.map(_id => ({ id: _id.toString(), quantity: 1 }))
+];
+
+// Previous flow: check every item, then decrement every item
+const checkThenDecrement = async (items) => {
+    for (const item of items) {
+        const product = await productModel.findById(item.id);
+        if (!product || Number(product.stock || 0) < item.quantity) return false;
+    }
+    for (const item of items) {
+        await productModel.findByIdAndUpdate(item.id, { $inc: { stock: -item.quantity } }, { new: true });
+    }
+    return true;
+};
+
+const reservation = async (items, index) => {
+    const reservationId = `bench:${index}`;
+    const result = await StockReservationService.reserve(reservationId, items);
+    if (!result.success) return false;
+    await StockReservationService.commit(reservationId, { orderId: reservationId });
+    return true;
+};
+
+const runScenario = async (name, checkout) => {
+    await seed();
+    roundTrips = 0;
+
+    let next = 0;
+    let accepted = 0;
+    let flashSold = 0;
+    const start = Date.now();
+
+    const worker = async () => {
+        while (next < BUYERS) {
+            const index = next++;
+            const items = cartFor(index);
+            if (await checkout(items, index)) {
+                accepted++;
+                flashSold += items[0].quantity;
+            }
+        }
+    };
+    await Promise.all(Array.from({ length: CONCURRENCY }, worker));
+
+    const elapsed = (Date.now() - start) / 1000;
+    const flash = await productModel.collection.findOne({ _id: FLASH_ID });
+
+    console.log(
+        `${name.padEnd(22)}${(BUYERS / elapsed).toFixed(0).padStart(12)}` +
+        `${(roundTrips / BUYERS).toFixed(1).padStart(16)}${String(accepted).padStart(10)}` +
+        `${`${flashSold}/${STOCK}`.padStart(12)}${String(flash.stock).padStart(13)}`
+    );
+};
+
+const main = async () => {
+    logger.silent = true;
+    await mongoose.connect(MONGODB_URI);
+    await stockReservationModel.init();
+    // Every command sent to MongoDB (collection methods are what mongoose debug reports)
+    mongoose.set('debug', () => { roundTrips++; });
+
+    console.log('='.repeat(72));
+    console.log(`🛒 Flash sale: ${BUYERS} checkouts for ${STOCK} items, ${CONCURRENCY} at a time`);
+    console.log('='.repeat(72));
+    console.log(`${'scenario'.padEnd(22)}${'checkouts/s'.padStart(12)}${'trips/checkout'.padStart(16)}${'accepted'.padStart(10)}${'flash sold'.padStart(12)}${'final stock'.padStart(13)}`);
+
+    await runScenario('check-then-decrement', checkThenDecrement);
+    await runScenario('reservation', reservation);
+
+    await mongoose.disconnect();
+};
+
+main().catch(async error => {
+    console.error('Benchmark failed:', error.message);
+    await mongoose.disconnect();
+    process.exit(1);
+});
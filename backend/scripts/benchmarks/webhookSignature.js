@@ -0,0 +1,159 @@
+import crypto from 'crypto';
+import WebhookSecurity from '../../utils/webhookSecurity.js';
+
+/**
+ * Webhook Signature Verification Benchmark
+ * Measures cost and correctness of each signature recipe across payload sizes:
+ *   - MuditaKurye docs: HMAC(JSON.stringify(payload)) vs HMAC(req.rawBody)
+ *   - WebhookSecurity:  HMAC(`${ts}.${JSON.stringify(payload)}`) vs raw-body variant
+ *   - Raw-body verification with a prepared key and in batches
+ *
+ * Correctness is checked against bodies the sender may legitimately produce
+ * (compact, pretty-printed, Python json.dumps style) and against payloads
+ * whose parsed dates were rewritten by validation middleware.
+ *
+ * Usage: node scripts/benchmarks/webhookSignature.js [iterations]
+ */
+
+const ITERATIONS = parseInt(process.argv[2]) || 20000;
+const SECRET = 'wh_benchmark_secret_0123456789abcdef';
+const SIZES = [256, 1024, 16 * 1024, 256 * 1024];
+
+const hmacHex = (...parts) => {
+    const hmac = crypto.createHmac('sha256', SECRET);
+    for (const part of parts) hmac.update(part);
+    return hmac.digest('hex');
+};
+
+const buildPayload = (targetBytes) => {
+    const payload = {
+        event: 'order.status_changed',
+        orderId: 'order_123456',
+        muditaKuryeOrderId: '550e8400-e29b-41d4-a716-446655440000',
+        orderNumber: 'RST-20251112-0042',
+        status: 'ON_DELIVERY',
+        previousStatus: 'PREPARED',
+        timestamp: '2025-11-12T17:45:00+03:00',
+        provider: 'THIRD_PARTY',
+        providerRestaurantId: 'rest_85b4ad47f35b45e893c9',
+        metadata: { notes: [] }
+    };
+    while (JSON.stringify(payload).length < targetBytes) {
+        payload.metadata.notes.push({ courier: 'Kurye Şükrü Öztürk', note: 'Kapıyı çalmadan önce arayın', at: Date.now() });
+    }
+    return payload;
+};
+
+// Requests as they reach the handler for the same logical payload: the sender's
+// byte formatting varies, and validation middleware may rewrite parsed fields
+const bodyVariants = (payload) => {
+    const compact = JSON.stringify(payload);
+    return {
+        compact: { body: compact },
+        pretty: { body: JSON.stringify(payload, null, 2) },
+        pythonStyle: {
+            body: compact
+                .replace(/[\u007f-\uffff]/g, c => '\\u' + c.charCodeAt(0).toString(16).padStart(4, '0'))
+                .replace(/","/g, '", "').replace(/":/g, '": ')
+        },
+        // Joi isoDate() with convert: true rewrote timestamps after parsing
+        dateConverted: {
+            body: compact,
+            mutate: (parsed) => { parsed.timestamp = new Date(parsed.timestamp).toISOString(); }
+        }
+    };
+};
+
+const recipes = {
+    // script_3.py verifyWebhookSignature(payload, ...)
+    docsStringify: {
+        sign: (body) => hmacHex(body),
+        verify: ({ payload, signature }) => hmacHex(JSON.stringify(payload)) === signature
+    },
+    // script_3.py verifySignature middleware (req.rawBody)
+    docsRawBody: {
+        sign: (body) => hmacHex(body),
+        verify: ({ rawBody, signature }) => WebhookSecurity.verifyRawSignature(rawBody, signature, null, SECRET)
+    },
+    // utils/webhookSecurity.js before raw-body support
+    securityStringify: {
+        sign: (body, ts) => hmacHex(`${ts}.`, body),
+        verify: ({ payload, signature, timestamp }) => WebhookSecurity.verifySignature(payload, signature, timestamp, SECRET)
+    },
+    securityRawBody: {
+        sign: (body, ts) => hmacHex(`${ts}.`, body),
+        verify: ({ rawBody, signature, timestamp }) => WebhookSecurity.verifyRawSignature(rawBody, signature, timestamp, SECRET)
+    },
+    securityRawPreparedKey: {
+        sign: (body, ts) => hmacHex(`${ts}.`, body),
+        verify: ({ rawBody, signature, timestamp }, key) => WebhookSecurity.verifyRawSignature(rawBody, signature, timestamp, key)
+    }
+};
+
+const makeRequest = ({ body, mutate }, recipe) => {
+    const timestamp = Date.now();
+    const rawBody = Buffer.from(body, 'utf8');
+    const payload = JSON.parse(body);
+    if (mutate) mutate(payload);
+    return {
+        rawBody,
+        payload,
+        timestamp,
+        signature: recipe.sign(rawBody, timestamp)
+    };
+};
+
+const timeIt = (fn) => {
+    for (let i = 0; i < Math.min(2000, ITERATIONS); i++) fn(i);
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < ITERATIONS; i++) fn(i);
+    return Number(process.hrtime.bigint() - start) / ITERATIONS;
+};
+
+const main = async () => {
+    const key = WebhookSecurity.prepareKey(SECRET);
+
+    console.log('='.repeat(78));
+    console.log(`🔐 Webhook signature verification benchmark (${ITERATIONS} iterations)`);
+    console.log('='.repeat(78));
+
+    for (const size of SIZES) {
+        const payload = buildPayload(size);
+        const variants = bodyVariants(payload);
+        console.log(`\n📦 Payload ~${(variants.compact.body.length / 1024).toFixed(1)} KB`);
+        console.log(`${'recipe'.padEnd(24)}${'µs/verify'.padStart(12)}${'verify/s'.padStart(12)}   correct`);
+
+        for (const [name, recipe] of Object.entries(recipes)) {
+            const request = makeRequest(variants.compact, recipe);
+            const nsPerOp = timeIt(() => recipe.verify(request, key));
+
+            const verdicts = Object.entries(variants).map(([variant, request]) =>
+                recipe.verify(makeRequest(request, recipe), key) ? variant : null
+            ).filter(Boolean);
+
+            console.log(
+                `${name.padEnd(24)}${(nsPerOp / 1000).toFixed(2).padStart(12)}` +
+                `${Math.round(1e9 / nsPerOp).toLocaleString().padStart(12)}   ` +
+                `${verdicts.length}/${Object.keys(variants).length} (${verdicts.join(', ')})`
+            );
+        }
+
+        // Batched raw-body verification of queued webhooks
+        const recipe = recipes.securityRawBody;
+        const queue = Array.from({ length: 1000 }, () => makeRequest(variants.compact, recipe));
+        const rounds = Math.max(1, Math.floor(ITERATIONS / queue.length));
+        const start = process.hrtime.bigint();
+        let ok = 0;
+        for (let r = 0; r < rounds; r++) {
+            const results = await WebhookSecurity.verifyBatch(queue, key);
+            ok += results.filter(Boolean).length;
+        }
+        const nsPerOp = Number(process.hrtime.bigint() - start) / (rounds * queue.length);
+        console.log(
+            `${'verifyBatch(1000)'.padEnd(24)}${(nsPerOp / 1000).toFixed(2).padStart(12)}` +
+            `${Math.round(1e9 / nsPerOp).toLocaleString().padStart(12)}   ${ok}/${rounds * queue.length} valid`
+        );
+    }
+};
+
+main();
@@ -0,0 +1,88 @@
+import { muditaKuryeWebhookSchema } from '../../schemas/webhookSchemas.js';
+import { validateMuditaKuryeWebhookPayload } from '../../schemas/generated/muditaKuryeContract.js';
+
+/**
+ * Webhook Validation Benchmark
+ * Compares per-webhook validation cost of the Joi schema (previous request path)
+ * with the generated MuditaKurye contract validator.
+ *
+ * Usage: node scripts/benchmarks/webhookValidation.js [iterations]
+ */
+
+const ITERATIONS = parseInt(process.argv[2]) || 200000;
+
+const payloads = [
+    {
+        event: 'order.status_changed',
+        orderId: 'order_123456',
+        muditaKuryeOrderId: '550e8400-e29b-41d4-a716-446655440000',
+        orderNumber: 'RST-20251112-0042',
+        status: 'PREPARED',
+        previousStatus: 'VALIDATED',
+        timestamp: '2025-11-12T17:45:00+03:00',
+        provider: 'THIRD_PARTY',
+        providerRestaurantId: 'rest_85b4ad47f35b45e893c9'
+    },
+    {
+        event: 'order.canceled',
+        orderId: 'order_123456',
+        muditaKuryeOrderId: '550e8400-e29b-41d4-a716-446655440000',
+        status: 'CANCELED',
+        previousStatus: 'ASSIGNED',
+        reason: 'Restoran isteği',
+        canceledBy: 'RESTAURANT',
+        timestamp: '2025-11-12T17:50:00+03:00'
+    },
+    {
+        // Invalid: unknown status, missing timestamp
+        event: 'order.status_changed',
+        orderId: 'order_123456',
+        status: 'LOST'
+    }
+];
+
+const joiOptions = { abortEarly: false, stripUnknown: true, convert: true };
+
+const candidates = {
+    joi: (payload) => !muditaKuryeWebhookSchema.validate(payload, joiOptions).error,
+    generated: (payload) => validateMuditaKuryeWebhookPayload(payload).valid
+};
+
+const run = (name, validate) => {
+    // Sanity: both validators must agree on every payload
+    const verdicts = payloads.map(validate);
+
+    // Warm up JIT
+    for (let i = 0; i < 10000; i++) {
+        validate(payloads[i % payloads.length]);
+    }
+
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < ITERATIONS; i++) {
+        validate(payloads[i % payloads.length]);
+    }
+    const elapsedNs = Number(process.hrtime.bigint() - start);
+
+    return {
+        name,
+        verdicts,
+        nsPerWebhook: Math.round(elapsedNs / ITERATIONS),
+        webhooksPerSecond: Math.round(ITERATIONS / (elapsedNs / 1e9))
+    };
+};
+
+console.log('='.repeat(60));
+console.log(`🧪 MuditaKurye webhook validation benchmark (${ITERATIONS} iterations)`);
+console.log('='.repeat(60));
+
+const results = Object.entries(candidates).map(([name, validate]) => run(name, validate));
+for (const result of results) {
+    console.log(`${result.name.padEnd(10)} ${String(result.nsPerWebhook).padStart(8)} ns/webhook  ${result.webhooksPerSecond.toLocaleString()} webhooks/s  verdicts=${result.verdicts.join(',')}`);
+}
+
+const [joi, generated] = results;
+console.log(`\n⚡ Speedup: ${(joi.nsPerWebhook / generated.nsPerWebhook).toFixed(1)}x`);
+if (joi.verdicts.join() !== generated.verdicts.join()) {
+    console.log('❌ Validators disagree on at least one payload');
+    process.exitCode = 1;
+}
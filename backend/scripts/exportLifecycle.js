@@ -0,0 +1,21 @@
+import "dotenv/config";
+import connectDB from "../config/mongodb.js";
+import { LifecycleExporter } from "../services/LifecycleExportService.js";
+
+// Output directory (defaults to LIFECYCLE_EXPORT_DIR); re-running continues where the last run stopped
+const OUTPUT_DIR = process.argv[2] || process.env.LIFECYCLE_EXPORT_DIR;
+
+const exportLifecycle = async () => {
+    try {
+        await connectDB();
+        const exporter = new LifecycleExporter({ outputDir: OUTPUT_DIR });
+        const result = await exporter.run();
+        console.log(`Exported ${result.orders} orders and ${result.events} courier events into ${result.files} files (${result.partitions.length} partitions) in ${result.durationMs}ms.`);
+        process.exit(0);
+    } catch (error) {
+        console.error("Failed to export lifecycle data:", error);
+        process.exit(1);
+    }
+};
+
+exportLifecycle();
@@ -0,0 +1,46 @@
+/**
+ * Fix Stock Reservation TTL Index
+ *
+ * The reservation ledger's TTL index used a partial filter with $ne, which MongoDB
+ * rejects, so it was never built and finished reservations were never removed.
+ * This script drops that index if it exists, stamps finishedAt on finished reservations
+ * that predate the field, and builds the finishedAt TTL index.
+ */
+
+import mongoose from 'mongoose';
+import connectDB from '../config/mongodb.js';
+import stockReservationModel from '../models/StockReservationModel.js';
+
+const fixStockReservationTtlIndex = async () => {
+    try {
+        await connectDB();
+        console.log('Connected to MongoDB');
+
+        const collection = stockReservationModel.collection;
+        const indexes = await collection.indexes();
+
+        const legacyIndex = indexes.find(idx => idx.key && idx.key.updatedAt !== undefined && idx.expireAfterSeconds !== undefined);
+        if (legacyIndex) {
+            console.log('Dropping legacy TTL index:', legacyIndex.name);
+            await collection.dropIndex(legacyIndex.name);
+        }
+
+        // Finished before finishedAt existed: expire a week after their last update
+        const result = await collection.updateMany(
+            { status: { $in: ['committed', 'released', 'expired', 'rejected'] }, finishedAt: { $exists: false } },
+            [{ $set: { finishedAt: '$updatedAt' } }]
+        );
+        console.log(`finishedAt set on ${result.modifiedCount} reservations`);
+
+        await stockReservationModel.createIndexes();
+        console.log('Indexes after fix:', await collection.indexes());
+
+        console.log('✅ Fix completed successfully');
+        process.exit(0);
+    } catch (error) {
+        console.error('❌ Error fixing index:', error);
+        process.exit(1);
+    }
+};
+
+fixStockReservationTtlIndex();
@@ -90,6 +90,16 @@ setTimeout(async () => {
   }
 }, 3000);
 
+// Admin notification fan-out across instances (Redis pub/sub, once Redis is connected)
+setTimeout(async () => {
+  try {
+    const { default: NotificationService } = await import("./services/NotificationService.js");
+    await NotificationService.initialize();
+  } catch (error) {
+    logger.error("Error initializing NotificationService", { error: error.message, stack: error.stack });
+  }
+}, 3500);
+
 // Initialize CourierIntegrationService
 setTimeout(async () => {
   try {
@@ -101,6 +111,73 @@ setTimeout(async () => {
   }
 }, 4000);
 
+// In-memory catalog for product lists, price range and facets
+setTimeout(async () => {
+  try {
+    const { default: CatalogSnapshot } = await import("./services/CatalogSnapshot.js");
+    await CatalogSnapshot.initialize();
+  } catch (error) {
+    logger.error("Error initializing catalog snapshot", { error: error.message, stack: error.stack });
+  }
+}, 4250);
+
+// Re-queue webhooks accepted before the last shutdown but not processed yet, then sweep for stranded ones every minute
+setTimeout(async () => {
+  try {
+    const { default: WebhookQueueService } = await import("./services/WebhookQueueService.js");
+    await WebhookQueueService.initialize();
+  } catch (error) {
+    logger.error("Error initializing WebhookQueueService", { error: error.message, stack: error.stack });
+  }
+}, 4500);
+
+// Courier status polling fallback (every minute, for orders whose webhooks went missing)
+setTimeout(async () => {
+  try {
+    const { courierStatusPollJob } = await import("./jobs/pollCourierStatus.js");
+    courierStatusPollJob.start();
+    logger.info("Courier status polling job scheduled successfully (every minute)");
+  } catch (error) {
+    logger.error("Error initializing courier status polling job", { error: error.message, stack: error.stack });
+  }
+}, 4750);
+
+// Stock reservation expiry (every minute, for abandoned checkouts and PayTR payments)
+setTimeout(async () => {
+  try {
+    const { stockReservationJob } = await import("./jobs/releaseStockReservations.js");
+    stockReservationJob.start();
+    logger.info("Stock reservation expiry job scheduled successfully (every minute)");
+  } catch (error) {
+    logger.error("Error initializing stock reservation expiry job", { error: error.message, stack: error.stack });
+  }
+}, 4800);
+
+// Sales report rollups (backfill on first start, nightly reconcile at 3:30 AM)
+setTimeout(async () => {
+  try {
+    const { salesRollupJob, ensureSalesRollups } = await import("./jobs/rebuildSalesRollups.js");
+    salesRollupJob.start();
+    logger.info("Sales rollup job scheduled successfully (daily at 3:30 AM)");
+    await ensureSalesRollups();
+  } catch (error) {
+    logger.error("Error initializing sales rollup job", { error: error.message, stack: error.stack });
+  }
+}, 4900);
+
+// Lifecycle export for offline analytics (daily at 2:00 AM, only when an export directory is set)
+if (process.env.LIFECYCLE_EXPORT_DIR) {
+  setTimeout(async () => {
+    try {
+      const { lifecycleExportJob } = await import("./jobs/exportLifecycle.js");
+      lifecycleExportJob.start();
+      logger.info("Lifecycle export job scheduled successfully (daily at 2:00 AM)");
+    } catch (error) {
+      logger.error("Error initializing lifecycle export job", { error: error.message, stack: error.stack });
+    }
+  }, 4950);
+}
+
 // Initialize Product Cleanup Job (30-day auto-delete for soft deleted products)
 setTimeout(async () => {
   try {
@@ -149,7 +226,16 @@ app.use(helmet({
         }
     }
 })); // Security headers
-app.use(express.json({ limit: '10mb' })); // Limit payload size
+app.use(express.json({
+    limit: '10mb', // Limit payload size
+    // Keep raw bytes for webhook signature verification (no re-serialization)
+    verify: (req, res, buf) => {
+        if (req.originalUrl.startsWith('/api/webhook/')) {
+            req.rawBody = buf;
+            req.bodyReceivedAt = performance.now(); // Start of the webhook's parse stage
+        }
+    }
+}));
 app.use(express.urlencoded({ extended: true, limit: '10mb' }));
 // CORS Configuration
 const allowedOrigins = process.env.CORS_ORIGINS 
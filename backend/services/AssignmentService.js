@@ -1,68 +1,138 @@
 import branchModel from "../models/BranchModel.js";
+import BranchSpatialIndex, { addressPoint } from "./BranchSpatialIndex.js";
 import logger from "../utils/logger.js";
 
-// Haversine distance in kilometers
-const haversineKm = (lat1, lon1, lat2, lon2) => {
-    const toRad = (d) => (d * Math.PI) / 180;
-    const R = 6371; // km
-    const dLat = toRad(lat2 - lat1);
-    const dLon = toRad(lon2 - lon1);
-    const a =
-        Math.sin(dLat / 2) * Math.sin(dLat / 2) +
-        Math.cos(toRad(lat1)) * Math.cos(toRad(lat2)) *
-        Math.sin(dLon / 2) * Math.sin(dLon / 2);
-    const c = 2 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
-    return R * c;
+/**
+ * Branch assignment
+ * Orders are matched against an in-memory BranchSpatialIndex of the active branches, so an
+ * assignment costs no database round trip. The index is rebuilt when branches are created,
+ * updated or deleted (BranchController, and a change stream for other instances), and
+ * refreshed in the background after BRANCH_INDEX_MAX_AGE_MS as a safety net.
+ *
+ * BRANCH_ASSIGNMENT_STRATEGY=near uses MongoDB $near queries on the branches' 2dsphere
+ * location instead (one query per step, no in-memory state).
+ */
+
+const config = {
+    strategy: process.env.BRANCH_ASSIGNMENT_STRATEGY === 'near' ? 'near' : 'memory',
+    maxAgeMs: parseInt(process.env.BRANCH_INDEX_MAX_AGE_MS) || 5 * 60 * 1000
 };
 
+const state = {
+    index: null,
+    loading: null,
+    // Bumped on every branch change; the index is current when built at the same generation
+    generation: 0,
+    indexGeneration: -1,
+    changeStream: null
+};
+
+function loadBranchIndex() {
+    if (state.loading) return state.loading;
+
+    const generation = state.generation;
+    state.loading = (async () => {
+        try {
+            const branches = await branchModel.find({ status: 'active' }).lean();
+            state.index = new BranchSpatialIndex(branches);
+            state.indexGeneration = generation;
+            watchBranches();
+            return state.index;
+        } finally {
+            state.loading = null;
+        }
+    })();
+    return state.loading;
+}
+
+async function getBranchIndex() {
+    if (state.index && state.indexGeneration === state.generation) {
+        if (Date.now() - state.index.builtAt > config.maxAgeMs && !state.loading) {
+            loadBranchIndex().catch(error => {
+                logger.warn('Branch index refresh failed, keeping the current one', { error: error.message });
+            });
+        }
+        return state.index;
+    }
+
+    try {
+        await loadBranchIndex();
+        // Branches changed while the index was loading
+        if (state.indexGeneration !== state.generation) await loadBranchIndex();
+    } catch (error) {
+        if (!state.index) throw error;
+        logger.warn('Branch index rebuild failed, using the previous one', { error: error.message });
+    }
+    return state.index;
+}
+
 /**
- * Determine best branch for an order
- * Priority: assignedZones by delivery.zoneId -> nearest by coordinates if available -> first active branch
+ * Branch data changed: rebuild the index before the next assignment
  */
-export async function findBestBranch({ delivery, address }) {
-    // Fetch active branches
-    const branches = await branchModel.find({ status: 'active' });
-    if (!branches.length) return null;
+export function invalidateBranchIndex() {
+    state.generation++;
+    if (config.strategy === 'memory') {
+        loadBranchIndex().catch(error => {
+            logger.warn('Branch index rebuild failed', { error: error.message });
+        });
+    }
+}
 
-    // 1) Zone-based match
-    if (delivery?.zoneId) {
-        const zoneBranches = branches.filter(b => Array.isArray(b.assignedZones) && b.assignedZones.includes(delivery.zoneId));
-        if (zoneBranches.length === 1) return zoneBranches[0];
-        if (zoneBranches.length > 1) {
-            // If multiple, try nearest by coordinates if available
-            const best = pickNearestByCoordinates(zoneBranches, address);
-            if (best) return best;
-            return zoneBranches[0];
-        }
+/**
+ * Rebuild the index on changes made by other instances or scripts
+ * Change streams need a replica set; without one the max-age refresh covers them
+ */
+function watchBranches() {
+    if (state.changeStream) return;
+
+    try {
+        state.changeStream = branchModel.watch();
+        state.changeStream.on('change', () => invalidateBranchIndex());
+        state.changeStream.on('error', (error) => {
+            logger.warn('Branch change stream unavailable, relying on periodic index refresh', {
+                error: error.message
+            });
+            state.changeStream?.close().catch(() => {});
+            // Don't try again on every rebuild
+            state.changeStream = { closed: true };
+        });
+    } catch (error) {
+        logger.warn('Could not watch branches', { error: error.message });
+        state.changeStream = { closed: true };
     }
+}
+
+/**
+ * Same priority as the index, answered by MongoDB through the 2dsphere index on location
+ */
+async function findBestBranchNear({ delivery, address }) {
+    const point = addressPoint(address);
+    const near = point
+        ? { location: { $near: { $geometry: { type: 'Point', coordinates: [point.longitude, point.latitude] } } } }
+        : null;
 
-    // 2) Nearest by coordinates if customer address has coords and branches have coords
-    const nearest = pickNearestByCoordinates(branches, address);
-    if (nearest) return nearest;
+    if (delivery?.zoneId) {
+        const zoneFilter = { status: 'active', assignedZones: delivery.zoneId };
+        const zoneBranch = (near && await branchModel.findOne({ ...zoneFilter, ...near })) ||
+            await branchModel.findOne(zoneFilter);
+        if (zoneBranch) return zoneBranch;
+    }
 
-    // 3) Fallback: first active branch
-    return branches[0];
+    const nearest = near && await branchModel.findOne({ status: 'active', ...near });
+    return nearest || branchModel.findOne({ status: 'active' });
 }
 
-function pickNearestByCoordinates(branches, address) {
-    const addrLat = address?.coordinates?.latitude ?? address?.lat;
-    const addrLon = address?.coordinates?.longitude ?? address?.lng;
-    if (typeof addrLat !== 'number' || typeof addrLon !== 'number') return null;
-
-    let best = null;
-    let bestKm = Number.POSITIVE_INFINITY;
-
-    for (const br of branches) {
-        const brLat = br?.address?.coordinates?.latitude;
-        const brLon = br?.address?.coordinates?.longitude;
-        if (typeof brLat !== 'number' || typeof brLon !== 'number') continue;
-        const km = haversineKm(addrLat, addrLon, brLat, brLon);
-        if (km < bestKm) {
-            bestKm = km;
-            best = br;
-        }
+/**
+ * Determine best branch for an order
+ * Priority: assignedZones by delivery.zoneId -> nearest by coordinates if available -> first active branch
+ */
+export async function findBestBranch({ delivery, address }) {
+    if (config.strategy === 'near') {
+        return findBestBranchNear({ delivery, address });
     }
-    return best;
+
+    const index = await getBranchIndex();
+    return index.findBest({ delivery, address });
 }
 
 /**
@@ -150,6 +220,6 @@ export async function assignBranch(orderId, branchId) {
     }
 }
 
-export default { findBestBranch, suggestBranch, assignBranch };
+export default { findBestBranch, suggestBranch, assignBranch, invalidateBranchIndex };
 
 
@@ -0,0 +1,199 @@
+/**
+ * Branch Spatial Index
+ * In-memory index of active branches for order assignment.
+ *
+ * - Branch coordinates are stored as points on the unit sphere in a k-d tree; the straight-line
+ *   distance between two such points grows with the great-circle distance, so the nearest
+ *   point in the tree is also the nearest branch by haversine, without longitude wrap-around
+ * - Nearest-branch queries are O(log n) on average
+ * - Zone → branches maps are precomputed from assignedZones; zones served by many branches get
+ *   their own tree, small ones are scanned
+ * - Built once from a list of branches and never mutated: rebuild it when branches change
+ */
+
+const EARTH_RADIUS_KM = 6371;
+const ZONE_TREE_MIN_BRANCHES = 8;
+
+const toRad = (d) => (d * Math.PI) / 180;
+
+// Haversine distance in kilometers
+const haversineKm = (lat1, lon1, lat2, lon2) => {
+    const dLat = toRad(lat2 - lat1);
+    const dLon = toRad(lon2 - lon1);
+    const a =
+        Math.sin(dLat / 2) * Math.sin(dLat / 2) +
+        Math.cos(toRad(lat1)) * Math.cos(toRad(lat2)) *
+        Math.sin(dLon / 2) * Math.sin(dLon / 2);
+    const c = 2 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
+    return EARTH_RADIUS_KM * c;
+};
+
+/**
+ * Customer coordinates of an order address, or null
+ */
+const addressPoint = (address) => {
+    const latitude = address?.coordinates?.latitude ?? address?.lat;
+    const longitude = address?.coordinates?.longitude ?? address?.lng;
+    if (typeof latitude !== 'number' || typeof longitude !== 'number') return null;
+    return { latitude, longitude };
+};
+
+const branchPoint = (branch) => {
+    const latitude = branch?.address?.coordinates?.latitude;
+    const longitude = branch?.address?.coordinates?.longitude;
+    if (typeof latitude !== 'number' || typeof longitude !== 'number') return null;
+    return { latitude, longitude };
+};
+
+const toVector = ({ latitude, longitude }) => {
+    const lat = toRad(latitude);
+    const lon = toRad(longitude);
+    return [Math.cos(lat) * Math.cos(lon), Math.cos(lat) * Math.sin(lon), Math.sin(lat)];
+};
+
+const squaredDistance = (a, b) => {
+    const dx = a[0] - b[0];
+    const dy = a[1] - b[1];
+    const dz = a[2] - b[2];
+    return dx * dx + dy * dy + dz * dz;
+};
+
+/**
+ * Nearest branch by linear haversine scan (first one wins on equal distance)
+ */
+const pickNearestByCoordinates = (branches, address) => {
+    const point = addressPoint(address);
+    if (!point) return null;
+
+    let best = null;
+    let bestKm = Number.POSITIVE_INFINITY;
+
+    for (const branch of branches) {
+        const location = branchPoint(branch);
+        if (!location) continue;
+        const km = haversineKm(point.latitude, point.longitude, location.latitude, location.longitude);
+        if (km < bestKm) {
+            bestKm = km;
+            best = branch;
+        }
+    }
+    return best;
+};
+
+// entries: [{ vector, order, branch }], order = position in the branch list (tie-break)
+const buildTree = (entries, depth = 0) => {
+    if (entries.length === 0) return null;
+
+    const axis = depth % 3;
+    entries.sort((a, b) => a.vector[axis] - b.vector[axis]);
+    const median = entries.length >> 1;
+
+    return {
+        entry: entries[median],
+        axis,
+        left: buildTree(entries.slice(0, median), depth + 1),
+        right: buildTree(entries.slice(median + 1), depth + 1)
+    };
+};
+
+const searchTree = (node, target, best) => {
+    if (!node) return;
+
+    const distance = squaredDistance(target, node.entry.vector);
+    if (distance < best.distance || (distance === best.distance && node.entry.order < best.entry.order)) {
+        best.distance = distance;
+        best.entry = node.entry;
+    }
+    best.visited++;
+
+    const diff = target[node.axis] - node.entry.vector[node.axis];
+    const [near, far] = diff < 0 ? [node.left, node.right] : [node.right, node.left];
+    searchTree(near, target, best);
+    if (diff * diff <= best.distance) {
+        searchTree(far, target, best);
+    }
+};
+
+class BranchSpatialIndex {
+    /**
+     * @param {Array<object>} branches - active branches, in the order the fallback should use
+     */
+    constructor(branches = []) {
+        this.branches = branches;
+        this.builtAt = Date.now();
+
+        const entries = [];
+        branches.forEach((branch, order) => {
+            const location = branchPoint(branch);
+            if (location) entries.push({ vector: toVector(location), order, branch });
+        });
+        this.located = entries.length;
+        this.tree = buildTree(entries);
+
+        // zoneId -> { branches, tree }
+        this.zones = new Map();
+        branches.forEach((branch) => {
+            for (const zoneId of Array.isArray(branch.assignedZones) ? branch.assignedZones : []) {
+                if (!this.zones.has(zoneId)) this.zones.set(zoneId, { branches: [], tree: null });
+                this.zones.get(zoneId).branches.push(branch);
+            }
+        });
+        const entryOf = new Map(entries.map(entry => [entry.branch, entry]));
+        for (const zone of this.zones.values()) {
+            if (zone.branches.length >= ZONE_TREE_MIN_BRANCHES) {
+                zone.tree = buildTree(zone.branches.map(branch => entryOf.get(branch)).filter(Boolean));
+            }
+        }
+    }
+
+    /**
+     * Nearest located branch to a point
+     * @returns {{branch: object, visited: number}|null}
+     */
+    nearest(point, tree = this.tree) {
+        if (!point || !tree) return null;
+
+        const best = { entry: null, distance: Number.POSITIVE_INFINITY, visited: 0 };
+        searchTree(tree, toVector(point), best);
+        return best.entry ? { branch: best.entry.branch, visited: best.visited } : null;
+    }
+
+    /**
+     * Best branch for an order
+     * Priority: assignedZones by delivery.zoneId -> nearest by coordinates if available -> first active branch
+     */
+    findBest({ delivery, address } = {}) {
+        if (this.branches.length === 0) return null;
+        const point = addressPoint(address);
+
+        // 1) Zone-based match
+        const zone = delivery?.zoneId ? this.zones.get(delivery.zoneId) : null;
+        if (zone) {
+            if (zone.branches.length === 1) return zone.branches[0];
+            // If multiple, try nearest by coordinates if available
+            const best = zone.tree
+                ? this.nearest(point, zone.tree)?.branch
+                : pickNearestByCoordinates(zone.branches, address);
+            return best || zone.branches[0];
+        }
+
+        // 2) Nearest by coordinates if customer address has coords and branches have coords
+        const nearest = this.nearest(point);
+        if (nearest) return nearest.branch;
+
+        // 3) Fallback: first active branch
+        return this.branches[0];
+    }
+
+    getStats() {
+        return {
+            branches: this.branches.length,
+            located: this.located,
+            zones: this.zones.size,
+            builtAt: this.builtAt
+        };
+    }
+}
+
+export default BranchSpatialIndex;
+export { BranchSpatialIndex, haversineKm, addressPoint, branchPoint, pickNearestByCoordinates };
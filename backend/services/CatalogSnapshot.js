@@ -0,0 +1,430 @@
+import crypto from 'crypto';
+import productModel from '../models/ProductModel.js';
+import categoryModel from '../models/CategoryModel.js';
+import eventEmitter from '../utils/eventEmitter.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Catalog Snapshot
+ * In-memory copy of the product catalog behind /api/product/list, /price-range and /facets.
+ *
+ * - Loaded once at startup, then kept current from the updatedAt timestamps of products and
+ *   categories: every syncIntervalMs (writes made by other instances and scripts) and right
+ *   after a write in this process (model hooks emit 'catalog:changed'). Deletes don't leave an
+ *   updatedAt behind, so the sync reloads everything when the collection counts disagree
+ * - List responses are serialized once per snapshot version and variant (active/all, in stock,
+ *   full/card projection) with a content hash as ETag, so a request costs neither a Mongo
+ *   query nor a JSON.stringify, and unchanged lists answer 304 on any instance
+ * - Price bounds and facets (categories, labels, sizes, ...) are computed with each version
+ * - Until the first load completes, callers fall back to querying MongoDB
+ */
+
+const CATEGORY_FIELDS = ['_id', 'name', 'slug', 'active'];
+
+// Storefront product cards: enough to render a grid and filter it
+const CARD_FIELDS = [
+    '_id', 'name', 'slug', 'sku', 'image', 'basePrice', 'sizes', 'sizePrices', 'personCounts',
+    'bestseller', 'stock', 'labels', 'freshType', 'packaging', 'giftWrap', 'subCategory', 'date', 'active'
+];
+
+const pick = (doc, fields) => {
+    const picked = {};
+    for (const field of fields) {
+        if (doc[field] !== undefined) picked[field] = doc[field];
+    }
+    return picked;
+};
+
+/**
+ * Min/max over basePrice and sizePrices of active products, in TL (prices are in kuruş)
+ */
+const priceBounds = (products) => {
+    let min = Infinity;
+    let max = -Infinity;
+
+    for (const product of products) {
+        if (product.active !== true) continue;
+        for (const price of [product.basePrice, ...(product.sizePrices || []).map(sp => sp.price)]) {
+            if (typeof price !== 'number' || Number.isNaN(price)) continue;
+            if (price < min) min = price;
+            if (price > max) max = price;
+        }
+    }
+
+    if (min === Infinity) return { minPrice: 0, maxPrice: 10000 };
+    return { minPrice: Math.floor(min / 100), maxPrice: Math.ceil(max / 100) };
+};
+
+/**
+ * Facet counts over storefront (not soft-deleted) products
+ */
+const buildFacets = (products, categories) => {
+    const counters = {
+        categories: new Map(),
+        labels: new Map(),
+        sizes: new Map(),
+        personCounts: new Map(),
+        freshType: new Map(),
+        packaging: new Map()
+    };
+    const count = (map, key) => {
+        if (key === undefined || key === null || key === '') return;
+        map.set(key, (map.get(key) || 0) + 1);
+    };
+    let inStock = 0;
+    let bestseller = 0;
+
+    for (const product of products) {
+        if (product.active === false) continue;
+
+        count(counters.categories, product.category ? String(product.category) : null);
+        new Set(product.labels || []).forEach(label => count(counters.labels, label));
+        new Set(product.sizes || []).forEach(size => count(counters.sizes, size));
+        new Set(product.personCounts || []).forEach(personCount => count(counters.personCounts, personCount));
+        count(counters.freshType, product.freshType);
+        count(counters.packaging, product.packaging);
+        if (Number(product.stock || 0) > 0) inStock++;
+        if (product.bestseller) bestseller++;
+    }
+
+    const values = (map) => Array.from(map, ([value, total]) => ({ value, count: total }))
+        .sort((a, b) => b.count - a.count || String(a.value).localeCompare(String(b.value), 'tr'));
+
+    return {
+        categories: Array.from(counters.categories, ([id, total]) => {
+            const category = categories.get(id);
+            return { _id: id, name: category?.name || null, slug: category?.slug || null, count: total };
+        }).sort((a, b) => b.count - a.count),
+        labels: values(counters.labels),
+        sizes: values(counters.sizes),
+        personCounts: values(counters.personCounts),
+        freshType: values(counters.freshType),
+        packaging: values(counters.packaging),
+        inStock,
+        bestseller
+    };
+};
+
+class CatalogSnapshot {
+    constructor(config = {}) {
+        this.config = {
+            syncIntervalMs: config.syncIntervalMs || parseInt(process.env.CATALOG_SYNC_INTERVAL_MS) || 5000,
+            // Re-read writes this close to the last one seen (app clocks of instances differ)
+            clockSkewMs: config.clockSkewMs ?? 5000,
+            // Coalesce bursts of local writes (e.g. checkouts taking stock) into one sync
+            changeDelayMs: config.changeDelayMs ?? 250
+        };
+
+        this.products = new Map();
+        this.categories = new Map();
+        this.ready = false;
+        this.version = 0;
+        this.productsSeenAt = 0;
+        this.categoriesSeenAt = 0;
+
+        // Derived from the current version, built on first use
+        this.sorted = null;
+        this.bodies = new Map();
+        this.derived = null;
+
+        this.syncing = null;
+        this.resync = false;
+        this.changeTimer = null;
+        this.interval = null;
+
+        this.metrics = {
+            fullLoads: 0,
+            syncs: 0,
+            syncErrors: 0,
+            productsApplied: 0,
+            bodiesBuilt: 0,
+            lastSyncAt: null,
+            lastSyncMs: 0
+        };
+
+        // Called with { type: 'reset' | 'products' | 'removed' | 'categories', ... } (e.g. ProductSearchIndex)
+        this.listeners = [];
+        this.loading = false;
+
+        this.onChange = this.onChange.bind(this);
+    }
+
+    /**
+     * Follow catalog changes; a listener added after the first load gets a reset right away
+     */
+    subscribe(listener) {
+        this.listeners.push(listener);
+        if (this.ready) this.notify(listener, { type: 'reset' });
+    }
+
+    notify(listener, change) {
+        try {
+            listener(change);
+        } catch (error) {
+            logger.error('Catalog snapshot listener failed', { type: change.type, error: error.message });
+        }
+    }
+
+    publish(change) {
+        if (this.loading) return;
+        for (const listener of this.listeners) this.notify(listener, change);
+    }
+
+    async initialize() {
+        if (this.interval) return;
+
+        await this.load();
+        eventEmitter.on('catalog:changed', this.onChange);
+        this.interval = setInterval(() => this.sync().catch(() => {}), this.config.syncIntervalMs);
+        this.interval.unref?.();
+
+        logger.info('Catalog snapshot loaded', { products: this.products.size, categories: this.categories.size });
+    }
+
+    stop() {
+        clearInterval(this.interval);
+        clearTimeout(this.changeTimer);
+        eventEmitter.off('catalog:changed', this.onChange);
+        this.interval = null;
+    }
+
+    /**
+     * A product or category was written in this process
+     */
+    onChange() {
+        if (this.changeTimer || !this.ready) return;
+        this.changeTimer = setTimeout(() => {
+            this.changeTimer = null;
+            this.sync().catch(() => {});
+        }, this.config.changeDelayMs);
+    }
+
+    /**
+     * Load the whole catalog
+     */
+    async load() {
+        const [products, categories] = await Promise.all([
+            productModel.find({}).select('-stockHolds').lean(),
+            categoryModel.find({}).select(`${CATEGORY_FIELDS.join(' ')} updatedAt`).lean()
+        ]);
+
+        this.products = new Map();
+        this.categories = new Map();
+        this.productsSeenAt = 0;
+        this.categoriesSeenAt = 0;
+        this.loading = true;
+        try {
+            this.applyCategories(categories);
+            this.applyProducts(products);
+        } finally {
+            this.loading = false;
+        }
+        this.ready = true;
+        this.metrics.fullLoads++;
+        this.publish({ type: 'reset' });
+    }
+
+    /**
+     * Pick up products and categories written since the last sync
+     */
+    sync() {
+        if (this.syncing) {
+            // A write may have landed after the running sync's queries; go again when it's done
+            this.resync = true;
+            return this.syncing;
+        }
+
+        this.syncing = this.runSync().finally(() => {
+            this.syncing = null;
+            if (this.resync) {
+                this.resync = false;
+                this.sync().catch(() => {});
+            }
+        });
+        return this.syncing;
+    }
+
+    async runSync() {
+        const startedAt = Date.now();
+
+        try {
+            const [products, categories] = await Promise.all([
+                productModel
+                    .find({ updatedAt: { $gte: new Date(this.productsSeenAt - this.config.clockSkewMs) } })
+                    .select('-stockHolds')
+                    .lean(),
+                categoryModel
+                    .find({ updatedAt: { $gte: new Date(this.categoriesSeenAt - this.config.clockSkewMs) } })
+                    .select(`${CATEGORY_FIELDS.join(' ')} updatedAt`)
+                    .lean()
+            ]);
+
+            this.applyCategories(categories);
+            this.applyProducts(products);
+
+            // Deletes leave nothing to sync from; a count mismatch means something went away
+            const [productCount, categoryCount] = await Promise.all([
+                productModel.countDocuments({}),
+                categoryModel.countDocuments({})
+            ]);
+            if (productCount !== this.products.size || categoryCount !== this.categories.size) {
+                await this.load();
+            }
+
+            this.metrics.syncs++;
+        } catch (error) {
+            this.metrics.syncErrors++;
+            logger.error('Catalog snapshot sync failed', { error: error.message });
+            throw error;
+        } finally {
+            this.metrics.lastSyncAt = startedAt;
+            this.metrics.lastSyncMs = Date.now() - startedAt;
+        }
+    }
+
+    /**
+     * Apply product documents (lean, category as an id); returns whether anything changed
+     */
+    applyProducts(docs) {
+        const changed = [];
+
+        for (const doc of docs) {
+            const id = String(doc._id);
+            const updatedAt = new Date(doc.updatedAt || 0).getTime();
+            if (updatedAt > this.productsSeenAt) this.productsSeenAt = updatedAt;
+
+            const current = this.products.get(id);
+            if (current && new Date(current.updatedAt || 0).getTime() === updatedAt && current.stock === doc.stock) continue;
+
+            this.products.set(id, doc);
+            this.metrics.productsApplied++;
+            changed.push(doc);
+        }
+
+        if (changed.length === 0) return false;
+        this.bump();
+        this.publish({ type: 'products', products: changed });
+        return true;
+    }
+
+    removeProducts(ids) {
+        const removed = ids.map(String).filter(id => this.products.delete(id));
+        if (removed.length === 0) return false;
+
+        this.bump();
+        this.publish({ type: 'removed', ids: removed });
+        return true;
+    }
+
+    applyCategories(docs) {
+        const changed = [];
+
+        for (const doc of docs) {
+            const id = String(doc._id);
+            const updatedAt = new Date(doc.updatedAt || 0).getTime();
+            if (updatedAt > this.categoriesSeenAt) this.categoriesSeenAt = updatedAt;
+
+            const current = this.categories.get(id);
+            if (current && new Date(current.updatedAt || 0).getTime() === updatedAt) continue;
+
+            this.categories.set(id, doc);
+            changed.push(doc);
+        }
+
+        if (changed.length === 0) return false;
+        this.bump();
+        this.publish({ type: 'categories', categories: changed });
+        return true;
+    }
+
+    bump() {
+        this.version++;
+        this.sorted = null;
+        this.bodies.clear();
+        this.derived = null;
+    }
+
+    /**
+     * Products newest first, as listProducts sorts them
+     */
+    getSorted() {
+        if (!this.sorted) {
+            this.sorted = Array.from(this.products.values()).sort((a, b) => (b.date || 0) - (a.date || 0));
+        }
+        return this.sorted;
+    }
+
+    /**
+     * Product as listProducts returned it: category populated with name, slug and active
+     */
+    present(product, view) {
+        const presented = view === 'card' ? pick(product, CARD_FIELDS) : { ...product };
+        const category = product.category ? this.categories.get(String(product.category)) : null;
+        presented.category = category ? pick(category, CATEGORY_FIELDS) : null;
+        return presented;
+    }
+
+    /**
+     * Serialized list response and its ETag
+     * @param {object} options - { includeDeleted, inStockOnly, view: 'full' | 'card' }
+     */
+    getList({ includeDeleted = false, inStockOnly = false, view = 'full' } = {}) {
+        const variant = `${includeDeleted ? 'all' : 'active'}|${inStockOnly ? 'inStock' : 'any'}|${view}`;
+        let cached = this.bodies.get(variant);
+
+        if (!cached) {
+            const products = this.getSorted()
+                .filter(product => includeDeleted || product.active !== false)
+                .filter(product => !inStockOnly || Number(product.stock || 0) > 0)
+                .map(product => this.present(product, view));
+
+            const body = JSON.stringify({ success: true, products });
+            cached = {
+                body,
+                etag: `W/"${crypto.createHash('sha1').update(body).digest('base64url')}"`,
+                count: products.length
+            };
+            this.bodies.set(variant, cached);
+            this.metrics.bodiesBuilt++;
+        }
+
+        return cached;
+    }
+
+    getPriceRange() {
+        return this.getDerived().priceRange;
+    }
+
+    getFacets() {
+        return this.getDerived().facets;
+    }
+
+    getDerived() {
+        if (!this.derived) {
+            const products = this.getSorted();
+            this.derived = {
+                priceRange: priceBounds(products),
+                facets: buildFacets(products, this.categories)
+            };
+        }
+        return this.derived;
+    }
+
+    getStats() {
+        return {
+            ready: this.ready,
+            version: this.version,
+            products: this.products.size,
+            categories: this.categories.size,
+            cachedBodies: this.bodies.size,
+            ...this.metrics
+        };
+    }
+}
+
+// Export singleton instance
+const catalogSnapshot = new CatalogSnapshot();
+export default catalogSnapshot;
+
+// Also export class for testing
+export { CatalogSnapshot, priceBounds, buildFacets };
@@ -1,87 +1,205 @@
+import os from 'os';
 import CourierIntegrationConfigModel from '../models/CourierIntegrationConfigModel.js';
 import logger from '../utils/logger.js';
-import { setInNamespace, getFromNamespace, deleteFromNamespace, isRedisAvailable } from '../config/redis.js';
+import { Histogram } from '../utils/histogram.js';
+import { setInNamespace, getFromNamespace, isRedisAvailable } from '../config/redis.js';
 
 /**
  * Circuit Breaker Service
  * Implements circuit breaker pattern to prevent cascading failures
  * States: CLOSED (normal), OPEN (failing), HALF_OPEN (testing)
  *
- * Now uses Redis for distributed state management to support horizontal scaling
+ * - Calls are tracked in a sliding window of time buckets (windowSize split into windowBuckets):
+ *   call count, failures, slow calls and a latency histogram per bucket
+ * - The circuit opens on failureThreshold consecutive failures, or, once the window holds
+ *   minimumCalls calls, on the failure rate, the slow-call rate or the latency percentile;
+ *   a provider that answers slowly ties up connections as much as one that fails.
+ *   Calls still in flight past slowCallDurationMs count as slow, and when at least
+ *   minimumSlowInFlight of them make up slowCallRateThreshold of the calls in flight the
+ *   circuit opens right away: a provider that stops answering fills the submission slots
+ *   long before its calls time out or dilute the window
+ * - Provider failures are thrown errors other than 4xx (except 408/429), and results with
+ *   { success: false, retryable: true }, since the courier services return their errors
+ * - OPEN lasts `timeout`, doubling (up to maxTimeout) each time the probes fail again.
+ *   HALF_OPEN lets halfOpenRequests probes through at once and closes after as many
+ *   fast successes; a failed or slow probe reopens the circuit
+ * - State is shared through Redis without a write per call: each instance keeps its own
+ *   window, writes only its OPEN/CLOSED transitions, and reads the shared state at most
+ *   every syncIntervalMs to pick up a circuit another instance opened or closed
  */
 
+const CLOSED = 'CLOSED';
+const OPEN = 'OPEN';
+const HALF_OPEN = 'HALF_OPEN';
+
+const INSTANCE_ID = `${os.hostname()}:${process.pid}`;
+const MAX_STATE_CHANGES = 50;
+
+const envInt = (name, fallback) => parseInt(process.env[name]) || fallback;
+
+/**
+ * Whether a thrown error counts against the provider
+ */
+const isFailure = (error) => {
+    const status = error?.statusCode ?? error?.response?.status;
+    if (status >= 400 && status < 500) {
+        return status === 408 || status === 429;
+    }
+    return true;
+};
+
+/**
+ * Whether a returned result counts against the provider (services report API errors this way)
+ */
+const isFailedResult = (result) => result?.success === false && result.retryable === true;
+
+/**
+ * Call outcomes over the last windowMs, in windowBuckets time buckets
+ */
+class SlidingWindow {
+    constructor(windowMs, bucketCount) {
+        this.bucketMs = Math.max(1, Math.floor(windowMs / bucketCount));
+        this.buckets = Array.from({ length: bucketCount }, () => this.emptyBucket(-1));
+    }
+
+    emptyBucket(start) {
+        return { start, calls: 0, failures: 0, slow: 0, latency: new Histogram() };
+    }
+
+    record(durationMs, { failed, slow }, now = Date.now()) {
+        const start = now - (now % this.bucketMs);
+        const index = Math.floor(now / this.bucketMs) % this.buckets.length;
+        let bucket = this.buckets[index];
+        if (bucket.start !== start) {
+            bucket = this.emptyBucket(start);
+            this.buckets[index] = bucket;
+        }
+
+        bucket.calls++;
+        if (failed) bucket.failures++;
+        if (slow) bucket.slow++;
+        bucket.latency.observe(durationMs);
+    }
+
+    snapshot(now = Date.now()) {
+        const oldest = now - now % this.bucketMs - (this.buckets.length - 1) * this.bucketMs;
+        const totals = { calls: 0, failures: 0, slow: 0, latency: new Histogram() };
+
+        for (const bucket of this.buckets) {
+            if (bucket.start < oldest) continue;
+            totals.calls += bucket.calls;
+            totals.failures += bucket.failures;
+            totals.slow += bucket.slow;
+            totals.latency.merge(bucket.latency);
+        }
+
+        totals.failureRate = totals.calls > 0 ? totals.failures / totals.calls : 0;
+        totals.slowCallRate = totals.calls > 0 ? totals.slow / totals.calls : 0;
+        return totals;
+    }
+
+    reset() {
+        this.buckets = this.buckets.map(() => this.emptyBucket(-1));
+    }
+}
+
 class CircuitBreaker {
     constructor(platform, config = {}) {
         this.platform = platform;
-        this.useRedis = isRedisAvailable();
 
-        // In-memory state (fallback when Redis unavailable)
-        this.state = 'CLOSED'; // CLOSED, OPEN, HALF_OPEN
-        this.failureCount = 0;
-        this.successCount = 0;
-        this.lastFailureTime = null;
+        this.state = CLOSED;
         this.lastStateChange = Date.now();
-        this.requestCount = 0;
+        this.lastFailureTime = null;
+        this.openUntil = null;
+        // Consecutive openings without a successful recovery (drives the open-time backoff)
+        this.openCount = 0;
+        this.consecutiveFailures = 0;
+        this.probesInFlight = 0;
+        this.probeSuccesses = 0;
+        // Start times of admitted (non-probe) calls, oldest first
+        this.inFlight = new Set();
 
         // Configuration with defaults
         this.config = {
-            failureThreshold: config.failureThreshold || 5,
-            timeout: config.timeout || 60000, // 60 seconds
+            failureThreshold: config.failureThreshold || 5, // consecutive failures
+            failureRateThreshold: config.failureRateThreshold || 0.5,
+            slowCallDurationMs: config.slowCallDurationMs || envInt('CIRCUIT_BREAKER_SLOW_CALL_MS', 3000),
+            slowCallRateThreshold: config.slowCallRateThreshold || 0.5,
+            latencyPercentile: config.latencyPercentile || 0.95,
+            latencyThresholdMs: config.latencyThresholdMs || envInt('CIRCUIT_BREAKER_LATENCY_P95_MS', 10000),
+            minimumCalls: config.minimumCalls || envInt('CIRCUIT_BREAKER_MIN_CALLS', 10),
+            minimumSlowInFlight: config.minimumSlowInFlight || 4,
+            timeout: config.timeout || 60000, // 60 seconds open before probing
+            maxTimeout: config.maxTimeout || 5 * 60000,
             halfOpenRequests: config.halfOpenRequests || 1,
-            resetTimeout: config.resetTimeout || 120000, // 2 minutes for full reset
-            windowSize: config.windowSize || 60000, // 1 minute sliding window
+            windowSize: config.windowSize || envInt('CIRCUIT_BREAKER_WINDOW_MS', 30000), // 30 second sliding window
+            windowBuckets: config.windowBuckets || 10,
+            syncIntervalMs: config.syncIntervalMs ?? envInt('CIRCUIT_BREAKER_SYNC_INTERVAL_MS', 5000),
             enabled: config.enabled !== false // Enabled by default
         };
 
-        // Failure tracking for sliding window
-        this.failureTimestamps = [];
+        this.isFailure = config.isFailure || isFailure;
+        this.isFailedResult = config.isFailedResult || isFailedResult;
+
+        this.window = new SlidingWindow(this.config.windowSize, this.config.windowBuckets);
 
         // Metrics for monitoring
         this.metrics = {
             totalRequests: 0,
             totalFailures: 0,
             totalSuccesses: 0,
+            slowCalls: 0,
+            rejected: 0,
             stateChanges: [],
             lastOpenedAt: null,
             lastClosedAt: null,
-            totalTimeOpen: 0,
-            totalTimeClosed: 0
+            lastTripReason: null,
+            totalTimeOpen: 0
         };
 
         // Redis key namespace
         this.redisNamespace = 'circuitbreaker';
+        this.lastSyncAt = 0;
+        this.syncing = null;
 
-        // Load state from Redis on initialization
-        if (this.useRedis) {
-            this.loadFromRedis().catch(err => {
-                logger.warn('Failed to load circuit breaker state from Redis, using defaults', {
-                    platform: this.platform,
-                    error: err.message
-                });
-            });
-        }
+        // Pick up a circuit another instance already opened
+        this.sync();
     }
 
     /**
-     * Load circuit breaker state from Redis
+     * Read the state shared by other instances and adopt their newer OPEN or CLOSED transition
      */
     async loadFromRedis() {
+        if (!isRedisAvailable()) return;
+
         try {
-            const stateData = await getFromNamespace(this.redisNamespace, `${this.platform}:state`);
-
-            if (stateData) {
-                this.state = stateData.state || 'CLOSED';
-                this.failureCount = stateData.failureCount || 0;
-                this.successCount = stateData.successCount || 0;
-                this.lastFailureTime = stateData.lastFailureTime || null;
-                this.lastStateChange = stateData.lastStateChange || Date.now();
-                this.failureTimestamps = stateData.failureTimestamps || [];
-                this.metrics = stateData.metrics || this.metrics;
-
-                logger.debug('Circuit breaker state loaded from Redis', {
+            const shared = await getFromNamespace(this.redisNamespace, `${this.platform}:state`);
+            if (!shared || shared.instanceId === INSTANCE_ID || !(shared.changedAt > this.lastStateChange)) {
+                return;
+            }
+
+            if (shared.state === OPEN && shared.openUntil > Date.now()) {
+                const from = this.state;
+                this.setState(OPEN, shared.changedAt);
+                this.openUntil = shared.openUntil;
+                this.openCount = shared.openCount || 1;
+                this.window.reset();
+                logger.info('Circuit breaker opened by another instance', {
                     platform: this.platform,
-                    state: this.state
+                    from,
+                    reason: shared.reason,
+                    instanceId: shared.instanceId
                 });
+            } else if (shared.state === CLOSED && this.state !== CLOSED) {
+                const from = this.state;
+                this.close(shared.changedAt);
+                logger.info('Circuit breaker closed by another instance', {
+                    platform: this.platform,
+                    from,
+                    instanceId: shared.instanceId
+                });
+            } else {
+                this.lastStateChange = shared.changedAt;
             }
         } catch (error) {
             logger.error('Error loading circuit breaker state from Redis', {
@@ -92,21 +210,19 @@ class CircuitBreaker {
     }
 
     /**
-     * Save circuit breaker state to Redis
+     * Share an OPEN or CLOSED transition with other instances
      */
-    async saveToRedis() {
-        if (!this.useRedis) return;
+    async saveToRedis(reason = null) {
+        if (!isRedisAvailable()) return;
 
         try {
             const stateData = {
                 state: this.state,
-                failureCount: this.failureCount,
-                successCount: this.successCount,
-                lastFailureTime: this.lastFailureTime,
-                lastStateChange: this.lastStateChange,
-                failureTimestamps: this.failureTimestamps,
-                metrics: this.metrics,
-                updatedAt: Date.now()
+                changedAt: this.lastStateChange,
+                openUntil: this.openUntil,
+                openCount: this.openCount,
+                reason,
+                instanceId: INSTANCE_ID
             };
 
             // Save with TTL of 24 hours
@@ -124,6 +240,18 @@ class CircuitBreaker {
         }
     }
 
+    /**
+     * Refresh from the shared state in the background, at most every syncIntervalMs
+     */
+    sync(now = Date.now()) {
+        if (this.syncing || now - this.lastSyncAt < this.config.syncIntervalMs || !isRedisAvailable()) return;
+
+        this.lastSyncAt = now;
+        this.syncing = this.loadFromRedis().finally(() => {
+            this.syncing = null;
+        });
+    }
+
     /**
      * Execute operation with circuit breaker protection
      */
@@ -133,259 +261,286 @@ class CircuitBreaker {
             return await operation();
         }
 
+        this.sync();
         this.metrics.totalRequests++;
-        this.requestCount++;
-
-        // Check circuit state
-        const currentState = this.getState();
 
-        if (currentState === 'OPEN') {
-            // Check if we should transition to HALF_OPEN
-            if (this.shouldAttemptReset()) {
-                this.transitionTo('HALF_OPEN');
-            } else {
-                // Reject request immediately
-                const error = new Error('Circuit breaker is OPEN');
-                error.code = 'CIRCUIT_OPEN';
-                error.statusCode = 503;
-                error.retryable = true;
-                error.retryAfter = this.getTimeUntilReset();
-
-                logger.warn('Circuit breaker rejected request', {
-                    platform: this.platform,
-                    state: this.state,
-                    context,
-                    timeUntilReset: error.retryAfter
-                });
+        const probe = this.acquire(context);
+        const call = { startedAt: Date.now() };
+        const startTime = performance.now();
+        if (!probe) this.inFlight.add(call);
 
-                throw error;
-            }
+        let result;
+        try {
+            result = await operation();
+        } catch (error) {
+            this.inFlight.delete(call);
+            this.onComplete(performance.now() - startTime, probe, this.isFailure(error) ? error : null);
+            throw error;
         }
 
-        // Execute operation
-        try {
-            const startTime = Date.now();
-            const result = await operation();
-            const duration = Date.now() - startTime;
+        this.inFlight.delete(call);
+        const failed = this.isFailedResult(result);
+        this.onComplete(performance.now() - startTime, probe, failed ? result.error || result : null);
+        return result;
+    }
 
-            // Record success
-            this.onSuccess(duration);
+    /**
+     * Admitted calls running longer than slowCallDurationMs
+     */
+    countOverdue(now = Date.now()) {
+        const cutoff = now - this.config.slowCallDurationMs;
+        let overdue = 0;
+        for (const call of this.inFlight) {
+            if (call.startedAt > cutoff) break;
+            overdue++;
+        }
+        return overdue;
+    }
 
-            return result;
+    /**
+     * Admit a call or reject it with CIRCUIT_OPEN
+     * @returns {boolean} Whether the call is a half-open probe
+     */
+    acquire(context) {
+        if (this.state === OPEN && Date.now() >= this.openUntil) {
+            this.transitionTo(HALF_OPEN);
+        }
 
-        } catch (error) {
-            // Record failure
-            this.onFailure(error);
+        if (this.state === CLOSED) {
+            // Only look at the window again when calls are hanging
+            const reason = this.countOverdue() > 0 ? this.tripReason() : null;
+            if (!reason) return false;
+            this.trip(reason);
+        }
 
-            // Re-throw error
-            throw error;
+        if (this.state === HALF_OPEN && this.probesInFlight < this.config.halfOpenRequests) {
+            this.probesInFlight++;
+            return true;
         }
+
+        this.metrics.rejected++;
+
+        const error = new Error(`Circuit breaker is ${this.state}`);
+        error.code = 'CIRCUIT_OPEN';
+        error.statusCode = 503;
+        error.retryable = true;
+        error.retryAfter = this.getTimeUntilReset();
+
+        logger.warn('Circuit breaker rejected request', {
+            platform: this.platform,
+            state: this.state,
+            context,
+            timeUntilReset: error.retryAfter
+        });
+
+        throw error;
     }
 
     /**
-     * Handle successful operation
+     * Record a finished call and trip or recover the circuit
+     * @param {Error|object|null} failure - Provider failure, or null on success
      */
-    onSuccess(duration) {
-        this.metrics.totalSuccesses++;
-        this.successCount++;
-
-        if (this.state === 'HALF_OPEN') {
-            // Success in HALF_OPEN state
-            if (this.successCount >= this.config.halfOpenRequests) {
-                // Enough successful requests, close circuit
-                this.transitionTo('CLOSED');
-                logger.info('Circuit breaker recovered', {
+    onComplete(duration, probe, failure) {
+        const slow = duration >= this.config.slowCallDurationMs;
+
+        if (failure) {
+            this.metrics.totalFailures++;
+            this.consecutiveFailures++;
+            this.lastFailureTime = Date.now();
+
+            logger.warn('Circuit breaker failure', {
+                platform: this.platform,
+                state: this.state,
+                consecutiveFailures: this.consecutiveFailures,
+                duration: Math.round(duration),
+                error: {
+                    message: failure.message,
+                    code: failure.code,
+                    statusCode: failure.statusCode
+                }
+            });
+        } else {
+            this.metrics.totalSuccesses++;
+            this.consecutiveFailures = 0;
+        }
+        if (slow) this.metrics.slowCalls++;
+
+        if (probe) {
+            this.probesInFlight = Math.max(0, this.probesInFlight - 1);
+            // Reset or another instance may have moved the circuit while the probe ran
+            if (this.state !== HALF_OPEN) return;
+
+            if (failure || slow) {
+                logger.error('Circuit breaker test failed, reopening', {
                     platform: this.platform,
-                    successCount: this.successCount,
-                    duration
+                    duration: Math.round(duration),
+                    error: failure?.message
                 });
+                this.transitionTo(OPEN, failure ? 'probe_failed' : 'probe_slow');
+                return;
             }
-        } else if (this.state === 'CLOSED') {
-            // Reset failure count on success in CLOSED state
-            if (this.failureCount > 0) {
-                this.failureCount = Math.max(0, this.failureCount - 1);
+
+            this.probeSuccesses++;
+            if (this.probeSuccesses >= this.config.halfOpenRequests) {
+                this.transitionTo(CLOSED);
+                logger.info('Circuit breaker recovered', {
+                    platform: this.platform,
+                    probes: this.probeSuccesses,
+                    duration: Math.round(duration)
+                });
             }
+            return;
         }
 
-        logger.debug('Circuit breaker success', {
-            platform: this.platform,
-            state: this.state,
-            successCount: this.successCount,
-            failureCount: this.failureCount,
-            duration
-        });
+        this.window.record(duration, { failed: !!failure, slow });
+        if (this.state !== CLOSED) return;
 
-        // Persist to Redis (async, non-blocking)
-        this.saveToRedis().catch(err => {
-            logger.warn('Failed to save circuit breaker state after success', {
-                platform: this.platform,
-                error: err.message
-            });
-        });
+        const reason = this.tripReason();
+        if (reason) {
+            this.trip(reason, failure);
+        }
     }
 
     /**
-     * Handle failed operation
+     * Why the circuit should open now, or null
      */
-    onFailure(error) {
-        this.metrics.totalFailures++;
-        this.failureCount++;
-        this.lastFailureTime = Date.now();
+    tripReason() {
+        if (this.consecutiveFailures >= this.config.failureThreshold) return 'consecutive_failures';
+
+        const overdue = this.countOverdue();
+        if (overdue >= this.config.minimumSlowInFlight &&
+            overdue / this.inFlight.size >= this.config.slowCallRateThreshold) {
+            return 'slow_calls_in_flight';
+        }
 
-        // Add to sliding window
-        this.failureTimestamps.push(Date.now());
-        this.cleanupOldFailures();
+        const window = this.window.snapshot();
+        const calls = window.calls + overdue;
+        if (calls < this.config.minimumCalls) return null;
 
-        // Check failure rate in sliding window
-        const failureRate = this.getFailureRate();
+        if (window.failures / calls >= this.config.failureRateThreshold) return 'failure_rate';
+        if ((window.slow + overdue) / calls >= this.config.slowCallRateThreshold) return 'slow_call_rate';
+        if (window.latency.percentile(this.config.latencyPercentile) >= this.config.latencyThresholdMs) {
+            return 'latency_percentile';
+        }
+        return null;
+    }
 
-        logger.warn('Circuit breaker failure', {
+    trip(reason, failure = null) {
+        const window = this.window.snapshot();
+        logger.error('Circuit breaker opened', {
             platform: this.platform,
-            state: this.state,
-            failureCount: this.failureCount,
-            failureRate,
-            error: {
-                message: error.message,
-                code: error.code,
-                statusCode: error.statusCode
-            }
+            reason,
+            consecutiveFailures: this.consecutiveFailures,
+            calls: window.calls,
+            callsInFlight: this.inFlight.size,
+            failureRate: window.failureRate,
+            slowCallRate: window.slowCallRate,
+            latencyPercentile: Math.round(window.latency.percentile(this.config.latencyPercentile))
         });
 
-        if (this.state === 'HALF_OPEN') {
-            // Failure in HALF_OPEN state - immediately open
-            this.transitionTo('OPEN');
-            logger.error('Circuit breaker test failed, reopening', {
-                platform: this.platform,
-                error: error.message
-            });
+        this.transitionTo(OPEN, reason);
+        this.sendAlert('opened', { reason, error: failure?.message });
+    }
 
-        } else if (this.state === 'CLOSED') {
-            // Check if we should open the circuit
-            if (this.failureCount >= this.config.failureThreshold ||
-                failureRate > 0.5) { // More than 50% failure rate
-                this.transitionTo('OPEN');
-                logger.error('Circuit breaker opened due to failures', {
-                    platform: this.platform,
-                    failureCount: this.failureCount,
-                    threshold: this.config.failureThreshold,
-                    failureRate
-                });
+    setState(newState, changedAt = Date.now()) {
+        const oldState = this.state;
+        this.state = newState;
+        this.lastStateChange = changedAt;
 
-                // Send alert
-                this.sendAlert('opened', error);
+        this.metrics.stateChanges.push({ from: oldState, to: newState, timestamp: changedAt });
+        if (this.metrics.stateChanges.length > MAX_STATE_CHANGES) {
+            this.metrics.stateChanges.shift();
+        }
+
+        if (newState === OPEN && oldState !== OPEN) {
+            this.metrics.lastOpenedAt = changedAt;
+        } else if (newState === CLOSED && oldState !== CLOSED) {
+            this.metrics.lastClosedAt = changedAt;
+            if (this.metrics.lastOpenedAt) {
+                this.metrics.totalTimeOpen += changedAt - this.metrics.lastOpenedAt;
             }
         }
+    }
 
-        // Persist to Redis (async, non-blocking)
-        this.saveToRedis().catch(err => {
-            logger.warn('Failed to save circuit breaker state after failure', {
-                platform: this.platform,
-                error: err.message
-            });
-        });
+    close(changedAt = Date.now()) {
+        this.setState(CLOSED, changedAt);
+        this.openUntil = null;
+        this.openCount = 0;
+        this.consecutiveFailures = 0;
+        this.probesInFlight = 0;
+        this.probeSuccesses = 0;
+        this.window.reset();
     }
 
     /**
      * Transition to a new state
      */
-    transitionTo(newState) {
+    transitionTo(newState, reason = null) {
         const oldState = this.state;
-        this.state = newState;
-        this.lastStateChange = Date.now();
-
-        // Reset counters
-        this.failureCount = 0;
-        this.successCount = 0;
 
-        // Track metrics
-        this.metrics.stateChanges.push({
-            from: oldState,
-            to: newState,
-            timestamp: Date.now()
-        });
-
-        if (newState === 'OPEN') {
-            this.metrics.lastOpenedAt = Date.now();
-        } else if (newState === 'CLOSED') {
-            this.metrics.lastClosedAt = Date.now();
-            if (this.metrics.lastOpenedAt) {
-                this.metrics.totalTimeOpen += Date.now() - this.metrics.lastOpenedAt;
-            }
+        if (newState === OPEN) {
+            this.setState(OPEN);
+            this.openCount = oldState === HALF_OPEN ? this.openCount + 1 : 1;
+            this.openUntil = Date.now() + this.getOpenDuration();
+            this.probesInFlight = 0;
+            this.metrics.lastTripReason = reason;
+            this.window.reset();
+        } else if (newState === HALF_OPEN) {
+            this.setState(HALF_OPEN);
+            this.probesInFlight = 0;
+            this.probeSuccesses = 0;
+        } else {
+            this.close();
         }
 
         logger.info('Circuit breaker state transition', {
             platform: this.platform,
             from: oldState,
             to: newState,
-            requestCount: this.requestCount
+            reason,
+            openUntil: this.openUntil
         });
 
-        // Persist state change to Redis immediately (sync for critical state changes)
-        this.saveToRedis().catch(err => {
-            logger.error('Failed to save circuit breaker state after transition', {
-                platform: this.platform,
-                from: oldState,
-                to: newState,
-                error: err.message
+        // Probing is local; only OPEN and CLOSED are shared
+        if (newState !== HALF_OPEN) {
+            this.saveToRedis(reason).catch(err => {
+                logger.error('Failed to save circuit breaker state after transition', {
+                    platform: this.platform,
+                    from: oldState,
+                    to: newState,
+                    error: err.message
+                });
             });
-        });
+        }
     }
 
     /**
-     * Check if we should attempt to reset (transition to HALF_OPEN)
+     * How long the circuit stays open: timeout, doubled for each failed recovery
      */
-    shouldAttemptReset() {
-        if (!this.lastFailureTime) return false;
-
-        const timeSinceLastFailure = Date.now() - this.lastFailureTime;
-        return timeSinceLastFailure >= this.config.timeout;
+    getOpenDuration() {
+        return Math.min(this.config.timeout * 2 ** Math.max(0, this.openCount - 1), this.config.maxTimeout);
     }
 
     /**
      * Get time until circuit reset attempt
      */
     getTimeUntilReset() {
-        if (!this.lastFailureTime) return 0;
-
-        const elapsed = Date.now() - this.lastFailureTime;
-        const remaining = this.config.timeout - elapsed;
-        return Math.max(0, remaining);
+        if (this.state !== OPEN || !this.openUntil) return 0;
+        return Math.max(0, this.openUntil - Date.now());
     }
 
     /**
-     * Get current state (with automatic transitions)
+     * Get current state
      */
     getState() {
-        // Check for automatic state transitions
-        if (this.state === 'OPEN' && this.shouldAttemptReset()) {
-            // Don't automatically transition here, let execute() handle it
-            // This is just for external state queries
-        }
-
         return this.state;
     }
 
     /**
-     * Get failure rate in sliding window
+     * Get failure rate in sliding window (0..1)
      */
     getFailureRate() {
-        this.cleanupOldFailures();
-
-        if (this.failureTimestamps.length === 0) return 0;
-
-        // Calculate failure rate as failures per minute
-        const windowSize = Math.min(Date.now() - this.failureTimestamps[0], this.config.windowSize);
-        const rate = this.failureTimestamps.length / (windowSize / 60000);
-
-        return rate;
-    }
-
-    /**
-     * Clean up old failures outside sliding window
-     */
-    cleanupOldFailures() {
-        const cutoff = Date.now() - this.config.windowSize;
-        this.failureTimestamps = this.failureTimestamps.filter(ts => ts > cutoff);
+        return this.window.snapshot().failureRate;
     }
 
     /**
@@ -393,23 +548,19 @@ class CircuitBreaker {
      */
     reset() {
         const oldState = this.state;
-        this.state = 'CLOSED';
-        this.failureCount = 0;
-        this.successCount = 0;
+        this.close();
         this.lastFailureTime = null;
-        this.lastStateChange = Date.now();
-        this.failureTimestamps = [];
 
         logger.info('Circuit breaker manually reset', {
             platform: this.platform,
             from: oldState,
-            to: 'CLOSED'
+            to: CLOSED
         });
 
         this.sendAlert('reset', { manual: true });
 
-        // Persist reset to Redis
-        this.saveToRedis().catch(err => {
+        // Close the circuit on the other instances too
+        this.saveToRedis('manual_reset').catch(err => {
             logger.error('Failed to save circuit breaker state after reset', {
                 platform: this.platform,
                 error: err.message
@@ -421,14 +572,25 @@ class CircuitBreaker {
      * Get circuit breaker status
      */
     getStatus() {
+        const window = this.window.snapshot();
+
         return {
             platform: this.platform,
             state: this.state,
-            failureCount: this.failureCount,
-            successCount: this.successCount,
+            failureCount: this.consecutiveFailures,
+            successCount: this.probeSuccesses,
             lastFailureTime: this.lastFailureTime,
             lastStateChange: this.lastStateChange,
-            failureRate: this.getFailureRate(),
+            failureRate: window.failureRate,
+            slowCallRate: window.slowCallRate,
+            window: {
+                calls: window.calls,
+                failures: window.failures,
+                slowCalls: window.slow,
+                latency: window.latency.toJSON()
+            },
+            callsInFlight: this.inFlight.size,
+            probesInFlight: this.probesInFlight,
             timeUntilReset: this.getTimeUntilReset(),
             config: this.config,
             metrics: {
@@ -445,8 +607,9 @@ class CircuitBreaker {
         const totalTime = Date.now() - (this.metrics.stateChanges[0]?.timestamp || Date.now());
         if (totalTime === 0) return 100;
 
-        const closedTime = totalTime - this.metrics.totalTimeOpen;
-        return (closedTime / totalTime) * 100;
+        const openTime = this.metrics.totalTimeOpen +
+            (this.state !== CLOSED && this.metrics.lastOpenedAt ? Date.now() - this.metrics.lastOpenedAt : 0);
+        return ((totalTime - openTime) / totalTime) * 100;
     }
 
     /**
@@ -470,6 +633,7 @@ class CircuitBreaker {
             ...this.config,
             ...newConfig
         };
+        this.window = new SlidingWindow(this.config.windowSize, this.config.windowBuckets);
 
         logger.info('Circuit breaker config updated', {
             platform: this.platform,
@@ -628,4 +792,4 @@ const circuitBreakerService = new CircuitBreakerService();
 export default circuitBreakerService;
 
 // Also export CircuitBreaker class for testing
-export { CircuitBreaker };
\ No newline at end of file
+export { CircuitBreaker, SlidingWindow, isFailure, isFailedResult };
@@ -1,6 +1,12 @@
 import MuditaKuryeService from './MuditaKuryeService.js';
 import RetryService from './RetryService.js';
+import WebhookIdempotencyService from './WebhookIdempotencyService.js';
+import WebhookQueueService from './WebhookQueueService.js';
+import CourierStatusReconciler, { nextPollAt } from './CourierStatusReconciler.js';
+import CourierSubmissionPipeline from './CourierSubmissionPipeline.js';
 import CircuitBreakerService from './CircuitBreakerService.js';
+import CourierRouter from './CourierRouter.js';
+import SalesRollupService from './SalesRollupService.js';
 import CourierIntegrationConfigModel from '../models/CourierIntegrationConfigModel.js';
 import DeadLetterQueueModel from '../models/DeadLetterQueueModel.js';
 import orderModel from '../models/OrderModel.js';
@@ -78,9 +84,17 @@ class CourierIntegrationService {
      * Determine which platform to use for an order
      */
     async determinePlatform(order) {
+        const [platform] = await this.determinePlatforms(order);
+        return platform;
+    }
+
+    /**
+     * Candidate platforms for an order, healthiest first (see CourierRouter)
+     */
+    async determinePlatforms(order) {
         // Check if order already has a platform assigned
         if (order.courierIntegration?.platform) {
-            return order.courierIntegration.platform;
+            return [order.courierIntegration.platform];
         }
 
         // Check for branch-specific platform configuration
@@ -93,17 +107,22 @@ class CourierIntegrationService {
             // TODO: Implement zone-specific platform lookup
         }
 
-        // Use default platform
-        const defaultConfig = await CourierIntegrationConfigModel.findOne({
-            platform: this.defaultPlatform,
+        // Enabled platforms with a registered service
+        const configs = await CourierIntegrationConfigModel.find({
+            platform: { $in: Array.from(this.services.keys()) },
             enabled: true
-        });
+        }).select('platform').lean();
 
-        if (!defaultConfig) {
+        if (configs.length === 0) {
             throw new Error('No enabled courier platform found');
         }
 
-        return this.defaultPlatform;
+        // Default platform first, so it wins ties (e.g. before any provider has traffic)
+        const platforms = configs
+            .map(config => config.platform)
+            .sort((a, b) => (b === this.defaultPlatform) - (a === this.defaultPlatform));
+
+        return CourierRouter.rank(platforms).map(health => health.platform);
     }
 
     /**
@@ -119,13 +138,15 @@ class CourierIntegrationService {
                 throw new Error(`Order not found: ${orderId}`);
             }
 
-            // Determine platform if not specified
+            // Determine platform if not specified; a second candidate is kept for hedging
+            let candidates = [platform];
             if (!platform) {
-                platform = await this.determinePlatform(order);
+                candidates = await this.determinePlatforms(order);
+                platform = candidates[0];
             }
 
-            // Get service for platform
-            const service = this.getService(platform);
+            // Fail early on a platform without a registered service
+            this.getService(platform);
 
             // Check if already submitted
             if (order.courierIntegration?.externalOrderId &&
@@ -156,33 +177,56 @@ class CourierIntegrationService {
                 amount: order.amount
             });
 
-            // Execute with circuit breaker protection
-            const result = await CircuitBreakerService.execute(
-                platform,
-                async () => await service.createOrder(order),
-                { orderId, operation: 'submit_order' }
+            // Execute with circuit breaker protection, at most N concurrent submissions per platform.
+            // Hedging needs both providers to cancel programmatically, whichever of them loses
+            const hedgeable = candidates.length > 1 &&
+                candidates.slice(0, 2).every(candidate => this.getService(candidate).supportsCancellation);
+
+            const result = await CourierRouter.dispatch(
+                hedgeable ? candidates.slice(0, 2) : [platform],
+                (target) => CourierSubmissionPipeline.run(target, () =>
+                    CircuitBreakerService.execute(
+                        target,
+                        () => CourierRouter.track(target, () => this.getService(target).createOrder(order)),
+                        { orderId, operation: 'submit_order' }
+                    )
+                ),
+                {
+                    orderId,
+                    cancel: (loser, loserResult) => this.getService(loser).cancelOrder(
+                        loserResult.externalOrderId,
+                        'Duplicate of a hedged submission'
+                    )
+                }
             );
+            platform = result.platform;
 
             const duration = Date.now() - startTime;
 
             if (result.success) {
-                // Update order with success info
-                await orderModel.findByIdAndUpdate(orderId, {
-                    'courierIntegration.externalOrderId': result.externalOrderId,
-                    'courierIntegration.syncStatus': 'synced',
-                    'courierIntegration.lastSyncAt': Date.now(),
-                    'courierIntegration.retryCount': 0,
-                    'courierIntegration.metadata': result.response || {}
+                // Update order with success info and status history in one write
+                await orderModel.updateOne({ _id: orderId }, {
+                    $set: {
+                        'courierIntegration.platform': platform,
+                        'courierIntegration.externalOrderId': result.externalOrderId,
+                        'courierIntegration.syncStatus': 'synced',
+                        'courierIntegration.lastSyncAt': Date.now(),
+                        'courierIntegration.retryCount': 0,
+                        'courierIntegration.metadata': result.response || {},
+                        'courierIntegration.nextPollAt': nextPollAt('NEW'),
+                        'courierIntegration.pollMisses': 0
+                    },
+                    $push: {
+                        statusHistory: {
+                            status: 'Kuryeye Gönderildi',
+                            timestamp: Date.now(),
+                            location: '',
+                            note: `${platform} sistemine başarıyla gönderildi`,
+                            updatedBy: 'system'
+                        }
+                    }
                 });
 
-                // Add status history
-                await this.addStatusHistory(
-                    orderId,
-                    'Kuryeye Gönderildi',
-                    `${platform} sistemine başarıyla gönderildi`,
-                    'system'
-                );
-
                 logger.info('Order submitted to courier successfully', {
                     orderId,
                     platform,
@@ -285,82 +329,88 @@ class CourierIntegrationService {
         }
     }
 
+    /**
+     * Submit several orders to courier platforms
+     * Submissions are pipelined through CourierSubmissionPipeline, which caps concurrency per platform
+     */
+    async submitOrders(orderIds, platform = null) {
+        const results = await Promise.allSettled(
+            orderIds.map(orderId => this.submitOrder(orderId, platform))
+        );
+
+        return results.map((result, index) => (
+            result.status === 'fulfilled'
+                ? { orderId: orderIds[index], ...result.value }
+                : { orderId: orderIds[index], success: false, error: result.reason?.message }
+        ));
+    }
+
     /**
      * Update order status from webhook
+     * Events go through CourierStatusReconciler, which drops stale ones and batches the writes
+     * @param {object} event - { previousStatus, timestamp, traceId } of the courier event (optional)
      */
-    async updateOrderStatus(platform, externalOrderId, status, additionalData = {}) {
+    async updateOrderStatus(platform, externalOrderId, status, additionalData = {}, event = {}) {
         try {
-            // Find order by external ID
-            const order = await orderModel.findOne({
-                'courierIntegration.externalOrderId': externalOrderId,
-                'courierIntegration.platform': platform
-            });
-
-            if (!order) {
-                logger.warn('Order not found for status update', {
-                    platform,
-                    externalOrderId,
-                    status
-                });
-                return {
-                    success: false,
-                    error: 'Order not found'
-                };
-            }
-
             // Get service for platform
             const service = this.getService(platform);
 
-            // Update status through service
+            // Map courier status through the platform service
             const result = await service.updateOrderStatus(
                 externalOrderId,
                 status,
                 additionalData
             );
 
-            if (result.success) {
-                // Update order status
-                const updateData = {
-                    courierStatus: result.tulumbakStatus,
-                    'courierIntegration.lastSyncAt': Date.now()
-                };
-
-                // Update main status for specific events
-                if (status === 'DELIVERED') {
-                    updateData.status = 'Teslim Edildi';
-                    updateData.actualDelivery = Date.now();
-                    updateData.payment = true;
-                } else if (status === 'CANCELED' || status === 'FAILED') {
-                    updateData.status = 'İptal Edildi';
-                }
+            if (!result.success) {
+                return result;
+            }
 
-                await orderModel.findByIdAndUpdate(order._id, updateData);
+            const { written, ...reconciled } = await CourierStatusReconciler.submit(platform, externalOrderId, {
+                status,
+                previousStatus: event.previousStatus,
+                timestamp: event.timestamp,
+                traceId: event.traceId,
+                tulumbakStatus: result.tulumbakStatus,
+                note: additionalData.note,
+                location: additionalData.location
+            });
 
-                // Add status history
-                await this.addStatusHistory(
-                    order._id,
-                    result.tulumbakStatus,
-                    additionalData.note || `Durum güncellendi: ${status}`,
-                    'courier',
-                    additionalData.location
-                );
+            // Report the event as handled only once it is written: a webhook's idempotency key is
+            // completed on success, so a dropped write has to fail for the provider's retry to count
+            if (written) {
+                const outcome = await written;
+                if (!outcome.success) {
+                    logger.error('Courier status event dropped', {
+                        orderId: reconciled.orderId,
+                        platform,
+                        externalOrderId,
+                        status,
+                        error: outcome.error,
+                        traceId: event.traceId
+                    });
+                    return {
+                        success: false,
+                        orderId: reconciled.orderId,
+                        statusCode: 503,
+                        error: outcome.error,
+                        errorCode: 'STATUS_WRITE_FAILED'
+                    };
+                }
+            }
 
-                logger.info('Order status updated from webhook', {
-                    orderId: order._id,
+            if (reconciled.success) {
+                logger.info('Courier status received from webhook', {
+                    orderId: reconciled.orderId,
                     platform,
                     externalOrderId,
                     status,
-                    tulumbakStatus: result.tulumbakStatus
+                    outcome: reconciled.outcome,
+                    traceId: event.traceId
                 });
-
-                return {
-                    success: true,
-                    orderId: order._id,
-                    status: result.tulumbakStatus
-                };
             }
 
-            return result;
+            return reconciled;
 
         } catch (error) {
             logger.error('Failed to update order status', {
@@ -409,6 +459,7 @@ class CourierIntegrationService {
                     courierStatus: 'iptal',
                     'courierIntegration.lastSyncAt': Date.now()
                 });
+                await SalesRollupService.recordStatusChange(order, order.status, 'İptal Edildi');
 
                 // Add status history
                 await this.addStatusHistory(
@@ -565,7 +616,12 @@ class CourierIntegrationService {
                 platforms: {},
                 retry: RetryService.getStats(),
                 circuitBreakers: CircuitBreakerService.getAllStatus(),
-                dlq: await DeadLetterQueueModel.getStats()
+                dlq: await DeadLetterQueueModel.getStats(),
+                webhookIdempotency: WebhookIdempotencyService.getStats(),
+                webhookQueue: WebhookQueueService.getStats(),
+                statusReconciler: CourierStatusReconciler.getStats(),
+                submissions: CourierSubmissionPipeline.getStats(),
+                slo: CourierRouter.getSloReport()
             };
 
             // Get stats per platform
@@ -604,17 +660,18 @@ class CourierIntegrationService {
 
     /**
      * Process webhook for a platform
+     * @param {Buffer} rawBody - Raw request body for signature verification (optional)
      */
-    async processWebhook(platform, payload, headers) {
+    async processWebhook(platform, payload, headers, rawBody = null) {
         try {
             const service = this.getService(platform);
 
             // Verify signature if service supports it
             if (service.verifyWebhookSignature) {
                 const signature = headers['x-webhook-signature'] || headers['x-muditakurye-signature'];
-                const timestamp = headers['x-webhook-timestamp'];
+                const timestamp = headers['x-webhook-timestamp'] || headers['x-mudita-timestamp'];
 
-                const isValid = service.verifyWebhookSignature(payload, signature, timestamp);
+                const isValid = service.verifyWebhookSignature(payload, signature, timestamp, rawBody);
                 if (!isValid) {
                     logger.warn('Invalid webhook signature', {
                         platform,
@@ -627,11 +684,30 @@ class CourierIntegrationService {
                 }
             }
 
+            return await this.handleWebhookEvent(platform, payload);
+
+        } catch (error) {
+            logger.error('Failed to process webhook', {
+                platform,
+                error: error.message
+            });
+            throw error;
+        }
+    }
+
+    /**
+     * Apply an already verified webhook event
+     * @param {object} context - { traceId } of the incoming webhook (optional)
+     */
+    async handleWebhookEvent(platform, payload, context = {}) {
+        try {
             // Process based on event type
             const event = payload.event;
 
             switch (event) {
                 case 'order.status.updated':
+                case 'order.status_changed': // MuditaKurye webhook event names
+                case 'order.canceled':
                 case 'order.assigned':
                 case 'order.delivered':
                 case 'order.failed':
@@ -640,7 +716,8 @@ class CourierIntegrationService {
                         platform,
                         payload.orderId || payload.muditaOrderId,
                         payload.status,
-                        payload.metadata || {}
+                        payload.metadata || {},
+                        { previousStatus: payload.previousStatus, timestamp: payload.timestamp, traceId: context.traceId }
                     );
 
                 default:
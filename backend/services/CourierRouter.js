@@ -0,0 +1,334 @@
+import CircuitBreakerService, { SlidingWindow, isFailure, isFailedResult } from './CircuitBreakerService.js';
+import CourierSubmissionPipeline from './CourierSubmissionPipeline.js';
+import logger from '../utils/logger.js';
+import { Histogram } from '../utils/histogram.js';
+
+/**
+ * Courier Router
+ * Picks the courier provider for new orders from live provider health, hedges slow
+ * submissions to a second provider, and keeps per-provider SLO figures.
+ *
+ * - Every order submission a provider answers is recorded: outcome and latency go into a
+ *   sliding window (routing) and into running totals since start (SLO reporting)
+ * - Health score = success rate / (1 + expected latency / SLO latency), where the expected
+ *   latency is the window p95 stretched by the provider's submission queue. Providers with
+ *   fewer than minimumCalls calls in the window are scored as meeting their SLO, so a new
+ *   or idle provider gets traffic again; providers with an open circuit are ranked last
+ * - Hedging (hedgeAfterMs > 0): when the first provider has not answered within
+ *   hedgeAfterMs, the order is also sent to the second one; the first success wins and a
+ *   losing submission that also succeeded is cancelled through the caller's cancel callback
+ * - A failure is a result with { success: false, retryable: true } or a thrown provider
+ *   error, as the circuit breaker counts them; validation errors don't count against a provider
+ */
+
+const round = (value, digits = 4) => Math.round(value * 10 ** digits) / 10 ** digits;
+
+class CourierRouter {
+    constructor(config = {}) {
+        this.config = {
+            windowMs: config.windowMs || parseInt(process.env.COURIER_ROUTER_WINDOW_MS) || 60000,
+            windowBuckets: config.windowBuckets || 12,
+            minimumCalls: config.minimumCalls || parseInt(process.env.COURIER_ROUTER_MIN_CALLS) || 10,
+            // 0 disables hedging
+            hedgeAfterMs: config.hedgeAfterMs ?? (parseInt(process.env.COURIER_HEDGE_AFTER_MS) || 0),
+            sloSuccessTarget: config.sloSuccessTarget || parseFloat(process.env.COURIER_SLO_SUCCESS_TARGET) || 0.99,
+            sloLatencyMs: config.sloLatencyMs || parseInt(process.env.COURIER_SLO_LATENCY_MS) || 3000,
+            sloLatencyTarget: config.sloLatencyTarget || parseFloat(process.env.COURIER_SLO_LATENCY_TARGET) || 0.95
+        };
+
+        // platform -> { window, totals, hedges }
+        this.providers = new Map();
+    }
+
+    getProvider(platform) {
+        let provider = this.providers.get(platform);
+        if (!provider) {
+            provider = {
+                window: new SlidingWindow(this.config.windowMs, this.config.windowBuckets),
+                totals: { calls: 0, failures: 0, slow: 0, latency: new Histogram() },
+                // started: hedged to this provider; won: hedge answered first; cancelled/cancelFailed: losing duplicates
+                hedges: { started: 0, won: 0, cancelled: 0, cancelFailed: 0 }
+            };
+            this.providers.set(platform, provider);
+        }
+        return provider;
+    }
+
+    /**
+     * Record one submission a provider answered
+     */
+    record(platform, durationMs, { failed }) {
+        const provider = this.getProvider(platform);
+        const slow = durationMs > this.config.sloLatencyMs;
+
+        provider.window.record(durationMs, { failed, slow });
+        provider.totals.calls++;
+        if (failed) provider.totals.failures++;
+        if (slow) provider.totals.slow++;
+        provider.totals.latency.observe(durationMs);
+    }
+
+    /**
+     * Time a submission and record its outcome
+     * @param {Function} operation - async () => result ({ success, ... })
+     */
+    async track(platform, operation) {
+        const startedAt = performance.now();
+        let result;
+        try {
+            result = await operation();
+        } catch (error) {
+            this.record(platform, performance.now() - startedAt, { failed: isFailure(error) });
+            throw error;
+        }
+        this.record(platform, performance.now() - startedAt, { failed: isFailedResult(result) });
+        return result;
+    }
+
+    getBreakerState(platform) {
+        return CircuitBreakerService.circuitBreakers.get(platform)?.getState() || 'CLOSED';
+    }
+
+    getLoad(platform) {
+        const stats = CourierSubmissionPipeline.getStats(platform);
+        return stats ? { queued: stats.queued, concurrency: stats.concurrency } : { queued: 0, concurrency: 1 };
+    }
+
+    /**
+     * Live health of a provider
+     */
+    health(platform) {
+        const window = this.getProvider(platform).window.snapshot();
+        const state = this.getBreakerState(platform);
+        const { queued, concurrency } = this.getLoad(platform);
+        const measured = window.calls >= this.config.minimumCalls;
+
+        const successRate = measured ? 1 - window.failureRate : this.config.sloSuccessTarget;
+        const p95 = measured ? window.latency.percentile(0.95) : this.config.sloLatencyMs;
+        // Orders queued ahead of this one each hold a slot for about one call
+        const expectedLatencyMs = p95 * (1 + queued / concurrency);
+
+        return {
+            platform,
+            state,
+            measured,
+            calls: window.calls,
+            successRate: round(successRate),
+            p95Ms: Math.round(p95),
+            queued,
+            expectedLatencyMs: Math.round(expectedLatencyMs),
+            score: state === 'OPEN' ? 0 : round(successRate / (1 + expectedLatencyMs / this.config.sloLatencyMs))
+        };
+    }
+
+    /**
+     * Order providers from healthiest to least healthy; ties keep the given order
+     */
+    rank(platforms) {
+        return platforms
+            .map((platform, index) => ({ ...this.health(platform), index }))
+            .sort((a, b) => b.score - a.score || a.index - b.index)
+            .map(({ index, ...health }) => health);
+    }
+
+    /**
+     * Submit to the first provider, hedging to the second one when the first is slow
+     * @param {string[]} platforms - Providers in preference order (only the first two are used)
+     * @param {Function} submit - async (platform) => result ({ success, ... })
+     * @param {object} options - { orderId, cancel: async (platform, result) => cancelResult }
+     * @returns {Promise<object>} Winning result with its platform, or the first provider's failure
+     */
+    dispatch(platforms, submit, { orderId, cancel } = {}) {
+        const [primary, secondary] = platforms;
+        const attempt = (platform) => submit(platform).then(
+            result => ({ platform, ...result }),
+            error => ({ platform, success: false, thrown: error })
+        );
+        const settle = (outcome) => {
+            if (outcome.thrown) throw outcome.thrown;
+            return outcome;
+        };
+
+        if (!secondary || !(this.config.hedgeAfterMs > 0)) {
+            return attempt(primary).then(settle);
+        }
+
+        return new Promise((resolve, reject) => {
+            const outcomes = new Map();
+            let winner = null;
+            let hedged = false;
+
+            const finish = (outcome) => {
+                winner = outcome;
+                clearTimeout(timer);
+                try {
+                    resolve(settle(outcome));
+                } catch (error) {
+                    reject(error);
+                }
+            };
+
+            const onSettled = (outcome) => {
+                outcomes.set(outcome.platform, outcome);
+
+                if (winner) {
+                    // A duplicate that also went through is cancelled at the losing provider
+                    if (outcome.success) this.cancelLoser(outcome, winner, { orderId, cancel });
+                    return;
+                }
+                if (outcome.success) {
+                    if (outcome.platform === secondary) this.getProvider(secondary).hedges.won++;
+                    finish(outcome);
+                    return;
+                }
+                // A failure before the hedge is sent goes to the caller's retry handling
+                if (!hedged || outcomes.size === 2) {
+                    finish(outcomes.get(primary) || outcome);
+                }
+            };
+
+            const timer = setTimeout(() => {
+                if (winner) return;
+                hedged = true;
+                this.getProvider(secondary).hedges.started++;
+                logger.info('Courier submission hedged', {
+                    orderId,
+                    primary,
+                    secondary,
+                    hedgeAfterMs: this.config.hedgeAfterMs
+                });
+                attempt(secondary).then(onSettled);
+            }, this.config.hedgeAfterMs);
+
+            attempt(primary).then(onSettled);
+        });
+    }
+
+    async cancelLoser(loser, winner, { orderId, cancel }) {
+        const hedges = this.getProvider(loser.platform).hedges;
+
+        try {
+            const result = cancel ? await cancel(loser.platform, loser) : { success: false };
+            if (!result?.success) throw new Error(result?.error?.message || result?.message || 'Cancellation not available');
+
+            hedges.cancelled++;
+            logger.info('Hedged duplicate cancelled', {
+                orderId,
+                platform: loser.platform,
+                externalOrderId: loser.externalOrderId,
+                winner: winner.platform
+            });
+        } catch (error) {
+            hedges.cancelFailed++;
+            logger.error('Failed to cancel hedged duplicate, cancel it manually', {
+                orderId,
+                platform: loser.platform,
+                externalOrderId: loser.externalOrderId,
+                winner: winner.platform,
+                error: error.message
+            });
+        }
+    }
+
+    /**
+     * Per-provider SLO report: success and latency SLIs since start with their error budgets,
+     * plus the live window used for routing
+     */
+    getSloReport() {
+        const { sloSuccessTarget, sloLatencyMs, sloLatencyTarget } = this.config;
+        const budget = (bad, calls, target) => (calls > 0 ? round(1 - bad / ((1 - target) * calls)) : 1);
+        const providers = {};
+
+        for (const [platform, provider] of this.providers.entries()) {
+            const { calls, failures, slow, latency } = provider.totals;
+            const window = provider.window.snapshot();
+
+            providers[platform] = {
+                health: this.health(platform),
+                success: {
+                    target: sloSuccessTarget,
+                    sli: calls > 0 ? round(1 - failures / calls) : 1,
+                    errorBudgetRemaining: budget(failures, calls, sloSuccessTarget),
+                    // 1 = spending the budget exactly as fast as the target allows
+                    burnRate: round(window.failureRate / (1 - sloSuccessTarget), 2)
+                },
+                latency: {
+                    thresholdMs: sloLatencyMs,
+                    target: sloLatencyTarget,
+                    sli: calls > 0 ? round(1 - slow / calls) : 1,
+                    errorBudgetRemaining: budget(slow, calls, sloLatencyTarget),
+                    burnRate: round(window.slowCallRate / (1 - sloLatencyTarget), 2),
+                    ...latency.toJSON()
+                },
+                calls,
+                failures,
+                window: {
+                    windowMs: this.config.windowMs,
+                    calls: window.calls,
+                    failureRate: round(window.failureRate),
+                    ...window.latency.toJSON()
+                },
+                hedges: { ...provider.hedges }
+            };
+        }
+
+        return { hedgeAfterMs: this.config.hedgeAfterMs, providers };
+    }
+
+    /**
+     * SLO figures in the Prometheus text exposition format
+     */
+    toPrometheus() {
+        const lines = [];
+        const metric = (name, type, help, samples) => {
+            lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`, ...samples);
+        };
+        const entries = Array.from(this.providers.entries());
+        const report = this.getSloReport().providers;
+
+        metric('courier_submissions_total', 'counter', 'Order submissions answered by the provider',
+            entries.map(([platform, { totals }]) => `courier_submissions_total{platform="${platform}"} ${totals.calls}`));
+        metric('courier_submission_failures_total', 'counter', 'Order submissions the provider failed',
+            entries.map(([platform, { totals }]) => `courier_submission_failures_total{platform="${platform}"} ${totals.failures}`));
+
+        const buckets = [];
+        for (const [platform, { totals: { latency } }] of entries) {
+            let cumulative = 0;
+            latency.buckets.forEach((le, slot) => {
+                cumulative += latency.counts[slot];
+                buckets.push(`courier_submission_duration_ms_bucket{platform="${platform}",le="${le}"} ${cumulative}`);
+            });
+            buckets.push(
+                `courier_submission_duration_ms_bucket{platform="${platform}",le="+Inf"} ${latency.count}`,
+                `courier_submission_duration_ms_sum{platform="${platform}"} ${latency.sum}`,
+                `courier_submission_duration_ms_count{platform="${platform}"} ${latency.count}`
+            );
+        }
+        metric('courier_submission_duration_ms', 'histogram', 'Order submission duration in milliseconds', buckets);
+
+        metric('courier_provider_health_score', 'gauge', 'Routing health score of the provider (higher is healthier)',
+            Object.entries(report).map(([platform, { health }]) => `courier_provider_health_score{platform="${platform}"} ${health.score}`));
+        metric('courier_slo_error_budget_remaining', 'gauge', 'Share of the SLO error budget left since start',
+            Object.entries(report).flatMap(([platform, { success, latency }]) => [
+                `courier_slo_error_budget_remaining{platform="${platform}",slo="success"} ${success.errorBudgetRemaining}`,
+                `courier_slo_error_budget_remaining{platform="${platform}",slo="latency"} ${latency.errorBudgetRemaining}`
+            ]));
+        metric('courier_hedged_submissions_total', 'counter', 'Hedged order submissions by outcome',
+            entries.flatMap(([platform, { hedges }]) => Object.entries(hedges).map(
+                ([outcome, count]) => `courier_hedged_submissions_total{platform="${platform}",outcome="${outcome}"} ${count}`
+            )));
+
+        return `${lines.join('\n')}\n`;
+    }
+
+    reset() {
+        this.providers.clear();
+    }
+}
+
+// Export singleton instance
+const courierRouter = new CourierRouter();
+export default courierRouter;
+
+// Also export class for testing
+export { CourierRouter };
@@ -0,0 +1,523 @@
+import orderModel from '../models/OrderModel.js';
+import SalesRollupService from './SalesRollupService.js';
+import WebhookMetricsService from './WebhookMetricsService.js';
+import logger from '../utils/logger.js';
+import eventEmitter from '../utils/eventEmitter.js';
+import { MUDITAKURYE_STATUSES } from '../schemas/generated/muditaKuryeContract.js';
+
+/**
+ * Courier Status Reconciler
+ * Keeps a per-order state machine over courier statuses so retried or reordered webhooks
+ * can only move an order forward.
+ *
+ * NEW → VALIDATED → ROUTED → ASSIGNED → ACCEPTED → PREPARED → ON_DELIVERY → DELIVERED,
+ * with CANCELED (and FAILED) reachable from any non-terminal stage.
+ *
+ * - Stale events (same or earlier stage, or anything after a terminal status) are discarded
+ * - An event whose previousStatus hasn't been seen yet is buffered until the gap is filled,
+ *   or applied anyway after bufferMs so a lost webhook can't stall an order
+ * - Applied events are coalesced per order and written with one conditional update,
+ *   which also guards against another instance having applied a later status
+ * - submit() hands back a `written` promise for accepted and buffered events, so webhook
+ *   processing can wait for the write before treating the event as handled
+ * - Applied statuses are announced on 'order:statusChanged' with the trace IDs of the
+ *   webhooks behind them; database and notify time of webhook events feed WebhookMetricsService
+ */
+
+const TERMINAL_RANK = 100;
+
+// Forward stages in lifecycle order; terminal statuses outrank everything
+const STATUS_RANKS = new Map(
+    MUDITAKURYE_STATUSES
+        .filter(status => status !== 'DELIVERED' && status !== 'CANCELED')
+        .map((status, index) => [status, index])
+);
+STATUS_RANKS.set('DELIVERED', TERMINAL_RANK);
+STATUS_RANKS.set('CANCELED', TERMINAL_RANK);
+STATUS_RANKS.set('FAILED', TERMINAL_RANK);
+
+// Polling fallback per stage: how long an order may sit in a stage before its status is
+// fetched from the courier API, and how often to re-check while it stays there
+const MINUTE = 60 * 1000;
+const POLL_POLICY = {
+    NEW: { stuckAfterMs: 3 * MINUTE, repollMs: 2 * MINUTE },
+    VALIDATED: { stuckAfterMs: 3 * MINUTE, repollMs: 2 * MINUTE },
+    ROUTED: { stuckAfterMs: 5 * MINUTE, repollMs: 2 * MINUTE },
+    ASSIGNED: { stuckAfterMs: 10 * MINUTE, repollMs: 5 * MINUTE },
+    ACCEPTED: { stuckAfterMs: 10 * MINUTE, repollMs: 5 * MINUTE },
+    PREPARED: { stuckAfterMs: 20 * MINUTE, repollMs: 5 * MINUTE },
+    ON_DELIVERY: { stuckAfterMs: 30 * MINUTE, repollMs: 10 * MINUTE }
+};
+const MAX_POLL_BACKOFF_MS = 60 * MINUTE;
+
+// Only webhook events carry a trace ID; polled statuses stay out of the webhook histograms
+const timed = (traced, stage, fn) => (traced ? WebhookMetricsService.time(null, stage, fn) : fn());
+
+/**
+ * When to poll the courier API for an order that is still in `status`
+ * @param {string} status - Current courier status
+ * @param {number} since - When the order entered the stage (or was last polled)
+ * @param {number} misses - Consecutive polls that found no change; each one doubles the interval
+ * @returns {number|null} Timestamp, or null for terminal statuses
+ */
+const nextPollAt = (status, since = Date.now(), misses = 0) => {
+    const policy = POLL_POLICY[status];
+    if (!policy) return null;
+    if (misses === 0) return since + policy.stuckAfterMs;
+    return since + Math.min(policy.repollMs * 2 ** (misses - 1), MAX_POLL_BACKOFF_MS);
+};
+
+class CourierStatusReconciler {
+    constructor(config = {}) {
+        this.config = {
+            bufferMs: config.bufferMs || 3000,
+            batchWindowMs: config.batchWindowMs ?? 25,
+            maxFlushAttempts: config.maxFlushAttempts || 3,
+            maxTrackedOrders: config.maxTrackedOrders || 10000
+        };
+
+        // `${platform}:${externalOrderId}` -> order state
+        this.orders = new Map();
+
+        this.metrics = {
+            received: 0,
+            applied: 0,
+            discarded: 0,
+            buffered: 0,
+            gapsForced: 0,
+            writes: 0,
+            conflicts: 0,
+            writeErrors: 0,
+            unknownStatus: 0
+        };
+    }
+
+    static rankOf(status) {
+        return STATUS_RANKS.get(status);
+    }
+
+    /**
+     * Submit a courier status event for an order
+     * @param {string} platform - Courier platform
+     * @param {string} externalOrderId - Order ID known to the courier platform
+     * @param {object} event - { status, previousStatus, timestamp, traceId, tulumbakStatus, note, location }
+     * @returns {Promise<object>} { success, orderId, outcome: 'accepted' | 'buffered' | 'stale', written }
+     *   written (accepted and buffered only) resolves to { success, error } once the event is written,
+     *   superseded by a later status, or dropped after maxFlushAttempts failed writes
+     */
+    async submit(platform, externalOrderId, event) {
+        this.metrics.received++;
+
+        const rank = CourierStatusReconciler.rankOf(event.status);
+        if (rank === undefined) {
+            this.metrics.unknownStatus++;
+            return { success: false, error: `Unknown courier status: ${event.status}` };
+        }
+
+        const state = await timed(event.traceId, 'dbRead', () => this.getState(platform, externalOrderId));
+        if (!state) {
+            return { success: false, error: 'Order not found' };
+        }
+
+        let settle;
+        const written = new Promise(resolve => { settle = resolve; });
+        const entry = { ...event, rank, eventAt: Date.parse(event.timestamp) || Date.now(), receivedAt: Date.now(), settle };
+        const result = { success: true, orderId: state.orderId, status: event.tulumbakStatus };
+
+        // Anything at or behind the furthest known stage is a retry or arrived too late
+        if (rank <= this.effectiveRank(state) || state.buffered.some(buffered => buffered.rank === rank)) {
+            this.metrics.discarded++;
+            logger.info('Stale courier status discarded', {
+                orderId: state.orderId,
+                status: event.status,
+                currentStatus: state.status,
+                traceId: event.traceId
+            });
+            return { ...result, outcome: 'stale' };
+        }
+
+        // previousStatus not seen yet: hold until it arrives. Cancellations never wait,
+        // and neither do orders with no recorded courier status yet
+        const isCancellation = event.status === 'CANCELED' || event.status === 'FAILED';
+        const previousRank = CourierStatusReconciler.rankOf(event.previousStatus);
+        const currentRank = this.effectiveRank(state);
+        if (!isCancellation && currentRank >= 0 && previousRank !== undefined && previousRank > currentRank) {
+            this.buffer(state, entry);
+            return { ...result, outcome: 'buffered', written };
+        }
+
+        state.pending.push(entry);
+        this.releaseBuffered(state);
+        this.scheduleFlush(state);
+        return { ...result, outcome: 'accepted', written };
+    }
+
+    /**
+     * Load (or reuse) the order's last applied courier status
+     */
+    async getState(platform, externalOrderId) {
+        const key = `${platform}:${externalOrderId}`;
+        let state = this.orders.get(key);
+
+        if (state) {
+            // Move to the back of the eviction order
+            this.orders.delete(key);
+            this.orders.set(key, state);
+            return state;
+        }
+
+        const order = await orderModel.findOne({
+            'courierIntegration.externalOrderId': externalOrderId,
+            'courierIntegration.platform': platform
+        })
+            .select('_id courierIntegration.lastStatus courierIntegration.statusRank')
+            .lean();
+
+        if (!order) {
+            logger.warn('Order not found for status update', { platform, externalOrderId });
+            return null;
+        }
+
+        // Another event for this order may have loaded it while we were waiting
+        if (this.orders.has(key)) {
+            return this.orders.get(key);
+        }
+
+        state = {
+            key,
+            orderId: order._id,
+            status: order.courierIntegration?.lastStatus || null,
+            rank: order.courierIntegration?.statusRank ?? -1,
+            pending: [],
+            buffered: [],
+            flushTimer: null,
+            bufferTimer: null,
+            flushing: null,
+            attempts: 0
+        };
+        this.orders.set(key, state);
+        this.evictIdle();
+        return state;
+    }
+
+    effectiveRank(state) {
+        let rank = state.rank;
+        for (const entry of state.pending) {
+            if (entry.rank > rank) rank = entry.rank;
+        }
+        return rank;
+    }
+
+    buffer(state, entry) {
+        this.metrics.buffered++;
+        state.buffered.push(entry);
+        state.buffered.sort((a, b) => a.rank - b.rank);
+
+        if (!state.bufferTimer) {
+            state.bufferTimer = setTimeout(() => this.forceBuffered(state), this.config.bufferMs);
+        }
+
+        logger.info('Out-of-order courier status buffered', {
+            orderId: state.orderId,
+            status: entry.status,
+            previousStatus: entry.previousStatus,
+            currentStatus: state.status
+        });
+    }
+
+    /**
+     * Move buffered events whose predecessor is now known into the pending batch
+     */
+    releaseBuffered(state) {
+        while (state.buffered.length > 0) {
+            const next = state.buffered[0];
+            const effective = this.effectiveRank(state);
+
+            if (next.rank <= effective) {
+                state.buffered.shift().settle({ success: true });
+                this.metrics.discarded++;
+                continue;
+            }
+            const previousRank = CourierStatusReconciler.rankOf(next.previousStatus);
+            if (previousRank !== undefined && previousRank > effective) {
+                break;
+            }
+            state.pending.push(state.buffered.shift());
+        }
+
+        if (state.buffered.length === 0 && state.bufferTimer) {
+            clearTimeout(state.bufferTimer);
+            state.bufferTimer = null;
+        }
+    }
+
+    /**
+     * The missing predecessor never arrived: apply what we have to keep the order moving
+     */
+    forceBuffered(state) {
+        state.bufferTimer = null;
+        if (state.buffered.length === 0) return;
+
+        this.metrics.gapsForced += state.buffered.length;
+        logger.warn('Applying courier status without its predecessor', {
+            orderId: state.orderId,
+            statuses: state.buffered.map(entry => entry.status),
+            currentStatus: state.status
+        });
+
+        const effective = this.effectiveRank(state);
+        for (const entry of state.buffered) {
+            if (entry.rank > effective) {
+                state.pending.push(entry);
+            } else {
+                entry.settle({ success: true });
+            }
+        }
+        state.buffered = [];
+        this.scheduleFlush(state);
+    }
+
+    scheduleFlush(state, delay = this.config.batchWindowMs) {
+        // A running flush reschedules itself when it finishes
+        if (state.flushTimer || state.flushing || state.pending.length === 0) return;
+        state.flushTimer = setTimeout(() => {
+            state.flushTimer = null;
+            state.flushing = this.flush(state).finally(() => {
+                state.flushing = null;
+                this.scheduleFlush(state);
+            });
+        }, delay);
+    }
+
+    /**
+     * Write all pending events of an order in a single update
+     */
+    async flush(state) {
+        const events = state.pending.splice(0).sort((a, b) => a.rank - b.rank);
+        if (events.length === 0) return;
+
+        const latest = events[events.length - 1];
+        const traceIds = events.map(entry => entry.traceId).filter(Boolean);
+        const now = Date.now();
+
+        const update = {
+            $set: {
+                courierStatus: latest.tulumbakStatus,
+                'courierIntegration.lastSyncAt': now,
+                'courierIntegration.lastStatus': latest.status,
+                'courierIntegration.statusRank': latest.rank,
+                'courierIntegration.lastStatusAt': latest.eventAt,
+                'courierIntegration.pollMisses': 0
+            },
+            $push: {
+                statusHistory: {
+                    $each: events.map(entry => ({
+                        status: entry.tulumbakStatus,
+                        timestamp: entry.eventAt,
+                        location: entry.location || '',
+                        note: entry.note || `Durum güncellendi: ${entry.status}`,
+                        updatedBy: 'courier'
+                    }))
+                }
+            }
+        };
+
+        // Re-arm the polling fallback for the new stage; terminal orders are never polled again
+        const pollAt = nextPollAt(latest.status, now);
+        if (pollAt) {
+            update.$set['courierIntegration.nextPollAt'] = pollAt;
+        } else {
+            update.$unset = { 'courierIntegration.nextPollAt': '' };
+        }
+
+        // Update main status for specific events
+        if (latest.status === 'DELIVERED') {
+            update.$set.status = 'Teslim Edildi';
+            update.$set.actualDelivery = latest.eventAt;
+            update.$set.payment = true;
+        } else if (latest.status === 'CANCELED' || latest.status === 'FAILED') {
+            update.$set.status = 'İptal Edildi';
+        }
+
+        try {
+            const filter = {
+                _id: state.orderId,
+                $or: [
+                    { 'courierIntegration.statusRank': { $lt: latest.rank } },
+                    { 'courierIntegration.statusRank': { $exists: false } }
+                ]
+            };
+
+            // When the main status changes, the pre-image moves the order between sales rollup
+            // buckets; otherwise only its branch is read, for the branch's admin panels
+            let previous = null;
+            const before = await timed(traceIds.length, 'dbWrite', () => orderModel.findOneAndUpdate(filter, update, {
+                new: false,
+                projection: update.$set.status
+                    ? { status: 1, date: 1, amount: 1, paymentMethod: 1, items: 1, userId: 1, branchId: 1 }
+                    : { branchId: 1 }
+            }).lean());
+            const matched = !!before;
+            if (before && update.$set.status) {
+                previous = before;
+                await SalesRollupService.recordStatusChange(previous, previous.status, update.$set.status);
+            }
+
+            this.metrics.writes++;
+            state.attempts = 0;
+            events.forEach(entry => entry.settle({ success: true }));
+
+            if (!matched) {
+                // Another instance already applied this stage or a later one
+                this.metrics.conflicts++;
+                this.metrics.discarded += events.length;
+                this.orders.delete(state.key);
+                return;
+            }
+
+            this.metrics.applied += events.length;
+            state.rank = latest.rank;
+            state.status = latest.status;
+
+            logger.info('Order status updated from webhook', {
+                orderId: state.orderId,
+                statuses: events.map(entry => entry.status),
+                tulumbakStatus: latest.tulumbakStatus,
+                traceIds
+            });
+
+            await timed(traceIds.length, 'notify', async () => this.notify(state, {
+                latest,
+                status: update.$set.status || latest.tulumbakStatus,
+                previous,
+                branchId: before.branchId,
+                traceIds
+            }));
+        } catch (error) {
+            this.metrics.writeErrors++;
+            state.attempts++;
+
+            logger.error('Failed to write courier status update', {
+                orderId: state.orderId,
+                statuses: events.map(entry => entry.status),
+                attempt: state.attempts,
+                error: error.message
+            });
+
+            if (state.attempts < this.config.maxFlushAttempts) {
+                // Put the events back and back off before the next flush
+                state.pending.unshift(...events);
+                await new Promise(resolve => setTimeout(resolve, 200 * 2 ** state.attempts));
+            } else {
+                // Give up; the order is reloaded from the database on its next event. Waiting
+                // webhooks report the failure, so the provider's retry is processed again
+                state.attempts = 0;
+                this.orders.delete(state.key);
+                events.forEach(entry => entry.settle({ success: false, error: `Courier status write failed: ${error.message}` }));
+            }
+        }
+    }
+
+    /**
+     * Announce an applied status to the admin panel, and email the customer on delivery
+     * @param {object} applied - { latest, status, previous, branchId, traceIds }; previous is
+     *   the order before the write, set only when the main status changed
+     */
+    notify(state, { latest, status, previous, branchId, traceIds }) {
+        // A failing listener must not look like a failed write (the events would be re-applied)
+        try {
+            eventEmitter.emit('order:statusChanged', {
+                _id: state.orderId,
+                status,
+                previousStatus: previous?.status,
+                branchId,
+                courierStatus: latest.status,
+                traceIds
+            });
+        } catch (error) {
+            logger.error('Order status listener failed', { orderId: state.orderId, traceIds, error: error.message });
+        }
+
+        if (latest.status === 'DELIVERED' && previous?.userId) {
+            const startedAt = performance.now();
+            this.sendDeliveryEmail(state.orderId, previous.userId, traceIds[0])
+                .catch(error => logger.error('Failed to send delivery email', {
+                    orderId: state.orderId,
+                    traceIds,
+                    error: error.message
+                }))
+                .finally(() => {
+                    if (traceIds.length) WebhookMetricsService.record(null, 'email', performance.now() - startedAt);
+                });
+        }
+    }
+
+    async sendDeliveryEmail(orderId, userId, traceId) {
+        const { default: userModel } = await import('../models/UserModel.js');
+        const user = await userModel.findById(userId).select('email').lean();
+        if (!user?.email) return;
+
+        const { default: emailService } = await import('./EmailService.js');
+        await emailService.sendDeliveryCompleted(
+            { _id: orderId, orderId: orderId.toString() },
+            user.email,
+            { traceId, orderId }
+        );
+    }
+
+    /**
+     * Forget idle orders beyond maxTrackedOrders, oldest first
+     */
+    evictIdle() {
+        if (this.orders.size <= this.config.maxTrackedOrders) return;
+
+        for (const [key, state] of this.orders) {
+            if (this.orders.size <= this.config.maxTrackedOrders) break;
+            if (state.pending.length === 0 && state.buffered.length === 0 && !state.flushing && !state.flushTimer) {
+                this.orders.delete(key);
+            }
+        }
+    }
+
+    /**
+     * Wait until all pending events are written (used on shutdown and in tests)
+     */
+    async drain() {
+        for (const state of this.orders.values()) {
+            if (state.bufferTimer) {
+                clearTimeout(state.bufferTimer);
+                this.forceBuffered(state);
+            }
+            if (state.flushTimer) {
+                clearTimeout(state.flushTimer);
+                state.flushTimer = null;
+            }
+            if (state.flushing) await state.flushing;
+            if (state.pending.length > 0) await this.flush(state);
+        }
+    }
+
+    getStats() {
+        let buffered = 0;
+        let pending = 0;
+        for (const state of this.orders.values()) {
+            buffered += state.buffered.length;
+            pending += state.pending.length;
+        }
+
+        return {
+            ...this.metrics,
+            trackedOrders: this.orders.size,
+            buffered,
+            pending,
+            eventsPerWrite: this.metrics.writes > 0 ? this.metrics.applied / this.metrics.writes : 0
+        };
+    }
+}
+
+// Export singleton instance
+const courierStatusReconciler = new CourierStatusReconciler();
+export default courierStatusReconciler;
+
+// Also export class for testing
+export { CourierStatusReconciler, STATUS_RANKS, TERMINAL_RANK, POLL_POLICY, nextPollAt };
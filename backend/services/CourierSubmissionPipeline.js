@@ -0,0 +1,169 @@
+/**
+ * Courier Submission Pipeline
+ * Caps concurrent order submissions per courier provider and keeps the rest in a FIFO queue.
+ *
+ * MuditaKurye has no batch order endpoint, so orders are pipelined: up to `concurrency`
+ * requests per provider are in flight at once over the service's keep-alive agent, and
+ * further submissions wait their turn instead of opening new connections.
+ *
+ * Reports per-provider throughput (last 60s) and end-to-end / service latency percentiles.
+ */
+
+const LATENCY_SAMPLE_SIZE = 1000;
+const THROUGHPUT_WINDOW_SECONDS = 60;
+
+class CourierSubmissionPipeline {
+    constructor(config = {}) {
+        this.config = {
+            concurrency: config.concurrency || parseInt(process.env.COURIER_SUBMIT_CONCURRENCY) || 8,
+            maxQueue: config.maxQueue || parseInt(process.env.COURIER_SUBMIT_MAX_QUEUE) || 1000
+        };
+
+        // platform -> { active, queue, metrics }
+        this.providers = new Map();
+    }
+
+    getProvider(platform) {
+        let provider = this.providers.get(platform);
+        if (!provider) {
+            provider = {
+                active: 0,
+                queue: [],
+                queueHead: 0,
+                totalLatency: new Array(LATENCY_SAMPLE_SIZE).fill(0),
+                serviceLatency: new Array(LATENCY_SAMPLE_SIZE).fill(0),
+                samples: 0,
+                // Completions per second, indexed by epoch second modulo the window
+                throughput: new Array(THROUGHPUT_WINDOW_SECONDS).fill(null).map(() => ({ second: 0, count: 0 })),
+                metrics: { submitted: 0, succeeded: 0, failed: 0, rejected: 0, maxQueued: 0 }
+            };
+            this.providers.set(platform, provider);
+        }
+        return provider;
+    }
+
+    /**
+     * Run a submission for a provider once a slot is free
+     * @param {string} platform - Courier platform
+     * @param {Function} task - async () => result ({ success, ... })
+     */
+    run(platform, task) {
+        const provider = this.getProvider(platform);
+        const queued = provider.queue.length - provider.queueHead;
+
+        if (queued >= this.config.maxQueue) {
+            provider.metrics.rejected++;
+            const error = new Error(`Courier submission queue full for ${platform}`);
+            error.code = 'SUBMIT_QUEUE_FULL';
+            error.retryable = true;
+            return Promise.reject(error);
+        }
+
+        provider.metrics.submitted++;
+
+        return new Promise((resolve, reject) => {
+            provider.queue.push({ task, resolve, reject, enqueuedAt: Date.now() });
+            if (queued + 1 > provider.metrics.maxQueued) {
+                provider.metrics.maxQueued = queued + 1;
+            }
+            this.pump(platform, provider);
+        });
+    }
+
+    pump(platform, provider) {
+        while (provider.active < this.config.concurrency && provider.queueHead < provider.queue.length) {
+            const item = provider.queue[provider.queueHead];
+            provider.queue[provider.queueHead++] = undefined;
+            provider.active++;
+            this.execute(platform, provider, item);
+        }
+
+        // Drop the consumed prefix once the queue is drained
+        if (provider.queueHead === provider.queue.length) {
+            provider.queue = [];
+            provider.queueHead = 0;
+        }
+    }
+
+    async execute(platform, provider, { task, resolve, reject, enqueuedAt }) {
+        const startedAt = Date.now();
+        let succeeded = false;
+
+        try {
+            const result = await task();
+            succeeded = result?.success !== false;
+            resolve(result);
+        } catch (error) {
+            reject(error);
+        } finally {
+            const finishedAt = Date.now();
+            this.record(provider, succeeded, finishedAt - enqueuedAt, finishedAt - startedAt, finishedAt);
+            provider.active--;
+            this.pump(platform, provider);
+        }
+    }
+
+    record(provider, succeeded, totalMs, serviceMs, finishedAt) {
+        const slot = provider.samples++ % LATENCY_SAMPLE_SIZE;
+        provider.totalLatency[slot] = totalMs;
+        provider.serviceLatency[slot] = serviceMs;
+
+        if (succeeded) {
+            provider.metrics.succeeded++;
+        } else {
+            provider.metrics.failed++;
+        }
+
+        const second = Math.floor(finishedAt / 1000);
+        const bucket = provider.throughput[second % THROUGHPUT_WINDOW_SECONDS];
+        if (bucket.second !== second) {
+            bucket.second = second;
+            bucket.count = 0;
+        }
+        bucket.count++;
+    }
+
+    /**
+     * Get throughput and latency stats per provider
+     */
+    getStats(platform = null) {
+        const percentiles = (samples, count) => {
+            const sorted = samples.slice(0, count).sort((a, b) => a - b);
+            const at = (pct) => sorted.length > 0
+                ? sorted[Math.min(sorted.length - 1, Math.floor(pct / 100 * sorted.length))]
+                : 0;
+            return { p50: at(50), p95: at(95), p99: at(99), max: sorted[sorted.length - 1] || 0 };
+        };
+
+        const nowSecond = Math.floor(Date.now() / 1000);
+        const stats = {};
+
+        for (const [name, provider] of this.providers.entries()) {
+            if (platform && name !== platform) continue;
+
+            const count = Math.min(provider.samples, LATENCY_SAMPLE_SIZE);
+            const completedLastMinute = provider.throughput
+                .filter(bucket => nowSecond - bucket.second < THROUGHPUT_WINDOW_SECONDS)
+                .reduce((sum, bucket) => sum + bucket.count, 0);
+
+            stats[name] = {
+                concurrency: this.config.concurrency,
+                active: provider.active,
+                queued: provider.queue.length - provider.queueHead,
+                ...provider.metrics,
+                throughputPerMinute: completedLastMinute,
+                latencyMs: percentiles(provider.totalLatency, count),
+                serviceTimeMs: percentiles(provider.serviceLatency, count)
+            };
+        }
+
+        return platform ? stats[platform] || null : stats;
+    }
+}
+
+// Export singleton instance
+const courierSubmissionPipeline = new CourierSubmissionPipeline();
+export default courierSubmissionPipeline;
+
+// Also export class for testing
+export { CourierSubmissionPipeline };
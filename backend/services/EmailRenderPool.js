@@ -0,0 +1,240 @@
+import { Worker } from 'worker_threads';
+import os from 'os';
+import { performance } from 'perf_hooks';
+import logger from '../utils/logger.js';
+import { renderJob } from '../emails/utils/renderJob.js';
+
+/**
+ * Email Render Pool
+ * Runs React Email renders (emails/utils/renderJob.js) on worker threads so a burst of
+ * order emails does not block the event loop.
+ *
+ * - Size: EMAIL_RENDER_WORKERS (default 2, at most one less than the CPU count); 0 renders inline
+ * - Workers start on first use and take one job at a time; other jobs wait in a queue
+ * - A worker that times out fails only its own job and is replaced; the job of a worker that
+ *   crashes or exits is rendered inline instead
+ * - When workers can't start or keep dying (maxWorkerFailures in a row without a finished
+ *   render), the pool renders inline for unavailableMs before trying workers again, so
+ *   emails still go out
+ * - Workers inherit the process execArgv, so they load .jsx templates the same way the server does
+ */
+const WORKER_URL = new URL('../emails/utils/renderWorker.js', import.meta.url);
+
+const defaultSize = () => {
+    if (process.env.EMAIL_RENDER_WORKERS !== undefined) {
+        const size = parseInt(process.env.EMAIL_RENDER_WORKERS);
+        return Number.isNaN(size) ? 0 : Math.max(0, size);
+    }
+    if (process.env.NODE_ENV === 'test') return 0;
+    return Math.max(1, Math.min(2, os.cpus().length - 1));
+};
+
+class EmailRenderPool {
+    constructor(config = {}) {
+        this.config = {
+            size: config.size ?? defaultSize(),
+            timeoutMs: config.timeoutMs || 15000,
+            maxWorkerFailures: config.maxWorkerFailures || 3,
+            unavailableMs: config.unavailableMs || 60000
+        };
+
+        this.workers = []; // { worker, task }
+        this.queue = [];
+        this.nextId = 0;
+        this.workerFailures = 0; // since the last render a worker finished
+        this.unavailableUntil = 0;
+        this.metrics = {
+            rendered: 0,
+            inline: 0,
+            failed: 0,
+            timeouts: 0,
+            restarts: 0,
+            fallbacks: 0
+        };
+    }
+
+    /**
+     * Render a job on a worker
+     * @param {Object} job - Plain data, see renderJob
+     * @returns {Promise<{ html: string, renderMs: number }>}
+     */
+    run(job) {
+        if (this.config.size <= 0) {
+            return this.runInline(job);
+        }
+        if (!this.isAvailable()) {
+            this.metrics.fallbacks++;
+            return this.runInline(job);
+        }
+
+        return new Promise((resolve, reject) => {
+            this.queue.push({ id: ++this.nextId, job, resolve, reject, timer: null });
+            this.dispatch();
+        });
+    }
+
+    isAvailable() {
+        return Date.now() >= this.unavailableUntil;
+    }
+
+    async runInline(job) {
+        const startedAt = performance.now();
+        try {
+            const html = await renderJob(job);
+            this.metrics.inline++;
+            return { html, renderMs: performance.now() - startedAt };
+        } catch (error) {
+            this.metrics.failed++;
+            throw error;
+        }
+    }
+
+    /**
+     * Hand queued jobs to idle workers, starting workers up to the pool size
+     */
+    dispatch() {
+        while (this.queue.length > 0) {
+            let entry = this.workers.find(candidate => !candidate.task);
+            if (!entry && this.workers.length < this.config.size) {
+                try {
+                    entry = this.spawn();
+                } catch (error) {
+                    // With no worker left, nothing would ever take the queued jobs
+                    this.workerFailed(error, { giveUp: this.workers.length === 0 });
+                    return;
+                }
+            }
+            if (!entry) return;
+
+            const task = this.queue.shift();
+            entry.task = task;
+            task.timer = setTimeout(() => {
+                this.metrics.timeouts++;
+                this.retire(entry, new Error(`Email render timed out after ${this.config.timeoutMs}ms`), { timedOut: true });
+            }, this.config.timeoutMs);
+            entry.worker.postMessage({ id: task.id, job: task.job });
+        }
+    }
+
+    spawn() {
+        const entry = { worker: new Worker(WORKER_URL), task: null };
+
+        entry.worker.on('message', (message) => this.complete(entry, message));
+        entry.worker.on('error', (error) => this.retire(entry, error));
+        entry.worker.on('exit', (code) => {
+            this.retire(entry, new Error(`Email render worker exited with code ${code}`));
+        });
+        // Idle workers should not keep the process alive on shutdown
+        entry.worker.unref();
+
+        this.workers.push(entry);
+        return entry;
+    }
+
+    complete(entry, { id, html, renderMs, error }) {
+        const task = entry.task;
+        if (!task || task.id !== id) return;
+
+        clearTimeout(task.timer);
+        entry.task = null;
+        this.workerFailures = 0;
+
+        if (error) {
+            this.metrics.failed++;
+            task.reject(new Error(error));
+        } else {
+            this.metrics.rendered++;
+            task.resolve({ html, renderMs });
+        }
+
+        this.dispatch();
+    }
+
+    /**
+     * Drop a broken worker and let dispatch() start a replacement. The job of a timed-out
+     * worker fails (inline it would block the event loop as long); any other job is
+     * rendered inline
+     */
+    retire(entry, error, { timedOut = false } = {}) {
+        if (!this.workers.includes(entry)) return;
+        this.workers = this.workers.filter(candidate => candidate !== entry);
+        this.metrics.restarts++;
+
+        const task = entry.task;
+        entry.task = null;
+        if (task) {
+            clearTimeout(task.timer);
+            if (timedOut) {
+                this.metrics.failed++;
+                task.reject(error);
+            } else {
+                this.fallback(task);
+            }
+        }
+
+        entry.worker.terminate().catch(() => {});
+        logger.error('Email render worker retired', { error: error.message, queued: this.queue.length });
+
+        if (!timedOut) {
+            this.workerFailed(error);
+        }
+        this.dispatch();
+    }
+
+    /**
+     * Count a worker that failed to start or died; past maxWorkerFailures in a row, render
+     * inline for unavailableMs
+     */
+    workerFailed(error, { giveUp = false } = {}) {
+        this.workerFailures++;
+        if (!giveUp && this.workerFailures < this.config.maxWorkerFailures) return;
+
+        this.unavailableUntil = Date.now() + this.config.unavailableMs;
+        this.workerFailures = 0;
+        logger.error('Email render workers unavailable, rendering inline', {
+            error: error.message,
+            retryInMs: this.config.unavailableMs,
+            queued: this.queue.length
+        });
+
+        for (const task of this.queue.splice(0)) {
+            this.fallback(task);
+        }
+    }
+
+    fallback(task) {
+        this.metrics.fallbacks++;
+        this.runInline(task.job).then(task.resolve, task.reject);
+    }
+
+    getStats() {
+        return {
+            size: this.config.size,
+            workers: this.workers.length,
+            busy: this.workers.filter(entry => entry.task).length,
+            queued: this.queue.length,
+            ...this.metrics
+        };
+    }
+
+    async shutdown() {
+        const workers = this.workers;
+        this.workers = [];
+        for (const task of this.queue.splice(0)) {
+            task.reject(new Error('Email render pool shut down'));
+        }
+        await Promise.all(workers.map(entry => {
+            if (entry.task) {
+                clearTimeout(entry.task.timer);
+                entry.task.reject(new Error('Email render pool shut down'));
+            }
+            return entry.worker.terminate();
+        }));
+    }
+}
+
+// Export singleton instance
+export default new EmailRenderPool();
+
+// Also export class for testing
+export { EmailRenderPool };
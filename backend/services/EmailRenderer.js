@@ -1,104 +1,211 @@
-import { renderEmailToHTML, generateEmailSubject } from '../emails/utils/renderEmail.js';
-import { OrderConfirmation } from '../emails/templates/customer/OrderConfirmation.jsx';
+import crypto from 'crypto';
+import { performance } from 'perf_hooks';
+import { generateEmailSubject } from '../emails/utils/renderEmail.js';
+import { compileShell, fillShell } from '../emails/utils/renderShell.js';
+import { templates } from '../emails/templates/index.js';
 import EmailSettings from '../models/EmailSettingsModel.js';
+import EmailRenderPool from './EmailRenderPool.js';
+import eventEmitter from '../utils/eventEmitter.js';
+import { Histogram } from '../utils/histogram.js';
+import logger from '../utils/logger.js';
+
+// Default settings fallback
+const DEFAULT_DESIGN = {
+  brandColor: '#d4af37',
+  logoUrl: 'https://tulumbak.com/logo.png',
+  storeName: 'Tulumbak İzmir Baklava',
+  storeEmail: 'info@tulumbak.com',
+  storePhone: '0232 XXX XXXX',
+  fontFamily: '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
+  privacyPolicyUrl: 'https://tulumbak.com/privacy',
+  emailPreferencesUrl: 'https://tulumbak.com/email-preferences',
+  unsubscribeUrl: 'https://tulumbak.com/unsubscribe',
+};
+
+const designVersion = (design) =>
+  crypto.createHash('sha1').update(JSON.stringify(design)).digest('hex').slice(0, 12);
 
 /**
  * EmailRenderer Class
  * Handles React Email template rendering with design settings integration
  * Follows Single Responsibility Principle - only responsible for rendering
+ *
+ * - Design settings are cached in memory; EmailSettings writes in this process clear the cache
+ *   ('emailSettings:changed'), designTtlMs bounds staleness for writes made by other instances
+ * - Templates with a shell spec are rendered once per design version and markup variant into a
+ *   shell (see emails/utils/renderShell.js); each email only fills in its values
+ * - React renders (shells, and full renders of templates without a shell) run on EmailRenderPool
  */
 class EmailRenderer {
-  constructor() {
-    this.templateMap = {
-      orderConfirmation: OrderConfirmation,
-      // Future templates will be added here
-      // orderStatusUpdate: OrderStatusUpdate,
-      // courierAssignment: CourierAssignment,
-      // orderDelivered: OrderDelivered,
-      // orderCancelled: OrderCancelled,
+  constructor(config = {}) {
+    this.templateMap = Object.fromEntries(
+      Object.entries(templates).map(([type, template]) => [type, template.component])
+    );
+
+    this.config = {
+      designTtlMs: config.designTtlMs || parseInt(process.env.EMAIL_DESIGN_CACHE_TTL_MS) || 60000,
+    };
+
+    // { settings, version, loadedAt }
+    this.design = null;
+    this.designLoading = null;
+    // Bumped on invalidation, so a load that started before it is not cached
+    this.designGeneration = 0;
+
+    // `${templateType}|${kind}|${variant}` -> Promise<compiled shell>, for shellsVersion
+    this.shells = new Map();
+    this.shellsVersion = null;
+
+    // Render time per template (ms)
+    this.renderTimes = {};
+    this.metrics = {
+      shellRenders: 0,
+      fullRenders: 0,
+      shellCompiles: 0,
+      designLoads: 0,
     };
+
+    eventEmitter.on('emailSettings:changed', () => this.invalidateDesignSettings());
   }
 
   /**
-   * Get email design settings from database
+   * Get email design settings (cached)
    * @returns {Promise<Object>} Design settings object
    */
   async getDesignSettings() {
-    try {
-      const settings = await EmailSettings.findOne();
-
-      // Default settings fallback
-      const defaults = {
-        brandColor: '#d4af37',
-        logoUrl: 'https://tulumbak.com/logo.png',
-        storeName: 'Tulumbak İzmir Baklava',
-        storeEmail: 'info@tulumbak.com',
-        storePhone: '0232 XXX XXXX',
-        fontFamily: '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
-        privacyPolicyUrl: 'https://tulumbak.com/privacy',
-        emailPreferencesUrl: 'https://tulumbak.com/email-preferences',
-        unsubscribeUrl: 'https://tulumbak.com/unsubscribe',
-      };
+    return (await this.getDesign()).settings;
+  }
 
-      if (!settings || !settings.design) {
-        return defaults;
-      }
+  /**
+   * Design settings with their version (short hash of the settings)
+   * @returns {Promise<{ settings: Object, version: string }>}
+   */
+  async getDesign() {
+    if (this.design && Date.now() - this.design.loadedAt < this.config.designTtlMs) {
+      return this.design;
+    }
+
+    if (!this.designLoading) {
+      this.designLoading = this.loadDesign().finally(() => {
+        this.designLoading = null;
+      });
+    }
+    return this.designLoading;
+  }
+
+  async loadDesign() {
+    const generation = this.designGeneration;
+
+    try {
+      const settings = await EmailSettings.findOne().select('design').lean();
+      const design = settings?.design || {};
 
       // Merge database settings with defaults
-      return {
-        brandColor: settings.design.brandColor || defaults.brandColor,
-        logoUrl: settings.design.logoUrl || defaults.logoUrl,
-        storeName: settings.design.storeName || defaults.storeName,
-        storeEmail: settings.design.storeEmail || defaults.storeEmail,
-        storePhone: settings.design.storePhone || defaults.storePhone,
-        fontFamily: settings.design.fontFamily || defaults.fontFamily,
-        privacyPolicyUrl: settings.design.privacyPolicyUrl || defaults.privacyPolicyUrl,
-        emailPreferencesUrl: settings.design.emailPreferencesUrl || defaults.emailPreferencesUrl,
-        unsubscribeUrl: settings.design.unsubscribeUrl || defaults.unsubscribeUrl,
-      };
+      const merged = Object.fromEntries(
+        Object.entries(DEFAULT_DESIGN).map(([key, fallback]) => [key, design[key] || fallback])
+      );
+
+      const loaded = { settings: merged, version: designVersion(merged), loadedAt: Date.now() };
+      this.metrics.designLoads++;
+      if (generation === this.designGeneration) {
+        this.design = loaded;
+      }
+      return loaded;
     } catch (error) {
       console.error('Error fetching email design settings:', error);
-      // Return defaults on error
-      return {
-        brandColor: '#d4af37',
-        logoUrl: 'https://tulumbak.com/logo.png',
-        storeName: 'Tulumbak İzmir Baklava',
-        storeEmail: 'info@tulumbak.com',
-        storePhone: '0232 XXX XXXX',
-        fontFamily: '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
-        privacyPolicyUrl: 'https://tulumbak.com/privacy',
-        emailPreferencesUrl: 'https://tulumbak.com/email-preferences',
-        unsubscribeUrl: 'https://tulumbak.com/unsubscribe',
-      };
+      // Return defaults on error (not cached, the next email tries the database again)
+      return { settings: { ...DEFAULT_DESIGN }, version: designVersion(DEFAULT_DESIGN), loadedAt: 0 };
     }
   }
 
+  /**
+   * Drop cached design settings; shells are rebuilt if the design version changed
+   */
+  invalidateDesignSettings() {
+    this.designGeneration++;
+    this.design = null;
+    this.designLoading = null;
+  }
+
+  /**
+   * Compiled shell for a template variant, rendered once per design version
+   * Concurrent emails share the pending render
+   */
+  getShell(templateType, kind, variant, design) {
+    if (this.shellsVersion !== design.version) {
+      this.shells.clear();
+      this.shellsVersion = design.version;
+    }
+
+    const key = `${templateType}|${kind}|${variant}`;
+    let shell = this.shells.get(key);
+    if (!shell) {
+      shell = EmailRenderPool.run({ kind, templateType, variant, design: design.settings })
+        .then(({ html, renderMs }) => {
+          this.metrics.shellCompiles++;
+          logger.info('Email shell rendered', { templateType, kind, variant, designVersion: design.version, renderMs: Math.round(renderMs) });
+          return compileShell(html);
+        });
+      this.shells.set(key, shell);
+      // A failed render is retried by the next email
+      shell.catch(() => {
+        if (this.shells.get(key) === shell) this.shells.delete(key);
+      });
+    }
+    return shell;
+  }
+
+  async renderFromShell(templateType, spec, data, design) {
+    const items = spec.items ? spec.items.list(data) : [];
+
+    const [shell, ...itemShells] = await Promise.all([
+      this.getShell(templateType, 'shell', spec.variant(data), design),
+      ...items.map(item => this.getShell(templateType, 'item', spec.items.variant(item), design)),
+    ]);
+
+    const html = spec.items
+      ? { items: items.map((item, index) => fillShell(itemShells[index], spec.items.values(item))).join('') }
+      : {};
+
+    return fillShell(shell, spec.values(data), html);
+  }
+
   /**
    * Render React Email template to HTML
    * @param {string} templateType - Template identifier (e.g., 'orderConfirmation')
    * @param {Object} data - Template data
-   * @returns {Promise<Object>} Rendered email with subject and HTML
+   * @returns {Promise<Object>} Rendered email with subject, HTML and render info ({ mode, renderMs, designVersion })
    */
   async renderTemplate(templateType, data) {
     try {
-      // Get template component
-      const TemplateComponent = this.templateMap[templateType];
+      const template = templates[templateType];
 
-      if (!TemplateComponent) {
+      if (!template) {
         throw new Error(`Template '${templateType}' not found. Available templates: ${Object.keys(this.templateMap).join(', ')}`);
       }
 
-      // Get design settings from database
-      const designSettings = await this.getDesignSettings();
+      // Get design settings (cached)
+      const design = await this.getDesign();
+      const startedAt = performance.now();
 
-      // Merge data with design settings
-      const templateProps = {
-        ...data,
-        ...designSettings,
-      };
+      let html;
+      let mode;
+      if (template.shell) {
+        html = await this.renderFromShell(templateType, template.shell, data, design);
+        mode = 'shell';
+        this.metrics.shellRenders++;
+      } else {
+        // Merge data with design settings; props are posted to a worker, so plain data only
+        ({ html } = await EmailRenderPool.run({ kind: 'full', templateType, props: { ...data, ...design.settings } }));
+        mode = 'full';
+        this.metrics.fullRenders++;
+      }
 
-      // Render template to HTML
-      const html = await renderEmailToHTML(TemplateComponent, templateProps);
+      const renderMs = Math.round((performance.now() - startedAt) * 100) / 100;
+      if (!this.renderTimes[templateType]) {
+        this.renderTimes[templateType] = new Histogram();
+      }
+      this.renderTimes[templateType].observe(renderMs);
 
       // Generate subject
       const subject = generateEmailSubject(templateType, data);
@@ -107,6 +214,7 @@ class EmailRenderer {
         subject,
         html,
         templateType,
+        render: { mode, renderMs, designVersion: design.version },
       };
     } catch (error) {
       console.error(`Error rendering email template '${templateType}':`, error);
@@ -154,7 +262,26 @@ class EmailRenderer {
   getAvailableTemplates() {
     return Object.keys(this.templateMap);
   }
+
+  /**
+   * Render statistics: per-template render time, shell cache and worker pool
+   * @returns {Object}
+   */
+  getStats() {
+    return {
+      designVersion: this.design?.version || null,
+      shells: this.shells.size,
+      ...this.metrics,
+      templates: Object.fromEntries(
+        Object.entries(this.renderTimes).map(([type, histogram]) => [type, histogram.toJSON()])
+      ),
+      pool: EmailRenderPool.getStats(),
+    };
+  }
 }
 
 // Export singleton instance
 export default new EmailRenderer();
+
+// Also export class for testing
+export { EmailRenderer };
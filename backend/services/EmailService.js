@@ -158,12 +158,19 @@ class EmailService {
    * Send email with confirmation
    * @param {Object} mailOptions - Email options
    * @param {String} trigger - Email trigger type (e.g., 'orderCreated', 'orderStatusUpdate')
+   * @param {Object} context - { orderId, traceId } recorded in logs and the email log (optional);
+   *   React Email sends also pass { templateName, render } from EmailRenderer
    * @returns {Promise<Object>}
    */
-  async sendEmail(mailOptions, trigger = 'manual') {
+  async sendEmail(mailOptions, trigger = 'manual', context = {}) {
+    const { orderId, traceId, templateName, render } = context;
+    const renderLog = render
+      ? { templateName, renderMs: render.renderMs, renderMode: render.mode, designVersion: render.designVersion }
+      : {};
+
     if (!this.transporter) {
       const errorMsg = 'Email service not configured. Please update SMTP settings.';
-      logger.warn(errorMsg, { to: mailOptions.to });
+      logger.warn(errorMsg, { to: mailOptions.to, traceId });
 
       // Log failed attempt
       await this.createEmailLog({
@@ -172,6 +179,9 @@ class EmailService {
         subject: mailOptions.subject,
         htmlContent: mailOptions.html,
         trigger,
+        orderId,
+        traceId,
+        ...renderLog,
         status: 'failed',
         error: errorMsg
       });
@@ -183,7 +193,8 @@ class EmailService {
       logger.info('Attempting to send email', {
         to: mailOptions.to,
         from: mailOptions.from,
-        subject: mailOptions.subject
+        subject: mailOptions.subject,
+        traceId
       });
 
       const info = await this.transporter.sendMail(mailOptions);
@@ -192,7 +203,8 @@ class EmailService {
         messageId: info.messageId,
         to: mailOptions.to,
         subject: mailOptions.subject,
-        response: info.response
+        response: info.response,
+        traceId
       });
 
       // Log successful email
@@ -202,6 +214,9 @@ class EmailService {
         subject: mailOptions.subject,
         htmlContent: mailOptions.html,
         trigger,
+        orderId,
+        traceId,
+        ...renderLog,
         status: 'sent',
         messageId: info.messageId,
         response: info.response
@@ -219,7 +234,8 @@ class EmailService {
         command: error.command,
         stack: error.stack,
         to: mailOptions.to,
-        subject: mailOptions.subject
+        subject: mailOptions.subject,
+        traceId
       });
 
       // Return user-friendly error messages
@@ -239,6 +255,9 @@ class EmailService {
         subject: mailOptions.subject,
         htmlContent: mailOptions.html,
         trigger,
+        orderId,
+        traceId,
+        ...renderLog,
         status: 'failed',
         error: userMessage,
         errorCode: error.code
@@ -278,7 +297,7 @@ class EmailService {
 
       // Render template
       logger.info('Rendering React Email template', { templateType, to });
-      const { subject, html } = await EmailRenderer.renderTemplate(templateType, data);
+      const { subject, html, render } = await EmailRenderer.renderTemplate(templateType, data);
 
       // Prepare mail options
       const mailOptions = {
@@ -293,13 +312,15 @@ class EmailService {
       const trigger = options.trigger || this.mapTemplateTrigger(templateType);
 
       // Send email with trigger information for logging
-      const result = await this.sendEmail(mailOptions, trigger);
+      const result = await this.sendEmail(mailOptions, trigger, { templateName: templateType, render });
 
       if (result.success) {
         logger.info('React Email sent successfully', {
           templateType,
           trigger,
           to,
+          renderMode: render.mode,
+          renderMs: render.renderMs,
           messageId: result.messageId
         });
       }
@@ -420,9 +441,10 @@ class EmailService {
    * Send delivery completed email
    * @param {Object} orderData - Order details
    * @param {String} to - Recipient email
+   * @param {Object} context - { orderId, traceId } (optional)
    * @returns {Promise<Object>}
    */
-  async sendDeliveryCompleted(orderData, to) {
+  async sendDeliveryCompleted(orderData, to, context = {}) {
     const mailOptions = {
       from: `"Tulumbak Baklava" <${process.env.SMTP_USER}>`,
       to,
@@ -430,7 +452,7 @@ class EmailService {
       html: this.getDeliveryCompletedTemplate(orderData),
     };
 
-    return await this.sendEmail(mailOptions, 'orderDelivered');
+    return await this.sendEmail(mailOptions, 'orderDelivered', context);
   }
 
   /**
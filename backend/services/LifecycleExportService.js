@@ -0,0 +1,446 @@
+import fs from 'fs';
+import path from 'path';
+import readline from 'readline';
+import zlib from 'zlib';
+import { once } from 'events';
+import { pipeline } from 'stream/promises';
+import orderModel from '../models/OrderModel.js';
+import webhookLogModel from '../models/WebhookLogModel.js';
+import { MUDITAKURYE_STATUSES } from '../schemas/generated/muditaKuryeContract.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Lifecycle Export Service
+ * Streams order and courier status data to compressed columnar files for offline analysis
+ * (time spent in each courier status, per branch/platform/day) so it doesn't run on Mongo.
+ *
+ * - Orders are walked with a cursor in (date, _id) order from secondaries when available,
+ *   and their courier webhooks are loaded in batches through the orderId index
+ * - Two datasets, partitioned by order date (UTC):
+ *     <dir>/order_lifecycle/date=YYYY-MM-DD/part-*.jsonl.gz       one row per order
+ *     <dir>/courier_status_events/date=YYYY-MM-DD/part-*.jsonl.gz one row per status event
+ * - Files are gzip'd JSON lines: a schema header, then record batches of up to rowGroupSize
+ *   rows stored column by column ({ rows, columns: { name: [values] } })
+ * - Only orders older than settleMs are exported, so their lifecycle is complete. The last
+ *   exported (date, _id) is the high-water mark in <dir>/_state.json, written after each part
+ *   is renamed into place; part names derive from their first order, so a run interrupted
+ *   between the two rewrites the same files instead of duplicating rows
+ */
+
+const FORMAT = 'tulumbak-columnar';
+const FORMAT_VERSION = 1;
+const DAY_MS = 24 * 60 * 60 * 1000;
+const STAGES = MUDITAKURYE_STATUSES.filter(status => status !== 'DELIVERED' && status !== 'CANCELED');
+const TERMINAL_STATUSES = new Set(['DELIVERED', 'CANCELED', 'FAILED']);
+
+const ORDER_SCHEMA = [
+    { name: 'orderId', type: 'string' },
+    { name: 'date', type: 'timestamp_ms' },
+    { name: 'branchCode', type: 'string' },
+    { name: 'platform', type: 'string' },
+    { name: 'paymentMethod', type: 'string' },
+    { name: 'amount', type: 'double' },
+    { name: 'status', type: 'string' },
+    { name: 'courierStatus', type: 'string' },
+    { name: 'submittedAt', type: 'timestamp_ms' },
+    { name: 'deliveredAt', type: 'timestamp_ms' },
+    { name: 'finalCourierStatus', type: 'string' },
+    { name: 'courierEvents', type: 'int32' },
+    { name: 'courierDurationMs', type: 'int64' },
+    ...STAGES.map(stage => ({ name: `${stage}_ms`, type: 'int64' }))
+];
+
+const EVENT_SCHEMA = [
+    { name: 'orderId', type: 'string' },
+    { name: 'platform', type: 'string' },
+    { name: 'source', type: 'string' },
+    { name: 'status', type: 'string' },
+    { name: 'previousStatus', type: 'string' },
+    { name: 'eventAt', type: 'timestamp_ms' },
+    { name: 'receivedAt', type: 'timestamp_ms' },
+    { name: 'durationMs', type: 'int64' }
+];
+
+const partitionOf = (time) => new Date(time).toISOString().slice(0, 10);
+
+/**
+ * Order a single order's courier events and work out how long it stayed in each status
+ * @param {Array<{status, eventAt}>} events
+ * @returns {{events: Array, stages: object, finalStatus: string|null, durationMs: number|null}}
+ */
+const stageDurations = (events) => {
+    const ordered = [];
+    const seen = new Set();
+    for (const event of [...events].sort((a, b) => a.eventAt - b.eventAt)) {
+        // Retried webhooks repeat a status; its first occurrence is when the order got there
+        if (seen.has(event.status)) continue;
+        seen.add(event.status);
+        ordered.push({ ...event, durationMs: null });
+    }
+
+    const stages = {};
+    for (let i = 0; i < ordered.length; i++) {
+        const next = ordered[i + 1];
+        if (!next || TERMINAL_STATUSES.has(ordered[i].status)) break;
+        ordered[i].durationMs = next.eventAt - ordered[i].eventAt;
+        stages[ordered[i].status] = (stages[ordered[i].status] || 0) + ordered[i].durationMs;
+    }
+
+    const last = ordered[ordered.length - 1];
+    return {
+        events: ordered,
+        stages,
+        finalStatus: last ? last.status : null,
+        durationMs: last && TERMINAL_STATUSES.has(last.status) ? last.eventAt - ordered[0].eventAt : null
+    };
+};
+
+/**
+ * Columnar writer for one part file of one dataset
+ */
+class ColumnarFileWriter {
+    constructor(filePath, dataset, schema, rowGroupSize) {
+        this.filePath = filePath;
+        this.tempPath = `${filePath}.tmp`;
+        this.schema = schema;
+        this.rowGroupSize = rowGroupSize;
+        this.rows = 0;
+        this.pending = 0;
+        this.columns = null;
+
+        fs.mkdirSync(path.dirname(filePath), { recursive: true });
+        this.gzip = zlib.createGzip();
+        this.file = fs.createWriteStream(this.tempPath);
+        this.done = pipeline(this.gzip, this.file);
+        // Surfaced by the next write or close()
+        this.done.catch(() => {});
+
+        this.resetColumns();
+        this.gzip.write(JSON.stringify({ format: FORMAT, version: FORMAT_VERSION, dataset, schema }) + '\n');
+    }
+
+    resetColumns() {
+        this.columns = Object.fromEntries(this.schema.map(field => [field.name, []]));
+        this.pending = 0;
+    }
+
+    async append(row) {
+        for (const field of this.schema) {
+            this.columns[field.name].push(row[field.name] ?? null);
+        }
+        this.pending++;
+        this.rows++;
+        if (this.pending >= this.rowGroupSize) await this.flushRowGroup();
+    }
+
+    async flushRowGroup() {
+        if (this.pending === 0) return;
+        const line = JSON.stringify({ rows: this.pending, columns: this.columns }) + '\n';
+        this.resetColumns();
+        if (!this.gzip.write(line)) await Promise.race([once(this.gzip, 'drain'), this.done]);
+    }
+
+    /**
+     * Finish the file and move it into place
+     */
+    async close() {
+        await this.flushRowGroup();
+        this.gzip.end();
+        await this.done;
+        await fs.promises.rename(this.tempPath, this.filePath);
+    }
+
+    async discard() {
+        this.gzip.destroy();
+        this.file.destroy();
+        await fs.promises.rm(this.tempPath, { force: true });
+    }
+}
+
+/**
+ * Read a columnar file back row by row
+ */
+async function* readColumnarFile(filePath) {
+    const lines = readline.createInterface({
+        input: fs.createReadStream(filePath).pipe(zlib.createGunzip()),
+        crlfDelay: Infinity
+    });
+
+    let schema = null;
+    for await (const line of lines) {
+        if (!line) continue;
+        const record = JSON.parse(line);
+        if (!schema) {
+            schema = record.schema;
+            continue;
+        }
+        for (let i = 0; i < record.rows; i++) {
+            yield Object.fromEntries(schema.map(field => [field.name, record.columns[field.name][i]]));
+        }
+    }
+}
+
+class LifecycleExporter {
+    constructor(config = {}) {
+        this.config = {
+            outputDir: config.outputDir || process.env.LIFECYCLE_EXPORT_DIR,
+            ordersPerFile: config.ordersPerFile || parseInt(process.env.LIFECYCLE_EXPORT_ORDERS_PER_FILE) || 50000,
+            rowGroupSize: config.rowGroupSize || 5000,
+            batchSize: config.batchSize || 500,
+            settleMs: config.settleMs ?? (parseInt(process.env.LIFECYCLE_EXPORT_SETTLE_DAYS) || 2) * DAY_MS
+        };
+
+        this.running = false;
+        this.metrics = {
+            runs: 0,
+            orders: 0,
+            events: 0,
+            files: 0,
+            lastRun: null
+        };
+    }
+
+    get statePath() {
+        return path.join(this.config.outputDir, '_state.json');
+    }
+
+    async loadState() {
+        try {
+            return JSON.parse(await fs.promises.readFile(this.statePath, 'utf8'));
+        } catch (error) {
+            if (error.code === 'ENOENT') return { highWaterMark: null, exportedOrders: 0 };
+            throw error;
+        }
+    }
+
+    async saveState(state) {
+        const tempPath = `${this.statePath}.tmp`;
+        await fs.promises.writeFile(tempPath, JSON.stringify(state, null, 2));
+        await fs.promises.rename(tempPath, this.statePath);
+    }
+
+    /**
+     * Orders after the high-water mark that are old enough to be complete
+     */
+    openCursor(highWaterMark, settledBefore) {
+        const query = { date: { $lt: settledBefore } };
+        if (highWaterMark) {
+            query.$or = [
+                { date: { $gt: highWaterMark.date } },
+                { date: highWaterMark.date, _id: { $gt: highWaterMark.orderId } }
+            ];
+        }
+
+        return orderModel.find(query)
+            .select('date amount paymentMethod status courierStatus branchCode actualDelivery statusHistory courierIntegration.platform courierIntegration.externalOrderId courierIntegration.submittedAt')
+            .sort({ date: 1, _id: 1 })
+            .read('secondaryPreferred')
+            .lean()
+            .cursor({ batchSize: this.config.batchSize });
+    }
+
+    /**
+     * Courier status events of a batch of orders: webhooks first, status history otherwise
+     * @returns {Map<string, Array>} orderId -> events
+     */
+    async loadEvents(orders) {
+        const ids = new Map();
+        for (const order of orders) {
+            ids.set(String(order._id), String(order._id));
+            const externalOrderId = order.courierIntegration?.externalOrderId;
+            if (externalOrderId) ids.set(externalOrderId, String(order._id));
+        }
+
+        const logs = await webhookLogModel.find({
+            orderId: { $in: [...ids.keys()] },
+            status: { $ne: 'failed' }
+        })
+            .select('orderId platform createdAt payload.status payload.previousStatus payload.timestamp')
+            .read('secondaryPreferred')
+            .lean();
+
+        const events = new Map();
+        for (const log of logs) {
+            const status = log.payload?.status;
+            if (!status) continue;
+            const orderId = ids.get(log.orderId);
+            const eventAt = Date.parse(log.payload.timestamp) || log.createdAt;
+            if (!events.has(orderId)) events.set(orderId, []);
+            events.get(orderId).push({
+                source: 'webhook',
+                platform: log.platform,
+                status,
+                previousStatus: log.payload.previousStatus || null,
+                eventAt,
+                receivedAt: log.createdAt
+            });
+        }
+
+        for (const order of orders) {
+            const orderId = String(order._id);
+            if (events.has(orderId)) continue;
+            const history = (order.statusHistory || []).filter(entry => entry.updatedBy === 'courier');
+            if (history.length === 0) continue;
+            events.set(orderId, history.map(entry => ({
+                source: 'history',
+                platform: order.courierIntegration?.platform || null,
+                status: entry.status,
+                previousStatus: null,
+                eventAt: entry.timestamp,
+                receivedAt: entry.timestamp
+            })));
+        }
+
+        return events;
+    }
+
+    /**
+     * Export everything after the high-water mark
+     * @returns {Promise<object>} run summary
+     */
+    async run() {
+        if (!this.config.outputDir) {
+            throw new Error('LIFECYCLE_EXPORT_DIR is not configured');
+        }
+        if (this.running) {
+            logger.warn('Lifecycle export already running, skipping');
+            return null;
+        }
+        this.running = true;
+
+        const startedAt = Date.now();
+        const summary = { orders: 0, events: 0, files: 0, partitions: new Set() };
+        let part = null;
+
+        try {
+            await fs.promises.mkdir(this.config.outputDir, { recursive: true });
+            const state = await this.loadState();
+            const cursor = this.openCursor(state.highWaterMark, startedAt - this.config.settleMs);
+
+            const openPart = (order) => {
+                const partition = partitionOf(order.date);
+                const name = `part-${order.date}-${order._id}.jsonl.gz`;
+                const file = (dataset) => path.join(this.config.outputDir, dataset, `date=${partition}`, name);
+                return {
+                    partition,
+                    orders: 0,
+                    last: null,
+                    orderWriter: new ColumnarFileWriter(file('order_lifecycle'), 'order_lifecycle', ORDER_SCHEMA, this.config.rowGroupSize),
+                    eventWriter: new ColumnarFileWriter(file('courier_status_events'), 'courier_status_events', EVENT_SCHEMA, this.config.rowGroupSize)
+                };
+            };
+
+            const closePart = async () => {
+                if (!part) return;
+                await part.orderWriter.close();
+                await part.eventWriter.close();
+                summary.files += 2;
+                summary.partitions.add(part.partition);
+
+                state.highWaterMark = { date: part.last.date, orderId: String(part.last._id) };
+                state.exportedOrders = (state.exportedOrders || 0) + part.orders;
+                state.updatedAt = Date.now();
+                await this.saveState(state);
+                part = null;
+            };
+
+            const writeBatch = async (orders) => {
+                const events = await this.loadEvents(orders);
+
+                for (const order of orders) {
+                    if (part && (part.partition !== partitionOf(order.date) || part.orders >= this.config.ordersPerFile)) {
+                        await closePart();
+                    }
+                    if (!part) part = openPart(order);
+
+                    const orderId = String(order._id);
+                    const lifecycle = stageDurations(events.get(orderId) || []);
+
+                    await part.orderWriter.append({
+                        orderId,
+                        date: order.date,
+                        branchCode: order.branchCode,
+                        platform: order.courierIntegration?.platform,
+                        paymentMethod: order.paymentMethod,
+                        amount: order.amount,
+                        status: order.status,
+                        courierStatus: order.courierStatus,
+                        submittedAt: order.courierIntegration?.submittedAt,
+                        deliveredAt: order.actualDelivery,
+                        finalCourierStatus: lifecycle.finalStatus,
+                        courierEvents: lifecycle.events.length,
+                        courierDurationMs: lifecycle.durationMs,
+                        ...Object.fromEntries(STAGES.map(stage => [`${stage}_ms`, lifecycle.stages[stage] ?? null]))
+                    });
+
+                    for (const event of lifecycle.events) {
+                        await part.eventWriter.append({ orderId, ...event });
+                    }
+
+                    part.orders++;
+                    part.last = order;
+                    summary.orders++;
+                    summary.events += lifecycle.events.length;
+                }
+            };
+
+            let batch = [];
+            for await (const order of cursor) {
+                batch.push(order);
+                if (batch.length >= this.config.batchSize) {
+                    await writeBatch(batch);
+                    batch = [];
+                }
+            }
+            if (batch.length > 0) await writeBatch(batch);
+            await closePart();
+
+            const result = {
+                orders: summary.orders,
+                events: summary.events,
+                files: summary.files,
+                partitions: [...summary.partitions],
+                highWaterMark: state.highWaterMark,
+                durationMs: Date.now() - startedAt
+            };
+
+            this.metrics.runs++;
+            this.metrics.orders += summary.orders;
+            this.metrics.events += summary.events;
+            this.metrics.files += summary.files;
+            this.metrics.lastRun = { ...result, at: startedAt };
+
+            logger.info('Lifecycle export completed', { ...result, partitions: result.partitions.length });
+            return result;
+        } catch (error) {
+            // The unfinished part is dropped; the next run resumes from the last saved mark
+            if (part) {
+                await part.orderWriter.discard();
+                await part.eventWriter.discard();
+            }
+            logger.error('Lifecycle export failed', {
+                error: error.message,
+                stack: error.stack,
+                exportedOrders: summary.orders
+            });
+            throw error;
+        } finally {
+            this.running = false;
+        }
+    }
+
+    getStats() {
+        return {
+            ...this.config,
+            running: this.running,
+            ...this.metrics
+        };
+    }
+}
+
+// Export singleton instance
+const lifecycleExporter = new LifecycleExporter();
+export default lifecycleExporter;
+
+// Also export class for testing
+export { LifecycleExporter, ColumnarFileWriter, readColumnarFile, stageDurations, ORDER_SCHEMA, EVENT_SCHEMA };
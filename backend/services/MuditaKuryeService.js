@@ -1,10 +1,31 @@
 import axios from 'axios';
 import crypto from 'crypto';
+import http from 'http';
+import https from 'https';
 import CourierIntegrationConfigModel from '../models/CourierIntegrationConfigModel.js';
 import DeadLetterQueueModel from '../models/DeadLetterQueueModel.js';
 import WebhookSecurity from '../utils/webhookSecurity.js';
+import { validateMuditaKuryeOrder } from '../schemas/generated/muditaKuryeContract.js';
 import logger from '../utils/logger.js';
 
+// Keep-alive agents shared across re-initializations, so order submissions reuse
+// connections instead of paying a TCP + TLS handshake per request
+const agentOptions = {
+    keepAlive: true,
+    maxSockets: parseInt(process.env.COURIER_SUBMIT_CONCURRENCY) || 8,
+    maxFreeSockets: 4
+};
+const httpAgent = new http.Agent(agentOptions);
+const httpsAgent = new https.Agent(agentOptions);
+
+// Status polls and health checks get their own sockets, so they never queue behind a full
+// submission pipeline (and the circuit breaker / health checks don't see that as timeouts)
+const controlAgentOptions = { keepAlive: true, maxSockets: 4, maxFreeSockets: 2 };
+const controlAgents = {
+    httpAgent: new http.Agent(controlAgentOptions),
+    httpsAgent: new https.Agent(controlAgentOptions)
+};
+
 /**
  * MuditaKurye Integration Service
  * Handles all interactions with MuditaKurye API
@@ -17,6 +38,8 @@ class MuditaKuryeService {
         this.config = null;
         this.authToken = null;
         this.tokenExpiresAt = null;
+        // Orders can only be cancelled in the MuditaKurye panel, so it can't take hedged submissions
+        this.supportsCancellation = false;
     }
 
     /**
@@ -62,6 +85,8 @@ class MuditaKuryeService {
             this.apiClient = axios.create({
                 baseURL,
                 timeout: 30000, // 30 seconds
+                httpAgent,
+                httpsAgent,
                 headers: {
                     'Content-Type': 'application/json',
                     'Accept': 'application/json',
@@ -204,27 +229,38 @@ class MuditaKuryeService {
             deliveryAddress = parts.join(', ');
         }
 
+        // Stored values can be strings (amounts, coordinates) or numbers (phone); send the
+        // types the contract documents
+        const toNumber = (value, fallback = 0) => {
+            const number = Number(value);
+            return value !== null && value !== undefined && value !== '' && Number.isFinite(number) ? number : fallback;
+        };
+        const phone = tulumbakOrder.address?.phone || tulumbakOrder.phone;
+        const amount = toNumber(tulumbakOrder.amount);
+        const deliveryFee = toNumber(tulumbakOrder.delivery?.fee);
+        const serviceFee = toNumber(tulumbakOrder.codFee);
+
         const transformed = {
             orderId: tulumbakOrder._id.toString(),
             restaurantId: this.config.restaurantId || tulumbakOrder.muditaRestaurantId || process.env.MUDITA_RESTAURANT_ID,
             customerName: tulumbakOrder.address?.name || tulumbakOrder.address?.firstName || tulumbakOrder.address?.lastName || 'Müşteri',
-            customerPhone: tulumbakOrder.address?.phone || tulumbakOrder.phone,
+            customerPhone: phone ? String(phone) : phone,
             customerEmail: tulumbakOrder.address?.email || null,
             deliveryAddress: deliveryAddress,
-            deliveryLatitude: tulumbakOrder.address?.latitude || tulumbakOrder.address?.coordinates?.latitude || null,
-            deliveryLongitude: tulumbakOrder.address?.longitude || tulumbakOrder.address?.coordinates?.longitude || null,
+            deliveryLatitude: toNumber(tulumbakOrder.address?.latitude || tulumbakOrder.address?.coordinates?.latitude, null),
+            deliveryLongitude: toNumber(tulumbakOrder.address?.longitude || tulumbakOrder.address?.coordinates?.longitude, null),
 
             // Payment information
             paymentMethod: this.mapPaymentMethod(tulumbakOrder.paymentMethod),
             paymentCaptured: tulumbakOrder.payment === true,
 
             // Amount details
-            subtotal: tulumbakOrder.amount - (tulumbakOrder.delivery?.fee || 0) - (tulumbakOrder.codFee || 0),
-            deliveryFee: tulumbakOrder.delivery?.fee || 0,
-            serviceFee: tulumbakOrder.codFee || 0,
+            subtotal: amount - deliveryFee - serviceFee,
+            deliveryFee,
+            serviceFee,
             discount: 0, // TODO: Add discount field if available
             taxAmount: 0, // TODO: Add tax calculation if needed
-            total: tulumbakOrder.amount,
+            total: amount,
             currency: 'TRY',
 
             // Additional fields
@@ -234,24 +270,22 @@ class MuditaKuryeService {
 
             // Order items
             items: tulumbakOrder.items?.map((item, index) => ({
-                productCode: item.productId || `ITEM-${index + 1}`,
+                productCode: item.productId ? String(item.productId) : `ITEM-${index + 1}`,
                 productName: item.name || 'Ürün',
-                quantity: item.quantity || 1,
-                unitPrice: item.price || 0,
-                totalAmount: (item.quantity || 1) * (item.price || 0),
+                quantity: toNumber(item.quantity, 1) || 1,
+                unitPrice: toNumber(item.price),
+                totalAmount: (toNumber(item.quantity, 1) || 1) * toNumber(item.price),
                 discountAmount: 0,
                 productNote: item.note || '',
                 features: item.extras || ''
             })) || []
         };
 
-        // Validate required fields
-        if (!transformed.restaurantId) {
-            throw new Error('Restaurant ID is required for MuditaKurye');
-        }
-
-        if (!transformed.deliveryAddress) {
-            throw new Error('Delivery address is required');
+        // Validate against the documented order contract (generated validator)
+        const validation = validateMuditaKuryeOrder(transformed);
+        if (!validation.valid) {
+            const fields = validation.errors.map(error => error.message).join(', ');
+            throw new Error(`Invalid MuditaKurye order: ${fields}`);
         }
 
         return transformed;
@@ -501,7 +535,7 @@ class MuditaKuryeService {
         try {
             await this.authenticate();
 
-            const response = await this.apiClient.get(`/api/orders/${externalOrderId}`);
+            const response = await this.apiClient.get(`/api/orders/${externalOrderId}`, { ...controlAgents });
 
             return {
                 success: true,
@@ -540,7 +574,7 @@ class MuditaKuryeService {
             await this.authenticate();
 
             // Try health check endpoint
-            const response = await this.apiClient.get('/webhook/third-party/health');
+            const response = await this.apiClient.get('/webhook/third-party/health', { ...controlAgents });
 
             return {
                 success: true,
@@ -560,8 +594,9 @@ class MuditaKuryeService {
     /**
      * Verify webhook signature
      * Now uses WebhookSecurity utility (DRY principle)
+     * Verifies over the raw body when it is available
      */
-    verifyWebhookSignature(payload, signature, timestamp) {
+    verifyWebhookSignature(payload, signature, timestamp, rawBody = null) {
         try {
             // Get secret key from config or env
             const secretKey = this.config?.webhookSecret ||
@@ -574,6 +609,10 @@ class MuditaKuryeService {
             }
 
             // Use WebhookSecurity utility for verification
+            if (rawBody) {
+                return WebhookSecurity.verifyRawSignature(rawBody, signature, timestamp, secretKey);
+            }
+
             return WebhookSecurity.verifySignature(
                 payload,
                 signature,
@@ -1,16 +1,83 @@
+import os from 'os';
 import logger from '../utils/logger.js';
 import eventEmitter from '../utils/eventEmitter.js';
+import { getRedisClient, isRedisAvailable } from '../config/redis.js';
 
 /**
  * Server-Sent Events (SSE) Notification Service
  * Handles real-time order notifications to admin panel
+ *
+ * - Fan-out across instances: events are published on a Redis channel and every instance
+ *   delivers them to its own connections, so an admin connected to instance A sees orders
+ *   placed on instance B. Without Redis, events are delivered in-process
+ * - Channels: every connection follows `all`, `role:<role>` and either `branch:<branchId>`
+ *   (?branch=) or `orders` (every branch). Order events go to `orders` and their branch
+ * - Every event has an id (Redis INCR) and is kept in a ring buffer (in Redis for instances
+ *   that start later, and in memory for replay). A reconnect with Last-Event-ID (header or
+ *   ?lastEventId=) gets what it missed; when that has already left the buffer it gets a
+ *   RESYNC event instead
+ * - Events delivered in-process (no Redis, or a failed publish) get ids of their own
+ *   (`local-<n>`) and ring buffer, so they never take an id a later Redis INCR hands out
+ * - Until the subscription succeeds, initialize is retried with backoff, so Redis coming up
+ *   after this instance started still enables fan-out
+ * - Each connection has a bounded send buffer: frames queue while the socket is not drained,
+ *   and a client that falls too far behind (or stays blocked) is disconnected; its reconnect
+ *   catches up from the ring buffer
+ * - Keep-alive is an SSE comment, written only to connections idle for keepAliveMs
+ * - The `retry:` hint is jittered so a restart doesn't bring every panel back at once
  */
+
+const REDIS_CHANNEL = 'notifications:events';
+const RING_KEY = 'notifications:ring';
+const SEQUENCE_KEY = 'notifications:seq';
+
 class NotificationService {
-  constructor() {
-    // Map of connected admin clients: adminId -> response object
+  constructor(config = {}) {
+    this.config = {
+      ringSize: config.ringSize || parseInt(process.env.NOTIFICATION_REPLAY_BUFFER) || 500,
+      maxBufferedMessages: config.maxBufferedMessages || 200,
+      maxBufferedBytes: config.maxBufferedBytes || 512 * 1024,
+      // A connection whose socket hasn't drained for this long is disconnected
+      slowClientMs: config.slowClientMs || 30000,
+      keepAliveMs: config.keepAliveMs || 30000,
+      retryMs: config.retryMs || 3000,
+      retryJitterMs: config.retryJitterMs || 7000,
+      // Redis subscription retries: doubling from initRetryMs up to initRetryMaxMs
+      initRetryMs: config.initRetryMs || 5000,
+      initRetryMaxMs: config.initRetryMaxMs || 60000
+    };
+
+    this.instanceId = `${os.hostname()}-${process.pid}`;
+
+    // Map of connected admin clients: connectionId -> client (an admin can have several tabs)
     this.clients = new Map();
+    // channel -> Set(connectionId)
+    this.channels = new Map();
+    this.connectionSeq = 0;
+
+    // Recent events ({ id, channels, data }) in id order, for Last-Event-ID replay
+    this.ring = [];
+    this.lastId = 0;
+
+    // Events delivered in-process ({ id: 'local-<seq>', seq, channels, data }), in seq order
+    this.localRing = [];
+    this.localSeq = 0;
+
+    // Dedicated Redis connection for SUBSCRIBE (set by initialize)
+    this.subscriber = null;
+    this.initTimer = null;
+    this.initAttempts = 0;
+
+    this.metrics = {
+      published: 0,
+      delivered: 0,
+      replayed: 0,
+      resyncs: 0,
+      evicted: 0,
+      redisFallbacks: 0
+    };
 
-    // Keep-alive interval (every 30 seconds)
+    // Keep-alive interval (checks idle and slow connections)
     this.keepAliveInterval = null;
 
     this.initializeEventListeners();
@@ -40,15 +107,80 @@ class NotificationService {
   }
 
   /**
-   * Start keep-alive ping to prevent connection timeout
+   * Subscribe to the Redis channel and load the shared ring buffer
+   * Until it succeeds the service delivers in-process and tries again later
+   */
+  async initialize() {
+    if (this.initTimer) {
+      clearTimeout(this.initTimer);
+      this.initTimer = null;
+    }
+    if (this.subscriber) return;
+
+    if (!isRedisAvailable()) {
+      this.scheduleInitialize();
+      return;
+    }
+
+    const subscriber = getRedisClient().duplicate();
+    subscriber.on('error', (error) => {
+      logger.error('Notification subscriber error', { error: error.message });
+    });
+
+    try {
+      await subscriber.connect();
+      await subscriber.subscribe(REDIS_CHANNEL, (message) => {
+        try {
+          this.receive(JSON.parse(message));
+        } catch (error) {
+          logger.error('Invalid notification message', { error: error.message });
+        }
+      });
+      this.subscriber = subscriber;
+      this.initAttempts = 0;
+
+      // Events published before this instance started, for panels reconnecting here
+      const recent = await getRedisClient().lRange(RING_KEY, 0, -1);
+      recent.forEach(message => this.remember(JSON.parse(message)));
+
+      logger.info('NotificationService subscribed to Redis', {
+        instanceId: this.instanceId,
+        replayBuffer: this.ring.length,
+        lastEventId: this.lastId
+      });
+    } catch (error) {
+      logger.error('NotificationService Redis subscription failed, delivering in-process', { error: error.message });
+      this.subscriber = null;
+      subscriber.disconnect().catch(() => {});
+      this.scheduleInitialize();
+    }
+  }
+
+  /**
+   * Retry initialize with exponential backoff
+   */
+  scheduleInitialize() {
+    if (this.initTimer) return;
+
+    const delay = Math.min(this.config.initRetryMs * 2 ** this.initAttempts, this.config.initRetryMaxMs);
+    this.initAttempts++;
+    this.initTimer = setTimeout(() => {
+      this.initTimer = null;
+      this.initialize().catch(error => {
+        logger.error('NotificationService initialize retry failed', { error: error.message });
+      });
+    }, delay);
+    this.initTimer.unref?.();
+  }
+
+  /**
+   * Start keep-alive and slow-client checks
    */
   startKeepAlive() {
     this.keepAliveInterval = setInterval(() => {
-      this.broadcast({
-        type: 'ping',
-        timestamp: Date.now()
-      });
-    }, 30000); // 30 seconds
+      this.checkClients();
+    }, Math.max(1000, Math.floor(this.config.keepAliveMs / 3)));
+    this.keepAliveInterval.unref?.();
   }
 
   /**
@@ -61,12 +193,27 @@ class NotificationService {
     }
   }
 
+  /**
+   * Ping idle connections, disconnect connections that stopped reading
+   */
+  checkClients(now = Date.now()) {
+    for (const client of Array.from(this.clients.values())) {
+      if (client.blockedSince && now - client.blockedSince > this.config.slowClientMs) {
+        this.evict(client, 'not_draining');
+      } else if (!client.blockedSince && now - client.lastWriteAt >= this.config.keepAliveMs) {
+        this.write(client, ': ping\n\n', false);
+      }
+    }
+  }
+
   /**
    * Add new SSE client connection
    * @param {string} adminId - Admin user identifier
    * @param {object} response - Express response object
+   * @param {object} options - { role, branch, lastEventId }
+   * @returns {string} Connection id
    */
-  addClient(adminId, response) {
+  addClient(adminId, response, { role = 'admin', branch = null, lastEventId = null } = {}) {
     // Set SSE headers
     response.writeHead(200, {
       'Content-Type': 'text/event-stream',
@@ -75,86 +222,306 @@ class NotificationService {
       'X-Accel-Buffering': 'no', // Disable nginx buffering
     });
 
-    // Add client to connections map
-    this.clients.set(adminId, response);
+    const connectionId = `${adminId || 'admin'}:${++this.connectionSeq}`;
+    const client = {
+      id: connectionId,
+      adminId,
+      role,
+      branch,
+      channels: new Set(['all', `role:${role}`, branch ? `branch:${branch}` : 'orders']),
+      response,
+      pending: [],
+      pendingBytes: 0,
+      blockedSince: null,
+      lastWriteAt: Date.now(),
+      connectedAt: Date.now()
+    };
+
+    this.clients.set(connectionId, client);
+    for (const channel of client.channels) {
+      if (!this.channels.has(channel)) this.channels.set(channel, new Set());
+      this.channels.get(channel).add(connectionId);
+    }
 
-    logger.info('SSE client connected', { adminId, totalClients: this.clients.size });
+    logger.info('SSE client connected', { adminId, connectionId, branch, lastEventId, totalClients: this.clients.size });
 
-    // Send initial connection success message
-    this.sendToClient(adminId, {
+    // Reconnect delay for EventSource, spread so a restart doesn't bring every panel back at once
+    this.write(client, `retry: ${this.config.retryMs + Math.floor(Math.random() * this.config.retryJitterMs)}\n\n`, false);
+
+    // Send initial connection success message (no id, so the client keeps its Last-Event-ID)
+    this.sendToClient(connectionId, {
       type: 'connected',
       message: 'Bildirim sistemi bağlandı',
+      lastEventId: this.lastId,
       timestamp: Date.now()
     });
 
+    if (lastEventId !== null && lastEventId !== undefined && lastEventId !== '') {
+      this.replay(client, lastEventId);
+    }
+
     // Handle client disconnect
     response.on('close', () => {
-      this.removeClient(adminId);
+      this.removeClient(connectionId);
     });
+
+    return connectionId;
   }
 
   /**
    * Remove disconnected client
-   * @param {string} adminId - Admin user identifier
+   * @param {string} connectionId - Connection identifier
    */
-  removeClient(adminId) {
-    const removed = this.clients.delete(adminId);
-    if (removed) {
-      logger.info('SSE client disconnected', { adminId, totalClients: this.clients.size });
+  removeClient(connectionId) {
+    const client = this.clients.get(connectionId);
+    if (!client) return false;
+
+    this.clients.delete(connectionId);
+    for (const channel of client.channels) {
+      const members = this.channels.get(channel);
+      members?.delete(connectionId);
+      if (members?.size === 0) this.channels.delete(channel);
     }
+
+    logger.info('SSE client disconnected', { adminId: client.adminId, connectionId, totalClients: this.clients.size });
+    return true;
   }
 
   /**
-   * Send message to specific admin client
-   * @param {string} adminId - Target admin identifier
-   * @param {object} data - Data to send
+   * Disconnect a client that can't keep up; it reconnects and replays from the ring buffer
    */
-  sendToClient(adminId, data) {
-    const response = this.clients.get(adminId);
-    if (!response) {
-      logger.warn('Attempted to send to non-existent client', { adminId });
-      return false;
+  evict(client, reason) {
+    this.metrics.evicted++;
+    logger.warn('Evicting slow SSE client', {
+      adminId: client.adminId,
+      connectionId: client.id,
+      reason,
+      bufferedMessages: client.pending.length,
+      bufferedBytes: client.pendingBytes
+    });
+
+    this.removeClient(client.id);
+    client.pending = [];
+    client.pendingBytes = 0;
+    try {
+      // Its socket isn't draining, so end() would only queue behind the backlog
+      client.response.destroy();
+    } catch (error) {
+      logger.error('Error closing SSE connection', { connectionId: client.id, error: error.message });
+    }
+  }
+
+  /**
+   * Write a frame, or queue it while the socket is not drained
+   * @returns {boolean} Whether the frame was written or queued
+   */
+  write(client, frame, counted = true) {
+    if (!client || !this.clients.has(client.id)) return false;
+
+    if (client.blockedSince) {
+      client.pending.push(frame);
+      client.pendingBytes += Buffer.byteLength(frame);
+      if (client.pending.length > this.config.maxBufferedMessages || client.pendingBytes > this.config.maxBufferedBytes) {
+        this.evict(client, 'buffer_full');
+        return false;
+      }
+      return true;
     }
 
     try {
-      response.write(`data: ${JSON.stringify(data)}\n\n`);
+      const flushed = client.response.write(frame);
+      client.lastWriteAt = Date.now();
+      if (counted) this.metrics.delivered++;
+
+      if (!flushed) {
+        client.blockedSince = Date.now();
+        client.response.once('drain', () => this.flush(client));
+      }
       return true;
     } catch (error) {
       logger.error('Error sending SSE message to client', {
-        adminId,
+        adminId: client.adminId,
+        connectionId: client.id,
         error: error.message
       });
-      this.removeClient(adminId);
+      this.removeClient(client.id);
       return false;
     }
   }
 
   /**
-   * Broadcast message to all connected admin clients
-   * @param {object} data - Data to broadcast
+   * Write queued frames after a drain
    */
-  broadcast(data) {
-    let successCount = 0;
-    let failCount = 0;
-
-    this.clients.forEach((response, adminId) => {
-      const success = this.sendToClient(adminId, data);
-      if (success) {
-        successCount++;
-      } else {
-        failCount++;
+  flush(client) {
+    if (!this.clients.has(client.id)) return;
+
+    client.blockedSince = null;
+    while (client.pending.length > 0 && !client.blockedSince) {
+      const frame = client.pending.shift();
+      client.pendingBytes -= Buffer.byteLength(frame);
+      this.write(client, frame, !frame.startsWith(':'));
+    }
+  }
+
+  /**
+   * Send message to one connection (not recorded for replay)
+   * @param {string} connectionId - Target connection identifier
+   * @param {object} data - Data to send
+   */
+  sendToClient(connectionId, data) {
+    const client = this.clients.get(connectionId);
+    if (!client) {
+      logger.warn('Attempted to send to non-existent client', { connectionId });
+      return false;
+    }
+
+    return this.write(client, `data: ${JSON.stringify(data)}\n\n`);
+  }
+
+  /**
+   * Publish an event to channels on every instance
+   * @param {object} data - Data to send
+   * @param {string[]} channels - e.g. ['orders', 'branch:<id>'], ['role:super_admin'], ['all']
+   * @returns {Promise<object>} { id, transport }
+   */
+  async publish(data, channels = ['all']) {
+    this.metrics.published++;
+
+    if (this.subscriber && isRedisAvailable()) {
+      try {
+        const client = getRedisClient();
+        const id = await client.incr(SEQUENCE_KEY);
+        const message = JSON.stringify({ id, channels, data });
+
+        // Delivered here too when the message comes back through the subscription
+        await client.multi()
+          .rPush(RING_KEY, message)
+          .lTrim(RING_KEY, -this.config.ringSize, -1)
+          .publish(REDIS_CHANNEL, message)
+          .exec();
+
+        return { id, transport: 'redis' };
+      } catch (error) {
+        this.metrics.redisFallbacks++;
+        logger.error('Failed to publish notification to Redis, delivering in-process', {
+          type: data.type,
+          error: error.message
+        });
       }
-    });
+    }
+
+    const seq = ++this.localSeq;
+    const event = { id: `local-${seq}`, seq, channels, data };
+    this.localRing.push(event);
+    if (this.localRing.length > this.config.ringSize) this.localRing.shift();
+    try {
+      this.deliver(event);
+    } catch (error) {
+      logger.error('Failed to deliver notification', { type: data.type, error: error.message });
+    }
+    return { id: event.id, transport: 'local' };
+  }
+
+  /**
+   * Deliver an event received from Redis, unless it was already delivered
+   * @returns {number} Connections written to
+   */
+  receive(event) {
+    if (!this.remember(event)) return 0;
+    return this.deliver(event);
+  }
+
+  /**
+   * Deliver an event to the connections following its channels
+   * @returns {number} Connections written to
+   */
+  deliver(event) {
+    const targets = new Set();
+    for (const channel of event.channels) {
+      this.channels.get(channel)?.forEach(connectionId => targets.add(connectionId));
+    }
+
+    // Serialized once for every connection
+    const frame = `id: ${event.id}\ndata: ${JSON.stringify(event.data)}\n\n`;
+    let delivered = 0;
+    for (const connectionId of targets) {
+      if (this.write(this.clients.get(connectionId), frame)) delivered++;
+    }
 
-    if (successCount > 0) {
-      logger.debug('Broadcast sent', {
-        type: data.type,
-        successCount,
-        failCount
+    if (delivered > 0) {
+      logger.debug('Notification delivered', { type: event.data.type, id: event.id, delivered });
+    }
+    return delivered;
+  }
+
+  /**
+   * Add an event to the ring buffer in id order
+   * @returns {boolean} False when the event is already there
+   */
+  remember(event) {
+    let at = this.ring.length;
+    while (at > 0 && this.ring[at - 1].id > event.id) at--;
+    if (at > 0 && this.ring[at - 1].id === event.id) return false;
+
+    this.ring.splice(at, 0, event);
+    if (this.ring.length > this.config.ringSize) this.ring.shift();
+    if (event.id > this.lastId) this.lastId = event.id;
+    return true;
+  }
+
+  /**
+   * Send a reconnecting client the events after lastEventId on its channels
+   * @param {string} lastEventId - a Redis id, or `local-<n>` for an in-process event
+   */
+  replay(client, lastEventId) {
+    const local = /^local-(\d+)$/.exec(String(lastEventId));
+    const after = local ? Number(local[1]) : Number(lastEventId);
+    if (!Number.isFinite(after) || after < 0) return 0;
+
+    const ring = local ? this.localRing : this.ring;
+    const newest = local ? this.localSeq : this.lastId;
+    const seqOf = local ? (event => event.seq) : (event => event.id);
+
+    // Events after lastEventId already left the buffer, or this instance never saw them
+    const oldest = ring[0];
+    if (after > newest || (oldest && seqOf(oldest) > after + 1)) {
+      this.metrics.resyncs++;
+      this.sendToClient(client.id, {
+        type: 'RESYNC',
+        title: 'Bildirimler Yenilendi',
+        message: 'Bağlantı koptuğu sırada gelen bazı bildirimler gösterilemedi, sipariş listesini yenileyin',
+        audio: false,
+        timestamp: Date.now()
       });
     }
 
-    return { successCount, failCount };
+    let replayed = 0;
+    for (const event of ring) {
+      if (seqOf(event) <= after || !event.channels.some(channel => client.channels.has(channel))) continue;
+      if (this.write(client, `id: ${event.id}\ndata: ${JSON.stringify(event.data)}\n\n`)) replayed++;
+    }
+
+    this.metrics.replayed += replayed;
+    if (replayed > 0) {
+      logger.info('Replayed missed notifications', { connectionId: client.id, lastEventId, replayed });
+    }
+    return replayed;
+  }
+
+  /**
+   * Broadcast message to every connection on the channels (all instances)
+   * @param {object} data - Data to broadcast
+   * @param {string[]} channels - Defaults to every connection
+   */
+  broadcast(data, channels = ['all']) {
+    return this.publish(data, channels);
+  }
+
+  /**
+   * Channels for an order event: every-branch panels plus the order's branch
+   */
+  orderChannels(orderData) {
+    return orderData.branchId ? ['orders', `branch:${orderData.branchId}`] : ['orders'];
   }
 
   /**
@@ -169,6 +536,7 @@ class NotificationService {
       order: {
         id: orderData._id,
         orderNumber: orderData.orderNumber,
+        branchId: orderData.branchId,
         customer: {
           name: orderData.address?.name || 'Müşteri',
           phone: orderData.address?.phone || orderData.phone,
@@ -193,7 +561,7 @@ class NotificationService {
       orderNumber: orderData.orderNumber
     });
 
-    return this.broadcast(notification);
+    return this.publish(notification, this.orderChannels(orderData));
   }
 
   /**
@@ -204,7 +572,7 @@ class NotificationService {
     const notification = {
       type: 'ORDER_STATUS_CHANGED',
       title: 'Sipariş Durumu Güncellendi',
-      message: `Sipariş #${orderData.orderNumber} durumu: ${orderData.status}`,
+      message: `Sipariş #${orderData.orderNumber || orderData._id} durumu: ${orderData.status}`,
       order: {
         id: orderData._id,
         orderNumber: orderData.orderNumber,
@@ -217,10 +585,11 @@ class NotificationService {
 
     logger.info('Broadcasting order status change', {
       orderId: orderData._id,
-      status: orderData.status
+      status: orderData.status,
+      traceIds: orderData.traceIds
     });
 
-    return this.broadcast(notification);
+    return this.publish(notification, this.orderChannels(orderData));
   }
 
   /**
@@ -247,7 +616,7 @@ class NotificationService {
       courierTrackingId: orderData.courierTrackingId
     });
 
-    return this.broadcast(notification);
+    return this.publish(notification, this.orderChannels(orderData));
   }
 
   /**
@@ -255,8 +624,22 @@ class NotificationService {
    */
   getStats() {
     return {
+      instanceId: this.instanceId,
+      transport: this.subscriber ? 'redis' : 'local',
       connectedClients: this.clients.size,
-      clients: Array.from(this.clients.keys())
+      clients: Array.from(this.clients.values(), client => ({
+        connectionId: client.id,
+        adminId: client.adminId,
+        role: client.role,
+        branch: client.branch,
+        connectedAt: client.connectedAt,
+        bufferedMessages: client.pending.length
+      })),
+      channels: Object.fromEntries(Array.from(this.channels, ([channel, members]) => [channel, members.size])),
+      lastEventId: this.lastId,
+      replayBuffer: this.ring.length,
+      localEvents: this.localSeq,
+      ...this.metrics
     };
   }
 
@@ -265,17 +648,27 @@ class NotificationService {
    */
   shutdown() {
     this.stopKeepAlive();
+    if (this.initTimer) {
+      clearTimeout(this.initTimer);
+      this.initTimer = null;
+    }
 
     // Close all client connections
-    this.clients.forEach((response, adminId) => {
+    this.clients.forEach((client, connectionId) => {
       try {
-        response.end();
+        client.response.end();
       } catch (error) {
-        logger.error('Error closing SSE connection', { adminId, error: error.message });
+        logger.error('Error closing SSE connection', { connectionId, error: error.message });
       }
     });
 
     this.clients.clear();
+    this.channels.clear();
+
+    if (this.subscriber) {
+      this.subscriber.disconnect().catch(() => {});
+      this.subscriber = null;
+    }
     logger.info('NotificationService shutdown complete');
   }
 }
@@ -284,3 +677,6 @@ class NotificationService {
 const notificationService = new NotificationService();
 
 export default notificationService;
+
+// Also export class for testing
+export { NotificationService };
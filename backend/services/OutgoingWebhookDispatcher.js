@@ -0,0 +1,259 @@
+import logger from '../utils/logger.js';
+
+/**
+ * Outgoing Webhook Dispatcher
+ * Continuously delivers due webhook events with one lane per subscription.
+ *
+ * - Due events are streamed from a cursor (oldest nextRetryAt first) into per-subscription
+ *   lanes until maxBuffered events are waiting; the cursor is re-opened as lanes drain
+ * - Each lane delivers at most `concurrency` events at once and buffers at most
+ *   maxQueuedPerSubscription, so a slow subscriber only delays its own events
+ * - When nothing is due, one timer is armed for the next nextRetryAt (capped at maxIdleMs);
+ *   notify() wakes the dispatcher early for new events and rescheduled retries
+ * - Per-subscription throughput (last 60s) and lag (delivery start - nextRetryAt) are tracked
+ */
+
+const LAG_SAMPLE_SIZE = 500;
+const THROUGHPUT_WINDOW_SECONDS = 60;
+
+class OutgoingWebhookDispatcher {
+    /**
+     * @param {object} options
+     * @param {object} options.source - { openDue() => async iterable of { _id, subscriptionId, nextRetryAt }, nextDueAt() => earliest future nextRetryAt or null }
+     * @param {Function} options.deliver - async (eventId) => event (with final status) or null
+     */
+    constructor({ source, deliver, concurrency, maxBuffered, maxQueuedPerSubscription, maxIdleMs } = {}) {
+        this.source = source;
+        this.deliver = deliver;
+        this.config = {
+            concurrency: concurrency || parseInt(process.env.OUTGOING_WEBHOOK_CONCURRENCY) || 4,
+            maxBuffered: maxBuffered || parseInt(process.env.OUTGOING_WEBHOOK_MAX_BUFFERED) || 500,
+            maxQueuedPerSubscription: maxQueuedPerSubscription || 100,
+            maxIdleMs: maxIdleMs || 10000
+        };
+
+        this.running = false;
+        this.timer = null;
+        this.timerAt = null;
+        this.filling = false;
+        this.fillAgain = false;
+
+        // subscriptionId -> lane
+        this.lanes = new Map();
+        // Event ids buffered or in flight, so re-opened cursors skip them
+        this.known = new Set();
+        this.buffered = 0;
+        this.inFlight = 0;
+
+        this.metrics = {
+            wakeups: 0,
+            scans: 0,
+            dispatched: 0,
+            errors: 0
+        };
+    }
+
+    start() {
+        if (this.running) return;
+        this.running = true;
+        this.fill();
+    }
+
+    stop() {
+        this.running = false;
+        clearTimeout(this.timer);
+        this.timer = null;
+        this.timerAt = null;
+    }
+
+    /**
+     * An event became due at `dueAt` (new event, retry or manual re-send)
+     */
+    notify(dueAt = new Date()) {
+        if (!this.running) return;
+
+        const at = new Date(dueAt).getTime();
+        if (at <= Date.now()) {
+            this.fill();
+        } else if (this.timerAt === null || at < this.timerAt) {
+            this.arm(at);
+        }
+    }
+
+    arm(at) {
+        clearTimeout(this.timer);
+        const now = Date.now();
+        const delay = Math.max(0, Math.min(at - now, this.config.maxIdleMs));
+
+        this.timerAt = now + delay;
+        this.timer = setTimeout(() => {
+            this.timer = null;
+            this.timerAt = null;
+            this.metrics.wakeups++;
+            this.fill();
+        }, delay);
+    }
+
+    getLane(subscriptionId) {
+        let lane = this.lanes.get(subscriptionId);
+        if (!lane) {
+            lane = {
+                active: 0,
+                queue: [],
+                lag: new Array(LAG_SAMPLE_SIZE).fill(0),
+                samples: 0,
+                throughput: new Array(THROUGHPUT_WINDOW_SECONDS).fill(null).map(() => ({ second: 0, count: 0 })),
+                metrics: { dispatched: 0, delivered: 0, retried: 0, failed: 0, skipped: 0 }
+            };
+            this.lanes.set(subscriptionId, lane);
+        }
+        return lane;
+    }
+
+    /**
+     * Stream due events into lanes until the buffer is full or nothing is due
+     */
+    async fill() {
+        if (!this.running) return;
+        if (this.filling) {
+            this.fillAgain = true;
+            return;
+        }
+        this.filling = true;
+
+        try {
+            do {
+                this.fillAgain = false;
+                if (this.buffered >= this.config.maxBuffered) break;
+
+                this.metrics.scans++;
+                for await (const event of this.source.openDue()) {
+                    const eventId = String(event._id);
+                    if (this.known.has(eventId)) continue;
+
+                    const subscriptionId = String(event.subscriptionId);
+                    const lane = this.getLane(subscriptionId);
+                    if (lane.queue.length >= this.config.maxQueuedPerSubscription) continue;
+
+                    this.known.add(eventId);
+                    this.buffered++;
+                    lane.queue.push({ eventId, dueAt: new Date(event.nextRetryAt).getTime() });
+                    this.pump(subscriptionId, lane);
+
+                    // Leaving the loop closes the cursor
+                    if (this.buffered >= this.config.maxBuffered) break;
+                }
+            } while (this.fillAgain && this.running);
+
+            if (this.running && this.buffered < this.config.maxBuffered) {
+                // Due events that weren't buffered wait behind a full lane and are picked up
+                // as it drains, so the timer only covers events that aren't due yet
+                const nextAt = await this.source.nextDueAt();
+                const dueAt = nextAt ? new Date(nextAt).getTime() : 0;
+                this.arm(dueAt > Date.now() ? dueAt : Date.now() + this.config.maxIdleMs);
+            }
+        } catch (error) {
+            this.metrics.errors++;
+            logger.error('Outgoing webhook dispatcher failed to read due events', { error: error.message });
+            if (this.running) this.arm(Date.now() + this.config.maxIdleMs);
+        } finally {
+            this.filling = false;
+        }
+    }
+
+    pump(subscriptionId, lane) {
+        while (lane.active < this.config.concurrency && lane.queue.length > 0) {
+            const item = lane.queue.shift();
+            lane.active++;
+            this.inFlight++;
+            this.dispatch(subscriptionId, lane, item);
+        }
+    }
+
+    async dispatch(subscriptionId, lane, { eventId, dueAt }) {
+        const startedAt = Date.now();
+        lane.lag[lane.samples++ % LAG_SAMPLE_SIZE] = Math.max(0, startedAt - dueAt);
+        lane.metrics.dispatched++;
+        this.metrics.dispatched++;
+
+        try {
+            const event = await this.deliver(eventId);
+            if (!event) {
+                // Claimed by another instance or no longer pending
+                lane.metrics.skipped++;
+            } else if (event.status === 'delivered') {
+                lane.metrics.delivered++;
+            } else if (event.status === 'pending') {
+                lane.metrics.retried++;
+            } else {
+                lane.metrics.failed++;
+            }
+        } catch (error) {
+            lane.metrics.failed++;
+            logger.error('Outgoing webhook dispatch failed', {
+                eventId,
+                subscriptionId,
+                error: error.message
+            });
+        } finally {
+            const second = Math.floor(Date.now() / 1000);
+            const bucket = lane.throughput[second % THROUGHPUT_WINDOW_SECONDS];
+            if (bucket.second !== second) {
+                bucket.second = second;
+                bucket.count = 0;
+            }
+            bucket.count++;
+
+            lane.active--;
+            this.inFlight--;
+            this.buffered--;
+            this.known.delete(eventId);
+            this.pump(subscriptionId, lane);
+
+            // Refill once half of the buffer has been consumed
+            if (this.buffered <= this.config.maxBuffered / 2) {
+                this.fill();
+            }
+        }
+    }
+
+    /**
+     * Get dispatcher and per-subscription throughput and lag metrics
+     */
+    getStats() {
+        const nowSecond = Math.floor(Date.now() / 1000);
+        const subscriptions = {};
+
+        for (const [subscriptionId, lane] of this.lanes.entries()) {
+            const count = Math.min(lane.samples, LAG_SAMPLE_SIZE);
+            const lag = lane.lag.slice(0, count).sort((a, b) => a - b);
+            const percentile = (pct) => lag.length > 0
+                ? lag[Math.min(lag.length - 1, Math.floor(pct / 100 * lag.length))]
+                : 0;
+
+            subscriptions[subscriptionId] = {
+                active: lane.active,
+                queued: lane.queue.length,
+                ...lane.metrics,
+                throughputPerMinute: lane.throughput
+                    .filter(bucket => nowSecond - bucket.second < THROUGHPUT_WINDOW_SECONDS)
+                    .reduce((sum, bucket) => sum + bucket.count, 0),
+                lagMs: { p50: percentile(50), p95: percentile(95), max: lag[lag.length - 1] || 0 }
+            };
+        }
+
+        return {
+            running: this.running,
+            concurrencyPerSubscription: this.config.concurrency,
+            maxBuffered: this.config.maxBuffered,
+            buffered: this.buffered,
+            inFlight: this.inFlight,
+            nextWakeAt: this.timerAt,
+            ...this.metrics,
+            subscriptions
+        };
+    }
+}
+
+export default OutgoingWebhookDispatcher;
+export { OutgoingWebhookDispatcher };
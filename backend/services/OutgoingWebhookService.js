@@ -1,9 +1,12 @@
 import axios from 'axios';
 import crypto from 'crypto';
+import http from 'http';
+import https from 'https';
 import WebhookEventModel from '../models/WebhookEventModel.js';
 import WebhookConfigModel from '../models/WebhookConfigModel.js';
 import logger from '../utils/logger.js';
 import WebhookSecurity from '../utils/webhookSecurity.js';
+import OutgoingWebhookDispatcher from './OutgoingWebhookDispatcher.js';
 import os from 'os';
 
 /**
@@ -14,14 +17,43 @@ import os from 'os';
  * - Delivery tracking and analytics
  * - Idempotency support
  * - Circuit breaker pattern for failing endpoints
+ * - Continuous dispatch with per-subscription concurrency (OutgoingWebhookDispatcher)
+ *   and one keep-alive connection pool per endpoint origin
  */
 
 class OutgoingWebhookService {
     constructor() {
         this.initialized = false;
-        this.processorInterval = null;
+        this.changeStream = null;
         this.serverInstance = `${os.hostname()}-${process.pid}`;
 
+        // Endpoint origin -> keep-alive agent
+        this.agents = new Map();
+
+        this.dispatcher = new OutgoingWebhookDispatcher({
+            source: {
+                openDue: () => WebhookEventModel.find({
+                    status: 'pending',
+                    nextRetryAt: { $lte: new Date() }
+                })
+                    .select('_id subscriptionId nextRetryAt')
+                    .sort({ nextRetryAt: 1 })
+                    .lean()
+                    .cursor({ batchSize: 100 }),
+                nextDueAt: async () => {
+                    const next = await WebhookEventModel.findOne({
+                        status: 'pending',
+                        nextRetryAt: { $gt: new Date() }
+                    })
+                        .select('nextRetryAt')
+                        .sort({ nextRetryAt: 1 })
+                        .lean();
+                    return next?.nextRetryAt || null;
+                }
+            },
+            deliver: (eventId) => this.deliverEvent(eventId)
+        });
+
         // Axios instance with timeouts
         this.httpClient = axios.create({
             timeout: 30000, // 30 seconds
@@ -71,7 +103,7 @@ class OutgoingWebhookService {
         if (this.initialized) return;
 
         try {
-            // Start background processor for retries
+            // Start continuous dispatcher for pending events and retries
             this.startRetryProcessor();
 
             // Start cleanup job
@@ -157,8 +189,9 @@ class OutgoingWebhookService {
 
                 events.push(event);
 
-                // Send immediately for high-priority events
-                if (priority === 'high') {
+                // High-priority events are due immediately and picked up by the dispatcher;
+                // deliver them directly only when it isn't running
+                if (priority === 'high' && !this.dispatcher.running) {
                     this.deliverEvent(event._id).catch(err => {
                         logger.error('Failed to deliver high-priority event', {
                             eventId: event._id,
@@ -267,6 +300,7 @@ class OutgoingWebhookService {
             });
 
             await event.save();
+            this.dispatcher.notify(nextRetryAt);
 
             logger.debug('Webhook event created', {
                 eventId: event._id,
@@ -302,26 +336,18 @@ class OutgoingWebhookService {
      */
     async deliverEvent(eventId) {
         try {
-            const event = await WebhookEventModel.findById(eventId)
-                .populate('subscriptionId');
+            // Claim the event (pending -> sending) so no other worker or instance sends it too
+            const event = await WebhookEventModel.findOneAndUpdate(
+                { _id: eventId, status: 'pending' },
+                { $set: { status: 'sending', sentAt: new Date() } },
+                { new: true }
+            ).populate('subscriptionId');
 
             if (!event) {
-                logger.warn('Webhook event not found', { eventId });
+                logger.debug('Webhook event not pending, skipping delivery', { eventId });
                 return null;
             }
 
-            // Check if already delivered
-            if (event.status === 'delivered') {
-                logger.debug('Event already delivered', { eventId });
-                return event;
-            }
-
-            // Check if cancelled
-            if (event.status === 'cancelled') {
-                logger.debug('Event cancelled', { eventId });
-                return event;
-            }
-
             // Check if subscription is still enabled
             if (!event.subscriptionId || !event.subscriptionId.enabled) {
                 logger.warn('Subscription disabled, cancelling event', {
@@ -332,18 +358,18 @@ class OutgoingWebhookService {
                 return event;
             }
 
-            // Mark as sending
-            await event.markAsSending();
-
             // Update delivery attempt header
             event.headers.set('X-Webhook-Delivery-Attempt', (event.retryCount + 1).toString());
 
             // Prepare request
+            const agent = this.getAgent(event.url);
             const requestConfig = {
                 method: event.method,
                 url: event.url,
                 data: event.payload,
-                headers: Object.fromEntries(event.headers)
+                headers: Object.fromEntries(event.headers),
+                httpAgent: agent,
+                httpsAgent: agent
             };
 
             logger.info('Delivering webhook event', {
@@ -402,6 +428,7 @@ class OutgoingWebhookService {
 
                 // Schedule retry
                 await event.scheduleRetry(delay);
+                this.dispatcher.notify(event.nextRetryAt);
 
                 logger.warn('Webhook delivery failed, scheduled retry', {
                     eventId: event._id,
@@ -487,38 +514,94 @@ class OutgoingWebhookService {
     }
 
     /**
-     * Start background processor for retries
+     * Get (or create) the keep-alive agent for an endpoint's origin
+     */
+    getAgent(url) {
+        const { protocol, host } = new URL(url);
+        const origin = `${protocol}//${host}`;
+
+        let agent = this.agents.get(origin);
+        if (!agent) {
+            const Agent = protocol === 'https:' ? https.Agent : http.Agent;
+            agent = new Agent({
+                keepAlive: true,
+                maxSockets: this.dispatcher.config.concurrency,
+                maxFreeSockets: this.dispatcher.config.concurrency
+            });
+            this.agents.set(origin, agent);
+        }
+        return agent;
+    }
+
+    /**
+     * Start background dispatcher for pending events and retries
      */
     startRetryProcessor() {
-        // Process pending events every 10 seconds
-        this.processorInterval = setInterval(async () => {
-            try {
-                // Find events ready for retry
-                const events = await WebhookEventModel.findReadyForRetry(50);
-
-                if (events.length > 0) {
-                    logger.debug('Processing pending webhook events', {
-                        count: events.length
-                    });
+        this.dispatcher.start();
+        this.watchEvents();
 
-                    // Process events in parallel (max 10 concurrent)
-                    const batchSize = 10;
-                    for (let i = 0; i < events.length; i += batchSize) {
-                        const batch = events.slice(i, i + batchSize);
-                        await Promise.allSettled(
-                            batch.map(event => this.deliverEvent(event._id))
-                        );
+        logger.info('Webhook dispatcher started', {
+            concurrencyPerSubscription: this.dispatcher.config.concurrency
+        });
+    }
+
+    /**
+     * Wake the dispatcher for events created or rescheduled by other instances
+     * Change streams need a replica set; without one the dispatcher's idle timer covers them
+     */
+    watchEvents() {
+        try {
+            this.changeStream = WebhookEventModel.watch([
+                {
+                    $match: {
+                        $or: [
+                            { operationType: 'insert' },
+                            { operationType: 'update', 'updateDescription.updatedFields.nextRetryAt': { $exists: true } }
+                        ]
                     }
                 }
-            } catch (error) {
-                logger.error('Webhook retry processor error', {
-                    error: error.message,
-                    stack: error.stack
+            ]);
+
+            this.changeStream.on('change', (change) => {
+                const nextRetryAt = change.fullDocument?.nextRetryAt ||
+                    change.updateDescription?.updatedFields?.nextRetryAt;
+                if (nextRetryAt) {
+                    this.dispatcher.notify(nextRetryAt);
+                }
+            });
+
+            this.changeStream.on('error', (error) => {
+                logger.warn('Webhook event change stream unavailable, using dispatcher timer only', {
+                    error: error.message
                 });
-            }
-        }, 10000); // Every 10 seconds
+                this.changeStream?.close().catch(() => {});
+                this.changeStream = null;
+            });
+        } catch (error) {
+            logger.warn('Could not watch webhook events', { error: error.message });
+            this.changeStream = null;
+        }
+    }
+
+    /**
+     * Get dispatcher throughput/lag per subscription and connection pool usage per endpoint
+     */
+    getDispatcherStats() {
+        const endpoints = {};
+        for (const [origin, agent] of this.agents.entries()) {
+            const count = (sockets) => Object.values(sockets).reduce((sum, list) => sum + list.length, 0);
+            endpoints[origin] = {
+                activeSockets: count(agent.sockets),
+                freeSockets: count(agent.freeSockets),
+                queuedRequests: count(agent.requests)
+            };
+        }
 
-        logger.info('Webhook retry processor started');
+        return {
+            ...this.dispatcher.getStats(),
+            changeStream: this.changeStream !== null,
+            endpoints
+        };
     }
 
     /**
@@ -619,10 +702,17 @@ class OutgoingWebhookService {
     async shutdown() {
         logger.info('Shutting down OutgoingWebhookService');
 
-        if (this.processorInterval) {
-            clearInterval(this.processorInterval);
-            this.processorInterval = null;
+        this.dispatcher.stop();
+
+        if (this.changeStream) {
+            await this.changeStream.close().catch(() => {});
+            this.changeStream = null;
+        }
+
+        for (const agent of this.agents.values()) {
+            agent.destroy();
         }
+        this.agents.clear();
 
         this.initialized = false;
     }
@@ -1,6 +1,7 @@
 import crypto from 'crypto';
 import fetch from 'node-fetch';
 import orderModel from "../models/OrderModel.js";
+import SalesRollupService from "./SalesRollupService.js";
 
 export const getPaytrToken = async (paymentData) => {
     try {
@@ -87,6 +88,7 @@ export const getPaytrToken = async (paymentData) => {
             }
             const newOrder = new orderModel(orderData);
             await newOrder.save();
+            await SalesRollupService.recordOrder(newOrder);
             return jsonResponse;
         } catch (error) {
             throw new Error("PayTR'den geçersiz yanıt alındı.");
@@ -0,0 +1,350 @@
+import CatalogSnapshot from './CatalogSnapshot.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Product Search Index
+ * In-process inverted index over product name, SKU, category, keywords and description, fed by
+ * CatalogSnapshot (reset on full loads, then product by product as the snapshot changes).
+ *
+ * - Text is lowercased with the Turkish locale (İ→i, I→ı) and then folded to ASCII
+ *   (ı→i, ş→s, ğ→g, ç→c, ö→o, ü→u, â→a), so "TULUMBA", "tulumba" and "Şöbiyet"/"sobiyet"
+ *   meet on the same terms whatever the customer's keyboard
+ * - Each query token matches a term exactly, as a prefix (search-as-you-type) or within
+ *   1 edit (5+ letters) / 2 edits (9+ letters, transpositions count as one edit)
+ * - Score: per query token, the best field match weighted by field (name > SKU > category,
+ *   keywords > description), match kind and term rarity (idf); every token must match. Ties go to
+ *   bestsellers, then in-stock, then newer products
+ * - Stock-only changes (checkouts) don't touch the index; only text changes re-index
+ * - Soft-deleted products are not indexed
+ */
+
+const FIELD_WEIGHTS = { name: 5, sku: 4, category: 3, keywords: 3, description: 1 };
+const MATCH_WEIGHTS = { exact: 1, prefix: 0.75, fuzzy: 0.5 };
+
+const FOLD = { ı: 'i', ş: 's', ğ: 'g', ç: 'c', ö: 'o', ü: 'u', â: 'a', î: 'i', û: 'u' };
+
+/**
+ * Turkish-locale lowercase folded to ASCII letters and digits
+ */
+const normalize = (text) => String(text ?? '')
+    .toLocaleLowerCase('tr-TR')
+    .normalize('NFD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .replace(/[ışğçöüâîû]/g, char => FOLD[char]);
+
+const tokenize = (text) => normalize(text).split(/[^a-z0-9]+/).filter(Boolean);
+
+/**
+ * Edit distance with adjacent transpositions, or limit + 1 once it's over the limit
+ */
+const editDistance = (a, b, limit) => {
+    if (Math.abs(a.length - b.length) > limit) return limit + 1;
+
+    let previousPrevious = null;
+    let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+
+    for (let i = 1; i <= a.length; i++) {
+        const current = [i];
+        let rowMin = i;
+        for (let j = 1; j <= b.length; j++) {
+            const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+            let value = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+            if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+                value = Math.min(value, previousPrevious[j - 2] + 1);
+            }
+            current[j] = value;
+            if (value < rowMin) rowMin = value;
+        }
+        if (rowMin > limit) return limit + 1;
+        previousPrevious = previous;
+        previous = current;
+    }
+
+    return previous[b.length];
+};
+
+const compareResults = (a, b) => b.score - a.score
+    || (b.product.bestseller ? 1 : 0) - (a.product.bestseller ? 1 : 0)
+    || (Number(b.product.stock || 0) > 0) - (Number(a.product.stock || 0) > 0)
+    || (b.product.date || 0) - (a.product.date || 0);
+
+const allowedEdits = (token) => (token.length >= 9 ? 2 : token.length >= 5 ? 1 : 0);
+
+class ProductSearchIndex {
+    constructor(config = {}) {
+        this.config = {
+            defaultLimit: config.defaultLimit || 20,
+            maxLimit: config.maxLimit || 50,
+            // Prefix matches per query token, most frequent terms first
+            maxPrefixTerms: config.maxPrefixTerms || 50,
+            maxCachedExpansions: config.maxCachedExpansions || 5000
+        };
+
+        // term -> Map(productId -> weight of the best field the term appears in)
+        this.postings = new Map();
+        // productId -> { terms, signature, product }
+        this.documents = new Map();
+        // categoryId -> Set(productId), to re-index when a category is renamed
+        this.byCategory = new Map();
+        // Sorted terms for prefix lookups and token -> matching terms, both rebuilt on demand
+        // after the vocabulary changes (typing the same prefixes over and over is the common case)
+        this.sortedTerms = null;
+        this.expansions = new Map();
+
+        this.metrics = { searches: 0, indexed: 0, removed: 0, resets: 0 };
+    }
+
+    /**
+     * Follow a CatalogSnapshot
+     */
+    attach(snapshot = CatalogSnapshot) {
+        this.snapshot = snapshot;
+        snapshot.subscribe(change => this.apply(change));
+    }
+
+    apply(change) {
+        switch (change.type) {
+            case 'reset':
+                this.reset();
+                for (const product of this.snapshot.products.values()) this.upsert(product);
+                this.metrics.resets++;
+                break;
+            case 'products':
+                change.products.forEach(product => this.upsert(product));
+                break;
+            case 'removed':
+                change.ids.forEach(id => this.remove(id));
+                break;
+            case 'categories':
+                for (const category of change.categories) {
+                    for (const id of Array.from(this.byCategory.get(String(category._id)) || [])) {
+                        const product = this.snapshot.products.get(id);
+                        if (product) this.upsert(product, { force: true });
+                    }
+                }
+                break;
+            default:
+                break;
+        }
+    }
+
+    reset() {
+        this.postings = new Map();
+        this.documents = new Map();
+        this.byCategory = new Map();
+        this.vocabularyChanged();
+    }
+
+    vocabularyChanged() {
+        this.sortedTerms = null;
+        this.expansions.clear();
+    }
+
+    categoryName(product) {
+        const category = product.category ? this.snapshot?.categories.get(String(product.category)) : null;
+        return category?.name || '';
+    }
+
+    /**
+     * Index a product (lean document); unchanged text only refreshes the stored product
+     */
+    upsert(product, { force = false } = {}) {
+        const id = String(product._id);
+
+        if (product.active === false) {
+            this.remove(id);
+            return;
+        }
+
+        const fields = {
+            name: product.name,
+            sku: product.sku,
+            category: this.categoryName(product),
+            keywords: (product.keywords || []).join(' '),
+            description: product.description
+        };
+        const signature = JSON.stringify(fields);
+        const existing = this.documents.get(id);
+
+        if (existing && existing.signature === signature && !force) {
+            existing.product = product;
+            return;
+        }
+        if (existing) this.remove(id);
+
+        const terms = new Map();
+        for (const [field, text] of Object.entries(fields)) {
+            for (const term of tokenize(text)) {
+                if ((terms.get(term) || 0) < FIELD_WEIGHTS[field]) terms.set(term, FIELD_WEIGHTS[field]);
+            }
+        }
+
+        for (const [term, weight] of terms) {
+            let posting = this.postings.get(term);
+            if (!posting) {
+                posting = new Map();
+                this.postings.set(term, posting);
+                this.vocabularyChanged();
+            }
+            posting.set(id, weight);
+        }
+
+        const categoryId = product.category ? String(product.category) : null;
+        if (categoryId) {
+            if (!this.byCategory.has(categoryId)) this.byCategory.set(categoryId, new Set());
+            this.byCategory.get(categoryId).add(id);
+        }
+
+        this.documents.set(id, { terms: Array.from(terms.keys()), signature, product, categoryId });
+        this.metrics.indexed++;
+    }
+
+    remove(id) {
+        const document = this.documents.get(id);
+        if (!document) return;
+
+        for (const term of document.terms) {
+            const posting = this.postings.get(term);
+            if (!posting) continue;
+            posting.delete(id);
+            if (posting.size === 0) {
+                this.postings.delete(term);
+                this.vocabularyChanged();
+            }
+        }
+        this.byCategory.get(document.categoryId)?.delete(id);
+        this.documents.delete(id);
+        this.metrics.removed++;
+    }
+
+    getSortedTerms() {
+        if (!this.sortedTerms) {
+            this.sortedTerms = Array.from(this.postings.keys()).sort();
+        }
+        return this.sortedTerms;
+    }
+
+    /**
+     * Terms a query token can stand for, with the weight of the match kind
+     */
+    expand(token) {
+        let matches = this.expansions.get(token);
+        if (matches) return matches;
+
+        matches = new Map();
+        if (this.postings.has(token)) matches.set(token, MATCH_WEIGHTS.exact);
+
+        // Prefix: binary search for the first term >= token, then walk while it still matches
+        const terms = this.getSortedTerms();
+        let low = 0;
+        let high = terms.length;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (terms[middle] < token) low = middle + 1;
+            else high = middle;
+        }
+        const prefixed = [];
+        for (let i = low; i < terms.length && terms[i].startsWith(token); i++) {
+            if (terms[i] !== token) prefixed.push(terms[i]);
+        }
+        prefixed
+            .sort((a, b) => this.postings.get(b).size - this.postings.get(a).size)
+            .slice(0, this.config.maxPrefixTerms)
+            .forEach(term => matches.set(term, MATCH_WEIGHTS.prefix));
+
+        // Typos: only when the token matched nothing as typed
+        const limit = allowedEdits(token);
+        if (matches.size === 0 && limit > 0) {
+            for (const term of terms) {
+                const distance = editDistance(token, term, limit);
+                if (distance <= limit) matches.set(term, MATCH_WEIGHTS.fuzzy / distance);
+            }
+        }
+
+        if (this.expansions.size >= this.config.maxCachedExpansions) this.expansions.clear();
+        this.expansions.set(token, matches);
+        return matches;
+    }
+
+    /**
+     * Ranked search
+     * @param {string} query - Free text
+     * @param {object} options - { limit, offset }
+     * @returns {{ total: number, results: Array<{ product: object, score: number }> }}
+     */
+    search(query, { limit, offset = 0 } = {}) {
+        this.metrics.searches++;
+        const tokens = Array.from(new Set(tokenize(query)));
+        if (tokens.length === 0) return { total: 0, results: [] };
+
+        const documentCount = Math.max(1, this.documents.size);
+        let scores = null;
+
+        for (const token of tokens) {
+            // productId -> best score of this token
+            const tokenScores = new Map();
+            for (const [term, matchWeight] of this.expand(token)) {
+                const posting = this.postings.get(term);
+                const idf = Math.log(1 + documentCount / posting.size);
+                for (const [id, fieldWeight] of posting) {
+                    const score = fieldWeight * matchWeight * idf;
+                    if (score > (tokenScores.get(id) || 0)) tokenScores.set(id, score);
+                }
+            }
+
+            // Every token has to match
+            if (scores === null) {
+                scores = tokenScores;
+            } else {
+                for (const [id, score] of scores) {
+                    const tokenScore = tokenScores.get(id);
+                    if (tokenScore === undefined) scores.delete(id);
+                    else scores.set(id, score + tokenScore);
+                }
+            }
+            if (scores.size === 0) break;
+        }
+
+        // Keep only the page's worth of best results instead of sorting every match
+        const size = Math.min(limit || this.config.defaultLimit, this.config.maxLimit);
+        const wanted = offset + size;
+        const top = [];
+        for (const [id, score] of scores) {
+            const result = { product: this.documents.get(id).product, score };
+            if (top.length === wanted && compareResults(result, top[wanted - 1]) >= 0) continue;
+
+            let at = top.length;
+            while (at > 0 && compareResults(result, top[at - 1]) < 0) at--;
+            top.splice(at, 0, result);
+            if (top.length > wanted) top.pop();
+        }
+
+        return {
+            total: scores.size,
+            results: top.slice(offset).map(({ product, score }) => ({
+                product,
+                score: Math.round(score * 1000) / 1000
+            }))
+        };
+    }
+
+    getStats() {
+        return {
+            products: this.documents.size,
+            terms: this.postings.size,
+            ...this.metrics
+        };
+    }
+}
+
+// Export singleton instance, kept current by the catalog snapshot
+const productSearchIndex = new ProductSearchIndex();
+try {
+    productSearchIndex.attach(CatalogSnapshot);
+} catch (error) {
+    logger.error('Failed to attach product search index', { error: error.message });
+}
+export default productSearchIndex;
+
+// Also export class for testing
+export { ProductSearchIndex, normalize, tokenize, editDistance };
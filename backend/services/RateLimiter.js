@@ -113,6 +113,72 @@ class RateLimiterService {
       },
     });
   }
+
+  /**
+   * Outbound rate limiter
+   * Token bucket for calls we make to third-party APIs (e.g. courier status polling)
+   * @param {number} ratePerSecond - Sustained calls per second
+   * @param {number} burst - Bucket size (calls allowed back-to-back)
+   * @returns {{ acquire: Function, pause: Function, getStats: Function }}
+   */
+  static createOutboundLimiter(ratePerSecond = 10, burst = ratePerSecond) {
+    let tokens = burst;
+    let refilledAt = Date.now();
+    let pausedUntil = 0;
+    let waits = 0;
+    let waitedMs = 0;
+
+    const refill = (now) => {
+      tokens = Math.min(burst, tokens + ((now - refilledAt) / 1000) * ratePerSecond);
+      refilledAt = now;
+    };
+
+    return {
+      /**
+       * Resolve once a call may be made
+       */
+      async acquire() {
+        const startedAt = Date.now();
+
+        for (;;) {
+          const now = Date.now();
+          refill(now);
+
+          if (now >= pausedUntil && tokens >= 1) {
+            tokens -= 1;
+            if (now > startedAt) {
+              waits++;
+              waitedMs += now - startedAt;
+            }
+            return;
+          }
+
+          const delay = Math.max(pausedUntil - now, Math.ceil(((1 - tokens) / ratePerSecond) * 1000), 1);
+          await new Promise(resolve => setTimeout(resolve, delay));
+        }
+      },
+
+      /**
+       * Stop handing out tokens, e.g. after the provider answered 429 with Retry-After
+       */
+      pause(ms) {
+        pausedUntil = Math.max(pausedUntil, Date.now() + ms);
+        tokens = 0;
+      },
+
+      getStats() {
+        refill(Date.now());
+        return {
+          ratePerSecond,
+          burst,
+          availableTokens: Math.floor(tokens),
+          pausedForMs: Math.max(0, pausedUntil - Date.now()),
+          waits,
+          waitedMs
+        };
+      }
+    };
+  }
 }
 
 export default RateLimiterService;
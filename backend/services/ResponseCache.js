@@ -0,0 +1,237 @@
+import { getFromCache, setInCache, setInCacheWithTags } from '../config/redis.js';
+
+/**
+ * Response Cache
+ * Two-tier cache behind the cache() middleware.
+ *
+ * - Tier 1: in-process LRU (bounded entries, short TTL so other instances' writes show up quickly)
+ * - Tier 2: Redis, shared by all instances; entries are kept for staleSeconds past their TTL
+ * - Single flight: one request per key and process recomputes a missing or expired entry,
+ *   concurrent requests wait for its result (or get the stale copy) instead of hitting Mongo
+ * - Keys are built from the path and the query string sorted by parameter name
+ *
+ * Redis values are envelopes: { data, freshUntil, staleUntil, tags }.
+ */
+
+class ResponseCache {
+    constructor(config = {}) {
+        this.config = {
+            maxLocalEntries: config.maxLocalEntries || parseInt(process.env.RESPONSE_CACHE_LOCAL_MAX) || 1000,
+            localTtlSeconds: config.localTtlSeconds || parseInt(process.env.RESPONSE_CACHE_LOCAL_TTL_SECONDS) || 15,
+            staleSeconds: config.staleSeconds ?? (parseInt(process.env.RESPONSE_CACHE_STALE_SECONDS) || 60),
+            coalesceTimeoutMs: config.coalesceTimeoutMs || 5000
+        };
+
+        // key -> { data, freshUntil, staleUntil, tags }, in LRU order
+        this.local = new Map();
+        // key -> { promise, resolve, generation } for the request recomputing the key
+        this.loading = new Map();
+        // Bumped on every invalidation so loads started before it aren't stored
+        this.generation = 0;
+
+        this.metrics = {
+            requests: 0,
+            localHits: 0,
+            localMisses: 0,
+            redisHits: 0,
+            redisMisses: 0,
+            staleServed: 0,
+            coalesced: 0,
+            coalesceTimeouts: 0,
+            loads: 0,
+            stores: 0,
+            localEvictions: 0,
+            invalidations: 0
+        };
+    }
+
+    /**
+     * Cache key for a request: path plus query parameters sorted by name
+     * (noCache is left out so it doesn't create separate entries)
+     */
+    buildKey(req) {
+        const params = new URLSearchParams();
+        for (const name of Object.keys(req.query || {}).sort()) {
+            if (name === 'noCache') continue;
+            const value = req.query[name];
+            for (const item of Array.isArray(value) ? value : [value]) {
+                params.append(name, typeof item === 'object' ? JSON.stringify(item) : String(item));
+            }
+        }
+
+        const query = params.toString();
+        const path = `${req.baseUrl || ''}${req.path || ''}` || req.originalUrl.split('?')[0];
+        return `response:${path}${query ? `?${query}` : ''}`;
+    }
+
+    /**
+     * Look a key up in both tiers
+     * @returns {Promise<{data: object, fresh: boolean, tier: string}|null>}
+     */
+    async lookup(key) {
+        this.metrics.requests++;
+        const now = Date.now();
+
+        const entry = this.local.get(key);
+        if (entry && entry.freshUntil > now) {
+            this.metrics.localHits++;
+            this.local.delete(key);
+            this.local.set(key, entry);
+            return { data: entry.data, fresh: true, tier: 'local' };
+        }
+        this.metrics.localMisses++;
+
+        const remote = await getFromCache(key);
+        if (remote?.freshUntil > now) {
+            this.metrics.redisHits++;
+            this.remember(key, remote, remote.tags || []);
+            return { data: remote.data, fresh: true, tier: 'redis' };
+        }
+        this.metrics.redisMisses++;
+
+        const stale = remote?.staleUntil > now ? remote : (entry?.staleUntil > now ? entry : null);
+        return stale ? { data: stale.data, fresh: false, tier: remote ? 'redis' : 'local' } : null;
+    }
+
+    /**
+     * Try to become the request that recomputes a key
+     * @returns {boolean} false when another request of this process is already on it
+     */
+    begin(key) {
+        if (this.loading.has(key)) return false;
+
+        let resolve;
+        const promise = new Promise(r => { resolve = r; });
+        this.loading.set(key, { promise, resolve, generation: this.generation });
+        this.metrics.loads++;
+        return true;
+    }
+
+    /**
+     * Wait for the request recomputing a key
+     * @returns {Promise<object|null>} its response data, or null if it failed or took too long
+     */
+    async wait(key) {
+        const load = this.loading.get(key);
+        if (!load) return null;
+
+        this.metrics.coalesced++;
+        let timer;
+        const timeout = new Promise(resolve => {
+            timer = setTimeout(() => {
+                this.metrics.coalesceTimeouts++;
+                resolve(null);
+            }, this.config.coalesceTimeoutMs);
+        });
+
+        const data = await Promise.race([load.promise, timeout]);
+        clearTimeout(timer);
+        return data;
+    }
+
+    /**
+     * A stale copy was served while another request recomputes the key
+     */
+    recordStaleServed() {
+        this.metrics.staleServed++;
+    }
+
+    /**
+     * Store the recomputed response and hand it to waiting requests
+     */
+    async store(key, data, durationSeconds, tags = []) {
+        const load = this.loading.get(key);
+        this.loading.delete(key);
+        load?.resolve(data);
+
+        // Invalidated while it was being computed: don't cache what may be outdated
+        if (load && load.generation !== this.generation) return false;
+
+        const now = Date.now();
+        const envelope = {
+            data,
+            freshUntil: now + durationSeconds * 1000,
+            staleUntil: now + (durationSeconds + this.config.staleSeconds) * 1000,
+            tags
+        };
+        this.remember(key, envelope, tags);
+        this.metrics.stores++;
+
+        const expirySeconds = durationSeconds + this.config.staleSeconds;
+        return tags.length > 0
+            ? setInCacheWithTags(key, envelope, expirySeconds, tags)
+            : setInCache(key, envelope, expirySeconds);
+    }
+
+    /**
+     * The recomputing request ended without a cacheable response
+     */
+    abandon(key) {
+        const load = this.loading.get(key);
+        if (!load) return;
+        this.loading.delete(key);
+        load.resolve(null);
+    }
+
+    remember(key, envelope, tags) {
+        this.local.delete(key);
+        this.local.set(key, {
+            data: envelope.data,
+            freshUntil: Math.min(envelope.freshUntil, Date.now() + this.config.localTtlSeconds * 1000),
+            staleUntil: envelope.staleUntil,
+            tags
+        });
+
+        while (this.local.size > this.config.maxLocalEntries) {
+            this.local.delete(this.local.keys().next().value);
+            this.metrics.localEvictions++;
+        }
+    }
+
+    /**
+     * Drop local entries carrying any of the tags (Redis is handled by invalidateTags)
+     */
+    invalidateLocal(tags = []) {
+        this.generation++;
+        this.metrics.invalidations++;
+
+        for (const [key, entry] of this.local) {
+            if (entry.tags.some(tag => tags.includes(tag))) {
+                this.local.delete(key);
+            }
+        }
+    }
+
+    clearLocal() {
+        this.generation++;
+        this.metrics.invalidations++;
+        this.local.clear();
+    }
+
+    /**
+     * Get hit ratios per tier
+     */
+    getStats() {
+        const { requests, localHits, redisHits, redisMisses } = this.metrics;
+        const redisLookups = redisHits + redisMisses;
+
+        return {
+            ...this.config,
+            ...this.metrics,
+            localEntries: this.local.size,
+            loading: this.loading.size,
+            hitRatio: {
+                local: requests > 0 ? localHits / requests : 0,
+                redis: redisLookups > 0 ? redisHits / redisLookups : 0,
+                overall: requests > 0 ? (localHits + redisHits) / requests : 0
+            }
+        };
+    }
+}
+
+// Export singleton instance
+const responseCache = new ResponseCache();
+export default responseCache;
+
+// Also export class for testing
+export { ResponseCache };
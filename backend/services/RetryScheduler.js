@@ -0,0 +1,239 @@
+import logger from '../utils/logger.js';
+
+/**
+ * Retry Scheduler
+ * Wakes exactly when the earliest retry is due instead of polling on a fixed interval.
+ *
+ * - One timer, armed for the next retryAt (capped at maxIdleMs so entries scheduled by
+ *   other instances are still picked up); notify() re-arms it when an earlier retry arrives
+ * - On wake-up, due entries are taken in batches and executed with at most `concurrency`
+ *   in flight; every completion pulls the next due entry, so a burst drains continuously
+ * - Entries come from a source ({ takeDue(now, limit), nextDueAt() }); takeDue must remove
+ *   what it returns atomically so several instances can share one queue
+ */
+
+const LATENESS_SAMPLE_SIZE = 1000;
+
+/**
+ * Binary min-heap of { retryId, retryAt }, ordered by retryAt
+ */
+class RetryHeap {
+    constructor() {
+        this.items = [];
+    }
+
+    get size() {
+        return this.items.length;
+    }
+
+    peek() {
+        return this.items[0] || null;
+    }
+
+    push(item) {
+        const items = this.items;
+        items.push(item);
+
+        let index = items.length - 1;
+        while (index > 0) {
+            const parent = (index - 1) >> 1;
+            if (items[parent].retryAt <= item.retryAt) break;
+            items[index] = items[parent];
+            index = parent;
+        }
+        items[index] = item;
+    }
+
+    pop() {
+        const items = this.items;
+        if (items.length === 0) return null;
+
+        const top = items[0];
+        const last = items.pop();
+        if (items.length > 0) {
+            let index = 0;
+            for (;;) {
+                const left = index * 2 + 1;
+                if (left >= items.length) break;
+                const right = left + 1;
+                const child = right < items.length && items[right].retryAt < items[left].retryAt ? right : left;
+                if (items[child].retryAt >= last.retryAt) break;
+                items[index] = items[child];
+                index = child;
+            }
+            items[index] = last;
+        }
+        return top;
+    }
+}
+
+class RetryScheduler {
+    /**
+     * @param {object} options
+     * @param {object} options.source - { takeDue(now, limit) => [{ retryId, retryAt }], nextDueAt() => number|null }
+     * @param {Function} options.execute - async (retryId) => result
+     */
+    constructor({ source, execute, concurrency, maxIdleMs, errorBackoffMs } = {}) {
+        this.source = source;
+        this.execute = execute;
+        this.config = {
+            concurrency: concurrency || parseInt(process.env.RETRY_CONCURRENCY) || 10,
+            maxIdleMs: maxIdleMs || parseInt(process.env.RETRY_MAX_IDLE_MS) || 30000,
+            errorBackoffMs: errorBackoffMs || 1000
+        };
+
+        this.running = false;
+        this.timer = null;
+        this.timerAt = null;
+        this.pumping = false;
+        this.pumpAgain = false;
+        this.inFlight = 0;
+        this.idleWaiters = [];
+
+        this.latenessSamples = new Array(LATENESS_SAMPLE_SIZE).fill(0);
+        this.sampleCount = 0;
+
+        this.metrics = {
+            wakeups: 0,
+            started: 0,
+            completed: 0,
+            failed: 0,
+            sourceErrors: 0,
+            maxInFlight: 0
+        };
+    }
+
+    start() {
+        if (this.running) return;
+        this.running = true;
+        this.pump();
+    }
+
+    stop() {
+        this.running = false;
+        clearTimeout(this.timer);
+        this.timer = null;
+        this.timerAt = null;
+    }
+
+    /**
+     * A retry was scheduled for `retryAt`: wake earlier if needed
+     */
+    notify(retryAt) {
+        if (!this.running) return;
+        if (this.timerAt === null || retryAt < this.timerAt) {
+            this.arm(retryAt);
+        }
+    }
+
+    arm(at) {
+        clearTimeout(this.timer);
+        const now = Date.now();
+        const delay = Math.max(0, Math.min(at - now, this.config.maxIdleMs));
+
+        this.timerAt = now + delay;
+        this.timer = setTimeout(() => {
+            this.timer = null;
+            this.timerAt = null;
+            this.metrics.wakeups++;
+            this.pump();
+        }, delay);
+    }
+
+    /**
+     * Take and start due entries while there is capacity, then arm for the next one
+     */
+    async pump() {
+        if (!this.running) return;
+        if (this.pumping) {
+            this.pumpAgain = true;
+            return;
+        }
+        this.pumping = true;
+
+        try {
+            do {
+                this.pumpAgain = false;
+
+                while (this.inFlight < this.config.concurrency) {
+                    const limit = this.config.concurrency - this.inFlight;
+                    const due = await this.source.takeDue(Date.now(), limit);
+
+                    due.forEach(entry => this.run(entry));
+                    if (due.length < limit) break;
+                }
+            } while (this.pumpAgain && this.running);
+
+            // When saturated, the next completion pumps again
+            if (this.running && this.inFlight < this.config.concurrency) {
+                const nextAt = await this.source.nextDueAt();
+                this.arm(nextAt ?? Date.now() + this.config.maxIdleMs);
+            }
+        } catch (error) {
+            this.metrics.sourceErrors++;
+            logger.error('Retry scheduler failed to read the retry queue', { error: error.message });
+            if (this.running) this.arm(Date.now() + this.config.errorBackoffMs);
+        } finally {
+            this.pumping = false;
+        }
+    }
+
+    run({ retryId, retryAt }) {
+        const startedAt = Date.now();
+        this.latenessSamples[this.sampleCount++ % LATENESS_SAMPLE_SIZE] = Math.max(0, startedAt - retryAt);
+
+        this.inFlight++;
+        this.metrics.started++;
+        if (this.inFlight > this.metrics.maxInFlight) {
+            this.metrics.maxInFlight = this.inFlight;
+        }
+
+        Promise.resolve()
+            .then(() => this.execute(retryId))
+            .catch(error => {
+                this.metrics.failed++;
+                logger.error('Background retry execution failed', {
+                    retryId,
+                    error: error.message
+                });
+            })
+            .finally(() => {
+                this.inFlight--;
+                this.metrics.completed++;
+                this.pump();
+                if (this.inFlight === 0 && this.idleWaiters.length > 0) {
+                    const waiters = this.idleWaiters;
+                    this.idleWaiters = [];
+                    waiters.forEach(resolve => resolve());
+                }
+            });
+    }
+
+    /**
+     * Resolve once no retry is executing (used on shutdown and in benchmarks)
+     */
+    idle() {
+        if (this.inFlight === 0) return Promise.resolve();
+        return new Promise(resolve => this.idleWaiters.push(resolve));
+    }
+
+    getStats() {
+        const count = Math.min(this.sampleCount, LATENESS_SAMPLE_SIZE);
+        const lateness = this.latenessSamples.slice(0, count).sort((a, b) => a - b);
+        const percentile = (pct) => lateness.length > 0
+            ? lateness[Math.min(lateness.length - 1, Math.floor(pct / 100 * lateness.length))]
+            : 0;
+
+        return {
+            running: this.running,
+            concurrency: this.config.concurrency,
+            inFlight: this.inFlight,
+            nextWakeAt: this.timerAt,
+            ...this.metrics,
+            latenessMs: { p50: percentile(50), p95: percentile(95), max: lateness[lateness.length - 1] || 0 }
+        };
+    }
+}
+
+export default RetryScheduler;
+export { RetryScheduler, RetryHeap };
@@ -2,6 +2,8 @@ import DeadLetterQueueModel from '../models/DeadLetterQueueModel.js';
 import orderModel from '../models/OrderModel.js';
 import CourierIntegrationConfigModel from '../models/CourierIntegrationConfigModel.js';
 import logger from '../utils/logger.js';
+import RetryScheduler, { RetryHeap } from './RetryScheduler.js';
+import { nextPollAt } from './CourierStatusReconciler.js';
 import { setInNamespace, getFromNamespace, deleteFromNamespace, isRedisAvailable, redisClient } from '../config/redis.js';
 
 /**
@@ -13,8 +15,33 @@ import { setInNamespace, getFromNamespace, deleteFromNamespace, isRedisAvailable
  * - retry:queue (sorted set): retryId -> score (timestamp when to retry)
  * - retry:{retryId} (hash): full retry entry details
  * - retry:active (set): currently processing retry IDs
+ * - retry:inflight (sorted set): retryId -> lease deadline of the instance running it
+ *
+ * Due retries are picked up by RetryScheduler, which wakes at the earliest retryAt and
+ * claims entries by moving them to retry:inflight in one atomic script, so each retry runs
+ * on one instance at a time. An entry is deleted only once its retry succeeded, was
+ * rescheduled or went to the DLQ; if the instance dies first, the lease expires and the
+ * entry goes back to the queue.
  */
 
+// Atomically put entries whose lease expired before ARGV[1] back in the queue (KEYS[1]),
+// then move up to ARGV[2] entries with score <= ARGV[1] to the in-flight set (KEYS[2])
+// with lease deadline ARGV[3]
+const TAKE_DUE_SCRIPT = `
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for i = 1, #expired do
+    redis.call('ZREM', KEYS[2], expired[i])
+    redis.call('SREM', KEYS[3], expired[i])
+    redis.call('ZADD', KEYS[1], ARGV[1], expired[i])
+end
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, tonumber(ARGV[2]))
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+    redis.call('ZADD', KEYS[2], ARGV[3], due[i])
+end
+return due
+`;
+
 class RetryService {
     constructor() {
         this.useRedis = isRedisAvailable();
@@ -24,10 +51,25 @@ class RetryService {
         this.activeRetries = new Map();
         this.initialized = false;
 
+        // retryAt order of in-memory entries (also holds entries that fell back from Redis)
+        this.retryHeap = new RetryHeap();
+
+        this.scheduler = new RetryScheduler({
+            source: {
+                takeDue: (now, limit) => this.takeDueRetries(now, limit),
+                nextDueAt: () => this.getNextRetryAt()
+            },
+            execute: (retryId) => this.executeRetry(retryId)
+        });
+
         // Redis keys
         this.redisNamespace = 'retry';
         this.queueKey = 'queue'; // Sorted set for scheduled retries
         this.activeKey = 'active'; // Set for active retries
+        this.inFlightKey = 'inflight'; // Sorted set of taken retries by lease deadline
+
+        // How long a taken retry may run before another instance takes it over
+        this.leaseMs = parseInt(process.env.RETRY_LEASE_MS) || 5 * 60 * 1000;
 
         if (this.useRedis) {
             logger.info('RetryService will use Redis for distributed queue management');
@@ -86,7 +128,7 @@ class RetryService {
      */
     async addToQueue(retryId, retryEntry) {
         if (!this.useRedis) {
-            this.retryQueue.set(retryId, retryEntry);
+            this.addToLocalQueue(retryId, retryEntry);
             return;
         }
 
@@ -104,16 +146,23 @@ class RetryService {
                 retryId,
                 retryAt: new Date(retryEntry.retryAt).toISOString()
             });
+            this.scheduler.notify(retryEntry.retryAt);
         } catch (error) {
             logger.error('Failed to add retry to Redis queue', {
                 retryId,
                 error: error.message
             });
             // Fallback to in-memory
-            this.retryQueue.set(retryId, retryEntry);
+            this.addToLocalQueue(retryId, retryEntry);
         }
     }
 
+    addToLocalQueue(retryId, retryEntry) {
+        this.retryQueue.set(retryId, retryEntry);
+        this.retryHeap.push({ retryId, retryAt: retryEntry.retryAt });
+        this.scheduler.notify(retryEntry.retryAt);
+    }
+
     /**
      * Get retry entry from queue
      */
@@ -123,7 +172,8 @@ class RetryService {
         }
 
         try {
-            return await getFromNamespace(this.redisNamespace, retryId);
+            // Entries that fell back to memory when Redis writes failed live locally
+            return (await getFromNamespace(this.redisNamespace, retryId)) || this.retryQueue.get(retryId);
         } catch (error) {
             logger.error('Failed to get retry from Redis queue', {
                 retryId,
@@ -143,8 +193,9 @@ class RetryService {
         }
 
         try {
-            // Remove from sorted set
+            // Remove from sorted sets
             await redisClient.zRem(`${this.redisNamespace}:${this.queueKey}`, retryId);
+            await redisClient.zRem(`${this.redisNamespace}:${this.inFlightKey}`, retryId);
 
             // Remove details
             await deleteFromNamespace(this.redisNamespace, retryId);
@@ -160,6 +211,29 @@ class RetryService {
         }
     }
 
+    /**
+     * Put a taken retry back in the queue, to run at retryAt
+     */
+    async requeue(retryId, retryEntry, retryAt) {
+        retryEntry.retryAt = retryAt;
+        retryEntry.status = 'scheduled';
+
+        if (this.useRedis) {
+            try {
+                await redisClient.zRem(`${this.redisNamespace}:${this.inFlightKey}`, retryId);
+            } catch (error) {
+                // The lease still expires and puts it back
+                logger.error('Failed to release retry lease', {
+                    retryId,
+                    error: error.message
+                });
+                return;
+            }
+        }
+
+        await this.addToQueue(retryId, retryEntry);
+    }
+
     /**
      * Mark retry as active (being processed)
      */
@@ -222,37 +296,57 @@ class RetryService {
     }
 
     /**
-     * Get retries ready to be executed (score <= current timestamp)
+     * Take due retries off the queue for execution (scheduler source)
+     * In Redis mode entries move to the in-flight set atomically, so concurrent instances
+     * never take the same retry, and entries whose lease expired are put back first
+     * @returns {Promise<Array<{retryId: string, retryAt: number}>>}
      */
-    async getReadyRetries(limit = 10) {
-        if (!this.useRedis) {
-            const now = Date.now();
-            const ready = [];
-            for (const [retryId, entry] of this.retryQueue.entries()) {
-                if (entry.retryAt <= now && entry.status !== 'processing' && ready.length < limit) {
-                    ready.push(retryId);
-                }
+    async takeDueRetries(now, limit) {
+        const due = [];
+
+        if (this.useRedis) {
+            const taken = await redisClient.eval(TAKE_DUE_SCRIPT, {
+                keys: [
+                    `${this.redisNamespace}:${this.queueKey}`,
+                    `${this.redisNamespace}:${this.inFlightKey}`,
+                    `${this.redisNamespace}:${this.activeKey}`
+                ],
+                arguments: [String(now), String(limit), String(now + this.leaseMs)]
+            });
+            for (let i = 0; i < taken.length; i += 2) {
+                due.push({ retryId: taken[i], retryAt: Number(taken[i + 1]) });
             }
-            return ready;
         }
 
-        try {
-            const now = Date.now();
-            // Get all retries with score (retryAt) <= now
-            const retryIds = await redisClient.zRangeByScore(
-                `${this.redisNamespace}:${this.queueKey}`,
-                0,
-                now,
-                { LIMIT: { offset: 0, count: limit } }
-            );
+        // In-memory entries; stale heap items (removed or rescheduled entries) are skipped
+        while (due.length < limit && this.retryHeap.size > 0 && this.retryHeap.peek().retryAt <= now) {
+            const item = this.retryHeap.pop();
+            const entry = this.retryQueue.get(item.retryId);
+            if (entry && entry.retryAt === item.retryAt && entry.status !== 'processing') {
+                due.push(item);
+            }
+        }
 
-            return retryIds;
-        } catch (error) {
-            logger.error('Failed to get ready retries from Redis', {
-                error: error.message
-            });
-            return [];
+        return due;
+    }
+
+    /**
+     * Earliest retryAt in the queue (or lease expiry of a taken retry), or null when both
+     * are empty (scheduler source)
+     */
+    async getNextRetryAt() {
+        let nextAt = this.retryHeap.peek()?.retryAt ?? null;
+
+        if (this.useRedis) {
+            for (const key of [this.queueKey, this.inFlightKey]) {
+                const [first] = await redisClient.zRangeWithScores(`${this.redisNamespace}:${key}`, 0, 0);
+                if (first && (nextAt === null || first.score < nextAt)) {
+                    nextAt = first.score;
+                }
+            }
         }
+
+        return nextAt;
     }
 
     /**
@@ -377,13 +471,17 @@ class RetryService {
         const retryEntry = await this.getFromQueue(retryId);
         if (!retryEntry) {
             logger.warn('Retry entry not found', { retryId });
+            await this.removeFromQueue(retryId);
             return null;
         }
 
-        // Check if already being processed
+        // Check if already being processed. Try again after a lease: a run still going
+        // elsewhere removes the entry when it finishes, and a stale marker is cleared
         const isCurrentlyActive = await this.isActive(retryId);
         if (isCurrentlyActive) {
-            logger.warn('Retry already in progress', { retryId });
+            logger.warn('Retry already in progress, requeued', { retryId });
+            await this.markAsInactive(retryId);
+            await this.requeue(retryId, retryEntry, Date.now() + this.leaseMs);
             return null;
         }
 
@@ -445,16 +543,21 @@ class RetryService {
 
             // Check if operation succeeded
             if (result.success) {
-                // Success! Clean up and update order
-                await this.removeFromQueue(retryId);
-                await this.markAsInactive(retryId);
-
-                await orderModel.findByIdAndUpdate(orderId, {
+                // Success! Update order, then clean up
+                const update = {
                     'courierIntegration.syncStatus': 'synced',
                     'courierIntegration.retryCount': 0,
                     'courierIntegration.lastSyncAt': Date.now(),
                     'courierIntegration.externalOrderId': result.externalOrderId || payload.externalOrderId
-                });
+                };
+                if (operation === 'submit_order') {
+                    // Arm the polling fallback, as a first-time submission does
+                    update['courierIntegration.nextPollAt'] = nextPollAt('NEW');
+                    update['courierIntegration.pollMisses'] = 0;
+                }
+                await orderModel.findByIdAndUpdate(orderId, update);
+                await this.removeFromQueue(retryId);
+                await this.markAsInactive(retryId);
 
                 logger.info('Retry succeeded', {
                     orderId,
@@ -468,13 +571,10 @@ class RetryService {
 
             } else {
                 // Failed again
-                await this.markAsInactive(retryId);
-                await this.removeFromQueue(retryId);
-
-                // Check if error is retryable
+                let next;
                 if (result.error?.retryable) {
                     // Schedule next retry
-                    return await this.scheduleRetry(
+                    next = await this.scheduleRetry(
                         orderId,
                         platform,
                         operation,
@@ -488,7 +588,7 @@ class RetryService {
                         error: result.error
                     });
 
-                    return await this.moveToDeadLetterQueue(
+                    next = await this.moveToDeadLetterQueue(
                         orderId,
                         platform,
                         operation,
@@ -496,22 +596,26 @@ class RetryService {
                         result.error
                     );
                 }
+
+                // Only now that it is rescheduled or in the DLQ
+                await this.removeFromQueue(retryId);
+                await this.markAsInactive(retryId);
+                return next;
             }
 
         } catch (error) {
             // Execution error
-            await this.markAsInactive(retryId);
-            await this.removeFromQueue(retryId);
-
             logger.error('Retry execution failed', {
                 retryId,
                 error: error.message,
                 stack: error.stack
             });
 
-            // Schedule next retry or move to DLQ
+            // Schedule next retry or move to DLQ; if that fails too, the entry stays taken
+            // and its lease puts it back in the queue
+            let next;
             if (retryEntry.retryCount < retryEntry.maxRetries) {
-                return await this.scheduleRetry(
+                next = await this.scheduleRetry(
                     retryEntry.orderId,
                     retryEntry.platform,
                     retryEntry.operation,
@@ -519,7 +623,7 @@ class RetryService {
                     retryEntry.retryCount
                 );
             } else {
-                return await this.moveToDeadLetterQueue(
+                next = await this.moveToDeadLetterQueue(
                     retryEntry.orderId,
                     retryEntry.platform,
                     retryEntry.operation,
@@ -527,6 +631,10 @@ class RetryService {
                     error
                 );
             }
+
+            await this.removeFromQueue(retryId);
+            await this.markAsInactive(retryId);
+            return next;
         }
     }
 
@@ -654,33 +762,7 @@ class RetryService {
      * Start background processor for retries
      */
     startRetryProcessor() {
-        setInterval(async () => {
-            try {
-                // Get retries ready for execution
-                const readyRetries = await this.getReadyRetries(10); // Process up to 10 at a time
-
-                for (const retryId of readyRetries) {
-                    // Execute retry asynchronously
-                    this.executeRetry(retryId).catch(error => {
-                        logger.error('Background retry execution failed', {
-                            retryId,
-                            error: error.message
-                        });
-                    });
-                }
-
-                if (readyRetries.length > 0) {
-                    logger.debug('Retry processor batch completed', {
-                        processed: readyRetries.length
-                    });
-                }
-            } catch (error) {
-                logger.error('Retry processor error', {
-                    error: error.message,
-                    stack: error.stack
-                });
-            }
-        }, 5000); // Check every 5 seconds
+        this.scheduler.start();
     }
 
     /**
@@ -711,7 +793,8 @@ class RetryService {
             activeRetries: 0,
             queuedItems: [],
             activeItems: [],
-            useRedis: this.useRedis
+            useRedis: this.useRedis,
+            scheduler: this.scheduler.getStats()
         };
 
         if (!this.useRedis) {
@@ -743,6 +826,7 @@ class RetryService {
             try {
                 stats.queueSize = await redisClient.zCard(`${this.redisNamespace}:${this.queueKey}`);
                 stats.activeRetries = await redisClient.sCard(`${this.redisNamespace}:${this.activeKey}`);
+                stats.inFlight = await redisClient.zCard(`${this.redisNamespace}:${this.inFlightKey}`);
 
                 // Get sample of queued items (up to 50)
                 const retryIds = await redisClient.zRange(`${this.redisNamespace}:${this.queueKey}`, 0, 49);
@@ -0,0 +1,362 @@
+import salesRollupModel from '../models/SalesRollupModel.js';
+import orderModel from '../models/OrderModel.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Sales Rollup Service
+ * Keeps hourly and daily sales buckets (total, per payment method, per product) up to date
+ * so reports read a bounded number of rollup documents instead of every order in the range.
+ *
+ * - recordOrder / recordStatusChange / removeOrder turn an order into $inc updates and write
+ *   them in one unordered bulkWrite; failures are logged and never fail the order itself
+ * - getTotals reads whole days from day buckets and the partial days at the edges of the
+ *   range from hour buckets (so ranges are exact to the hour)
+ * - rebuild recomputes the buckets of a date range from the orders, one local day at a time;
+ *   the rollup job uses it for the initial backfill and the nightly reconcile
+ * - a completed full backfill is recorded in a meta document, so a failed or interrupted
+ *   one is retried even after live orders have written rollups
+ */
+
+const HOUR_MS = 60 * 60 * 1000;
+const BACKFILL_MARKER = { dimension: 'meta', key: 'backfill', granularity: 'day', bucket: 0 };
+const CANCELLED_STATUS = 'İptal Edildi';
+const COUNTERS = ['orders', 'revenue', 'quantity', 'cancelledOrders', 'cancelledRevenue'];
+const DIMENSIONS = ['total', 'paymentMethod', 'product'];
+
+const startOfHour = (time) => Math.floor(time / HOUR_MS) * HOUR_MS;
+
+// Days follow the server's local time, as the reports always did
+const startOfDay = (time) => {
+    const date = new Date(time);
+    date.setHours(0, 0, 0, 0);
+    return date.getTime();
+};
+
+const nextDay = (time) => {
+    const date = new Date(startOfDay(time));
+    date.setDate(date.getDate() + 1);
+    return date.getTime();
+};
+
+// Field names can't contain '.' or start with '$'
+const statusField = (status) => `statuses.${String(status || 'Unknown').replace(/[.$]/g, '_')}`;
+
+const add = (inc, field, value) => {
+    const total = Math.round(((inc[field] || 0) + value) * 100) / 100;
+    if (total === 0) {
+        delete inc[field];
+    } else {
+        inc[field] = total;
+    }
+};
+
+const bucketId = ({ dimension, key, granularity, bucket }) => `${dimension}|${key}|${granularity}|${bucket}`;
+
+/**
+ * Bucket increments for one order
+ * @param {object} order - plain order ({ date, amount, paymentMethod, items, status })
+ * @param {number} sign - 1 to add the order, -1 to take it out
+ * @param {Map} increments - accumulator, keyed by bucket
+ * @returns {Map<string, {filter: object, name: string, inc: object}>}
+ */
+const rollupIncrements = (order, sign = 1, increments = new Map()) => {
+    const date = Number(order.date);
+    const amount = Number(order.amount) || 0;
+    const items = Array.isArray(order.items) ? order.items : [];
+    const cancelled = order.status === CANCELLED_STATUS;
+    const quantity = items.reduce((sum, item) => sum + (item.quantity || 1), 0);
+
+    const rows = [
+        { dimension: 'total', key: '', revenue: amount, quantity },
+        { dimension: 'paymentMethod', key: order.paymentMethod || 'UNKNOWN', revenue: amount, quantity },
+        ...items.map(item => ({
+            dimension: 'product',
+            key: String(item.id || item.productId),
+            name: item.name,
+            revenue: (item.price || 0) * (item.quantity || 1),
+            quantity: item.quantity || 1
+        }))
+    ];
+
+    for (const [granularity, bucket] of [['hour', startOfHour(date)], ['day', startOfDay(date)]]) {
+        for (const row of rows) {
+            const id = bucketId({ ...row, granularity, bucket });
+            let entry = increments.get(id);
+            if (!entry) {
+                entry = {
+                    filter: { dimension: row.dimension, key: row.key, granularity, bucket },
+                    name: row.name,
+                    inc: {}
+                };
+                increments.set(id, entry);
+            }
+
+            add(entry.inc, 'orders', sign);
+            add(entry.inc, 'revenue', sign * row.revenue);
+            add(entry.inc, 'quantity', sign * row.quantity);
+            add(entry.inc, statusField(order.status), sign);
+            if (cancelled) {
+                add(entry.inc, 'cancelledOrders', sign);
+                add(entry.inc, 'cancelledRevenue', sign * row.revenue);
+            }
+        }
+    }
+
+    return increments;
+};
+
+/**
+ * Bucket queries covering [from, to] (to inclusive): day buckets for the whole local days
+ * inside the range, hour buckets for the rest
+ */
+const rangeSegments = (from, to) => {
+    const end = to + 1;
+    const firstDay = startOfDay(from) === from ? from : nextDay(from);
+    const lastDay = startOfDay(end);
+
+    if (firstDay >= lastDay) {
+        return [{ granularity: 'hour', bucket: { $gte: startOfHour(from), $lt: end } }];
+    }
+
+    const segments = [{ granularity: 'day', bucket: { $gte: firstDay, $lt: lastDay } }];
+    if (startOfHour(from) < firstDay) {
+        segments.push({ granularity: 'hour', bucket: { $gte: startOfHour(from), $lt: firstDay } });
+    }
+    if (lastDay < end) {
+        segments.push({ granularity: 'hour', bucket: { $gte: lastDay, $lt: end } });
+    }
+    return segments;
+};
+
+const toOrder = (order) => (typeof order?.toObject === 'function' ? order.toObject() : order);
+
+class SalesRollupService {
+    constructor() {
+        this.metrics = {
+            recorded: 0,
+            statusChanges: 0,
+            removed: 0,
+            writes: 0,
+            writeErrors: 0,
+            rebuilds: 0,
+            lastRebuild: null
+        };
+    }
+
+    /**
+     * A new order was saved
+     */
+    async recordOrder(order) {
+        this.metrics.recorded++;
+        await this.apply(rollupIncrements(toOrder(order), 1), { orderId: order?._id });
+    }
+
+    /**
+     * An order moved from previousStatus to status
+     */
+    async recordStatusChange(order, previousStatus, status) {
+        if (!order || previousStatus === status) return;
+
+        const plain = toOrder(order);
+        const increments = rollupIncrements({ ...plain, status: previousStatus }, -1);
+        rollupIncrements({ ...plain, status }, 1, increments);
+
+        this.metrics.statusChanges++;
+        await this.apply(increments, { orderId: plain._id, previousStatus, status });
+    }
+
+    /**
+     * An order was deleted
+     */
+    async removeOrder(order) {
+        this.metrics.removed++;
+        await this.apply(rollupIncrements(toOrder(order), -1), { orderId: order?._id });
+    }
+
+    async apply(increments, context = {}) {
+        const now = Date.now();
+        const operations = [];
+
+        for (const { filter, name, inc } of increments.values()) {
+            if (Object.keys(inc).length === 0) continue;
+            operations.push({
+                updateOne: {
+                    filter,
+                    update: { $inc: inc, $set: { updatedAt: now, ...(name ? { name } : {}) } },
+                    upsert: true
+                }
+            });
+        }
+
+        if (operations.length === 0) return;
+
+        try {
+            await this.bulkUpsert(operations);
+            this.metrics.writes++;
+        } catch (error) {
+            // The nightly reconcile rebuilds recent buckets, so a lost increment heals itself
+            this.metrics.writeErrors++;
+            logger.error('Failed to update sales rollups', {
+                ...context,
+                buckets: operations.length,
+                error: error.message
+            });
+        }
+    }
+
+    async bulkUpsert(operations) {
+        try {
+            await salesRollupModel.bulkWrite(operations, { ordered: false });
+        } catch (error) {
+            // Two first writes to the same new bucket race on the unique index: the loser
+            // is retried once and then finds the bucket
+            const writeErrors = error.writeErrors || [];
+            if (writeErrors.length === 0 || writeErrors.some(writeError => writeError.code !== 11000)) {
+                throw error;
+            }
+            await salesRollupModel.bulkWrite(writeErrors.map(writeError => operations[writeError.index]), { ordered: false });
+        }
+    }
+
+    /**
+     * Sum one dimension over [from, to] (ms, to inclusive)
+     * @returns {Promise<Array<{key, name, orders, revenue, quantity, cancelledOrders, cancelledRevenue}>>} sorted by revenue
+     */
+    async getTotals(dimension, from, to) {
+        const rows = await salesRollupModel.aggregate([
+            { $match: { dimension, $or: rangeSegments(from, to) } },
+            {
+                $group: {
+                    _id: '$key',
+                    name: { $last: '$name' },
+                    ...Object.fromEntries(COUNTERS.map(field => [field, { $sum: `$${field}` }]))
+                }
+            },
+            { $sort: { revenue: -1 } }
+        ]);
+
+        return rows.map(({ _id, ...row }) => ({ key: _id, ...row }));
+    }
+
+    /**
+     * Totals for [from, to] across all orders
+     */
+    async getSummary(from, to) {
+        const [total] = await this.getTotals('total', from, to);
+        return total || { key: '', orders: 0, revenue: 0, quantity: 0, cancelledOrders: 0, cancelledRevenue: 0 };
+    }
+
+    /**
+     * Bucket documents of one dimension and granularity in [from, to)
+     */
+    async getBuckets(dimension, granularity, from, to) {
+        return salesRollupModel.find({
+            dimension,
+            granularity,
+            bucket: { $gte: from, $lt: to }
+        }).sort({ bucket: 1 }).lean();
+    }
+
+    /**
+     * Recompute the buckets of the local days touching [from, to] from the orders.
+     * Each recomputed bucket is replaced in place (upsert), then buckets of the day that no
+     * order produced any more are deleted; increments written for a day while it is being
+     * recomputed can be lost, so this runs when order traffic is low.
+     */
+    async rebuild({ from = 0, to = Date.now() } = {}) {
+        const startedAt = Date.now();
+        const rangeStart = startOfDay(from);
+        const rangeEnd = nextDay(to);
+
+        let dayStart = rangeStart;
+        let dayEnd = nextDay(rangeStart);
+        let increments = new Map();
+        let orders = 0;
+        let buckets = 0;
+
+        // Replace every bucket in [dayStart, until) with the accumulated increments
+        const flush = async (until) => {
+            const operations = [...increments.values()].map(({ filter, name, inc }) => {
+                const document = { ...filter, name, statuses: {}, updatedAt: Date.now() };
+                for (const field of COUNTERS) document[field] = inc[field] || 0;
+                for (const [field, value] of Object.entries(inc)) {
+                    if (field.startsWith('statuses.')) document.statuses[field.slice(9)] = value;
+                }
+                return { replaceOne: { filter, replacement: document, upsert: true } };
+            });
+
+            if (operations.length > 0) {
+                await this.bulkUpsert(operations);
+            }
+
+            // Buckets left over from orders that moved or were deleted
+            const rebuilt = new Set(increments.keys());
+            const existing = await salesRollupModel.find({
+                dimension: { $in: DIMENSIONS },
+                granularity: { $in: ['hour', 'day'] },
+                bucket: { $gte: dayStart, $lt: until }
+            }).select('dimension key granularity bucket').lean();
+            const stale = existing.filter(bucket => !rebuilt.has(bucketId(bucket))).map(bucket => bucket._id);
+            if (stale.length > 0) {
+                await salesRollupModel.deleteMany({ _id: { $in: stale } });
+            }
+
+            buckets += operations.length;
+        };
+
+        const cursor = orderModel.find({ date: { $gte: rangeStart, $lt: rangeEnd } })
+            .select('date amount paymentMethod items status')
+            .sort({ date: 1 })
+            .lean()
+            .cursor();
+
+        for await (const order of cursor) {
+            if (order.date >= dayEnd) {
+                const orderDay = startOfDay(order.date);
+                await flush(orderDay);
+                dayStart = orderDay;
+                dayEnd = nextDay(orderDay);
+                increments = new Map();
+            }
+            rollupIncrements(order, 1, increments);
+            orders++;
+        }
+        await flush(rangeEnd);
+
+        const result = { from: rangeStart, to: rangeEnd, orders, buckets, durationMs: Date.now() - startedAt };
+        this.metrics.rebuilds++;
+        this.metrics.lastRebuild = result;
+        logger.info('Sales rollups rebuilt', result);
+        return result;
+    }
+
+    /**
+     * Whether a full backfill from the order history has completed
+     */
+    async isBackfilled() {
+        return (await salesRollupModel.exists(BACKFILL_MARKER)) !== null;
+    }
+
+    /**
+     * Record a completed full backfill
+     * @param {object} result - rebuild() result
+     */
+    async markBackfilled(result) {
+        await salesRollupModel.updateOne(
+            BACKFILL_MARKER,
+            { $set: { updatedAt: Date.now(), orders: result.orders } },
+            { upsert: true }
+        );
+    }
+
+    getStats() {
+        return { ...this.metrics };
+    }
+}
+
+// Export singleton instance
+const salesRollupService = new SalesRollupService();
+export default salesRollupService;
+
+// Also export class for testing
+export { SalesRollupService, rollupIncrements, rangeSegments, startOfDay, nextDay };
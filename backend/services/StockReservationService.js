@@ -0,0 +1,262 @@
+import mongoose from 'mongoose';
+import productModel from '../models/ProductModel.js';
+import stockReservationModel from '../models/StockReservationModel.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Stock Reservation Service
+ * Checks and takes stock for a whole cart in one conditional bulk write, so concurrent
+ * checkouts can't both pass a check and oversell the last items.
+ *
+ * - reserve: one ledger insert, then one unordered bulkWrite with an update per product,
+ *   filtered on stock >= quantity. Each update also tags the product with the reservation
+ *   (stockHolds), the two-phase pattern MongoDB documents for multi-document updates; when
+ *   fewer products than requested were updated, the tagged ones are put back and the
+ *   reservation is rejected
+ * - commit: the order keeps the stock; release: the stock goes back. Both first claim the
+ *   held reservation in the ledger, so a commit and a release (or expiry) never both win
+ * - Held reservations expire after ttlMs (PayTR payments can take up to 30 minutes) and are
+ *   released by the releaseStockReservations job. A crash between a claim and the product
+ *   writes errs towards selling less, never more
+ */
+
+class StockReservationError extends Error {
+    constructor(code, message, productId = null) {
+        super(message);
+        this.name = 'StockReservationError';
+        this.code = code;
+        this.productId = productId;
+    }
+}
+
+/**
+ * Merge cart lines per product (one product can be in the cart in several sizes)
+ * @returns {Array<{productId: string, quantity: number}>}
+ */
+const normalizeItems = (items) => {
+    if (!Array.isArray(items) || items.length === 0) {
+        throw new StockReservationError('EMPTY_CART', 'Sepet boş veya geçersiz');
+    }
+
+    const quantities = new Map();
+    for (const item of items) {
+        // Hem item.id hem de item._id'yi kontrol et (frontend farklı formatlar gönderebilir)
+        const productId = String(item?.id || item?._id || item?.productId || '');
+        if (!productId) {
+            throw new StockReservationError('MISSING_PRODUCT_ID', 'Ürün ID\'si bulunamadı');
+        }
+        if (!mongoose.isValidObjectId(productId)) {
+            throw new StockReservationError('PRODUCT_NOT_FOUND', 'Ürün bulunamadı', productId);
+        }
+
+        const quantity = Number(item.quantity || 0);
+        if (!Number.isInteger(quantity) || quantity < 0) {
+            throw new StockReservationError('INVALID_QUANTITY', 'Geçersiz ürün adedi', productId);
+        }
+        if (quantity > 0) {
+            quantities.set(productId, (quantities.get(productId) || 0) + quantity);
+        }
+    }
+
+    return Array.from(quantities, ([productId, quantity]) => ({ productId, quantity }));
+};
+
+/**
+ * Conditional decrement per product, tagged with the reservation
+ */
+const reserveOperations = (tag, items) => items.map(({ productId, quantity }) => ({
+    updateOne: {
+        filter: { _id: productId, stock: { $gte: quantity }, stockHolds: { $ne: tag } },
+        update: { $inc: { stock: -quantity }, $push: { stockHolds: tag } }
+    }
+}));
+
+/**
+ * Give stock back, only to products still tagged with the reservation
+ */
+const restoreOperations = (tag, items) => items.map(({ productId, quantity }) => ({
+    updateOne: {
+        filter: { _id: productId, stockHolds: tag },
+        update: { $inc: { stock: quantity }, $pull: { stockHolds: tag } }
+    }
+}));
+
+class StockReservationService {
+    constructor(config = {}) {
+        this.config = {
+            ttlMs: config.ttlMs || parseInt(process.env.STOCK_RESERVATION_TTL_MS) || 35 * 60 * 1000,
+            expireBatchSize: config.expireBatchSize || 500
+        };
+
+        this.metrics = {
+            reserved: 0,
+            rejected: 0,
+            committed: 0,
+            released: 0,
+            expired: 0
+        };
+    }
+
+    /**
+     * Reserve stock for a cart
+     * @param {string} reservationId - Business key, e.g. checkout:<uuid> or paytr:<merchant_oid>
+     * @param {Array} items - Cart lines ({ id | _id, quantity })
+     * @param {object} options - { ttlMs }
+     * @returns {Promise<object>} { success, reservationId, expiresAt } or { success: false, code, message, productId }
+     */
+    async reserve(reservationId, items, { ttlMs } = {}) {
+        let lines;
+        try {
+            lines = normalizeItems(items);
+        } catch (error) {
+            if (error instanceof StockReservationError) {
+                return { success: false, code: error.code, message: error.message, productId: error.productId };
+            }
+            throw error;
+        }
+
+        const expiresAt = new Date(Date.now() + (ttlMs || this.config.ttlMs));
+        const reservation = await stockReservationModel.create({ reservationId, items: lines, expiresAt });
+        const tag = reservation._id.toString();
+
+        if (lines.length > 0) {
+            const result = await productModel.bulkWrite(reserveOperations(tag, lines), { ordered: false });
+
+            if (result.modifiedCount < lines.length) {
+                await this.finish(reservation, 'rejected');
+                this.metrics.rejected++;
+                return { success: false, ...(await this.describeShortage(lines)) };
+            }
+        }
+
+        this.metrics.reserved++;
+        return { success: true, reservationId, expiresAt };
+    }
+
+    /**
+     * Keep the reserved stock for an order
+     * @returns {Promise<object>} { success, outcome } or { success: false, code: 'NOT_HELD', status }
+     */
+    async commit(reservationId, { orderId } = {}) {
+        const reservation = await stockReservationModel.findOneAndUpdate(
+            { reservationId, status: 'held' },
+            { $set: { status: 'committed', finishedAt: new Date(), ...(orderId ? { orderId: String(orderId) } : {}) } },
+            { new: true }
+        );
+
+        if (!reservation) {
+            const latest = await stockReservationModel.findOne({ reservationId }).sort({ createdAt: -1 }).lean();
+            if (latest?.status === 'committed') {
+                return { success: true, outcome: 'already_committed' };
+            }
+            return { success: false, code: 'NOT_HELD', status: latest?.status || null };
+        }
+
+        // The stock is the order's now; the tags only guarded a release
+        await productModel.updateMany(
+            { _id: { $in: reservation.items.map(item => item.productId) } },
+            { $pull: { stockHolds: reservation._id.toString() } }
+        );
+
+        this.metrics.committed++;
+        return { success: true, outcome: 'committed' };
+    }
+
+    /**
+     * Give the stock of a held reservation back
+     * @returns {Promise<boolean>} Whether a held reservation was released
+     */
+    async release(reservationId, status = 'released') {
+        const reservation = await stockReservationModel.findOne({ reservationId, status: 'held' });
+        if (!reservation) return false;
+
+        const released = await this.finish(reservation, status);
+        if (released) this.metrics[status === 'expired' ? 'expired' : 'released']++;
+        return released;
+    }
+
+    /**
+     * Release held reservations past their expiry
+     * @returns {Promise<number>} Number of reservations released
+     */
+    async releaseExpired() {
+        const expired = await stockReservationModel
+            .find({ status: 'held', expiresAt: { $lte: new Date() } })
+            .sort({ expiresAt: 1 })
+            .limit(this.config.expireBatchSize);
+
+        let released = 0;
+        for (const reservation of expired) {
+            try {
+                if (await this.finish(reservation, 'expired')) {
+                    released++;
+                    this.metrics.expired++;
+                }
+            } catch (error) {
+                logger.error('Failed to release expired stock reservation', {
+                    reservationId: reservation.reservationId,
+                    error: error.message
+                });
+            }
+        }
+
+        if (released > 0) {
+            logger.info('Expired stock reservations released', { released });
+        }
+        return released;
+    }
+
+    /**
+     * Claim a held reservation with a final status and put its stock back
+     */
+    async finish(reservation, status) {
+        const claimed = await stockReservationModel.updateOne(
+            { _id: reservation._id, status: 'held' },
+            { $set: { status, finishedAt: new Date() } }
+        );
+        if (claimed.modifiedCount === 0) return false;
+
+        if (reservation.items.length > 0) {
+            await productModel.bulkWrite(restoreOperations(reservation._id.toString(), reservation.items), { ordered: false });
+        }
+        return true;
+    }
+
+    /**
+     * Find which product a rejected reservation ran out on (rejections only)
+     */
+    async describeShortage(lines) {
+        const products = await productModel
+            .find({ _id: { $in: lines.map(line => line.productId) } })
+            .select('name stock')
+            .lean();
+        const byId = new Map(products.map(product => [product._id.toString(), product]));
+
+        for (const { productId, quantity } of lines) {
+            const product = byId.get(productId);
+            if (!product) {
+                return { code: 'PRODUCT_NOT_FOUND', message: 'Ürün bulunamadı', productId };
+            }
+            if (Number(product.stock || 0) < quantity) {
+                return { code: 'INSUFFICIENT_STOCK', message: `${product.name} için stok yetersiz`, productId };
+            }
+        }
+
+        // Stock came back while the reservation was being rolled back
+        return { code: 'INSUFFICIENT_STOCK', message: 'Stok yetersiz, lütfen tekrar deneyin', productId: null };
+    }
+
+    getStats() {
+        return {
+            ttlMs: this.config.ttlMs,
+            ...this.metrics
+        };
+    }
+}
+
+// Export singleton instance
+const stockReservationService = new StockReservationService();
+export default stockReservationService;
+
+// Also export class for testing
+export { StockReservationService, StockReservationError, normalizeItems, reserveOperations, restoreOperations };
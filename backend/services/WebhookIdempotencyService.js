@@ -0,0 +1,278 @@
+import crypto from 'crypto';
+import webhookIdempotencyModel from '../models/WebhookIdempotencyModel.js';
+import logger from '../utils/logger.js';
+import { getRedisClient, isRedisAvailable } from '../config/redis.js';
+
+/**
+ * Webhook Idempotency Service
+ * Deduplicates incoming webhooks across all workers so a retried delivery is never processed twice.
+ *
+ * Keys are SHA-256 digests of the sender's webhook id, or of orderId/status/event/timestamp when the
+ * sender doesn't provide one. A key is first claimed with a short processing lease and marked done
+ * once processing succeeds; failed deliveries release the key so the provider's retry goes through.
+ *
+ * Storage: Redis (SET NX PX) when connected, otherwise the webhook_idempotency collection with a TTL
+ * index. Completed keys are also kept in a bounded in-process map so hot retries skip the round trip.
+ */
+
+const CLAIM_NEW = 'new';
+const CLAIM_DUPLICATE = 'duplicate';
+const CLAIM_IN_PROGRESS = 'in_progress';
+
+// Approximate heap cost of one local entry: 22-char key string, expiry number and Map slot
+const LOCAL_ENTRY_BYTES = 120;
+
+class WebhookIdempotencyService {
+    constructor(config = {}) {
+        this.config = {
+            ttlMs: config.ttlMs || (parseInt(process.env.WEBHOOK_IDEMPOTENCY_TTL_SECONDS) || 24 * 60 * 60) * 1000,
+            leaseMs: config.leaseMs || 5 * 60 * 1000, // Matches the webhook timestamp window
+            maxLocalEntries: config.maxLocalEntries || parseInt(process.env.WEBHOOK_IDEMPOTENCY_LOCAL_MAX) || 100000,
+            sweepBatch: config.sweepBatch || 100
+        };
+
+        this.redisNamespace = 'webhook:idempotency';
+
+        // key -> expiresAt, insertion order equals expiry order because the TTL is constant
+        this.local = new Map();
+
+        this.metrics = {
+            claims: 0,
+            duplicates: 0,
+            inProgress: 0,
+            localHits: 0,
+            sharedHits: 0,
+            completed: 0,
+            released: 0,
+            unkeyed: 0,
+            sharedErrors: 0,
+            expiredEvictions: 0,
+            capacityEvictions: 0,
+            peakLocalEntries: 0
+        };
+    }
+
+    /**
+     * Build a compact idempotency key for a webhook
+     * Returns null when neither a webhook id nor a stable event identity is available
+     */
+    buildKey(platform, { webhookId = null, payload = {} } = {}) {
+        let identity;
+
+        if (webhookId) {
+            identity = `id:${webhookId}`;
+        } else {
+            const orderId = payload.orderId || payload.muditaKuryeOrderId || payload.muditaOrderId;
+            if (!orderId || !payload.timestamp) {
+                return null;
+            }
+            identity = `event:${orderId}|${payload.status || ''}|${payload.event || ''}|${payload.timestamp}`;
+        }
+
+        return crypto
+            .createHash('sha256')
+            .update(`${String(platform).toLowerCase()}|${identity}`)
+            .digest()
+            .subarray(0, 16)
+            .toString('base64url');
+    }
+
+    /**
+     * Claim a key before processing
+     * @returns {Promise<string>} 'new', 'duplicate' or 'in_progress'
+     */
+    async claim(key, platform = null) {
+        if (!key) {
+            this.metrics.unkeyed++;
+            return CLAIM_NEW;
+        }
+
+        this.metrics.claims++;
+        this.sweep();
+
+        const expiresAt = this.local.get(key);
+        if (expiresAt && expiresAt > Date.now()) {
+            this.metrics.localHits++;
+            this.metrics.duplicates++;
+            return CLAIM_DUPLICATE;
+        }
+
+        let result;
+        try {
+            result = isRedisAvailable()
+                ? await this.claimInRedis(key)
+                : await this.claimInMongo(key, platform);
+        } catch (error) {
+            // Fail open: losing dedup for one delivery is better than rejecting it
+            this.metrics.sharedErrors++;
+            logger.error('Webhook idempotency claim failed', { error: error.message });
+            return CLAIM_NEW;
+        }
+
+        if (result === CLAIM_DUPLICATE) {
+            this.metrics.sharedHits++;
+            this.metrics.duplicates++;
+            this.remember(key);
+        } else if (result === CLAIM_IN_PROGRESS) {
+            this.metrics.sharedHits++;
+            this.metrics.inProgress++;
+        }
+
+        return result;
+    }
+
+    /**
+     * Mark a claimed key as processed
+     */
+    async complete(key) {
+        if (!key) return;
+
+        this.metrics.completed++;
+        this.remember(key);
+
+        try {
+            if (isRedisAvailable()) {
+                await getRedisClient().set(this.redisKey(key), 'done', { PX: this.config.ttlMs });
+            } else {
+                await webhookIdempotencyModel.updateOne(
+                    { key },
+                    { $set: { state: 'done', expiresAt: new Date(Date.now() + this.config.ttlMs) } },
+                    { upsert: true }
+                );
+            }
+        } catch (error) {
+            this.metrics.sharedErrors++;
+            logger.error('Webhook idempotency complete failed', { error: error.message });
+        }
+    }
+
+    /**
+     * Release a claimed key after failed processing so the next delivery is processed
+     */
+    async release(key) {
+        if (!key) return;
+
+        this.metrics.released++;
+        this.local.delete(key);
+
+        try {
+            if (isRedisAvailable()) {
+                await getRedisClient().del(this.redisKey(key));
+            } else {
+                await webhookIdempotencyModel.deleteOne({ key });
+            }
+        } catch (error) {
+            this.metrics.sharedErrors++;
+            logger.error('Webhook idempotency release failed', { error: error.message });
+        }
+    }
+
+    async claimInRedis(key) {
+        const client = getRedisClient();
+        const redisKey = this.redisKey(key);
+
+        const claimed = await client.set(redisKey, 'processing', { NX: true, PX: this.config.leaseMs });
+        if (claimed) {
+            return CLAIM_NEW;
+        }
+
+        const state = await client.get(redisKey);
+        if (state === null) {
+            // Lease expired between SET and GET, try once more
+            return (await client.set(redisKey, 'processing', { NX: true, PX: this.config.leaseMs }))
+                ? CLAIM_NEW
+                : CLAIM_IN_PROGRESS;
+        }
+        return state === 'done' ? CLAIM_DUPLICATE : CLAIM_IN_PROGRESS;
+    }
+
+    async claimInMongo(key, platform, retry = true) {
+        const now = Date.now();
+        const lease = { state: 'processing', platform, expiresAt: new Date(now + this.config.leaseMs) };
+
+        try {
+            await webhookIdempotencyModel.create({ key, ...lease });
+            return CLAIM_NEW;
+        } catch (error) {
+            if (error.code !== 11000) throw error;
+        }
+
+        // The TTL monitor runs once a minute, so take over entries that expired but weren't removed yet
+        const expired = await webhookIdempotencyModel.findOneAndUpdate(
+            { key, expiresAt: { $lte: new Date(now) } },
+            { $set: lease }
+        ).lean();
+        if (expired) {
+            return CLAIM_NEW;
+        }
+
+        const current = await webhookIdempotencyModel.findOne({ key }).select('state').lean();
+        if (!current) {
+            // Released between insert and lookup
+            return retry ? this.claimInMongo(key, platform, false) : CLAIM_IN_PROGRESS;
+        }
+        return current.state === 'done' ? CLAIM_DUPLICATE : CLAIM_IN_PROGRESS;
+    }
+
+    redisKey(key) {
+        return `${this.redisNamespace}:${key}`;
+    }
+
+    /**
+     * Record a completed key in the local map, evicting the oldest entry when full
+     */
+    remember(key) {
+        this.local.delete(key);
+        this.local.set(key, Date.now() + this.config.ttlMs);
+
+        while (this.local.size > this.config.maxLocalEntries) {
+            this.local.delete(this.local.keys().next().value);
+            this.metrics.capacityEvictions++;
+        }
+
+        if (this.local.size > this.metrics.peakLocalEntries) {
+            this.metrics.peakLocalEntries = this.local.size;
+        }
+    }
+
+    /**
+     * Drop expired entries from the head of the local map, a bounded amount per call
+     */
+    sweep() {
+        const now = Date.now();
+        let checked = 0;
+
+        for (const [key, expiresAt] of this.local) {
+            if (expiresAt > now || checked++ >= this.config.sweepBatch) break;
+            this.local.delete(key);
+            this.metrics.expiredEvictions++;
+        }
+    }
+
+    /**
+     * Get dedup metrics for monitoring
+     */
+    getStats() {
+        const lookups = this.metrics.claims;
+
+        return {
+            backend: isRedisAvailable() ? 'redis' : 'mongodb',
+            ttlSeconds: Math.round(this.config.ttlMs / 1000),
+            ...this.metrics,
+            hitRate: lookups > 0 ? (this.metrics.duplicates + this.metrics.inProgress) / lookups : 0,
+            localHitRate: lookups > 0 ? this.metrics.localHits / lookups : 0,
+            local: {
+                entries: this.local.size,
+                maxEntries: this.config.maxLocalEntries,
+                estimatedBytes: this.local.size * LOCAL_ENTRY_BYTES
+            }
+        };
+    }
+}
+
+// Export singleton instance
+const webhookIdempotencyService = new WebhookIdempotencyService();
+export default webhookIdempotencyService;
+
+// Also export class and claim results for testing
+export { WebhookIdempotencyService, CLAIM_NEW, CLAIM_DUPLICATE, CLAIM_IN_PROGRESS };
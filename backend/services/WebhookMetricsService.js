@@ -0,0 +1,171 @@
+import crypto from 'crypto';
+import logger from '../utils/logger.js';
+import { Histogram, DEFAULT_BUCKETS_MS } from '../utils/histogram.js';
+
+/**
+ * Webhook Metrics Service
+ * Per-stage latency histograms for the webhook ingestion path.
+ *
+ * Receipt (acked within the sender's budget):
+ *   parse → dbRead (config) → verify → dedup → dbWrite (webhook log) → ack
+ * Processing (queue worker or inline):
+ *   queueWait → dbRead (order state) → dbWrite (order, webhook log) → notify → email
+ *
+ * - Each webhook gets a trace ID that travels with its queue job, courier status event,
+ *   admin notification and delivery email, so log lines can be joined per webhook
+ * - Histograms use fixed millisecond buckets; percentiles are interpolated within a bucket
+ * - An ack slower than ackBudgetMs is logged with its stage breakdown and counted against
+ *   its slowest stage, which is where to look when the sender starts retrying
+ */
+
+const STAGES = ['parse', 'dbRead', 'verify', 'dedup', 'dbWrite', 'ack', 'queueWait', 'process', 'notify', 'email'];
+
+// Stages that run before the webhook is acked
+const ACK_STAGES = ['parse', 'dbRead', 'verify', 'dedup', 'dbWrite'];
+
+class WebhookMetricsService {
+    constructor(config = {}) {
+        this.config = {
+            ackBudgetMs: config.ackBudgetMs || parseInt(process.env.WEBHOOK_ACK_BUDGET_MS) || 5000,
+            buckets: config.buckets || DEFAULT_BUCKETS_MS
+        };
+
+        this.histograms = new Map(STAGES.map(stage => [stage, new Histogram(this.config.buckets)]));
+
+        this.metrics = {
+            acked: 0,
+            overBudget: 0,
+            // slowest stage of each ack over budget -> count
+            overBudgetStages: {}
+        };
+    }
+
+    /**
+     * Start timing one webhook
+     * @param {object} options - { traceId, startedAt } (startedAt from performance.now())
+     */
+    startTrace({ traceId, startedAt } = {}) {
+        return {
+            traceId: traceId || crypto.randomUUID(),
+            startedAt: startedAt ?? performance.now(),
+            stages: {}
+        };
+    }
+
+    /**
+     * Record a stage duration; repeated stages of one trace add up
+     * @param {object|null} trace - Trace from startTrace, or null to only update the histogram
+     */
+    record(trace, stage, ms) {
+        const histogram = this.histograms.get(stage);
+        if (!histogram) return;
+
+        histogram.observe(ms);
+        if (trace) {
+            trace.stages[stage] = (trace.stages[stage] || 0) + ms;
+        }
+    }
+
+    /**
+     * Time an async operation as a stage
+     */
+    async time(trace, stage, fn) {
+        const startedAt = performance.now();
+        try {
+            return await fn();
+        } finally {
+            this.record(trace, stage, performance.now() - startedAt);
+        }
+    }
+
+    /**
+     * Record the ack of a webhook and check it against the sender's budget
+     * @returns {number} Milliseconds from receipt to response
+     */
+    recordAck(trace, statusCode) {
+        const ackMs = performance.now() - trace.startedAt;
+        this.record(trace, 'ack', ackMs);
+        this.metrics.acked++;
+
+        const stages = Object.fromEntries(
+            Object.entries(trace.stages).map(([stage, ms]) => [stage, Math.round(ms * 100) / 100])
+        );
+
+        if (ackMs > this.config.ackBudgetMs) {
+            const slowest = ACK_STAGES
+                .filter(stage => trace.stages[stage] !== undefined)
+                .sort((a, b) => trace.stages[b] - trace.stages[a])[0] || 'unknown';
+
+            this.metrics.overBudget++;
+            this.metrics.overBudgetStages[slowest] = (this.metrics.overBudgetStages[slowest] || 0) + 1;
+
+            logger.warn('Webhook ack exceeded budget', {
+                traceId: trace.traceId,
+                statusCode,
+                ackMs: Math.round(ackMs),
+                budgetMs: this.config.ackBudgetMs,
+                slowestStage: slowest,
+                stages
+            });
+        } else {
+            logger.debug('Webhook acked', { traceId: trace.traceId, statusCode, ackMs: Math.round(ackMs), stages });
+        }
+
+        return ackMs;
+    }
+
+    getStats() {
+        return {
+            ackBudgetMs: this.config.ackBudgetMs,
+            ...this.metrics,
+            stages: Object.fromEntries(
+                Array.from(this.histograms, ([stage, histogram]) => [stage, histogram.toJSON()])
+            )
+        };
+    }
+
+    /**
+     * Histograms in the Prometheus text exposition format
+     */
+    toPrometheus() {
+        const lines = [
+            '# HELP webhook_stage_duration_ms Webhook ingestion stage duration in milliseconds',
+            '# TYPE webhook_stage_duration_ms histogram'
+        ];
+
+        for (const [stage, histogram] of this.histograms) {
+            let cumulative = 0;
+            histogram.buckets.forEach((le, slot) => {
+                cumulative += histogram.counts[slot];
+                lines.push(`webhook_stage_duration_ms_bucket{stage="${stage}",le="${le}"} ${cumulative}`);
+            });
+            lines.push(`webhook_stage_duration_ms_bucket{stage="${stage}",le="+Inf"} ${histogram.count}`);
+            lines.push(`webhook_stage_duration_ms_sum{stage="${stage}"} ${histogram.sum}`);
+            lines.push(`webhook_stage_duration_ms_count{stage="${stage}"} ${histogram.count}`);
+        }
+
+        lines.push(
+            '# HELP webhook_ack_over_budget_total Webhooks acked slower than the ack budget, by slowest stage',
+            '# TYPE webhook_ack_over_budget_total counter'
+        );
+        for (const [stage, count] of Object.entries(this.metrics.overBudgetStages)) {
+            lines.push(`webhook_ack_over_budget_total{stage="${stage}"} ${count}`);
+        }
+
+        return `${lines.join('\n')}\n`;
+    }
+
+    reset() {
+        for (const stage of this.histograms.keys()) {
+            this.histograms.set(stage, new Histogram(this.config.buckets));
+        }
+        this.metrics = { acked: 0, overBudget: 0, overBudgetStages: {} };
+    }
+}
+
+// Export singleton instance
+const webhookMetricsService = new WebhookMetricsService();
+export default webhookMetricsService;
+
+// Also export class for testing
+export { WebhookMetricsService, STAGES };
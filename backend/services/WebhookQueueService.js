@@ -0,0 +1,367 @@
+import os from 'os';
+import webhookLogModel from '../models/WebhookLogModel.js';
+import logger from '../utils/logger.js';
+
+/**
+ * Webhook Queue Service
+ * Processes accepted webhooks in the background so the sender gets its ack immediately.
+ *
+ * - One FIFO lane per order: events of the same order are never processed concurrently or out of order
+ * - A fixed pool of workers drains lanes round-robin, so one busy order can't starve the others
+ * - Backpressure: enqueue() refuses new jobs once maxDepth is reached and the caller answers 503
+ * - Durability: jobs are backed by their webhook_log entry (status 'pending'), leased to the
+ *   instance that queued it (processingBy / leaseUntil) and renewed by every sweep while the job
+ *   waits or runs. Pending logs whose lease expired are re-queued on startup and by a periodic
+ *   sweep, so a crash or deploy doesn't drop accepted webhooks, and a job still queued on a live
+ *   instance is never taken by another one
+ */
+
+const LAG_SAMPLE_SIZE = 1000;
+
+class WebhookQueueService {
+    constructor(config = {}) {
+        this.config = {
+            enabled: config.enabled ?? process.env.WEBHOOK_QUEUE_ENABLED !== 'false',
+            concurrency: config.concurrency || parseInt(process.env.WEBHOOK_QUEUE_CONCURRENCY) || 4,
+            maxDepth: config.maxDepth || parseInt(process.env.WEBHOOK_QUEUE_MAX_DEPTH) || 5000,
+            recoveryBatch: config.recoveryBatch || 500,
+            // Pending logs younger than this may still be queued on another instance
+            recoveryGraceMs: config.recoveryGraceMs || 5 * 60 * 1000,
+            recoveryIntervalMs: config.recoveryIntervalMs || 60 * 1000,
+            leaseMs: config.leaseMs || parseInt(process.env.WEBHOOK_QUEUE_LEASE_MS) || 5 * 60 * 1000
+        };
+
+        this.instanceId = `${os.hostname()}-${process.pid}`;
+
+        this.processor = null;
+        this.lanes = new Map(); // orderKey -> jobs[]
+        this.ready = []; // orderKeys with queued jobs and no job in flight
+        this.readyHead = 0;
+        this.busyLanes = new Set();
+        this.depth = 0;
+        this.inFlight = 0;
+        this.idleWaiters = [];
+        this.initialized = false;
+        this.recoveryTimer = null;
+        this.recovering = false;
+        // Webhook log IDs queued or in flight here, so the sweep doesn't queue them twice
+        this.queuedLogIds = new Set();
+
+        // Ring buffers of recent samples (ms)
+        this.lagSamples = new Array(LAG_SAMPLE_SIZE).fill(0);
+        this.processingSamples = new Array(LAG_SAMPLE_SIZE).fill(0);
+        this.sampleCount = 0;
+
+        this.metrics = {
+            enqueued: 0,
+            processed: 0,
+            failed: 0,
+            rejected: 0,
+            recovered: 0,
+            leaseErrors: 0,
+            maxDepthSeen: 0
+        };
+    }
+
+    /**
+     * Register the function that processes a job
+     * @param {Function} processor - async (job) => { success, ... }
+     */
+    setProcessor(processor) {
+        this.processor = processor;
+    }
+
+    isEnabled() {
+        return this.config.enabled && this.processor !== null;
+    }
+
+    /**
+     * Re-queue webhooks that were accepted but not processed before the last shutdown,
+     * then keep sweeping for them
+     */
+    async initialize() {
+        if (this.initialized || !this.isEnabled()) return;
+        this.initialized = true;
+
+        await this.recover();
+
+        this.recoveryTimer = setInterval(async () => {
+            await this.renewLeases();
+            await this.recover();
+        }, this.config.recoveryIntervalMs);
+        this.recoveryTimer.unref?.();
+
+        logger.info('WebhookQueueService initialized', {
+            concurrency: this.config.concurrency,
+            maxDepth: this.config.maxDepth,
+            recoveryIntervalMs: this.config.recoveryIntervalMs,
+            leaseMs: this.config.leaseMs,
+            recovered: this.metrics.recovered
+        });
+    }
+
+    /**
+     * Lease fields for a webhook log queued on this instance
+     */
+    lease() {
+        return { processingBy: this.instanceId, leaseUntil: Date.now() + this.config.leaseMs };
+    }
+
+    /**
+     * Pending logs no live instance holds: lease expired, or (logs written before leases
+     * existed) older than recoveryGraceMs
+     */
+    unleased(now = Date.now()) {
+        return [
+            { leaseUntil: { $lt: now } },
+            { leaseUntil: { $exists: false }, createdAt: { $lt: now - this.config.recoveryGraceMs } }
+        ];
+    }
+
+    /**
+     * Extend the lease of every log queued or in flight here
+     */
+    async renewLeases() {
+        if (this.queuedLogIds.size === 0) return;
+
+        try {
+            await webhookLogModel.updateMany(
+                { _id: { $in: Array.from(this.queuedLogIds) }, status: 'pending', processingBy: this.instanceId },
+                { $set: { leaseUntil: Date.now() + this.config.leaseMs } }
+            );
+        } catch (error) {
+            this.metrics.leaseErrors++;
+            logger.error('Failed to renew webhook leases', { queued: this.queuedLogIds.size, error: error.message });
+        }
+    }
+
+    /**
+     * Renew the lease of a log about to be processed
+     * @returns {Promise<boolean>} false when the log was processed or taken over elsewhere
+     */
+    async holdLease(webhookLogId) {
+        const held = await webhookLogModel.updateOne(
+            {
+                _id: webhookLogId,
+                status: 'pending',
+                $or: [{ processingBy: this.instanceId }, { processingBy: { $exists: false } }]
+            },
+            { $set: this.lease() }
+        );
+        return held.matchedCount > 0;
+    }
+
+    /**
+     * Queue pending webhook logs that no instance holds a lease on
+     * (their processing lease blocks the provider's retries until they are processed)
+     */
+    async recover() {
+        if (this.recovering) return;
+        this.recovering = true;
+
+        try {
+            const room = this.config.maxDepth - this.depth;
+            if (room <= 0) return;
+
+            const pendingLogs = await webhookLogModel
+                .find({ status: 'pending', $or: this.unleased() })
+                .sort({ createdAt: 1 })
+                .limit(Math.min(this.config.recoveryBatch, room))
+                .lean();
+
+            let recovered = 0;
+            for (const log of pendingLogs) {
+                if (this.queuedLogIds.has(String(log._id))) continue;
+
+                // Take ownership so concurrently sweeping instances don't both re-queue it, and
+                // so a lease renewed since the read keeps the log with its instance
+                const owned = await webhookLogModel.updateOne(
+                    { _id: log._id, status: 'pending', retryCount: log.retryCount || 0, $or: this.unleased() },
+                    { $inc: { retryCount: 1 }, $set: this.lease() }
+                );
+                if (owned.modifiedCount === 0) continue;
+
+                const accepted = this.enqueue({
+                    webhookLogId: log._id,
+                    webhookId: log.webhookId,
+                    traceId: log.traceId,
+                    platform: log.platform,
+                    payload: log.payload,
+                    idempotencyKey: log.idempotencyKey || null,
+                    receivedAt: log.createdAt
+                });
+                if (accepted) recovered++;
+            }
+
+            this.metrics.recovered += recovered;
+            if (recovered > 0) {
+                logger.warn('Re-queued unprocessed webhooks', { recovered });
+            }
+        } catch (error) {
+            logger.error('Failed to recover pending webhooks', { error: error.message });
+        } finally {
+            this.recovering = false;
+        }
+    }
+
+    stop() {
+        if (this.recoveryTimer) {
+            clearInterval(this.recoveryTimer);
+            this.recoveryTimer = null;
+        }
+        this.initialized = false;
+    }
+
+    /**
+     * Queue a webhook for processing
+     * @returns {boolean} false when the queue is full
+     */
+    enqueue(job) {
+        if (this.depth >= this.config.maxDepth) {
+            this.metrics.rejected++;
+            return false;
+        }
+
+        const orderKey = String(job.payload?.orderId || job.payload?.muditaKuryeOrderId || job.payload?.muditaOrderId || job.webhookId);
+        const queuedJob = { ...job, orderKey, queuedAt: Date.now(), receivedAt: job.receivedAt || Date.now() };
+
+        let lane = this.lanes.get(orderKey);
+        if (!lane) {
+            lane = [];
+            this.lanes.set(orderKey, lane);
+        }
+        lane.push(queuedJob);
+        if (job.webhookLogId) this.queuedLogIds.add(String(job.webhookLogId));
+
+        if (lane.length === 1 && !this.busyLanes.has(orderKey)) {
+            this.ready.push(orderKey);
+        }
+
+        this.depth++;
+        this.metrics.enqueued++;
+        if (this.depth > this.metrics.maxDepthSeen) {
+            this.metrics.maxDepthSeen = this.depth;
+        }
+
+        this.pump();
+        return true;
+    }
+
+    /**
+     * Start workers while there are free slots and ready lanes
+     */
+    pump() {
+        while (this.inFlight < this.config.concurrency && this.readyHead < this.ready.length) {
+            const orderKey = this.ready[this.readyHead++];
+            const job = this.lanes.get(orderKey).shift();
+
+            this.busyLanes.add(orderKey);
+            this.inFlight++;
+            this.depth--;
+
+            this.run(job).finally(() => {
+                this.inFlight--;
+                this.busyLanes.delete(orderKey);
+
+                const lane = this.lanes.get(orderKey);
+                if (lane.length > 0) {
+                    this.ready.push(orderKey);
+                } else {
+                    this.lanes.delete(orderKey);
+                }
+
+                this.pump();
+                this.notifyIdle();
+            });
+        }
+
+        // Compact the ready list once the consumed prefix dominates it
+        if (this.readyHead > 1024 && this.readyHead * 2 > this.ready.length) {
+            this.ready = this.ready.slice(this.readyHead);
+            this.readyHead = 0;
+        }
+    }
+
+    async run(job) {
+        const startedAt = Date.now();
+        const slot = this.sampleCount++ % LAG_SAMPLE_SIZE;
+        this.lagSamples[slot] = startedAt - job.receivedAt;
+
+        try {
+            const result = await this.processor(job);
+            if (result?.success) {
+                this.metrics.processed++;
+            } else {
+                this.metrics.failed++;
+            }
+        } catch (error) {
+            this.metrics.failed++;
+            logger.error('Queued webhook processing error', {
+                webhookId: job.webhookId,
+                orderKey: job.orderKey,
+                error: error.message
+            });
+        } finally {
+            this.processingSamples[slot] = Date.now() - startedAt;
+            if (job.webhookLogId) this.queuedLogIds.delete(String(job.webhookLogId));
+        }
+    }
+
+    /**
+     * Resolve once the queue is empty and no job is in flight
+     */
+    drain() {
+        if (this.depth === 0 && this.inFlight === 0) {
+            return Promise.resolve();
+        }
+        return new Promise(resolve => this.idleWaiters.push(resolve));
+    }
+
+    notifyIdle() {
+        if (this.depth === 0 && this.inFlight === 0 && this.idleWaiters.length > 0) {
+            const waiters = this.idleWaiters;
+            this.idleWaiters = [];
+            waiters.forEach(resolve => resolve());
+        }
+    }
+
+    /**
+     * Get queue depth and lag metrics
+     */
+    getStats() {
+        const count = Math.min(this.sampleCount, LAG_SAMPLE_SIZE);
+        const lag = this.lagSamples.slice(0, count).sort((a, b) => a - b);
+        const processing = this.processingSamples.slice(0, count).sort((a, b) => a - b);
+        const percentile = (sorted, pct) => sorted.length > 0
+            ? sorted[Math.min(sorted.length - 1, Math.floor(pct / 100 * sorted.length))]
+            : 0;
+
+        let oldestQueuedAt = null;
+        for (const lane of this.lanes.values()) {
+            const head = lane[0];
+            if (head && (oldestQueuedAt === null || head.receivedAt < oldestQueuedAt)) {
+                oldestQueuedAt = head.receivedAt;
+            }
+        }
+
+        return {
+            enabled: this.isEnabled(),
+            concurrency: this.config.concurrency,
+            maxDepth: this.config.maxDepth,
+            depth: this.depth,
+            inFlight: this.inFlight,
+            orders: this.lanes.size,
+            oldestQueuedAgeMs: oldestQueuedAt ? Date.now() - oldestQueuedAt : 0,
+            lagMs: { p50: percentile(lag, 50), p95: percentile(lag, 95), p99: percentile(lag, 99), max: lag[lag.length - 1] || 0 },
+            processingMs: { p50: percentile(processing, 50), p95: percentile(processing, 95), p99: percentile(processing, 99) },
+            ...this.metrics
+        };
+    }
+}
+
+// Export singleton instance
+const webhookQueueService = new WebhookQueueService();
+export default webhookQueueService;
+
+// Also export class for testing
+export { WebhookQueueService };
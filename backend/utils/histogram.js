@@ -0,0 +1,77 @@
+/**
+ * Latency Histogram
+ * Fixed millisecond buckets: constant memory per histogram, cheap to merge, and
+ * percentiles are interpolated within the bucket they fall in.
+ */
+
+export const DEFAULT_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+
+export class Histogram {
+    constructor(buckets = DEFAULT_BUCKETS_MS) {
+        this.buckets = buckets;
+        // Last slot counts observations above the largest bucket
+        this.counts = new Array(buckets.length + 1).fill(0);
+        this.count = 0;
+        this.sum = 0;
+        this.max = 0;
+    }
+
+    observe(ms) {
+        let slot = 0;
+        while (slot < this.buckets.length && ms > this.buckets[slot]) slot++;
+        this.counts[slot]++;
+        this.count++;
+        this.sum += ms;
+        if (ms > this.max) this.max = ms;
+    }
+
+    /**
+     * Add another histogram with the same buckets into this one
+     */
+    merge(other) {
+        for (let slot = 0; slot < this.counts.length; slot++) {
+            this.counts[slot] += other.counts[slot];
+        }
+        this.count += other.count;
+        this.sum += other.sum;
+        if (other.max > this.max) this.max = other.max;
+        return this;
+    }
+
+    /**
+     * Estimated value at quantile q (0..1)
+     */
+    percentile(q) {
+        if (this.count === 0) return 0;
+
+        const rank = q * this.count;
+        let seen = 0;
+        for (let slot = 0; slot < this.counts.length; slot++) {
+            if (this.counts[slot] === 0) continue;
+            if (seen + this.counts[slot] >= rank) {
+                const lower = slot === 0 ? 0 : this.buckets[slot - 1];
+                const upper = slot < this.buckets.length ? Math.min(this.buckets[slot], this.max) : this.max;
+                return lower + (upper - lower) * ((rank - seen) / this.counts[slot]);
+            }
+            seen += this.counts[slot];
+        }
+        return this.max;
+    }
+
+    toJSON() {
+        const round = (ms) => Math.round(ms * 100) / 100;
+        return {
+            count: this.count,
+            mean: this.count > 0 ? round(this.sum / this.count) : 0,
+            p50: round(this.percentile(0.5)),
+            p95: round(this.percentile(0.95)),
+            p99: round(this.percentile(0.99)),
+            max: round(this.max),
+            buckets: Object.fromEntries(
+                this.buckets.map((le, slot) => [le, this.counts[slot]]).concat([['+Inf', this.counts[this.buckets.length]]])
+            )
+        };
+    }
+}
+
+export default Histogram;
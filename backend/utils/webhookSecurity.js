@@ -50,6 +50,90 @@ export class WebhookSecurity {
         }
     }
 
+    /**
+     * Verify HMAC-SHA256 signature over the raw request body (timing-safe)
+     * Hashes the exact bytes that were received instead of re-serializing the
+     * parsed payload, so whitespace, key order and unicode escaping chosen by
+     * the sender cannot break verification.
+     *
+     * @param {Buffer|string} rawBody - Raw request body as received
+     * @param {string} signature - Received signature (with or without 'sha256=' prefix)
+     * @param {string|number|null} timestamp - Webhook timestamp; when null the
+     *        signature is HMAC(rawBody) (MuditaKurye docs), otherwise HMAC(`${timestamp}.${rawBody}`)
+     * @param {string|KeyObject} secretKey - Secret key (or prepared KeyObject) for HMAC
+     * @returns {boolean} True if signature is valid
+     */
+    static verifyRawSignature(rawBody, signature, timestamp, secretKey) {
+        try {
+            if (!rawBody || typeof signature !== 'string' || !secretKey) {
+                return false;
+            }
+
+            const hmac = crypto.createHmac('sha256', secretKey);
+            if (timestamp !== null && timestamp !== undefined) {
+                hmac.update(`${timestamp}.`);
+            }
+            const expected = hmac.update(rawBody).digest();
+
+            const cleanSignature = signature.startsWith('sha256=') ? signature.slice(7) : signature;
+            if (cleanSignature.length !== expected.length * 2) {
+                return false;
+            }
+
+            // Compare decoded digests; Buffer.from(hex) drops invalid characters so
+            // the decoded length is re-checked before the constant-time comparison
+            const received = Buffer.from(cleanSignature, 'hex');
+            return received.length === expected.length && crypto.timingSafeEqual(received, expected);
+        } catch (error) {
+            logger.error('Raw signature verification error', {
+                error: error.message
+            });
+            return false;
+        }
+    }
+
+    /**
+     * Prepare a reusable HMAC key
+     * Importing the secret once avoids re-deriving the key for every webhook
+     * when many deliveries are verified with the same secret.
+     *
+     * @param {string} secretKey - Secret key for HMAC
+     * @returns {KeyObject} Secret key object accepted by verifyRawSignature
+     */
+    static prepareKey(secretKey) {
+        return crypto.createSecretKey(Buffer.from(secretKey, 'utf8'));
+    }
+
+    /**
+     * Verify a batch of queued webhooks against one secret
+     * Processes entries in chunks and yields to the event loop between chunks so
+     * a large backlog does not block request handling.
+     *
+     * @param {Array<{rawBody: Buffer|string, signature: string, timestamp?: string|number|null}>} entries
+     * @param {string|KeyObject} secretKey - Secret key (or prepared KeyObject)
+     * @param {Object} options
+     * @param {number} options.chunkSize - Entries verified per event loop turn (default: 256)
+     * @returns {Promise<boolean[]>} Verification result per entry (same order)
+     */
+    static async verifyBatch(entries, secretKey, options = {}) {
+        const { chunkSize = 256 } = options;
+        const key = typeof secretKey === 'string' ? this.prepareKey(secretKey) : secretKey;
+        const results = new Array(entries.length);
+
+        for (let start = 0; start < entries.length; start += chunkSize) {
+            const end = Math.min(start + chunkSize, entries.length);
+            for (let i = start; i < end; i++) {
+                const { rawBody, signature, timestamp = null } = entries[i];
+                results[i] = this.verifyRawSignature(rawBody, signature, timestamp, key);
+            }
+            if (end < entries.length) {
+                await new Promise(resolve => setImmediate(resolve));
+            }
+        }
+
+        return results;
+    }
+
     /**
      * Validate webhook timestamp
      * Prevents replay attacks and future timestamps
@@ -145,6 +229,8 @@ export class WebhookSecurity {
      * @param {string|number} timestamp - Webhook timestamp
      * @param {string} secretKey - Secret key for HMAC
      * @param {Object} options - Validation options
+     * @param {Buffer} options.rawBody - Raw request body; when present the signature
+     *        is verified over these bytes instead of JSON.stringify(payload)
      * @returns {Object} { valid: boolean, error?: string, details?: Object }
      */
     static verifyWebhook(payload, signature, timestamp, secretKey, options = {}) {
@@ -154,8 +240,10 @@ export class WebhookSecurity {
             return timestampValidation;
         }
 
-        // Verify signature
-        const isValidSignature = this.verifySignature(payload, signature, timestamp, secretKey);
+        // Verify signature (raw body when available, legacy re-serialization otherwise)
+        const isValidSignature = options.rawBody
+            ? this.verifyRawSignature(options.rawBody, signature, timestamp, secretKey)
+            : this.verifySignature(payload, signature, timestamp, secretKey);
         if (!isValidSignature) {
             return {
                 valid: false,
@@ -294,6 +382,19 @@ export default WebhookSecurity;
  *     return res.status(401).json({ error: result.error });
  * }
  *
+ * // Verify over the raw body captured by express.json({ verify })
+ * const result = WebhookSecurity.verifyWebhook(
+ *     req.body,
+ *     signature,
+ *     timestamp,
+ *     secretKey,
+ *     { rawBody: req.rawBody }
+ * );
+ *
+ * // Verify queued deliveries in bulk
+ * const key = WebhookSecurity.prepareKey(secretKey);
+ * const results = await WebhookSecurity.verifyBatch(queuedWebhooks, key);
+ *
  * // Generate signature for outgoing webhook
  * const signature = WebhookSecurity.generateSignature(
  *     payload,
@@ -0,0 +1,6 @@
+"""MuditaKurye entegrasyonu için geliştirme ve performans araçları.
+
+Bu paket yalnızca standart kütüphaneyi kullanır; ``Docs/MuditaKurye
+Entegrasyon Dokümantasyonu`` altındaki sözleşmeyi (payload'lar, imza şeması,
+durum listesi) tek bir yerde toplar ve araçlar bu modülü paylaşır.
+"""
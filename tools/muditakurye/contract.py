@@ -0,0 +1,162 @@
+"""MuditaKurye webhook sözleşmesi.
+
+script.py'deki dokuz sipariş durumu, script_3.py'deki ``order.status_changed`` /
+``order.canceled`` payload'ları ve ``X-MuditaKurye-Signature`` HMAC-SHA256
+şeması burada tanımlanır. Yük üretici ve sahte sunucu bu modülü paylaşır.
+"""
+
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+# script.py - Sipariş Durumları
+STATUSES = (
+    'NEW',
+    'VALIDATED',
+    'ROUTED',
+    'ASSIGNED',
+    'ACCEPTED',
+    'PREPARED',
+    'ON_DELIVERY',
+    'DELIVERED',
+    'CANCELED',
+)
+
+# NEW → DELIVERED ileri akışı (CANCELED herhangi bir aşamadan gelebilir)
+LIFECYCLE = STATUSES[:-1]
+TERMINAL_STATUSES = ('DELIVERED', 'CANCELED')
+
+# Aşamalar arası tipik bekleme süreleri (saniye, min-max)
+STAGE_DELAYS = {
+    'VALIDATED': (5, 60),
+    'ROUTED': (5, 30),
+    'ASSIGNED': (30, 180),
+    'ACCEPTED': (10, 60),
+    'PREPARED': (300, 900),
+    'ON_DELIVERY': (60, 300),
+    'DELIVERED': (600, 1800),
+}
+
+CANCELED_BY = ('RESTAURANT', 'CUSTOMER', 'COURIER', 'SYSTEM')
+CANCEL_REASONS = ('Restoran isteği', 'Müşteri vazgeçti', 'Kurye bulunamadı', 'Adres hatalı')
+
+SIGNATURE_HEADER = 'X-MuditaKurye-Signature'
+TIMESTAMP_HEADER = 'X-Mudita-Timestamp'
+WEBHOOK_ID_HEADER = 'X-Mudita-Webhook-Id'
+
+# İmza şemaları:
+#   raw         -> HMAC(secret, rawBody)              (script_3.py, verifySignature)
+#   timestamped -> HMAC(secret, f"{ts}.{rawBody}")    (backend/utils/webhookSecurity.js)
+SIGNATURE_SCHEMES = ('raw', 'timestamped')
+
+
+def iso_timestamp(moment=None):
+    """JavaScript ``Date.prototype.toISOString()`` ile birebir aynı biçim.
+
+    Backend Joi şeması ``isoDate()`` alanlarını bu biçime dönüştürdüğü için
+    imzanın yeniden serileştirmeden sonra da tutması için bu biçim kullanılır.
+    """
+    moment = moment or datetime.now(timezone.utc)
+    moment = moment.astimezone(timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f'{moment.microsecond // 1000:03d}Z'
+
+
+def canonical_json(payload):
+    """``JSON.stringify`` ile aynı baytları üretir (boşluksuz, UTF-8)."""
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def sign(body, secret, timestamp=None, scheme='timestamped'):
+    """Ham gövde baytları üzerinden hex HMAC-SHA256 imzası üretir."""
+    if scheme not in SIGNATURE_SCHEMES:
+        raise ValueError(f'Bilinmeyen imza şeması: {scheme}')
+
+    mac = hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+    if scheme == 'timestamped':
+        if timestamp is None:
+            raise ValueError('timestamped şeması için timestamp zorunludur')
+        mac.update(f'{timestamp}.'.encode('utf-8'))
+    mac.update(body)
+    return mac.hexdigest()
+
+
+def signed_headers(body, secret, scheme='timestamped', timestamp_ms=None, webhook_id=None):
+    """Gövde için imza, zaman damgası ve webhook ID başlıklarını döndürür."""
+    timestamp_ms = timestamp_ms if timestamp_ms is not None else int(time.time() * 1000)
+    return {
+        'Content-Type': 'application/json',
+        SIGNATURE_HEADER: sign(body, secret, timestamp_ms, scheme),
+        TIMESTAMP_HEADER: str(timestamp_ms),
+        WEBHOOK_ID_HEADER: webhook_id or uuid.uuid4().hex,
+    }
+
+
+def status_changed_payload(order, status, previous_status, moment=None):
+    """script_3.py - Durum Güncellemesi payload'ı."""
+    return {
+        'event': 'order.status_changed',
+        'orderId': order['orderId'],
+        'muditaKuryeOrderId': order['muditaKuryeOrderId'],
+        'orderNumber': order['orderNumber'],
+        'status': status,
+        'previousStatus': previous_status,
+        'timestamp': iso_timestamp(moment),
+        'provider': 'THIRD_PARTY',
+        'providerRestaurantId': order['restaurantId'],
+    }
+
+
+def canceled_payload(order, previous_status, reason, canceled_by, moment=None):
+    """script_3.py - İptal Bildirimi payload'ı."""
+    return {
+        'event': 'order.canceled',
+        'orderId': order['orderId'],
+        'muditaKuryeOrderId': order['muditaKuryeOrderId'],
+        'status': 'CANCELED',
+        'previousStatus': previous_status,
+        'reason': reason,
+        'canceledBy': canceled_by,
+        'timestamp': iso_timestamp(moment),
+    }
+
+
+def new_order(rng, restaurant_id='rest_85b4ad47f35b45e893c9', sequence=0):
+    """Simülasyon için sipariş kimlikleri üretir."""
+    today = datetime.now(timezone.utc).strftime('%Y%m%d')
+    return {
+        'orderId': f'order_{rng.randrange(10 ** 9):09d}',
+        'muditaKuryeOrderId': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'orderNumber': f'RST-{today}-{sequence % 10000:04d}',
+        'restaurantId': restaurant_id,
+    }
+
+
+def lifecycle(rng, cancel_rate=0.05):
+    """Bir siparişin NEW → DELIVERED (veya CANCELED) geçişlerini üretir.
+
+    Her eleman ``(status, previous_status, delay_seconds)`` demetidir;
+    ``delay_seconds`` bir önceki geçişten sonra geçen simüle edilmiş süredir.
+    """
+    transitions = []
+    previous = LIFECYCLE[0]
+    cancel_at = None
+    if rng.random() < cancel_rate:
+        cancel_at = rng.randrange(1, len(LIFECYCLE) - 1)
+
+    for index, status in enumerate(LIFECYCLE[1:], start=1):
+        if cancel_at == index:
+            transitions.append(('CANCELED', previous, rng.uniform(30, 600)))
+            return transitions
+        low, high = STAGE_DELAYS[status]
+        transitions.append((status, previous, rng.uniform(low, high)))
+        previous = status
+
+    return transitions
+
+
+def seeded_rng(seed=None):
+    return random.Random(seed)
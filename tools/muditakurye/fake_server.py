@@ -0,0 +1,437 @@
+"""Yerel MuditaKurye API taklidi (fake server).
+
+script_2.py (``POST /webhook/third-party/order`` → 202/400/401) ve script_1.py
+(``GET /webhook/third-party/health``, 429 rate-limit) sözleşmesini uygular.
+Her uç nokta için gecikme dağılımı, 5xx patlamaları ve 429 kısıtlaması
+enjekte edilebilir; kabul edilen siparişler için simüle edilmiş kurye zaman
+çizelgesi boyunca durum/iptal webhook'ları geri çağrılır.
+
+Kullanım:
+    python -m tools.muditakurye.fake_server --port 4010 --seed 42 \\
+        --faults faults.json --time-scale 0.01 \\
+        --status-webhook http://localhost:4001/api/webhook/muditakurye
+
+Backend'i bu sunucuya yönlendirmek için ``MUDITAKURYE_BASE_URL`` /
+CourierIntegrationConfig ``apiUrl`` değerini ``http://localhost:4010`` yapın.
+
+Çalışma anında yönetim:
+    GET  /__fake/stats   sayaçlar ve aktif arıza ayarları
+    POST /__fake/faults  arıza ayarlarını (kısmen) günceller
+    POST /__fake/reset   sayaçları ve siparişleri sıfırlar
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+
+from .contract import (
+    CANCEL_REASONS,
+    CANCELED_BY,
+    SIGNATURE_SCHEMES,
+    canceled_payload,
+    canonical_json,
+    lifecycle,
+    seeded_rng,
+    signed_headers,
+    status_changed_payload,
+)
+from .httpclient import HttpConnection, HttpError
+
+DEFAULT_API_KEY = 'yk_24c584705e97492483bcb4264338aa14'
+DEFAULT_WEBHOOK_URL = 'http://localhost:4001/api/webhook/muditakurye'
+
+REQUIRED_ORDER_FIELDS = ('orderId', 'restaurantId', 'customerName', 'deliveryAddress')
+
+REASONS = {
+    200: 'OK', 202: 'Accepted', 400: 'Bad Request', 401: 'Unauthorized',
+    404: 'Not Found', 405: 'Method Not Allowed', 429: 'Too Many Requests',
+    500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable',
+    504: 'Gateway Timeout',
+}
+
+# Uç nokta başına varsayılan arıza ayarları. "default" diğerlerine taban olur.
+DEFAULT_FAULTS = {
+    'default': {
+        'latency': {'dist': 'fixed', 'ms': 0},
+        'errorRate': 0.0,
+        'errorStatus': 500,
+        'burst': None,
+        'rateLimit': None,
+    },
+    'order': {},
+    'health': {},
+    'status': {},
+}
+
+
+class Latency:
+    """Gecikme dağılımı: fixed, uniform, normal, lognormal."""
+
+    def __init__(self, spec, rng):
+        self.spec = spec
+        self.rng = rng
+
+    def sample_ms(self):
+        spec = self.spec
+        dist = spec.get('dist', 'fixed')
+        if dist == 'fixed':
+            value = spec.get('ms', 0)
+        elif dist == 'uniform':
+            value = self.rng.uniform(spec.get('minMs', 0), spec.get('maxMs', 0))
+        elif dist == 'normal':
+            value = self.rng.gauss(spec.get('meanMs', 0), spec.get('stdMs', 0))
+        elif dist == 'lognormal':
+            # medianMs + sigma ile uzun kuyruklu (gerçekçi) API gecikmesi
+            value = self.rng.lognormvariate(math.log(max(spec.get('medianMs', 1), 1e-3)),
+                                            spec.get('sigma', 0.5))
+        else:
+            raise ValueError(f'Bilinmeyen gecikme dağılımı: {dist}')
+        return max(0.0, min(value, spec.get('capMs', float('inf'))))
+
+
+class TokenBucket:
+    """429 kısıtlaması için token bucket."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class EndpointFaults:
+    """Bir uç noktanın gecikme / hata / patlama / kısıtlama ayarları."""
+
+    def __init__(self, spec, rng, started_at):
+        self.spec = spec
+        self.rng = rng
+        self.started_at = started_at
+        self.latency = Latency(spec.get('latency') or {}, rng)
+        rate_limit = spec.get('rateLimit')
+        self.bucket = TokenBucket(rate_limit['rate'], rate_limit.get('burst')) if rate_limit else None
+
+    def in_burst(self):
+        """``burst: {everyS, durationS, status}`` → periyodik 5xx penceresi.
+
+        Pencere her periyodun sonunda açılır; ilk patlama ``everyS - durationS``
+        saniye sonra başlar.
+        """
+        burst = self.spec.get('burst')
+        if not burst:
+            return None
+        every = burst.get('everyS', 60)
+        duration = burst.get('durationS', 5)
+        offset = (time.monotonic() - self.started_at) % every
+        if offset >= every - duration:
+            return burst.get('status', 503)
+        return None
+
+    def decide(self):
+        """İstek için ``(delay_ms, forced_status, retry_after)`` döndürür."""
+        delay_ms = self.latency.sample_ms()
+        burst_status = self.in_burst()
+        if burst_status:
+            return delay_ms, burst_status, None
+        if self.bucket is not None and not self.bucket.take():
+            return delay_ms, 429, self.spec['rateLimit'].get('retryAfter', 1)
+        if self.spec.get('errorRate') and self.rng.random() < self.spec['errorRate']:
+            return delay_ms, self.spec.get('errorStatus', 500), None
+        return delay_ms, None, None
+
+
+def merge_faults(base, override):
+    merged = json.loads(json.dumps(base))
+    for endpoint, spec in (override or {}).items():
+        merged.setdefault(endpoint, {}).update(spec or {})
+    return merged
+
+
+class FakeMuditaKurye:
+    def __init__(self, args):
+        self.args = args
+        self.rng = seeded_rng(args.seed)
+        self.started_at = time.monotonic()
+        self.orders = {}
+        self.stats = Counter()
+        self.callback_tasks = set()
+        self.fault_specs = merge_faults(DEFAULT_FAULTS, args.faults)
+        self._build_faults()
+
+    def _build_faults(self):
+        default = self.fault_specs['default']
+        self.faults = {
+            endpoint: EndpointFaults({**default, **spec}, self.rng, self.started_at)
+            for endpoint, spec in self.fault_specs.items()
+            if endpoint != 'default'
+        }
+
+    # ------------------------------------------------------------------ HTTP
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                method, target, _version = request_line.split(' ', 2)
+                headers = {}
+                for line in header_lines:
+                    if line:
+                        name, _, value = line.partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload, extra_headers = await self.dispatch(method, target, headers, body)
+                data = canonical_json(payload)
+                response_headers = {
+                    'Content-Type': 'application/json; charset=utf-8',
+                    'Content-Length': str(len(data)),
+                    'Connection': 'keep-alive',
+                    **(extra_headers or {}),
+                }
+                head_out = f'HTTP/1.1 {status} {REASONS.get(status, "Unknown")}\r\n'
+                head_out += ''.join(f'{k}: {v}\r\n' for k, v in response_headers.items()) + '\r\n'
+                writer.write(head_out.encode('latin-1') + data)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, headers, body):
+        path = target.split('?', 1)[0]
+
+        if path.startswith('/__fake/'):
+            return self.admin(method, path, body)
+
+        if path == '/webhook/third-party/order':
+            endpoint = 'order'
+        elif path == '/webhook/third-party/health':
+            endpoint = 'health'
+        elif path.startswith('/api/orders/'):
+            endpoint = 'status'
+        else:
+            return 404, {'error': 'not_found', 'message': 'Endpoint bulunamadı'}, None
+
+        self.stats[f'{endpoint}.requests'] += 1
+        delay_ms, forced_status, retry_after = self.faults[endpoint].decide()
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+        if forced_status == 429:
+            self.stats[f'{endpoint}.429'] += 1
+            return 429, {'error': 'rate_limited', 'message': 'Rate limit aşıldı, bekleyin'}, {
+                'Retry-After': str(retry_after)
+            }
+        if forced_status:
+            self.stats[f'{endpoint}.{forced_status}'] += 1
+            return forced_status, {'error': 'server_error', 'message': 'MuditaKurye desteğe başvurun'}, None
+
+        if endpoint == 'health':
+            self.stats['health.200'] += 1
+            return 200, {'status': 'ok', 'version': 'fake-1.0',
+                         'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}, None
+
+        if not self.authorized(headers):
+            self.stats[f'{endpoint}.401'] += 1
+            return 401, {'error': 'unauthorized', 'message': 'Geçersiz API Key'}, None
+
+        if endpoint == 'status':
+            if method != 'GET':
+                return 405, {'error': 'method_not_allowed'}, None
+            order_key = path.rsplit('/', 1)[-1]
+            order = self.orders.get(order_key) or next(
+                (o for o in self.orders.values() if o['muditaKuryeOrderId'] == order_key), None
+            )
+            if not order:
+                self.stats['status.404'] += 1
+                return 404, {'error': 'not_found', 'message': 'Sipariş bulunamadı'}, None
+            self.stats['status.200'] += 1
+            return 200, {key: order[key] for key in ('orderId', 'muditaKuryeOrderId', 'status', 'updatedAt')}, None
+
+        if method != 'POST':
+            return 405, {'error': 'method_not_allowed'}, None
+        return self.create_order(body)
+
+    def authorized(self, headers):
+        if headers.get('x-api-key') == self.args.api_key:
+            return True
+        auth = headers.get('authorization', '')
+        if auth.startswith('Basic ') and self.args.basic_auth:
+            try:
+                return base64.b64decode(auth[6:]).decode('utf-8') == self.args.basic_auth
+            except (ValueError, UnicodeDecodeError):
+                return False
+        return False
+
+    def create_order(self, body):
+        try:
+            order_data = json.loads(body or b'{}')
+        except ValueError:
+            self.stats['order.400'] += 1
+            return 400, {'error': 'validation_error', 'message': 'Geçersiz JSON'}, None
+
+        missing = {field: 'Bu alan zorunludur' for field in REQUIRED_ORDER_FIELDS if not order_data.get(field)}
+        if missing:
+            self.stats['order.400'] += 1
+            return 400, {'error': 'validation_error', 'message': 'Geçersiz sipariş bilgileri',
+                         'details': missing}, None
+
+        order_id = str(order_data['orderId'])
+        existing = self.orders.get(order_id)
+        if existing:
+            # script_2.py - İdempotency: aynı orderId ile sadece ilki işleme alınır
+            self.stats['order.duplicate'] += 1
+            return 202, {'status': 'accepted', 'orderId': order_id,
+                         'muditaKuryeOrderId': existing['muditaKuryeOrderId'],
+                         'message': 'Sipariş zaten mevcut'}, None
+
+        order = {
+            'orderId': order_id,
+            'muditaKuryeOrderId': str(uuid.UUID(int=self.rng.getrandbits(128), version=4)),
+            'orderNumber': order_data.get('orderNumber') or f'RST-{time.strftime("%Y%m%d")}-{len(self.orders) % 10000:04d}',
+            'restaurantId': order_data['restaurantId'],
+            'status': 'NEW',
+            'updatedAt': time.time(),
+        }
+        self.orders[order_id] = order
+        self.stats['order.202'] += 1
+
+        if self.args.status_webhook:
+            task = asyncio.ensure_future(self.run_timeline(order))
+            self.callback_tasks.add(task)
+            task.add_done_callback(self.callback_tasks.discard)
+
+        return 202, {'status': 'accepted', 'orderId': order_id,
+                     'muditaKuryeOrderId': order['muditaKuryeOrderId'],
+                     'message': 'Sipariş alındı ve işleme konuldu'}, None
+
+    def admin(self, method, path, body):
+        if path == '/__fake/stats':
+            statuses = Counter(order['status'] for order in self.orders.values())
+            return 200, {'uptimeS': round(time.monotonic() - self.started_at, 3),
+                         'counters': dict(self.stats), 'orders': len(self.orders),
+                         'orderStatuses': dict(statuses), 'faults': self.fault_specs}, None
+        if path == '/__fake/faults' and method == 'POST':
+            try:
+                self.fault_specs = merge_faults(self.fault_specs, json.loads(body or b'{}'))
+            except ValueError:
+                return 400, {'error': 'validation_error', 'message': 'Geçersiz JSON'}, None
+            self._build_faults()
+            return 200, {'faults': self.fault_specs}, None
+        if path == '/__fake/reset' and method == 'POST':
+            self.stats.clear()
+            self.orders.clear()
+            return 200, {'reset': True}, None
+        return 404, {'error': 'not_found'}, None
+
+    # -------------------------------------------------------------- Callbacks
+
+    async def run_timeline(self, order):
+        """Simüle edilmiş kurye zaman çizelgesi boyunca webhook gönderir."""
+        connections = {}
+        try:
+            for status, previous, delay_s in lifecycle(self.rng, self.args.cancel_rate):
+                await asyncio.sleep(delay_s * self.args.time_scale)
+                order['status'] = status
+                order['updatedAt'] = time.time()
+                if status == 'CANCELED':
+                    payload = canceled_payload(order, previous, self.rng.choice(CANCEL_REASONS),
+                                               self.rng.choice(CANCELED_BY))
+                    url = self.args.cancel_webhook or self.args.status_webhook
+                else:
+                    payload = status_changed_payload(order, status, previous)
+                    url = self.args.status_webhook
+                if url not in connections:
+                    connections[url] = HttpConnection(url, timeout=self.args.callback_timeout)
+                await self.deliver(connections[url], payload)
+        finally:
+            for connection in connections.values():
+                await connection.close()
+
+    async def deliver(self, connection, payload):
+        body = canonical_json(payload)
+        # Tekrar denemeler aynı olayın teslimidir: webhook ID sabit, imza her denemede taze
+        webhook_id = uuid.uuid4().hex
+        for attempt in range(self.args.callback_retries + 1):
+            headers = signed_headers(body, self.args.webhook_secret, scheme=self.args.scheme,
+                                     webhook_id=webhook_id)
+            try:
+                status, _headers, _body = await connection.request('POST', body, headers)
+            except HttpError:
+                status = None
+            self.stats[f'callback.{status or "error"}'] += 1
+            if status is not None and status < 500 and status != 429:
+                return status
+            # MuditaKurye retry yapar: üstel bekleme
+            await asyncio.sleep(min(2 ** attempt, 30) * self.args.time_scale)
+        return None
+
+
+async def serve(args):
+    fake = FakeMuditaKurye(args)
+    server = await asyncio.start_server(fake.handle_connection, args.host, args.port)
+    print(f'🚀 Fake MuditaKurye çalışıyor: http://{args.host}:{args.port}')
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Yerel MuditaKurye API taklidi')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4010)
+    parser.add_argument('--api-key', default=os.environ.get('MUDITAKURYE_API_KEY', DEFAULT_API_KEY))
+    parser.add_argument('--basic-auth', default=None, help='"kullanıcı:şifre" (Basic Auth için)')
+    parser.add_argument('--faults', default=None, help='Arıza ayarları JSON dosyası')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--status-webhook', default=DEFAULT_WEBHOOK_URL,
+                        help='Durum webhook URL (boş bırakılırsa geri çağrı yapılmaz)')
+    parser.add_argument('--cancel-webhook', default=None, help='İptal webhook URL (varsayılan: status)')
+    parser.add_argument('--webhook-secret', default=os.environ.get('MUDITAKURYE_WEBHOOK_SECRET',
+                                                                   os.environ.get('MUDITA_WEBHOOK_SECRET', '')))
+    parser.add_argument('--scheme', choices=SIGNATURE_SCHEMES, default='timestamped')
+    parser.add_argument('--time-scale', type=float, default=0.01,
+                        help='Kurye zaman çizelgesi çarpanı (0.01 → 100 kat hızlı)')
+    parser.add_argument('--cancel-rate', type=float, default=0.05)
+    parser.add_argument('--callback-timeout', type=float, default=5.0)
+    parser.add_argument('--callback-retries', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.faults:
+        with open(args.faults, encoding='utf-8') as handle:
+            args.faults = json.load(handle)
+    if args.status_webhook and not args.webhook_secret:
+        parser.error('Geri çağrılar için --webhook-secret veya MUDITAKURYE_WEBHOOK_SECRET gerekli')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
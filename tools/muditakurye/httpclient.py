@@ -0,0 +1,98 @@
+"""asyncio üzerinde minimal, keep-alive destekli HTTP/1.1 istemcisi.
+
+Yük üretirken her istek için yeni bağlantı açmak ölçümü bozar; bu yüzden her
+``HttpConnection`` tek bir TCP bağlantısını yeniden kullanır. Harici bağımlılık
+gerektirmez.
+"""
+
+import asyncio
+from urllib.parse import urlsplit
+
+
+class HttpError(Exception):
+    """Bağlantı veya protokol hatası."""
+
+
+class HttpConnection:
+    def __init__(self, url, timeout=10.0):
+        parts = urlsplit(url)
+        if parts.scheme != 'http':
+            raise ValueError('Yalnızca http:// hedefleri destekleniyor')
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def request(self, method, body=b'', headers=None, path=None):
+        """İstek gönderir; ``(status, headers, body)`` döndürür."""
+        if self._writer is None or self._writer.is_closing():
+            await self._connect()
+
+        lines = [
+            f'{method} {path or self.path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Connection: keep-alive',
+            f'Content-Length: {len(body)}',
+        ]
+        for name, value in (headers or {}).items():
+            lines.append(f'{name}: {value}')
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        try:
+            self._writer.write(head + body)
+            await self._writer.drain()
+            status, response_headers, response_body = await asyncio.wait_for(
+                self._read_response(), self.timeout
+            )
+        except (asyncio.TimeoutError, ConnectionError, OSError, asyncio.IncompleteReadError) as error:
+            await self.close()
+            raise HttpError(type(error).__name__) from error
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, response_headers, response_body
+
+    async def _read_response(self):
+        status_line = await self._reader.readuntil(b'\r\n')
+        try:
+            status = int(status_line.split(b' ', 2)[1])
+        except (IndexError, ValueError) as error:
+            raise HttpError(f'Geçersiz durum satırı: {status_line!r}') from error
+
+        headers = {}
+        while True:
+            line = await self._reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    await self._reader.readuntil(b'\r\n')
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+            return status, headers, b''.join(chunks)
+
+        length = int(headers.get('content-length', 0))
+        return status, headers, await self._reader.readexactly(length) if length else b''
@@ -0,0 +1,259 @@
+"""MuditaKurye webhook yük üretici.
+
+script_3.py'deki ``order.status_changed`` / ``order.canceled`` payload'larını
+gerçekçi NEW → DELIVERED yaşam döngüleri boyunca üretir, aynı HMAC-SHA256
+şemasıyla imzalar ve ``receiveMuditaKuryeWebhook`` uç noktasına sabit hızda
+(open-loop) gönderir. Gecikme, isteğin *planlanan* gönderim anından ölçülür;
+böylece sunucu yavaşladığında oluşan kuyruk beklemesi de sonuca yansır
+(coordinated omission düzeltmesi).
+
+Kullanım:
+    python -m tools.muditakurye.loadgen --rate 2000 --duration 30 \\
+        --url http://localhost:4001/api/webhook/muditakurye
+
+Not: ``/api/webhook`` rotaları ``webhookRateLimiter`` arkasındadır; limit
+kapatılmadan yapılan testlerde 429 yanıtları hata oranında ayrıca görünür.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from .contract import (
+    CANCEL_REASONS,
+    CANCELED_BY,
+    SIGNATURE_SCHEMES,
+    canceled_payload,
+    canonical_json,
+    lifecycle,
+    new_order,
+    seeded_rng,
+    signed_headers,
+    status_changed_payload,
+)
+from .httpclient import HttpConnection, HttpError
+
+DEFAULT_URL = 'http://localhost:4001/api/webhook/muditakurye'
+TICK_SECONDS = 0.001
+
+
+def percentile(sorted_values, pct):
+    """Sıralı liste üzerinde nearest-rank yüzdelik."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LifecycleSource:
+    """Eşzamanlı aktif siparişlerin durum geçişlerini sırayla üretir.
+
+    Bir sipariş yaşam döngüsünü tamamladığında yerine yenisi açılır; böylece
+    sabit sayıda sipariş her zaman "yolda" kalır.
+    """
+
+    def __init__(self, rng, active_orders, cancel_rate):
+        self.rng = rng
+        self.cancel_rate = cancel_rate
+        self.sequence = 0
+        self.active = [self._open() for _ in range(active_orders)]
+        self.completed_orders = 0
+
+    def _open(self):
+        self.sequence += 1
+        order = new_order(self.rng, sequence=self.sequence)
+        return order, list(reversed(lifecycle(self.rng, self.cancel_rate)))
+
+    def next_payload(self):
+        slot = self.rng.randrange(len(self.active))
+        order, remaining = self.active[slot]
+        status, previous, _delay = remaining.pop()
+        if not remaining:
+            self.active[slot] = self._open()
+            self.completed_orders += 1
+
+        if status == 'CANCELED':
+            return canceled_payload(
+                order,
+                previous,
+                self.rng.choice(CANCEL_REASONS),
+                self.rng.choice(CANCELED_BY),
+            )
+        return status_changed_payload(order, status, previous)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.service_ms = []
+        self.status_codes = Counter()
+        self.transport_errors = Counter()
+        self.by_webhook_status = Counter()
+        self.dropped = 0
+        self.sent = 0
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies_ms)
+        service = sorted(self.service_ms)
+        completed = len(latencies)
+        failures = sum(count for code, count in self.status_codes.items() if code >= 300)
+        failures += sum(self.transport_errors.values())
+        return {
+            'sent': self.sent,
+            'completed': completed,
+            'dropped': self.dropped,
+            'elapsedSeconds': round(elapsed, 3),
+            'throughputPerSecond': round(completed / elapsed, 1) if elapsed else 0.0,
+            'errorRate': round(failures / max(1, completed + sum(self.transport_errors.values())), 4),
+            'latencyMs': {
+                'p50': round(percentile(latencies, 50), 2),
+                'p95': round(percentile(latencies, 95), 2),
+                'p99': round(percentile(latencies, 99), 2),
+                'max': round(latencies[-1], 2) if latencies else 0.0,
+            },
+            'serviceTimeMs': {
+                'p50': round(percentile(service, 50), 2),
+                'p95': round(percentile(service, 95), 2),
+                'p99': round(percentile(service, 99), 2),
+            },
+            'statusCodes': {str(code): count for code, count in sorted(self.status_codes.items())},
+            'transportErrors': dict(self.transport_errors),
+            'webhookStatuses': dict(self.by_webhook_status),
+        }
+
+
+async def _schedule(queue, source, stats, rate, duration, start):
+    """Hedef hızda olay üretir; kuyruk doluysa olayı düşürür ve sayar."""
+    emitted = 0
+    while True:
+        now = time.perf_counter()
+        elapsed = now - start
+        if elapsed >= duration:
+            break
+        due = int(elapsed * rate)
+        while emitted < due:
+            intended = start + emitted / rate
+            emitted += 1
+            payload = source.next_payload()
+            try:
+                queue.put_nowait((intended, payload))
+            except asyncio.QueueFull:
+                stats.dropped += 1
+        await asyncio.sleep(TICK_SECONDS)
+
+
+async def _worker(queue, url, secret, scheme, timeout, stats):
+    connection = HttpConnection(url, timeout=timeout)
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            intended, payload = item
+            body = canonical_json(payload)
+            headers = signed_headers(body, secret, scheme=scheme)
+            stats.sent += 1
+            sent_at = time.perf_counter()
+            try:
+                status, _headers, _body = await connection.request('POST', body, headers)
+                stats.status_codes[status] += 1
+                stats.by_webhook_status[payload['status']] += 1
+            except HttpError as error:
+                stats.transport_errors[str(error)] += 1
+                queue.task_done()
+                continue
+            done = time.perf_counter()
+            stats.latencies_ms.append((done - intended) * 1000.0)
+            stats.service_ms.append((done - sent_at) * 1000.0)
+            queue.task_done()
+    finally:
+        await connection.close()
+
+
+async def run(args):
+    rng = seeded_rng(args.seed)
+    source = LifecycleSource(rng, args.orders, args.cancel_rate)
+    stats = Stats()
+    queue = asyncio.Queue(maxsize=args.max_backlog)
+
+    workers = [
+        asyncio.create_task(_worker(queue, args.url, args.secret, args.scheme, args.timeout, stats))
+        for _ in range(args.connections)
+    ]
+
+    start = time.perf_counter()
+    await _schedule(queue, source, stats, args.rate, args.duration, start)
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start
+
+    summary = stats.summary(elapsed)
+    summary['completedLifecycles'] = source.completed_orders
+    summary['targetRatePerSecond'] = args.rate
+    return summary
+
+
+def print_report(summary):
+    print('=' * 60)
+    print('📊 MuditaKurye Webhook Yük Testi')
+    print('=' * 60)
+    print(f"Hedef hız      : {summary['targetRatePerSecond']} istek/sn")
+    print(f"Gerçekleşen    : {summary['throughputPerSecond']} istek/sn "
+          f"({summary['completed']} tamamlandı, {summary['dropped']} düşürüldü)")
+    print(f"Hata oranı     : {summary['errorRate'] * 100:.2f}%")
+    latency = summary['latencyMs']
+    print(f"Gecikme (ms)   : p50={latency['p50']}  p95={latency['p95']}  "
+          f"p99={latency['p99']}  max={latency['max']}")
+    service = summary['serviceTimeMs']
+    print(f"Servis (ms)    : p50={service['p50']}  p95={service['p95']}  p99={service['p99']}")
+    print(f"HTTP kodları   : {summary['statusCodes']}")
+    if summary['transportErrors']:
+        print(f"Bağlantı hata. : {summary['transportErrors']}")
+    print(f"Durum dağılımı : {summary['webhookStatuses']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='MuditaKurye webhook yük üretici')
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--secret', default=os.environ.get('MUDITAKURYE_WEBHOOK_SECRET',
+                                                           os.environ.get('MUDITA_WEBHOOK_SECRET')))
+    parser.add_argument('--scheme', choices=SIGNATURE_SCHEMES, default='timestamped',
+                        help='timestamped: backend/utils/webhookSecurity.js, raw: script_3.py')
+    parser.add_argument('--rate', type=float, default=1000.0, help='Saniyedeki webhook sayısı')
+    parser.add_argument('--duration', type=float, default=10.0, help='Test süresi (saniye)')
+    parser.add_argument('--connections', type=int, default=64, help='Keep-alive bağlantı sayısı')
+    parser.add_argument('--orders', type=int, default=500, help='Eşzamanlı aktif sipariş sayısı')
+    parser.add_argument('--cancel-rate', type=float, default=0.05)
+    parser.add_argument('--timeout', type=float, default=10.0, help='İstek zaman aşımı (saniye)')
+    parser.add_argument('--max-backlog', type=int, default=10000,
+                        help='Gönderilmeyi bekleyen en fazla olay sayısı')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', action='store_true', help='Özeti JSON olarak yazdır')
+    args = parser.parse_args(argv)
+
+    if not args.secret:
+        parser.error('--secret veya MUDITAKURYE_WEBHOOK_SECRET gerekli')
+    if args.rate <= 0 or args.duration <= 0 or args.connections <= 0 or args.orders <= 0:
+        parser.error('--rate, --duration, --connections ve --orders pozitif olmalı')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = asyncio.run(run(args))
+    if args.json:
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(summary)
+    return 0 if summary['errorRate'] < 1.0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""Sözleşmeden şemaya derleyici.
+
+``order_content`` (script_2.py) ve ``webhook_content`` (script_3.py) içindeki
+JSON örnekleri, sipariş ve webhook payload'larının tek spesifikasyonudur. Bu
+araç o blokları çıkarır, tipli bir şema çıkarır (zorunlu/opsiyonel alanlar,
+script.py'deki dokuz durum gibi enum'lar, uuid/date-time biçimleri) ve
+``backend/schemas/generated/muditaKuryeContract.js`` içine önceden derlenmiş,
+düz (yorumlayıcısız) JavaScript doğrulayıcıları üretir.
+
+Kullanım:
+    python -m tools.muditakurye.schema_compiler          # dosyayı üret
+    python -m tools.muditakurye.schema_compiler --check  # güncel mi? (CI)
+"""
+
+import argparse
+import json
+import os
+import re
+import runpy
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DOCS_DIR = os.path.join(REPO_ROOT, 'Docs', 'MuditaKurye Entegrasyon Dokümantasyonu')
+OUTPUT_PATH = os.path.join(REPO_ROOT, 'backend', 'schemas', 'generated', 'muditaKuryeContract.js')
+
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$', re.I)
+DATE_TIME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$')
+
+# Dokümandaki örneklerden şema çıkarma kuralları.
+#   examples     : şemayı besleyen JSON bloklarının başlıkları
+#   requiredFrom : yalnızca bu örnekteki alanlar zorunludur (yoksa: tüm örneklerde ortak alanlar)
+#   enums        : alan adı -> enum kaynağı ('statuses' = script.py durum listesi, 'observed' = örnek değerleri)
+#   extensions   : dokümanda olmayan ama backend'in bugün kabul ettiği değerler
+#                  (schemas/webhookSchemas.js muditaKuryeWebhookSchema ile geriye uyumluluk)
+CONTRACTS = (
+    {
+        'name': 'MuditaKuryeOrder',
+        'source': ('script_2.py', 'order_content'),
+        'examples': ('Request Body (Tüm Alanlar)', 'Request Body (Zorunlu Alanlar)'),
+        'requiredFrom': 'Request Body (Zorunlu Alanlar)',
+        'enums': {},
+        'extensions': {},
+    },
+    {
+        'name': 'MuditaKuryeWebhookPayload',
+        'source': ('script_3.py', 'webhook_content'),
+        'examples': ('Durum Güncellemesi', 'İptal Bildirimi'),
+        'requiredFrom': None,
+        # previousStatus serbest metin kalır: Joi şeması da her string'i kabul ediyordu
+        'enums': {'status': 'statuses', 'event': 'observed'},
+        'extensions': {
+            # Eski biçimde (testWebhook.js) event / muditaKuryeOrderId gelmeyebilir
+            'optional': ('event', 'orderId', 'muditaKuryeOrderId', 'previousStatus'),
+            'enumValues': {
+                'status': ('FAILED',),
+                'event': ('order.delivered', 'order.assigned'),
+            },
+            'fields': {
+                'provider': {'type': 'string', 'enum': ['THIRD_PARTY', 'DIRECT']},
+                'canceledBy': {'type': 'string', 'enum': ['RESTAURANT', 'CUSTOMER', 'COURIER', 'SYSTEM']},
+                'metadata': {'type': 'object'},
+            },
+            'maxLength': {'orderNumber': 100, 'reason': 500},
+        },
+    },
+)
+
+
+def load_content(script, variable):
+    return runpy.run_path(os.path.join(DOCS_DIR, script), run_name='schema_compiler')[variable]
+
+
+def json_blocks(markdown):
+    """``### Başlık`` → ilk ```json bloğu eşlemesi."""
+    blocks = {}
+    heading = None
+    for match in re.finditer(r'^(#{2,4}) ([^\n]+)$|^```json\n(.*?)^```', markdown, re.M | re.S):
+        if match.group(2):
+            heading = match.group(2).strip()
+        elif heading and heading not in blocks:
+            blocks[heading] = json.loads(match.group(3))
+    return blocks
+
+
+def documented_statuses():
+    readme = load_content('script.py', 'readme_content')
+    section = readme.split('### Sipariş Durumları', 1)[1].split('\n## ', 1)[0]
+    return re.findall(r'^- `([A-Z_]+)`', section, re.M)
+
+
+def infer_type(value):
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, list):
+        return 'array'
+    if isinstance(value, dict):
+        return 'object'
+    raise ValueError(f'Desteklenmeyen JSON değeri: {value!r}')
+
+
+def infer_object(samples, required_keys=None):
+    """Örnek nesnelerden ``{alan: şema}`` çıkarır (alan sırası korunur)."""
+    fields = {}
+    for sample in samples:
+        for key, value in sample.items():
+            fields.setdefault(key, []).append(value)
+
+    if required_keys is None:
+        required_keys = set.intersection(*(set(sample) for sample in samples)) if samples else set()
+
+    schema = {}
+    for key, values in fields.items():
+        types = {infer_type(value) for value in values}
+        if len(types) != 1:
+            raise ValueError(f'{key} alanı için tutarsız tipler: {sorted(types)}')
+        field = {'type': types.pop(), 'required': key in required_keys, 'observed': values}
+        if field['type'] == 'string':
+            if all(UUID_RE.match(value) for value in values):
+                field['format'] = 'uuid'
+            elif all(DATE_TIME_RE.match(value) for value in values):
+                field['format'] = 'date-time'
+        elif field['type'] == 'array':
+            items = [item for value in values for item in value]
+            if items and all(isinstance(item, dict) for item in items):
+                field['items'] = infer_object(items)
+        elif field['type'] == 'object':
+            field['properties'] = infer_object(values)
+        schema[key] = field
+    return schema
+
+
+def build_schema(contract, statuses):
+    blocks = json_blocks(load_content(*contract['source']))
+    missing = [heading for heading in contract['examples'] if heading not in blocks]
+    if missing:
+        raise ValueError(f"{contract['name']}: dokümanda JSON örneği bulunamadı: {missing}")
+
+    samples = [blocks[heading] for heading in contract['examples']]
+    required = set(blocks[contract['requiredFrom']]) if contract['requiredFrom'] else None
+    schema = infer_object(samples, required)
+
+    for key, source in contract['enums'].items():
+        if key in schema:
+            values = statuses if source == 'statuses' else list(dict.fromkeys(schema[key]['observed']))
+            schema[key]['enum'] = list(values)
+
+    extensions = contract['extensions']
+    for key in extensions.get('optional', ()):
+        schema[key]['required'] = False
+    for key, values in extensions.get('enumValues', {}).items():
+        schema[key]['enum'] += [value for value in values if value not in schema[key]['enum']]
+    for key, spec in extensions.get('fields', {}).items():
+        schema.setdefault(key, {'required': False, 'observed': []}).update(spec)
+    for key, limit in extensions.get('maxLength', {}).items():
+        schema[key]['maxLength'] = limit
+    return schema
+
+
+# --------------------------------------------------------------------- JS codegen
+
+# Önceki Joi sözleşmesiyle uyumlu: Joi.number() sayısal metinleri ("12.50") kabul eder
+TYPE_CHECKS = {
+    'string': "typeof {v} !== 'string'",
+    'number': '!isNumeric({v})',
+    'boolean': "typeof {v} !== 'boolean'",
+    'array': '!Array.isArray({v})',
+    'object': "{v} === null || typeof {v} !== 'object' || Array.isArray({v})",
+}
+
+
+ARTICLES = {'string': 'a', 'number': 'a', 'boolean': 'a', 'array': 'an', 'object': 'an'}
+
+
+def js_string(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+class Generator:
+    def __init__(self):
+        self.constants = []
+        self.helpers = []
+
+    def constant(self, name, values):
+        self.constants.append(f'const {name} = new Set({js_string(values)});')
+        return name
+
+    def field_checks(self, prefix, schema, target, path_expr, indent):
+        pad = ' ' * indent
+        lines = []
+        for key, field in schema.items():
+            value = f'{target}[{js_string(key)}]'
+            path = f'{path_expr} + {js_string(key)}' if path_expr else js_string(key)
+            label = f'\\"{key}\\"'
+            lines.append(f'{pad}value = {value};')
+            if field['required']:
+                lines.append(f"{pad}if (value === undefined || value === null || value === '') {{")
+                lines.append(f"{pad}    errors.push({{ field: {path}, message: \"{label} is required\", type: 'any.required' }});")
+                lines.append(f'{pad}}} else {{')
+            else:
+                lines.append(f'{pad}if (value !== undefined && value !== null) {{')
+            inner = ' ' * (indent + 4)
+            check = TYPE_CHECKS[field['type']].format(v='value')
+            lines.append(f'{inner}if ({check}) {{')
+            lines.append(f"{inner}    errors.push({{ field: {path}, message: \"{label} must be {ARTICLES[field['type']]} {field['type']}\", type: '{field['type']}.base' }});")
+
+            if 'enum' in field:
+                name = self.constant(f"{prefix}_{to_constant(key)}_VALUES", field['enum'])
+                lines.append(f'{inner}}} else if (!{name}.has(value)) {{')
+                lines.append(f"{inner}    errors.push({{ field: {path}, message: \"{label} must be one of \" + {js_string(', '.join(field['enum']))}, type: 'any.only' }});")
+            if field.get('format') == 'uuid':
+                lines.append(f'{inner}}} else if (!UUID_PATTERN.test(value)) {{')
+                lines.append(f"{inner}    errors.push({{ field: {path}, message: \"{label} must be a valid GUID\", type: 'string.guid' }});")
+            if field.get('format') == 'date-time':
+                lines.append(f'{inner}}} else if (!DATE_TIME_PATTERN.test(value) || Number.isNaN(Date.parse(value))) {{')
+                lines.append(f"{inner}    errors.push({{ field: {path}, message: \"{label} must be in ISO 8601 date format\", type: 'date.format' }});")
+            if 'maxLength' in field:
+                limit = field['maxLength']
+                lines.append(f'{inner}}} else if (value.length > {limit}) {{')
+                lines.append(f"{inner}    errors.push({{ field: {path}, message: \"{label} length must be less than or equal to {limit} characters long\", type: 'string.max' }});")
+            if field['type'] == 'array' and 'items' in field:
+                helper = self.object_helper(f'{prefix}_{to_constant(key)}_ITEM', field['items'])
+                lines.append(f'{inner}}} else {{')
+                lines.append(f'{inner}    for (let i = 0; i < value.length; i++) {{')
+                lines.append(f"{inner}        {helper}(value[i], {path} + '.' + i + '.', errors);")
+                lines.append(f'{inner}    }}')
+            if field['type'] == 'object' and field.get('properties'):
+                helper = self.object_helper(f'{prefix}_{to_constant(key)}', field['properties'])
+                lines.append(f'{inner}}} else {{')
+                lines.append(f"{inner}    {helper}(value, {path} + '.', errors);")
+            lines.append(f'{inner}}}')
+            lines.append(f'{pad}}}')
+        return lines
+
+    def object_helper(self, prefix, schema):
+        name = 'check' + ''.join(part.capitalize() for part in prefix.lower().split('_'))
+        body = self.field_checks(prefix, schema, 'item', 'path', 8)
+        self.helpers.append('\n'.join([
+            f'function {name}(item, path, errors) {{',
+            "    if (item === null || typeof item !== 'object' || Array.isArray(item)) {",
+            "        errors.push({ field: path.slice(0, -1), message: 'must be an object', type: 'object.base' });",
+            '        return;',
+            '    }',
+            '    let value;',
+            *[line[4:] for line in body],
+            '}',
+        ]))
+        return name
+
+    def validator(self, contract_name, schema):
+        prefix = to_constant(contract_name)
+        body = self.field_checks(prefix, schema, 'payload', None, 4)
+        required = [key for key, field in schema.items() if field['required']]
+        optional = [key for key, field in schema.items() if not field['required']]
+        doc = [
+            '/**',
+            f' * Validate a {contract_name} payload (generated from the integration docs).',
+            f" * Required: {', '.join(required) or '-'}",
+            f" * Optional: {', '.join(optional) or '-'}",
+            ' *',
+            ' * @param {Object} payload - Parsed JSON body',
+            ' * @returns {{ valid: boolean, errors: Array<{field: string, message: string, type: string}> }}',
+            ' */',
+        ]
+        return '\n'.join([
+            *doc,
+            f'export function validate{contract_name}(payload) {{',
+            "    if (payload === null || typeof payload !== 'object' || Array.isArray(payload)) {",
+            "        return { valid: false, errors: [{ field: '', message: 'Payload must be an object', type: 'object.base' }] };",
+            '    }',
+            '    const errors = [];',
+            '    let value;',
+            *body,
+            '    return errors.length === 0 ? VALID : { valid: false, errors };',
+            '}',
+        ])
+
+
+def to_constant(name):
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).upper()
+
+
+def render(schemas, statuses):
+    generator = Generator()
+    validators = [generator.validator(name, schema) for name, schema in schemas]
+    header = [
+        '// AUTO-GENERATED by tools/muditakurye/schema_compiler.py - DO NOT EDIT.',
+        '// Source: Docs/MuditaKurye Entegrasyon Dokümantasyonu (script.py, script_2.py, script_3.py)',
+        '// Regenerate: python -m tools.muditakurye.schema_compiler',
+        '',
+        '/**',
+        ' * Precompiled MuditaKurye contract validators',
+        ' * Straight-line checks derived from the documented JSON examples; no schema',
+        ' * interpretation happens per request. Payloads are never mutated, so HMAC',
+        ' * signatures computed over the original body stay valid.',
+        ' */',
+        '',
+        f'export const MUDITAKURYE_STATUSES = Object.freeze({js_string(statuses)});',
+        '',
+        "const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$/i;",
+        '// ISO 8601 as Joi isoDate() accepts it: time, seconds and offset are optional',
+        "const DATE_TIME_PATTERN = /^\\d{4}-\\d{2}-\\d{2}(T\\d{2}:\\d{2}(:\\d{2}(\\.\\d+)?)?(Z|[+-]\\d{2}(:?\\d{2})?)?)?$/;",
+        "const NUMERIC_PATTERN = /^\\s*[+-]?(\\d+\\.?\\d*|\\.\\d+)(e[+-]?\\d+)?\\s*$/i;",
+        'const VALID = Object.freeze({ valid: true, errors: Object.freeze([]) });',
+        '',
+        '// Numbers, or numeric strings as Joi.number() converts them',
+        "const isNumeric = (value) => (typeof value === 'number' ? Number.isFinite(value) : typeof value === 'string' && NUMERIC_PATTERN.test(value));",
+        '',
+    ]
+    parts = header + generator.constants + ['']
+    for helper in generator.helpers:
+        parts += [helper, '']
+    for validator in validators:
+        parts += [validator, '']
+    return '\n'.join(parts)
+
+
+def compile_contracts():
+    statuses = documented_statuses()
+    if len(statuses) != 9:
+        raise ValueError(f'script.py içinde dokuz durum bekleniyordu, bulunan: {statuses}')
+    schemas = [(contract['name'], build_schema(contract, statuses)) for contract in CONTRACTS]
+    return render(schemas, statuses), schemas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='MuditaKurye sözleşme → JS doğrulayıcı derleyici')
+    parser.add_argument('--out', default=OUTPUT_PATH)
+    parser.add_argument('--check', action='store_true', help='Üretilen dosya güncel değilse exit 1')
+    args = parser.parse_args(argv)
+
+    source, schemas = compile_contracts()
+    try:
+        with open(args.out, encoding='utf-8') as handle:
+            current = handle.read()
+    except FileNotFoundError:
+        current = None
+
+    for name, schema in schemas:
+        required = sum(1 for field in schema.values() if field['required'])
+        print(f'✅ {name}: {len(schema)} alan ({required} zorunlu)')
+
+    if args.check:
+        if current != source:
+            print(f'❌ {os.path.relpath(args.out, REPO_ROOT)} güncel değil')
+            return 1
+        return 0
+
+    if current != source:
+        os.makedirs(os.path.dirname(args.out), exist_ok=True)
+        with open(args.out, 'w', encoding='utf-8') as handle:
+            handle.write(source)
+        print(f'📝 {os.path.relpath(args.out, REPO_ROOT)} yazıldı')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())